@@ -0,0 +1,163 @@
+"""hot/archive 分割のベンチマーク: 退避前（全履歴が state.sqlite）vs 退避後（直近 --keep 日だけ本体）。
+
+合成した記事 DB（bench_db_connect と同じ生成、既定 5 万件）の時刻を直近 --days 日（既定 365 日）に散らし、
+3 記事ずつのトピックと一部のトピックの insight を作ってから、次を退避の前後で測る。
+
+- 大きさ: state.sqlite（退避後は VACUUM 済み）と archive.sqlite のファイルサイズ
+- 本体だけを読む処理: 運用ページの統計（_build_ops_page_data）、本文を含む全件走査（dedupe・
+  エンティティ抽出の走査相当）、FTS の作り直し（'rebuild'）
+- 退避済みの行も読む処理（connect(archive=True) の all_<表>）: タイムライン、検索インデックス、
+  予測検証のダイジェスト（本体で足りる 72h と、境界より前にかかる期間）。結果が退避前と一致したかも表示する
+  （タイムラインは退避前後の両方で作ったページ、ダイジェストは元になる行を比べる）
+- 退避ジョブ自体の所要時間
+
+使い方:
+    python scripts/bench_archive.py                    # 5 万件、直近 90 日を残す
+    python scripts/bench_archive.py --n 200000 --keep 30
+
+報告値: 処理ごとの所要 ms（--rounds 回の最小値）。
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import archive  # noqa: E402
+import db  # noqa: E402
+import forecast_generate  # noqa: E402
+import render_feeds  # noqa: E402
+import render_main  # noqa: E402
+import topic_timeline  # noqa: E402
+from bench_db_connect import build_db  # noqa: E402
+from bench_event_ts import RecordingCursor, add_topics, spread_timestamps  # noqa: E402
+from bench_topic_stats import add_insights  # noqa: E402
+
+
+def _best_ms(fn, rounds: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def _sizes(path: Path) -> str:
+    arch = db.archive_path()
+    arch_mb = arch.stat().st_size / 2**20 if arch.exists() else 0.0
+    return f"state.sqlite={path.stat().st_size / 2**20:.1f}MB archive.sqlite={arch_mb:.1f}MB"
+
+
+def measure(path: Path, workdir: Path, label: str, keep_days: int, rounds: int) -> dict:
+    """各処理の (ms, 結果) を返す。結果は退避の前後で同じになるべきもの（タイムライン等）だけ持つ。"""
+    now = datetime.now(timezone.utc)
+    cutoff_48h = (now - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
+    out_dir = workdir / label
+    results: dict[str, tuple[float, object]] = {}
+
+    conn = db.connect(readonly=True, archive=True)
+    cur = conn.cursor()
+    results["ops_page_data"] = (_best_ms(lambda: render_main._build_ops_page_data(cur, cutoff_48h, {}), rounds)[0], None)
+    results["full_scan_content"] = (_best_ms(
+        lambda: cur.execute("SELECT COUNT(*) FROM articles WHERE content LIKE '%zzzz%'").fetchone(), rounds)[0], None)
+
+    def timelines():
+        topic_timeline.render_topic_timelines(out_dir, top_n=50, conn=conn)
+        return {p.parent.name: p.read_text(encoding="utf-8") for p in (out_dir / "topic").glob("*/index.html")}
+
+    def search():
+        render_feeds.render_search_page(out_dir, "now", cur)
+        return (out_dir / "search-index.json").read_text(encoding="utf-8")
+
+    def digest(hours):
+        # カテゴリごとの上位 per_cat 件は重要度が同じ記事の間で未定義なので、ダイジェストの元になる行を比べる
+        def run():
+            rec = RecordingCursor(cur)
+            forecast_generate.build_news_digest(rec, hours=hours, per_cat=8)
+            sql, params = rec.calls[-1]
+            return sorted(cur.execute(sql, params).fetchall())
+        return run
+
+    results["timelines"] = _best_ms(timelines, rounds)
+    results["search_index"] = _best_ms(search, rounds)
+    results["digest_72h"] = _best_ms(digest(72), rounds)
+    results[f"digest_{keep_days + 30}d"] = _best_ms(digest((keep_days + 30) * 24), rounds)
+    conn.close()
+
+    # FTS の作り直しは書き込みになるので、測ったら戻す
+    conn = db.connect()
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='articles_fts'").fetchone():
+        t0 = time.perf_counter()
+        conn.execute("INSERT INTO articles_fts(articles_fts) VALUES('rebuild')")
+        results["fts_rebuild"] = ((time.perf_counter() - t0) * 1000, None)
+        conn.rollback()
+    conn.close()
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000, help="記事数")
+    ap.add_argument("--days", type=int, default=365, help="記事の時刻を散らす日数")
+    ap.add_argument("--keep", type=int, default=90, help="本体に残す日数（これより前を退避する）")
+    ap.add_argument("--rounds", type=int, default=3, help="各処理の実行回数（最小値を報告）")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_archive_"))
+    try:
+        path = workdir / "state.sqlite"
+        t0 = time.perf_counter()
+        build_db(path, args.n, args.seed)
+        spread_timestamps(path, args.days)
+        add_topics(path)
+        add_insights(path)
+        db.DB_PATH = path
+        conn = db.connect()
+        db.update_topic_stats(conn.cursor())
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        print(f"built {args.n} articles in {time.perf_counter() - t0:.1f}s")
+        print(f"before: {_sizes(path)}")
+        before = measure(path, workdir, "before", args.keep, args.rounds)
+
+        t0 = time.perf_counter()
+        logging.basicConfig(level=logging.INFO, format="  %(message)s")
+        moved = archive.main(args.keep, vacuum=True)
+        print(f"archive job: {time.perf_counter() - t0:.1f}s moved articles={moved['articles']} "
+              f"topics={moved['topics']} insights={moved['topic_insights']}")
+        print(f"after:  {_sizes(path)}")
+        after = measure(path, workdir, "after", args.keep, args.rounds)
+
+        for name, (before_ms, before_result) in before.items():
+            after_ms, after_result = after[name]
+            if name == "timelines":
+                # 記事がすべて退避されたトピックは対象から外れる（既存のページをそのまま使う）ので、両方で作ったページを比べる
+                common = before_result.keys() & after_result.keys()
+                same = (f"pages={len(before_result)}->{len(after_result)} common="
+                        + ("same" if all(before_result[k] == after_result[k] for k in common) else "DIFFERENT"))
+            else:
+                same = "" if before_result is None else ("same" if before_result == after_result else "DIFFERENT")
+            print(f"{name:20s} before={before_ms:9.2f}ms after={after_ms:9.2f}ms "
+                  f"({before_ms / max(after_ms, 1e-6):5.1f}x) {same}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""collect.main() のオフラインベンチマーク（記録済みレスポンスをローカル再生）。
+
+ライブホストに取りに行くと遅く、実行ごとに結果も変わるため、一度だけ
+--record でフィード／記事レスポンスをコーパスに保存し、以後はローカルの
+再生サーバ（src/http_replay.py）に対して collect.main() を実行して計測する。
+
+使い方:
+    # 記録（ライブ取得。作業用の一時ディレクトリで実行し data/state.sqlite には触れない）
+    python scripts/bench_collect.py --record bench_corpus/
+
+    # 再生して計測（既定は空 DB で 1 回）
+    python scripts/bench_collect.py bench_corpus/ --runs 3
+    python scripts/bench_collect.py bench_corpus/ --latency-ms 80 --jitter-ms 200 \\
+        --error-rate 0.05 --timeout-rate 0.02 --client-timeout 3
+    # 2 回目以降は同じ DB を使う（304・既存記事スキップが効く定常状態の計測）
+    python scripts/bench_collect.py bench_corpus/ --runs 3 --warm --not-modified-rate 0.7
+    # ストリーミングモードとの比較
+    python scripts/bench_collect.py bench_corpus/ --pipeline
+
+報告値: 段階別の所要秒（fetch / parse / write / fulltext / total。parse はフィードごとの
+合計 CPU 時間）、フィード・記事のスループット、HTTP 接続の再利用率、再生サーバの応答内訳、
+ピーク RSS。
+適応ポーリングは実行間で取得対象が変わるため、--adaptive-poll を付けない限り無効にする。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+import collect  # noqa: E402
+import http_replay  # noqa: E402
+
+try:
+    import resource  # POSIX のみ（Windows の run_daily.bat 環境には無い）
+except ImportError:
+    resource = None
+
+
+def _peak_rss_mb() -> tuple[float | None, float | None]:
+    """(本プロセス, 子プロセス最大) のピーク RSS [MB]。測れない値は None。
+
+    POSIX は getrusage（Linux の ru_maxrss は KB、macOS は byte 単位）。Windows は psutil が
+    あれば本プロセスのピークワーキングセット（peak_wset）を使い、終了済みの子プロセスは測れない。
+    """
+    if resource is not None:
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+        return self_rss, child_rss
+    try:
+        import psutil
+    except ImportError:
+        return None, None
+    peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+    return (peak / 2**20 if peak is not None else None), None
+
+
+def _fmt_mb(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:.0f}MB"
+
+
+def _prepare_workdir(workdir: Path, sources: Path):
+    """collect.main() は cwd 相対で src/sources.yaml・data/・logs/ を使うため作業用に用意する。"""
+    (workdir / "src").mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(sources, workdir / "src" / "sources.yaml")
+
+
+def run_collect(workdir: Path, *, pipeline: bool) -> dict:
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        stats = collect.main(pipeline=pipeline)
+    finally:
+        os.chdir(cwd)
+    return stats
+
+
+def summarize(stats: dict, server: http_replay.ReplayServer | None, feeds_total: int) -> dict:
+    timings = {k: round(v, 3) for k, v in stats["timings"].items()}
+    outcomes = dict(stats["feed_outcomes"])
+    articles = dict(stats["articles"])
+    written = articles.get("new", 0) + articles.get("changed", 0) + articles.get("low_priority", 0)
+    total = timings.get("total_sec", 0.0) or 1e-9
+    self_rss, child_rss = _peak_rss_mb()
+    result = {
+        "timings": timings,
+        "feeds": feeds_total,
+        "feed_outcomes": outcomes,
+        "articles": articles,
+        "fulltext": dict(stats["fulltext"]),
+        "http": dict(stats.get("http", {})),
+        "feeds_per_sec": round(feeds_total / total, 2),
+        "articles_per_sec": round(written / total, 2),
+        "peak_rss_mb": None if self_rss is None else round(self_rss, 1),
+        "peak_child_rss_mb": None if child_rss is None else round(child_rss, 1),
+    }
+    if server is not None:
+        result["server"] = {"responses": dict(server.counts), "bytes_sent": server.bytes_sent}
+        server.counts.clear()
+        server.bytes_sent = 0
+    return result
+
+
+def _print_run(i: int, r: dict):
+    t = r["timings"]
+    o = r["feed_outcomes"]
+    a = r["articles"]
+    print(
+        f"run {i}: total={t.get('total_sec', 0):.2f}s fetch={t.get('fetch_sec', 0):.2f}s "
+        f"parse={t.get('parse_sec', 0):.2f}s write={t.get('write_sec', 0):.2f}s "
+        f"fulltext={t.get('fulltext_sec', 0):.2f}s"
+    )
+    print(
+        f"       feeds={r['feeds']} fetched={o.get('fetched', 0)} not_modified={o.get('not_modified', 0)} "
+        f"failed={o.get('failed', 0)}  articles new={a.get('new', 0)} changed={a.get('changed', 0)} "
+        f"unchanged={a.get('unchanged', 0)} low_priority={a.get('low_priority', 0)}"
+    )
+    print(
+        f"       {r['feeds_per_sec']:.1f} feeds/s  {r['articles_per_sec']:.1f} articles/s  "
+        f"peak_rss={_fmt_mb(r['peak_rss_mb'])} (children {_fmt_mb(r['peak_child_rss_mb'])})"
+    )
+    h = r["http"]
+    if h:
+        print(
+            f"       http requests={h['requests']} new_connections={h['new_connections']} "
+            f"reuse_rate={h['reuse_rate']:.0%} dns_hits={h['dns_hits']}"
+        )
+    if "server" in r:
+        print(f"       server responses={r['server']['responses']} bytes={r['server']['bytes_sent']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", nargs="?", help="再生するコーパスのディレクトリ")
+    ap.add_argument("--record", metavar="DIR", help="ライブ取得してレスポンスを DIR に記録する")
+    ap.add_argument("--sources", default=str(REPO_ROOT / "src" / "sources.yaml"))
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--warm", action="store_true", help="実行間で DB を使い回す")
+    ap.add_argument("--pipeline", action="store_true", help="COLLECT_PIPELINE=1 相当で実行する")
+    ap.add_argument("--adaptive-poll", action="store_true", help="適応ポーリングを有効のままにする")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-rate", type=float, default=0.0)
+    ap.add_argument("--not-modified-rate", type=float, default=0.0)
+    ap.add_argument("--client-timeout", type=int, default=None, help="collect.FETCH_TIMEOUT_SEC を上書きする")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", metavar="PATH", help="各 run の結果を JSON で保存する")
+    ap.add_argument("--keep-workdir", action="store_true")
+    args = ap.parse_args()
+
+    if not args.record and not args.corpus:
+        ap.error("コーパスのディレクトリか --record DIR を指定してください")
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    if args.client_timeout:
+        collect.FETCH_TIMEOUT_SEC = args.client_timeout
+    if not args.adaptive_poll:
+        collect.FEED_ADAPTIVE_POLL = False
+    sources = Path(args.sources).resolve()
+
+    server = None
+    if args.record:
+        Path(args.record).mkdir(parents=True, exist_ok=True)
+        http_replay.RECORD_DIR = str(Path(args.record).resolve())
+        runs = 1
+    else:
+        server = http_replay.ReplayServer(
+            args.corpus,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate,
+            hang_sec=collect.FETCH_TIMEOUT_SEC + 1,
+            not_modified_rate=args.not_modified_rate,
+            seed=args.seed,
+        )
+        if not server.entries:
+            ap.error(f"コーパスが空です: {args.corpus}")
+        server.start()
+        http_replay.REPLAY_BASE = server.base_url
+        runs = args.runs
+
+    base_dir = Path(tempfile.mkdtemp(prefix="bench_collect_"))
+    results = []
+    try:
+        for i in range(runs):
+            workdir = base_dir if args.warm else base_dir / f"run{i}"
+            _prepare_workdir(workdir, sources)
+            stats = run_collect(workdir, pipeline=args.pipeline)
+            feeds_total = sum(stats["feed_outcomes"].values())
+            r = summarize(stats, server, feeds_total)
+            results.append(r)
+            _print_run(i, r)
+    finally:
+        if server is not None:
+            server.stop()
+        if args.keep_workdir:
+            print(f"workdir: {base_dir}")
+        else:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    if args.record:
+        print(f"recorded {len(http_replay.load_corpus(args.record))} responses to {args.record}")
+    elif len(results) > 1:
+        totals = [r["timings"].get("total_sec", 0.0) for r in results]
+        print(f"median total={statistics.median(totals):.2f}s min={min(totals):.2f}s max={max(totals):.2f}s")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
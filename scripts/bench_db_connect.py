@@ -0,0 +1,158 @@
+"""接続設定のベンチマーク: SQLite 既定値 vs db.connect() の本番プロファイル。
+
+合成した記事 DB（既定 5 万件）のコピーに対して dedupe → thread → render を順に実行し、
+各ステップの所要秒を接続設定ごとに比べる。あわせて小さな書き込みトランザクションを
+--commits 回繰り返す時間（LLM 結果の逐次保存などに相当）も測る。
+
+既定値側は db の設定定数を SQLite / Python の既定（rollback journal・synchronous=FULL・
+キャッシュ約 2MB・mmap なし・一時表はファイル）に差し替えて同じコードを動かす。
+
+使い方:
+    python scripts/bench_db_connect.py                    # 5 万件
+    python scripts/bench_db_connect.py --n 200000 --rounds 2
+
+報告値: ステップ別の所要秒（--rounds 回の最小値）。render は一時ディレクトリに docs/ を書き出す。
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import db  # noqa: E402
+from bench_dedupe import CATEGORIES, HOSTS, _reword, _title, _vocabulary  # noqa: E402
+
+PROFILES = {
+    "default": {
+        "JOURNAL_MODE": "DELETE", "SYNCHRONOUS": "FULL", "CACHE_SIZE_MB": 2,
+        "MMAP_SIZE_MB": 0, "TEMP_STORE": "DEFAULT", "BUSY_TIMEOUT_MS": 5000,
+    },
+    "tuned": {
+        "JOURNAL_MODE": db.JOURNAL_MODE, "SYNCHRONOUS": db.SYNCHRONOUS, "CACHE_SIZE_MB": db.CACHE_SIZE_MB,
+        "MMAP_SIZE_MB": db.MMAP_SIZE_MB, "TEMP_STORE": db.TEMP_STORE, "BUSY_TIMEOUT_MS": db.BUSY_TIMEOUT_MS,
+    },
+}
+
+
+def build_db(path: Path, n: int, seed: int) -> None:
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng, 4000)
+    db.DB_PATH = path
+    db.init_db()
+    now = datetime.now(timezone.utc)
+    rows = []
+    titles: list[str] = []
+    for i in range(1, n + 1):
+        if titles and rng.random() < 0.1:
+            title = _reword(rng, rng.choice(titles[-3000:]))
+        else:
+            title = _title(rng, vocab)
+        titles.append(title)
+        host = rng.choice(HOSTS)
+        # 直近 30 日に一様に散らし、描画の 48h / 7 日窓にも記事が入るようにする
+        ts = (now - timedelta(minutes=rng.randint(0, 30 * 24 * 60) * (n - i) // n)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        rows.append((
+            rng.choice(["news", "tech"]), rng.choice(["jp", "global"]), f"src{host[4:6]}", title,
+            f"https://{host}/a/{i}", " ".join(rng.choices(vocab, k=60)), rng.choice(CATEGORIES),
+            rng.choice(["primary", "secondary"]), ts, ts,
+        ))
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO articles(kind, region, source, title, url, content, category, source_tier, published_at, fetched_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+
+def _step(fn) -> float:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - t0
+
+
+def _small_commits(count: int) -> None:
+    conn = db.connect()
+    conn.execute("CREATE TABLE IF NOT EXISTS bench_commits (id INTEGER PRIMARY KEY, v TEXT)")
+    for i in range(count):
+        conn.execute("INSERT INTO bench_commits(v) VALUES (?)", (f"row {i}",))
+        conn.commit()
+    conn.execute("DROP TABLE bench_commits")
+    conn.commit()
+    conn.close()
+
+
+def run_profile(base: Path, workdir: Path, profile: str, commits: int) -> dict[str, float]:
+    import dedupe
+    import render_main
+    import thread
+
+    for name, value in PROFILES[profile].items():
+        setattr(db, name, value)
+    rundir = workdir / profile
+    shutil.rmtree(rundir, ignore_errors=True)
+    (rundir / "data").mkdir(parents=True)
+    (rundir / "src").symlink_to(ROOT / "src")  # render が相対パスで src/sources.yaml を読む
+    db.DB_PATH = rundir / "data" / "state.sqlite"
+    shutil.copyfile(base, db.DB_PATH)
+    cwd = os.getcwd()
+    os.chdir(rundir)
+    try:
+        return {
+            "dedupe": _step(dedupe.main),
+            "thread": _step(thread.main),
+            "render": _step(render_main.main),
+            "commits": _step(lambda: _small_commits(commits)),
+        }
+    finally:
+        os.chdir(cwd)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000, help="記事数")
+    ap.add_argument("--rounds", type=int, default=1, help="各設定の実行回数（最小値を報告）")
+    ap.add_argument("--commits", type=int, default=2000, help="小さな書き込みトランザクションの回数")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    logging.disable(logging.INFO)
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_db_connect_"))
+    try:
+        base = workdir / "base.sqlite"
+        t0 = time.perf_counter()
+        build_db(base, args.n, args.seed)
+        print(f"built {args.n} articles ({base.stat().st_size / 2**20:.0f}MB) in {time.perf_counter() - t0:.1f}s")
+        best: dict[str, dict[str, float]] = {}
+        for _ in range(args.rounds):
+            for profile in PROFILES:
+                for step, sec in run_profile(base, workdir, profile, args.commits).items():
+                    best.setdefault(profile, {})[step] = min(sec, best.get(profile, {}).get(step, sec))
+        for profile, steps in best.items():
+            print(f"{profile:8s} " + " ".join(f"{step}={sec:.2f}s" for step, sec in steps.items())
+                  + f" total={sum(steps.values()):.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
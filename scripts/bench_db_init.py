@@ -0,0 +1,129 @@
+"""起動時スキーマ確認のベンチマーク: 毎回の全処理（従来の init_db）vs schema_version の高速経路。
+
+合成した記事 DB（bench_db_connect と同じ生成、既定 5 万件）に対して、起動時に init_db() を
+呼ぶ各ステップを別プロセスで import し、import と init_db の所要時間を測る。
+
+- legacy: 全マイグレーションを毎回実行する（変更前の init_db と同じ処理。全表 UPDATE・
+  topic_key 重複整理・PRAGMA table_info・articles_fts の COUNT(*) を含む）
+- upgrade: schema_version の無い DB を最新版にする 1 回目の起動
+- current: 最新版の DB での起動（schema_version を 1 回読んで戻る）
+
+使い方:
+    python scripts/bench_db_init.py                 # 5 万件
+    python scripts/bench_db_init.py --n 200000 --rounds 5
+
+報告値: ステップごとの import と init_db の所要 ms（--rounds 回の最小値）。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import db  # noqa: E402
+from bench_db_connect import build_db  # noqa: E402
+
+# 起動時に init_db() を呼ぶステップ
+STEPS = ("collect", "forecast_generate", "forecast_import", "forecast_verify")
+
+
+def legacy_init_db() -> None:
+    """変更前の init_db と同じく、全マイグレーションを版の確認なしに 1 トランザクションで実行する。"""
+    conn = db.connect()
+    try:
+        cur = conn.cursor()
+        for _version, _name, migration in db.MIGRATIONS:
+            migration(cur)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# 子プロセスで実行する起動処理。mode=legacy は legacy_init_db、current は init_db を呼ぶ。
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path[:0] = [{src!r}, {scripts!r}]
+import {step}
+import db
+t1 = time.perf_counter()
+db.DB_PATH = __import__("pathlib").Path({path!r})
+if {mode!r} == "legacy":
+    import bench_db_init
+    bench_db_init.legacy_init_db()
+else:
+    db.init_db()
+t2 = time.perf_counter()
+print(json.dumps([t1 - t0, t2 - t1]))
+"""
+
+
+def run_step(step: str, path: Path, mode: str) -> tuple[float, float]:
+    """step を import して起動処理を 1 回実行し、(import 秒, init_db 秒) を返す。"""
+    code = _CHILD.format(src=str(ROOT / "src"), scripts=str(Path(__file__).resolve().parent),
+                         step=step, path=str(path), mode=mode)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    imp, init = json.loads(out.stdout.strip().splitlines()[-1])
+    return imp, init
+
+
+def _best_ms(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000, help="記事数")
+    ap.add_argument("--rounds", type=int, default=3, help="各方式の実行回数（最小値を報告）")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_db_init_"))
+    try:
+        base = workdir / "base.sqlite"
+        t0 = time.perf_counter()
+        build_db(base, args.n, args.seed)
+        print(f"built {args.n} articles ({base.stat().st_size / 2**20:.0f}MB) in {time.perf_counter() - t0:.1f}s")
+
+        db.DB_PATH = workdir / "state.sqlite"
+        shutil.copyfile(base, db.DB_PATH)
+        legacy_init_db()  # ページキャッシュを温める
+
+        def upgrade() -> None:
+            conn = db.connect()
+            conn.execute("DROP TABLE IF EXISTS schema_version")
+            conn.close()
+            db.init_db()
+
+        print(f"upgrade (schema_version の無い DB を最新化、初回のみ): {_best_ms(upgrade, args.rounds):.1f}ms")
+        for step in STEPS:
+            best: dict[str, list[float]] = {}
+            for _ in range(args.rounds):
+                for mode in ("legacy", "current"):
+                    times = run_step(step, db.DB_PATH, mode)
+                    prev = best.get(mode, [float("inf")] * 2)
+                    best[mode] = [min(a, b) for a, b in zip(prev, times)]
+            legacy_ms, current_ms = best["legacy"][1] * 1000, best["current"][1] * 1000
+            print(f"{step:18s} import={best['current'][0] * 1000:7.1f}ms "
+                  f"init_db legacy={legacy_ms:8.2f}ms current={current_ms:6.2f}ms ({legacy_ms / current_ms:.0f}x)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
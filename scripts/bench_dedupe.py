@@ -0,0 +1,227 @@
+"""dedupe の候補抽出ベンチマーク: タイトル先頭語ブロッキング vs MinHash/LSH。
+
+合成した記事 DB（既定 20 万件。うち直近 --new 件が未判定）に、語順の入れ替え・
+接頭語の追加・1 語の脱落で作った言い換え見出しを正解ペアとして埋め込み、
+同じ DB のコピーに対して dedupe.main() を各方式で実行して比較する。
+
+正解ペアは「比較さえされれば厳密スコア（token set ratio + URL の複合スコア）で
+重複と判定されるもの」だけに絞るので、再現率はそのまま候補抽出の取りこぼし率になる。
+LSH では正規化済み特徴量と帯キーを dedupe_features に保存するため、保存済みの状態で
+再実行した時間（lsh_warm）も測る。
+
+使い方:
+    python scripts/bench_dedupe.py                       # 20 万件（うち新規 2 万件）
+    python scripts/bench_dedupe.py --n 50000 --new 5000 --dup-rate 0.1
+    python scripts/bench_dedupe.py --modes lsh --keep-db /tmp/bench.sqlite
+    python scripts/bench_dedupe.py --n 50000 --new 5000 --scorer difflib   # 一括採点なし
+    python scripts/bench_dedupe.py --workers 4                             # カテゴリ別に並列判定
+
+報告値: 所要秒、削除件数、正解ペアの再現率、正解外の削除件数、読み込んだ記事数（loaded）、
+厳密スコアを計算した候補数（candidate_checked）、特徴量・MinHash を計算した件数。
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import dedupe  # noqa: E402
+
+CATEGORIES = ["ai", "security", "cloud", "devtools", "business", "policy", "science"]
+HOSTS = [f"news{i}.example.com" for i in range(40)]
+PREFIXES = ["breaking", "update", "exclusive", "report", "速報", "独自"]
+_SYLLABLES = ["ka", "ri", "to", "mo", "sa", "ne", "lu", "vi", "po", "de", "an", "or", "em", "ix", "ul"]
+_JA_WORDS = ["生成ai", "半導体", "脆弱性", "決算", "規制", "クラウド", "発表", "提携", "買収", "新モデル",
+             "データ", "障害", "値上げ", "公開", "調査", "開発者", "セキュリティ", "政府", "市場", "国内"]
+
+
+def _vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _title(rng: random.Random, vocab: list[str]) -> str:
+    if rng.random() < 0.3:
+        return "".join(rng.sample(_JA_WORDS, 3)) + " " + " ".join(rng.choices(vocab, k=rng.randint(2, 4)))
+    # 先頭語は頻出語に偏らせる（実データでも "openai" "google" 等の書き出しが多い）
+    head = vocab[min(int(rng.paretovariate(1.2)) - 1, len(vocab) - 1)]
+    return " ".join([head] + rng.choices(vocab, k=rng.randint(5, 10)))
+
+
+def _reword(rng: random.Random, title: str) -> str:
+    tokens = title.split()
+    kind = rng.randrange(3)
+    if kind == 0 and len(tokens) > 2:
+        cut = rng.randint(1, len(tokens) - 1)
+        tokens = tokens[cut:] + tokens[:cut]
+    elif kind == 1:
+        tokens = [rng.choice(PREFIXES)] + tokens
+    elif len(tokens) > 4:
+        del tokens[rng.randrange(len(tokens))]
+    return " ".join(tokens)
+
+
+def _would_match(dup: tuple, base: tuple) -> bool:
+    """厳密スコアだけで重複と判定されるか（候補抽出を介さない）。"""
+    _, _, category, title_a, url_a = dup
+    _, _, _, title_b, url_b = base
+    threshold = dedupe.category_threshold(category)
+    ta, tb = dedupe.normalize_title(title_a), dedupe.normalize_title(title_b)
+    title_score = dedupe._token_set_ratio(ta, tb)
+    if title_score < threshold - 5:
+        return False
+    url_score = dedupe._ratio(dedupe.normalize_url(url_a), dedupe.normalize_url(url_b))
+    return dedupe._composite_score(title_score, url_score) >= threshold
+
+
+def build_db(path: Path, *, n: int, new: int, dup_rate: float, max_gap: int, seed: int) -> list[tuple[int, int]]:
+    """合成 DB を作り、埋め込んだ正解ペア [(新しい id, 古い id)] を返す。"""
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng, 4000)
+    rows: list[tuple] = []
+    for i in range(1, n + 1):
+        host = rng.choice(HOSTS)
+        rows.append((i, f"src{host[4:6]}", rng.choice(CATEGORIES), _title(rng, vocab), f"https://{host}/a/{i}"))
+
+    pairs: list[tuple[int, int]] = []
+    first_new = n - new + 1
+    for i in range(first_new, n + 1):
+        if rng.random() >= dup_rate:
+            continue
+        base_id = i - rng.randint(1, max_gap)
+        if base_id < first_new:
+            continue
+        _, _, category, base_title, base_url = rows[base_id - 1]
+        # 同じサイトの別 URL（スラッグ違い）で配信された言い換え見出し
+        dup = (i, rows[i - 1][1], category, _reword(rng, base_title), base_url + "-v2")
+        rows[i - 1] = dup
+        if _would_match(dup, rows[base_id - 1]):
+            pairs.append((i, base_id))
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE articles (
+          id INTEGER PRIMARY KEY,
+          source TEXT,
+          category TEXT,
+          title TEXT,
+          url TEXT,
+          url_norm TEXT,
+          dedupe_checked INTEGER DEFAULT 0
+        )
+        """
+    )
+    conn.executemany(
+        "INSERT INTO articles(id, source, category, title, url, dedupe_checked) VALUES (?, ?, ?, ?, ?, ?)",
+        [(*r, 1 if r[0] < first_new else 0) for r in rows],
+    )
+    conn.commit()
+    conn.close()
+    return pairs
+
+
+def run_dedupe(db_path: Path, mode: str, scorer: str | None = None, workers: int | None = None) -> dict:
+    original_connect = dedupe.connect
+    dedupe.connect = lambda: sqlite3.connect(db_path)
+    try:
+        t0 = time.perf_counter()
+        stats = dedupe.main(candidate_mode=mode, scorer=scorer, workers=workers)
+        stats["sec"] = round(time.perf_counter() - t0, 2)
+    finally:
+        dedupe.connect = original_connect
+    return stats
+
+
+def score(db_path: Path, pairs: list[tuple[int, int]], n: int) -> dict:
+    conn = sqlite3.connect(db_path)
+    remaining = {r[0] for r in conn.execute("SELECT id FROM articles")}
+    conn.close()
+    deleted = set(range(1, n + 1)) - remaining
+    caught = sum(1 for a, b in pairs if a in deleted or b in deleted)
+    in_pairs = {x for p in pairs for x in p}
+    return {
+        "recall": round(caught / len(pairs), 4) if pairs else None,
+        "extra_deleted": len(deleted - in_pairs),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=200_000, help="記事数")
+    ap.add_argument("--new", type=int, default=20_000, help="未判定（dedupe_checked=0）の直近記事数")
+    ap.add_argument("--dup-rate", type=float, default=0.05, help="新規記事のうち言い換え見出しにする割合")
+    ap.add_argument("--max-gap", type=int, default=3000, help="正解ペアの id の最大距離")
+    ap.add_argument("--modes", default="blocking,lsh")
+    ap.add_argument("--scorer", choices=["rapidfuzz", "difflib"], default=None,
+                    help="候補の採点方式（既定は DEDUPE_SCORER 環境変数）")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="カテゴリ別判定の並列プロセス数（既定は DEDUPE_WORKERS 環境変数）")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", metavar="PATH", help="結果を JSON で保存する")
+    ap.add_argument("--keep-db", metavar="PATH", help="生成した合成 DB を PATH に保存する")
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_dedupe_"))
+    results = {}
+    try:
+        source_db = workdir / "source.sqlite"
+        t0 = time.perf_counter()
+        pairs = build_db(
+            source_db, n=args.n, new=min(args.new, args.n), dup_rate=args.dup_rate,
+            max_gap=args.max_gap, seed=args.seed,
+        )
+        print(f"built {args.n} articles ({args.new} unchecked, {len(pairs)} reworded pairs) "
+              f"in {time.perf_counter() - t0:.1f}s")
+        if args.keep_db:
+            shutil.copyfile(source_db, args.keep_db)
+
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            db_path = workdir / f"{mode}.sqlite"
+            shutil.copyfile(source_db, db_path)
+            r = run_dedupe(db_path, mode, args.scorer, args.workers)
+            r.update(score(db_path, pairs, args.n))
+            results[mode] = r
+            if mode == "lsh":
+                # 特徴量・帯キーを保存済みの状態で同じ入力をもう一度判定する（定常運用の 2 回目以降）
+                warm_db = workdir / "lsh_warm.sqlite"
+                shutil.copyfile(source_db, warm_db)
+                conn = sqlite3.connect(warm_db)
+                conn.execute("ATTACH DATABASE ? AS prev", (str(db_path),))
+                dedupe.ensure_features_table(conn.cursor())
+                conn.execute("INSERT INTO dedupe_features SELECT * FROM prev.dedupe_features")
+                conn.commit()
+                conn.execute("DETACH DATABASE prev")
+                conn.close()
+                w = run_dedupe(warm_db, mode, args.scorer, args.workers)
+                w.update(score(warm_db, pairs, args.n))
+                results["lsh_warm"] = w
+
+        for mode, r in results.items():
+            recall = "n/a" if r["recall"] is None else f"{r['recall']:.1%}"
+            print(
+                f"{mode:9s} sec={r['sec']:.2f} deleted={r['deleted']} recall={recall} "
+                f"extra_deleted={r['extra_deleted']} loaded={r['loaded']} "
+                f"candidate_checked={r['candidate_checked']} features_computed={r['features_computed']} "
+                f"minhash_computed={r['minhash_computed']}"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
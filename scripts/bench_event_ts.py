@@ -0,0 +1,215 @@
+"""articles.event_ts のベンチマーク: 時刻の文字列加工式（従来）vs 正規化列 + 索引の範囲走査。
+
+合成した記事 DB（bench_db_connect と同じ生成、既定 5 万件）の時刻を直近 --days 日（既定 180 日。
+本番 DB のように履歴が溜まった状態）に一様に散らし、3 記事ずつのトピックを作って、
+描画・予測の主要クエリを従来の SQL と現在の SQL で実行して所要 ms を比べる。
+現在の SQL は各関数が実際に発行した文を記録して使い、EXPLAIN QUERY PLAN も表示する。
+あわせて既存 DB へのマイグレーション（event_ts のバックフィルと索引作成）の時間も測る。
+
+使い方:
+    python scripts/bench_event_ts.py                  # 5 万件
+    python scripts/bench_event_ts.py --n 200000 --rounds 5
+    python scripts/bench_event_ts.py --days 30             # 48h 窓に記事が多い場合
+
+報告値: クエリごとの所要 ms（--rounds 回の最小値）と、結果が従来と一致したか。
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import db  # noqa: E402
+import forecast_generate  # noqa: E402
+import render_main  # noqa: E402
+from bench_db_connect import build_db  # noqa: E402
+from bench_dedupe import CATEGORIES  # noqa: E402
+
+# 変更前のクエリが使っていた時刻式
+LEGACY_TS = "datetime(substr(replace(replace(COALESCE(NULLIF({p}published_at,''), {p}fetched_at),'T',' '),'+00:00',''),1,19))"
+
+# 変更前の _build_category_topics（注目 TOP5）
+LEGACY_HOT_TOPICS = f"""
+SELECT
+  t.id,
+  COALESCE(t.title_ja, t.title) AS ttitle,
+  COUNT(ta.article_id) AS total_count,
+  SUM(CASE WHEN {LEGACY_TS.format(p="a.")} >= datetime(?) THEN 1 ELSE 0 END) AS recent_count,
+  MAX({LEGACY_TS.format(p="a.")}) AS article_date
+FROM topics t
+JOIN topic_articles ta ON ta.topic_id = t.id
+JOIN articles a ON a.id = ta.article_id
+WHERE t.category = ?
+  AND COALESCE(t.category,'') <> 'news'
+  AND COALESCE(a.kind,'') <> 'news'
+GROUP BY t.id
+HAVING recent_count > 0
+ORDER BY recent_count DESC, total_count DESC, t.id DESC
+LIMIT ?
+"""
+
+LEGACY_OPS_COUNTS = """
+SELECT COUNT(*) as total,
+  SUM(CASE WHEN datetime(fetched_at) >= datetime(?) THEN 1 ELSE 0 END) as week,
+  SUM(CASE WHEN datetime(fetched_at) >= datetime(?) THEN 1 ELSE 0 END) as h48
+FROM articles
+"""
+
+
+class RecordingCursor:
+    def __init__(self, cur):
+        self._cur = cur
+        self.calls: list[tuple[str, tuple]] = []
+
+    def execute(self, sql, params=()):
+        self.calls.append((sql, tuple(params)))
+        return self._cur.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+def spread_timestamps(path: Path, days: int) -> None:
+    """記事の時刻を直近 days 日に一様に散らす（id から決まる決定的な値。event_ts はトリガで追従）。"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "UPDATE articles SET published_at = strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now', "
+        "'-' || ((id * 7919) % ?) || ' seconds'), fetched_at = strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now', "
+        "'-' || ((id * 7919) % ?) || ' seconds')",
+        (days * 86400, days * 86400),
+    )
+    conn.commit()
+    conn.close()
+
+
+def add_topics(path: Path) -> None:
+    """3 記事ずつを 1 トピックにまとめる（カテゴリ・kind は先頭記事に合わせる）。"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO topics(id, topic_key, title, category, kind, region, created_at) "
+        "SELECT id / 3 + 1, 'k' || (id / 3 + 1), title, category, kind, region, fetched_at "
+        "FROM articles WHERE id % 3 = 0 OR id = 1 "
+        "GROUP BY id / 3 + 1"
+    )
+    conn.execute("INSERT INTO topic_articles(topic_id, article_id) SELECT id / 3 + 1, id FROM articles")
+    conn.commit()
+    conn.close()
+
+
+def _best_ms(conn, sql: str, params: tuple, rounds: int) -> tuple[float, list]:
+    best, rows = float("inf"), []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, rows
+
+
+def _recorded(conn, fn, *args, match: str = "") -> tuple[str, tuple]:
+    rec = RecordingCursor(conn.cursor())
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(rec, *args)
+    return next((sql, params) for sql, params in reversed(rec.calls) if match in sql)
+
+
+def bench_queries(conn, rounds: int) -> None:
+    now = datetime.now(timezone.utc)
+    cutoff_48h = (now - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
+    cutoff_7d = (now - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    cat = CATEGORIES[0]
+
+    cases = []
+    sql, params = _recorded(conn, render_main.fetch_news_articles_by_category, "jp", cat, 40)
+    legacy = sql.replace("a.event_ts", LEGACY_TS.format(p="a.")).replace(
+        "a.category = ?", "COALESCE(NULLIF(a.category,''), 'other')=?")
+    cases.append(("news_by_category", legacy, params, sql, params))
+
+    sql, params = _recorded(conn, render_main.count_news_recent_48h, "jp", cat, cutoff_48h)
+    legacy = sql.replace("event_ts", LEGACY_TS.format(p="")).replace(
+        "category = ?", "COALESCE(NULLIF(category,''), 'other')=?")
+    cases.append(("news_recent_48h", legacy, params, sql, params))
+
+    sql, params = _recorded(conn, render_main._build_category_topics, cat, cutoff_48h, 30, 5, match="WITH recent")
+    cases.append(("hot_topics", LEGACY_HOT_TOPICS, (cutoff_48h, cat, 5), sql, params))
+
+    sql = "SELECT COUNT(*) FROM articles WHERE event_ts >= datetime(?)"
+    cases.append(("ops_article_counts", LEGACY_OPS_COUNTS, (cutoff_7d, cutoff_48h), sql, (cutoff_7d,)))
+
+    sql, params = _recorded(conn, forecast_generate.build_news_digest, 48)
+    legacy = sql.replace("a.event_ts", "datetime(a.fetched_at)")
+    cases.append(("news_digest", legacy, params, sql, params))
+
+    for name, legacy_sql, legacy_params, sql, params in cases:
+        legacy_ms, legacy_rows = _best_ms(conn, legacy_sql, legacy_params, rounds)
+        new_ms, new_rows = _best_ms(conn, sql, params, rounds)
+        if name == "ops_article_counts":
+            same = "same" if legacy_rows[0][1] == new_rows[0][0] else "DIFFERENT"
+        elif name == "news_digest":  # 重要度が同じ行の順序は SQL 上も未定義
+            same = "same (順不同)" if sorted(legacy_rows) == sorted(new_rows) else "DIFFERENT"
+        else:
+            same = "same" if legacy_rows == new_rows else "DIFFERENT"
+        print(f"{name:20s} legacy={legacy_ms:9.2f}ms event_ts={new_ms:8.2f}ms "
+              f"({legacy_ms / max(new_ms, 1e-6):5.0f}x) rows={len(new_rows)} {same}")
+        # 相関サブクエリ（代表 insight の取得など）の中身は省いて表示する
+        skipped: set[int] = set()
+        for node, parent, _notused, detail in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall():
+            if parent in skipped or "SUBQUERY" in detail:
+                skipped.add(node)
+                continue
+            print(f"    plan: {detail}")
+
+
+def bench_backfill(path: Path) -> None:
+    """event_ts 導入前の状態（列はあるが空、索引・トリガなし）からのマイグレーション時間。"""
+    conn = sqlite3.connect(path)
+    for name in ("articles_event_ts_ai", "articles_event_ts_au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for name in ("idx_articles_event_ts", "idx_articles_kind_category_event_ts"):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.execute("UPDATE articles SET event_ts = NULL")
+    conn.commit()
+    t0 = time.perf_counter()
+    db._migrate_articles_event_ts(conn.cursor())
+    conn.commit()
+    print(f"migration (backfill + 索引作成): {time.perf_counter() - t0:.2f}s")
+    conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000, help="記事数")
+    ap.add_argument("--days", type=int, default=180, help="記事の時刻を散らす日数")
+    ap.add_argument("--rounds", type=int, default=3, help="各クエリの実行回数（最小値を報告）")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_event_ts_"))
+    try:
+        path = workdir / "state.sqlite"
+        t0 = time.perf_counter()
+        build_db(path, args.n, args.seed)
+        spread_timestamps(path, args.days)
+        add_topics(path)
+        print(f"built {args.n} articles ({path.stat().st_size / 2**20:.0f}MB) in {time.perf_counter() - t0:.1f}s")
+        conn = db.connect(path, readonly=True)
+        bench_queries(conn, args.rounds)
+        conn.close()
+        bench_backfill(path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
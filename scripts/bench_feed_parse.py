@@ -0,0 +1,133 @@
+"""フィードパースのベンチマーク: feedparser 全体パース vs feed_fastparse（limit 打ち切り）。
+
+collect は各フィードの先頭 limit 件（既定 30）しか使わないが、feedparser は文書全体を
+パースする。記録済みの大きなフィード（arXiv の一覧、本文 HTML 入りの Atom 等）で
+両者の処理時間・ピークメモリと、先頭 limit 件の一致を比較する。
+
+使い方:
+    python scripts/bench_feed_parse.py path/to/feed1.xml path/to/feed2.xml
+    python scripts/bench_feed_parse.py --synthetic 2000          # 記録が無い場合の合成フィード
+    python scripts/bench_feed_parse.py recorded_feeds/ --limit 30 --repeat 5
+
+ディレクトリを渡すと配下の *.xml / *.rss / *.atom / *.body を対象にする。
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import feedparser
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from feed_fastparse import parse_feed_limited  # noqa: E402
+
+FEED_SUFFIXES = {".xml", ".rss", ".atom", ".body"}
+
+
+def synthetic_feed(n: int, body_chars: int = 4000) -> bytes:
+    """本文 HTML 入りの大きな RSS 2.0 を生成する。"""
+    body = "<p>" + "lorem ipsum dolor sit amet " * (body_chars // 27) + "</p>"
+    items = "".join(
+        f"<item><title>Item {i}</title><link>https://example.com/{i}</link>"
+        f"<description><![CDATA[{body}]]></description>"
+        f"<pubDate>Mon, 05 Jan 2026 10:00:00 +0000</pubDate></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>s</title>{items}</channel></rss>'.encode()
+
+
+def _measure(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn()
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(times), peak
+
+
+def _agree(fast, slow, limit: int) -> bool:
+    if fast is None:
+        return True  # フォールバック時は feedparser の結果そのもの
+    pairs = list(zip(fast.entries, slow.entries[:limit]))
+    if len(pairs) != min(limit, len(slow.entries)):
+        return False
+    for f, s in pairs:
+        if f.get("link") != s.get("link") or (f.get("title") or "").strip() != (s.get("title") or "").strip():
+            return False
+    return True
+
+
+def bench_one(name: str, raw: bytes, limit: int, repeat: int) -> dict:
+    slow, slow_sec, slow_peak = _measure(lambda: feedparser.parse(raw), repeat)
+    fast, fast_sec, fast_peak = _measure(lambda: parse_feed_limited(raw, limit), repeat)
+    return {
+        "name": name,
+        "bytes": len(raw),
+        "entries": len(slow.entries),
+        "fastpath": fast is not None,
+        "feedparser_ms": slow_sec * 1000,
+        "fast_ms": fast_sec * 1000,
+        "feedparser_peak_kb": slow_peak / 1024,
+        "fast_peak_kb": fast_peak / 1024,
+        "agree": _agree(fast, slow, limit),
+    }
+
+
+def _collect_inputs(paths: list[str]) -> list[tuple[str, bytes]]:
+    out = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files = sorted(f for f in p.rglob("*") if f.suffix in FEED_SUFFIXES)
+        else:
+            files = [p]
+        for f in files:
+            out.append((str(f), f.read_bytes()))
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("paths", nargs="*", help="記録済みフィードのファイルまたはディレクトリ")
+    ap.add_argument("--synthetic", type=int, default=0, help="N 件の合成フィードを追加する")
+    ap.add_argument("--limit", type=int, default=30, help="collect の per-feed limit 相当")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    inputs = _collect_inputs(args.paths)
+    if args.synthetic:
+        inputs.append((f"synthetic-{args.synthetic}", synthetic_feed(args.synthetic)))
+    if not inputs:
+        ap.error("フィードのパスか --synthetic N を指定してください")
+
+    header = f"{'feed':<48} {'KB':>8} {'entries':>7} {'fp_ms':>9} {'fast_ms':>9} {'speedup':>7} {'fp_peakKB':>10} {'fast_peakKB':>11} agree"
+    print(header)
+    print("-" * len(header))
+    total_slow = total_fast = 0.0
+    for name, raw in inputs:
+        r = bench_one(name, raw, args.limit, args.repeat)
+        fast_ms = r["fast_ms"] if r["fastpath"] else r["fast_ms"] + r["feedparser_ms"]
+        total_slow += r["feedparser_ms"]
+        total_fast += fast_ms
+        speedup = r["feedparser_ms"] / fast_ms if fast_ms else 0.0
+        label = name[-48:]
+        print(
+            f"{label:<48} {r['bytes'] / 1024:>8.0f} {r['entries']:>7} {r['feedparser_ms']:>9.1f} "
+            f"{fast_ms:>9.1f} {speedup:>6.1f}x {r['feedparser_peak_kb']:>10.0f} {r['fast_peak_kb']:>11.0f} "
+            f"{'yes' if r['agree'] else 'NO'}{'' if r['fastpath'] else ' (fallback)'}"
+        )
+    print("-" * len(header))
+    print(f"total feedparser={total_slow:.1f}ms fast(+fallback)={total_fast:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""thread のトピック照合ベンチマーク: 直近 400 件の線形走査 vs 転置索引。
+
+bench_dedupe と同じ合成見出しでトピックを --topics 件作り、うち --match-rate の割合の
+記事を既存トピックの言い換え（古いトピックも含め一様に選ぶ）にして --articles 件照合する。
+従来方式は各カテゴリの直近 CANDIDATE_TOPICS_PER_CAT 件を token_set_ratio で総当たりする。
+
+使い方:
+    python scripts/bench_thread.py                         # トピック 5 万件、記事 2000 件
+    python scripts/bench_thread.py --topics 200000 --articles 5000
+    python scripts/bench_thread.py --rebuild 200000        # edges・代表記事の全件 vs 差分作り直し
+
+報告値: 索引の構築秒、照合秒、閾値以上で一致した記事数、採点した候補数の平均。
+--rebuild N は記事 N 件を紐付け済みの合成 DB で、新着 --articles 件を入れた後の
+thread.main() を全件作り直し（--full-rebuild 相当）と差分作り直しで比べる。あわせて
+未紐付け記事の取り込み（直近 2000 件 + 1 件ずつの存在確認 vs 処理済み位置からの anti-join）も測る。
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from rapidfuzz import fuzz  # noqa: E402
+
+import db  # noqa: E402
+import thread  # noqa: E402
+from bench_dedupe import CATEGORIES, _reword, _title, _vocabulary  # noqa: E402
+
+CANDIDATE_TOPICS_PER_CAT = 400  # 変更前の上限（直近 N 件）
+
+
+def legacy_find(norm_title, key, recent_by_cat, sim_threshold):
+    """変更前の find_best_topic（直近 400 件を線形走査）。"""
+    best_tid, best_score = None, -1
+    for tid, tnorm in recent_by_cat.get(key, []):
+        score = fuzz.token_set_ratio(norm_title, tnorm)
+        if score > best_score:
+            best_score, best_tid = score, tid
+    return (best_tid, best_score) if best_score >= sim_threshold else (None, best_score)
+
+
+def _timed_thread_main(db_path: Path, full_rebuild: bool) -> float:
+    db.DB_PATH = db_path
+    t0 = time.perf_counter()
+    thread.main(full_rebuild=full_rebuild)
+    return time.perf_counter() - t0
+
+
+def _bench_intake(cur, watermark: int) -> None:
+    """未紐付け記事の取り込み: 直近 2000 件 + 1 件ずつの存在確認 vs 処理済み位置からの anti-join。"""
+    t0 = time.perf_counter()
+    cur.execute("SELECT id, title, kind, region, category FROM articles ORDER BY id DESC LIMIT 2000")
+    legacy = []
+    for row in cur.fetchall():
+        cur.execute("SELECT 1 FROM topic_articles WHERE article_id=? LIMIT 1", (row[0],))
+        if not cur.fetchone():
+            legacy.append(row[0])
+    legacy_sec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    rows = thread.fetch_unthreaded_articles(cur, after_id=watermark, limit=thread.BATCH_SIZE)
+    sec = time.perf_counter() - t0
+    print(f"intake legacy sec={legacy_sec * 1000:.1f}ms found={len(legacy)} / "
+          f"watermark sec={sec * 1000:.1f}ms found={len(rows)}")
+
+
+def bench_rebuild(n: int, new: int, seed: int) -> None:
+    """紐付け済み n 件 + 新着 new 件の DB で thread.main() の作り直し方式を比べる。"""
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng, 4000)
+    workdir = Path(tempfile.mkdtemp(prefix="bench_thread_"))
+    try:
+        base = workdir / "base.sqlite"
+        db.DB_PATH = base
+        db.init_db()
+        conn = sqlite3.connect(base)
+        rows = []
+        for i in range(1, n + new + 1):
+            kind = "news" if rng.random() < 0.5 else "tech"
+            rows.append((i, kind, "global", "s", _title(rng, vocab), f"https://example.com/{i}",
+                         rng.choice(CATEGORIES), rng.choice(["primary", "secondary"]),
+                         f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T00:00:00"))
+        conn.executemany(
+            "INSERT INTO articles(id, kind, region, source, title, url, category, source_tier, published_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        # 既存分は 1 トピック平均 3 記事で紐付け済みにしておく
+        conn.executemany(
+            "INSERT INTO topics(id, topic_key, title, category, kind, region) VALUES (?, ?, ?, ?, ?, 'global')",
+            [(i // 3 + 1, f"k{i // 3 + 1}", r[4], r[6], r[1]) for i, r in enumerate(rows[:n]) if i % 3 == 0],
+        )
+        conn.executemany(
+            "INSERT INTO topic_articles(topic_id, article_id) VALUES (?, ?)",
+            [(i // 3 + 1, r[0]) for i, r in enumerate(rows[:n])],
+        )
+        conn.commit()
+        conn.close()
+        _timed_thread_main(base, full_rebuild=True)  # 追跡表を作り、初回の全件作り直しを済ませる
+        conn = sqlite3.connect(base)
+        conn.execute("DELETE FROM topic_articles WHERE article_id > ?", (n,))
+        conn.execute("DELETE FROM thread_dirty_topics")
+        db.set_watermark(conn.cursor(), thread.WATERMARK_NAME, n)
+        conn.commit()
+        _bench_intake(conn.cursor(), n)
+        conn.close()
+
+        for label, full in (("full", True), ("dirty", False)):
+            path = workdir / f"{label}.sqlite"
+            shutil.copyfile(base, path)
+            sec = _timed_thread_main(path, full_rebuild=full)
+            print(f"rebuild={label:5s} articles={n} new={new} thread.main sec={sec:.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--topics", type=int, default=50_000)
+    ap.add_argument("--articles", type=int, default=2000)
+    ap.add_argument("--match-rate", type=float, default=0.3, help="既存トピックの言い換えにする記事の割合")
+    ap.add_argument("--rebuild", type=int, default=0, metavar="N",
+                    help="紐付け済み記事 N 件の DB で edges・代表記事の作り直し方式を比べる")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.rebuild:
+        bench_rebuild(args.rebuild, args.articles, args.seed)
+        return 0
+
+    rng = random.Random(args.seed)
+    vocab = _vocabulary(rng, 4000)
+    topics = [(tid, ("tech", "global", rng.choice(CATEGORIES)), _title(rng, vocab))
+              for tid in range(1, args.topics + 1)]
+    articles = []
+    for _ in range(args.articles):
+        if rng.random() < args.match_rate:
+            _tid, key, title = rng.choice(topics)
+            articles.append((key, _reword(rng, title)))
+        else:
+            articles.append((("tech", "global", rng.choice(CATEGORIES)), _title(rng, vocab)))
+    norm_articles = [(key, thread.normalize_title(t)) for key, t in articles]
+
+    t0 = time.perf_counter()
+    recent_by_cat: dict[tuple, list] = {}
+    for tid, key, title in reversed(topics):
+        if len(recent_by_cat.get(key, [])) < CANDIDATE_TOPICS_PER_CAT:
+            recent_by_cat.setdefault(key, []).append((tid, thread.normalize_title(title)))
+    legacy_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    legacy = [legacy_find(n, key, recent_by_cat, thread.TOPIC_SIM)[0] for key, n in norm_articles]
+    legacy_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = thread.TopicIndex()
+    for tid, key, title in topics:
+        index.add(key, tid, thread.normalize_title(title))
+    index_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = [thread.find_best_topic(n, *key, index)[0] for key, n in norm_articles]
+    index_sec = time.perf_counter() - t0
+    scored = sum(len(index.candidates(key, n)) for key, n in norm_articles)
+
+    agree = sum(1 for a, b in zip(legacy, found) if a is not None and a == b)
+    print(f"topics={args.topics} articles={args.articles}")
+    print(f"  legacy build={legacy_build:.2f}s match={legacy_sec:.2f}s matched={sum(x is not None for x in legacy)} "
+          f"scored/article={min(CANDIDATE_TOPICS_PER_CAT, args.topics // len(CATEGORIES))}")
+    print(f"  index  build={index_build:.2f}s match={index_sec:.2f}s matched={sum(x is not None for x in found)} "
+          f"scored/article={scored / len(norm_articles):.0f} same_as_legacy={agree}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
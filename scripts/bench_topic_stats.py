@@ -0,0 +1,286 @@
+"""topic_stats のベンチマーク: トピックごとの相関サブクエリ・ウィンドウ関数（従来）vs 実体化した集計表。
+
+合成した記事 DB（bench_db_connect と同じ生成、既定 5 万件）の時刻を直近 --days 日に散らし、
+3 記事ずつのトピックと一部のトピックの insight を作ってから、次を測る。
+
+- 読み手: カテゴリ一覧（技術ページ）・カテゴリ横断 TOP・LLM の対象選び（pick_topic_inputs）・
+  タイムライン対象（48h に記事のあるトピック）・recompute_score_48h。従来の SQL と現在の SQL を
+  同じ DB で実行し、所要 ms と結果が一致したかを表示する（48h の境界は topic_stats の窓に揃える）
+- 維持: 全トピックの初回集計（マイグレーション相当）、--new 件の記事を紐付けた後の差分反映
+  （thread / dedupe / collect の最後に行う処理）、窓の基準時刻を 1 時間進める decay
+
+使い方:
+    python scripts/bench_topic_stats.py                  # 5 万件
+    python scripts/bench_topic_stats.py --n 200000 --rounds 5
+
+報告値: クエリごとの所要 ms（--rounds 回の最小値）と、結果が従来と一致したか。
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import db  # noqa: E402
+import llm_insights_pipeline  # noqa: E402
+import render_main  # noqa: E402
+from bench_db_connect import build_db  # noqa: E402
+from bench_dedupe import CATEGORIES  # noqa: E402
+from bench_event_ts import RecordingCursor, add_topics, spread_timestamps  # noqa: E402
+
+# 変更前の一覧が列ごとに発行していた相関サブクエリ（代表記事の 1 列を引く）
+_LEGACY_REP = """(
+  SELECT {col}
+  FROM topic_articles ta2
+  JOIN articles a2 ON a2.id = ta2.article_id
+  WHERE ta2.topic_id = t.id
+  ORDER BY
+    CASE WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0 ELSE 1 END,
+    datetime(a2.fetched_at) DESC,
+    a2.event_ts DESC,
+    a2.url ASC
+  LIMIT 1
+)"""
+_LEGACY_RECENT = """(
+  SELECT COALESCE(SUM(CASE WHEN a3.event_ts >= datetime(?) THEN 1 ELSE 0 END), 0)
+  FROM topic_articles ta3
+  JOIN articles a3 ON a3.id = ta3.article_id
+  WHERE ta3.topic_id = t.id
+)"""
+_LEGACY_NO_NEWS = """NOT EXISTS (
+  SELECT 1
+  FROM topic_articles ta4
+  JOIN articles a4 ON a4.id = ta4.article_id
+  WHERE ta4.topic_id = t.id
+    AND COALESCE(a4.kind,'') = 'news'
+)"""
+
+# 変更前の _build_category_topics（一覧 B）
+LEGACY_CATEGORY_LIST = f"""
+SELECT
+  t.id,
+  COALESCE(t.title_ja, t.title) AS title,
+  {_LEGACY_REP.format(col="a2.url")} AS url,
+  {_LEGACY_REP.format(col="COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)")} AS article_date,
+  {_LEGACY_RECENT} AS recent,
+  {_LEGACY_REP.format(col="a2.source")} AS source,
+  i.importance, i.summary, i.key_points, i.evidence_urls, i.tags, i.perspectives, i.perspective_digest
+FROM topics t
+LEFT JOIN topic_insights i ON i.topic_id = t.id
+WHERE t.category = ?
+  AND COALESCE(t.category,'') <> 'news'
+  AND {_LEGACY_NO_NEWS}
+ORDER BY COALESCE(i.importance, 0) DESC, COALESCE(recent, 0) DESC, t.id DESC
+LIMIT ?
+"""
+
+# 変更前の _build_cross_category_top（Trending Top 10）
+LEGACY_TRENDING_TOP = f"""
+SELECT
+  t.id,
+  COALESCE(t.title_ja, t.title) AS title,
+  COALESCE(NULLIF(t.category,''), 'other') AS category,
+  (SELECT a2.url FROM topic_articles ta2 JOIN articles a2 ON a2.id = ta2.article_id
+   WHERE ta2.topic_id = t.id ORDER BY a2.id DESC LIMIT 1) AS url,
+  {_LEGACY_REP.format(col="COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)")} AS article_date,
+  {_LEGACY_RECENT} AS recent,
+  i.importance, i.summary, i.tags, i.perspectives, i.perspective_digest
+FROM topics t
+LEFT JOIN topic_insights i ON i.topic_id = t.id
+WHERE {_LEGACY_RECENT} > 0
+  AND COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
+  AND {_LEGACY_NO_NEWS}
+ORDER BY COALESCE(recent,0) DESC, COALESCE(i.importance,0) DESC, t.id ASC
+LIMIT 10
+"""
+
+# 変更前の topic_timeline（48h に記事のあるトピック。境界の比較は event_ts に揃える）
+LEGACY_TIMELINE_TARGETS = """
+SELECT DISTINCT ta.topic_id FROM topic_articles ta
+JOIN articles a ON a.id = ta.article_id
+WHERE a.event_ts >= ?
+"""
+
+# 変更前の recompute_score_48h（トピックごとの相関サブクエリ。境界の比較は event_ts に揃える）
+LEGACY_SCORE_48H = """
+UPDATE topics
+SET score_48h = (
+  SELECT COUNT(*)
+  FROM topic_articles ta
+  JOIN articles a ON a.id = ta.article_id
+  WHERE ta.topic_id = topics.id
+    AND a.event_ts >= ?
+)
+"""
+
+
+def add_insights(path: Path) -> None:
+    """5 トピックに 1 つ insight を付ける（importance は id から決まる決定的な値）。"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO topic_insights(topic_id, importance, summary, tags, updated_at) "
+        "SELECT id, (id * 37) % 100, 'summary ' || id, '[]', '2026-01-01' FROM topics WHERE id % 5 = 0"
+    )
+    conn.commit()
+    conn.close()
+
+
+def _best_ms(fn, rounds: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, result
+
+
+def _recorded(conn, fn, *args, match: tuple[str, ...] = ()) -> tuple[str, tuple]:
+    """fn が発行した SQL のうち match の文字列をすべて含む最後の文とパラメータ。"""
+    rec = RecordingCursor(conn.cursor())
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(rec, *args)
+    return next((sql, params) for sql, params in reversed(rec.calls) if all(m in sql for m in match))
+
+
+def _report(name: str, legacy_ms: float, new_ms: float, same: bool, rows: int) -> None:
+    print(f"{name:22s} legacy={legacy_ms:9.2f}ms topic_stats={new_ms:8.2f}ms "
+          f"({legacy_ms / max(new_ms, 1e-6):5.0f}x) rows={rows} {'same' if same else 'DIFFERENT'}")
+
+
+def bench_readers(conn, rounds: int) -> None:
+    cur = conn.cursor()
+    anchor = db.get_watermark(cur, db.TOPIC_STATS_WINDOW)
+    cutoff_48h = db._window_cutoff(anchor, 48)
+    cat = CATEGORIES[0]
+
+    def run(sql, params):
+        return lambda: conn.execute(sql, params).fetchall()
+
+    sql, params = _recorded(conn, render_main._build_category_topics, cat, cutoff_48h, 15, 5,
+                             match=("topic_stats s ON", "LIMIT ?"))
+    legacy_ms, legacy = _best_ms(run(LEGACY_CATEGORY_LIST, (cutoff_48h, cat, 15)), rounds)
+    new_ms, rows = _best_ms(run(sql, params), rounds)
+    _report("category_list", legacy_ms, new_ms, legacy == rows, len(rows))
+
+    categories = [{"id": c} for c in CATEGORIES]
+    sql, params = _recorded(conn, render_main._build_cross_category_top, cutoff_48h, categories,
+                             match=("s.recent_48h > 0", "NOT IN ('news', 'market')"))
+    legacy_ms, legacy = _best_ms(run(LEGACY_TRENDING_TOP, (cutoff_48h, cutoff_48h)), rounds)
+    new_ms, rows = _best_ms(run(sql, params), rounds)
+    _report("cross_trending_top", legacy_ms, new_ms, legacy == rows, len(rows))
+
+    legacy_ms, legacy = _best_ms(run(LEGACY_TIMELINE_TARGETS, (cutoff_48h,)), rounds)
+    new_ms, rows = _best_ms(run("SELECT topic_id FROM topic_stats WHERE recent_48h > 0", ()), rounds)
+    _report("timeline_targets", legacy_ms, new_ms, sorted(legacy) == sorted(rows), len(rows))
+
+    # pick_topic_inputs の従来経路は topic_stats の無い DB 向けに残した ROW_NUMBER の CTE
+    has_stats = llm_insights_pipeline.table_exists
+    llm_insights_pipeline.table_exists = lambda cur, table: False
+    try:
+        legacy_ms, legacy = _best_ms(lambda: [tuple(r) for r in llm_insights_pipeline.pick_topic_inputs(conn, 300)], rounds)
+    finally:
+        llm_insights_pipeline.table_exists = has_stats
+        conn.row_factory = None
+    new_ms, rows = _best_ms(lambda: [tuple(r) for r in llm_insights_pipeline.pick_topic_inputs(conn, 300)], rounds)
+    conn.row_factory = None
+    _report("pick_topic_inputs", legacy_ms, new_ms, legacy == rows, len(rows))
+
+    def score(sql, params):
+        def fn():
+            conn.execute(sql, params)
+            result = conn.execute("SELECT id, score_48h FROM topics ORDER BY id").fetchall()
+            conn.rollback()
+            return result
+        return fn
+
+    new_sql = """
+    UPDATE topics
+    SET score_48h = COALESCE((SELECT recent_48h FROM topic_stats s WHERE s.topic_id = topics.id), 0)
+    WHERE score_48h IS NOT COALESCE((SELECT recent_48h FROM topic_stats s WHERE s.topic_id = topics.id), 0)
+    """
+    legacy_ms, legacy = _best_ms(score(LEGACY_SCORE_48H, (cutoff_48h,)), rounds)
+    new_ms, rows = _best_ms(score(new_sql, ()), rounds)
+    _report("recompute_score_48h", legacy_ms, new_ms, legacy == rows, len(rows))
+
+
+def bench_maintenance(path: Path, new_articles: int) -> None:
+    conn = sqlite3.connect(path)
+    cur = conn.cursor()
+
+    # 初回集計（マイグレーション直後と同じく全トピックを数える）
+    cur.execute("DELETE FROM topic_stats")
+    cur.execute("DELETE FROM pipeline_watermarks WHERE name=?", (db.TOPIC_STATS_WINDOW,))
+    t0 = time.perf_counter()
+    refreshed = db.update_topic_stats(cur)
+    conn.commit()
+    print(f"full build:            {(time.perf_counter() - t0) * 1000:9.1f}ms topics={refreshed}")
+
+    # 新着記事を既存トピックに紐付けた後の差分反映（thread の最後に行う処理）
+    now = datetime.now(timezone.utc)
+    topics = cur.execute("SELECT MAX(id) FROM topics").fetchone()[0]
+    cur.executemany(
+        "INSERT INTO articles(kind, region, source, title, url, content, category, source_tier, published_at, fetched_at) "
+        "SELECT kind, region, source, title, url || '#new', content, category, source_tier, ?, ? FROM articles WHERE id = ?",
+        [((now - timedelta(minutes=i)).isoformat(timespec="seconds"),) * 2 + (i * 7 + 1,) for i in range(new_articles)],
+    )
+    new_ids = [r[0] for r in cur.execute("SELECT id FROM articles ORDER BY id DESC LIMIT ?", (new_articles,))]
+    cur.executemany(
+        "INSERT OR IGNORE INTO topic_articles(topic_id, article_id) VALUES (?, ?)",
+        [((aid * 7919) % topics + 1, aid) for aid in new_ids],
+    )
+    t0 = time.perf_counter()
+    refreshed = db.refresh_topic_stats(cur)
+    conn.commit()
+    print(f"incremental ({new_articles} new): {(time.perf_counter() - t0) * 1000:9.1f}ms topics={refreshed}")
+
+    # 窓の基準時刻を 1 時間進める（窓から外れた記事のトピックだけ数え直す）
+    t0 = time.perf_counter()
+    refreshed = db.update_topic_stats(cur, now + timedelta(hours=1))
+    conn.commit()
+    print(f"decay (+1h):           {(time.perf_counter() - t0) * 1000:9.1f}ms topics={refreshed}")
+    conn.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=50_000, help="記事数")
+    ap.add_argument("--days", type=int, default=180, help="記事の時刻を散らす日数")
+    ap.add_argument("--new", type=int, default=500, help="差分反映で紐付ける新着記事数")
+    ap.add_argument("--rounds", type=int, default=3, help="各クエリの実行回数（最小値を報告）")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_topic_stats_"))
+    try:
+        path = workdir / "state.sqlite"
+        t0 = time.perf_counter()
+        build_db(path, args.n, args.seed)
+        spread_timestamps(path, args.days)
+        add_topics(path)
+        add_insights(path)
+        db.DB_PATH = path
+        conn = db.connect()
+        db.update_topic_stats(conn.cursor())
+        conn.commit()
+        print(f"built {args.n} articles ({path.stat().st_size / 2**20:.0f}MB) in {time.perf_counter() - t0:.1f}s")
+        bench_readers(conn, args.rounds)
+        conn.close()
+        bench_maintenance(path, args.new)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
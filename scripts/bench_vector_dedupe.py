@@ -0,0 +1,144 @@
+"""ベクトル dedupe の類似ペア抽出ベンチマーク: 従来の二重ループ vs タイル分割（similar_pairs）。
+
+正規化したランダム埋め込み（既定 384 次元 = MiniLM と同じ）に近傍ペアを埋め込み、
+dedupe_vector.similar_pairs をタイルの大きさを変えて計測する。従来方式
+（n×n 行列を作って Python の二重ループで走査）は n が小さいときだけ実行し、
+結果の一致も確認する。
+
+使い方:
+    python scripts/bench_vector_dedupe.py                      # 5k / 20k / 50k
+    python scripts/bench_vector_dedupe.py --sizes 5000 --tiles 512,2048,8192
+    python scripts/bench_vector_dedupe.py --legacy-max 20000   # 従来方式も 20k まで測る
+
+報告値: 所要秒、ピークメモリ（tracemalloc。NumPy の確保も含む）、検出ペア数。
+
+--hashing N を付けると、bench_dedupe と同じ合成見出し（言い換えペア入り）N 件を
+組み込みのハッシュ TF-IDF（VECTOR_DEDUPE_MODEL=hashing）で埋め込み、
+埋め込み速度（件/秒）と言い換えペアに対する適合率・再現率も報告する。
+    python scripts/bench_vector_dedupe.py --sizes "" --hashing 20000 --hashing-thresholds 0.5,0.6,0.7
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from dedupe_vector import similar_pairs  # noqa: E402
+from embedding_hashing import HashingTfidfModel  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_dedupe import _reword, _title, _vocabulary  # noqa: E402
+
+
+def make_embeddings(n: int, dim: int, dup_rate: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    emb = rng.normal(size=(n, dim)).astype(np.float32)
+    n_dup = int(n * dup_rate)
+    src = rng.integers(0, n, size=n_dup)
+    dst = rng.integers(0, n, size=n_dup)
+    emb[dst] = emb[src] + rng.normal(scale=0.3, size=(n_dup, dim)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb
+
+
+def legacy_pairs(emb: np.ndarray, threshold: float) -> list[tuple[int, int]]:
+    """変更前の find_duplicate_candidates と同じ走査。"""
+    mat = emb @ emb.T
+    n = len(emb)
+    out = []
+    for i in range(n):
+        for j in range(i + 1, n):
+            if float(mat[i][j]) >= threshold:
+                out.append((i, j))
+    return out
+
+
+def make_titles(n: int, dup_rate: float, seed: int) -> tuple[list[str], set[tuple[int, int]]]:
+    """合成見出しと、言い換えで作った正解ペア {(古い添字, 新しい添字)}。"""
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng, 4000)
+    titles = [_title(rng, vocab) for _ in range(n)]
+    pairs: set[tuple[int, int]] = set()
+    for i in range(1, n):
+        if rng.random() < dup_rate:
+            base = rng.randrange(i)
+            titles[i] = _reword(rng, titles[base])
+            pairs.add((base, i))
+    return titles, pairs
+
+
+def bench_hashing(n: int, thresholds: list[float], dup_rate: float, tile: int, seed: int) -> None:
+    titles, truth = make_titles(n, dup_rate, seed)
+    t0 = time.perf_counter()
+    HashingTfidfModel().encode(titles)
+    sec = time.perf_counter() - t0  # tracemalloc を外した速度（件/秒の報告用）
+    emb, _sec, peak = _measure(lambda: HashingTfidfModel().encode(titles))
+    print(f"hashing n={n} dim={emb.shape[1]} encode sec={sec:.2f} ({n / sec:,.0f} titles/s) "
+          f"peak={peak:.1f}MB truth_pairs={len(truth)}")
+    for threshold in thresholds:
+        (i, j, _scores), sec, _peak = _measure(lambda: similar_pairs(emb, threshold, tile_size=tile))
+        found = set(zip(i.tolist(), j.tolist()))
+        hit = len(found & truth)
+        precision = hit / len(found) if found else 0.0
+        recall = hit / len(truth) if truth else 0.0
+        print(f"  threshold={threshold:.2f} search sec={sec:6.2f} pairs={len(found)} "
+              f"precision={precision:.1%} recall={recall:.1%}")
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    sec = time.perf_counter() - t0
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, sec, peak / (1024 * 1024)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="5000,20000,50000")
+    ap.add_argument("--tiles", default="512,2048")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--threshold", type=float, default=0.82)
+    ap.add_argument("--dup-rate", type=float, default=0.02, help="近傍ペアとして埋め込む割合")
+    ap.add_argument("--legacy-max", type=int, default=5000, help="従来方式を実行する最大件数")
+    ap.add_argument("--hashing", type=int, default=0, metavar="N",
+                    help="合成見出し N 件でハッシュ TF-IDF の速度と適合率・再現率を測る")
+    ap.add_argument("--hashing-thresholds", default="0.5,0.6,0.7")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    tiles = [int(x) for x in args.tiles.split(",") if x.strip()]
+    for n in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        emb = make_embeddings(n, args.dim, args.dup_rate, args.seed)
+        print(f"n={n} dim={args.dim} threshold={args.threshold}")
+        tiled_pairs = None
+        for tile in tiles:
+            (i, j, _scores), sec, peak = _measure(
+                lambda tile=tile: similar_pairs(emb, args.threshold, tile_size=tile)
+            )
+            tiled_pairs = list(zip(i.tolist(), j.tolist()))
+            print(f"  tiled tile={tile:<6d} sec={sec:8.2f} peak={peak:8.1f}MB pairs={len(tiled_pairs)}")
+        if n <= args.legacy_max:
+            pairs, sec, peak = _measure(lambda: legacy_pairs(emb, args.threshold))
+            same = "same" if pairs == tiled_pairs else "DIFFERENT"
+            print(f"  legacy            sec={sec:8.2f} peak={peak:8.1f}MB pairs={len(pairs)} ({same})")
+        else:
+            print(f"  legacy            skipped (n×n 行列だけで {n * n * 4 / 2**20:.0f}MB)")
+    if args.hashing:
+        thresholds = [float(x) for x in args.hashing_thresholds.split(",") if x.strip()]
+        bench_hashing(args.hashing, thresholds, args.dup_rate, tiles[-1] if tiles else 2048, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# src/archive.py
+"""古い記事の退避（hot/archive 分割）。
+
+event_ts が ARCHIVE_AFTER_DAYS 日より前の記事を退避 DB（db.archive_path()。既定は data/archive.sqlite）へ
+移し、state.sqlite には直近の記事だけを残す。dedupe・エンティティ抽出・運用統計・FTS の作り直しなど
+記事を全件走査する処理が、履歴全体の分を払わないようにする。
+
+移すもの:
+- 境界より前の記事と、その topic_articles / article_entities
+- それで本体に記事が 1 件も残らなくなったトピックの topics / topic_insights / edges
+FTS・dedupe_features などの派生データは記事の削除トリガで本体から消え、記事が減ったトピックは
+topic_stats（同じトランザクションで数え直す）と thread の edges・代表記事（次回の thread）が作り直す。
+
+移した行は id を変えないので、connect(archive=True) の接続なら TEMP VIEW all_<表> で移す前と同じ行が
+読める。タイムライン・検索インデックス・予測検証のダイジェストは db.archive_source() で、
+読む範囲が境界より前にかかるときだけ退避先も読む。
+
+環境変数:
+    ARCHIVE_AFTER_DAYS  この日数より前の記事を退避する（既定 180。予測検証のダイジェストの最長 14 日より十分長く）
+    ARCHIVE_BATCH_SIZE  1 トランザクションで移す記事数（既定 5000）
+    ARCHIVE_DB_PATH     退避 DB のパス（db.py）
+
+使い方:
+    python src/archive.py
+    python src/archive.py --days 90 --vacuum   # 空いたページを詰めて state.sqlite のファイルを縮める
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from db import (
+    ARCHIVE_SCHEMA,
+    ARCHIVE_WATERMARK,
+    archive_path,
+    attach_archive,
+    connect,
+    delete_archived_articles,
+    get_watermark,
+    init_db,
+    refresh_topic_stats,
+    set_watermark,
+    table_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "180"))
+BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "5000"))
+
+_BATCH_ARTICLES = "SELECT id FROM temp.archive_batch_articles"
+_BATCH_TOPICS = "SELECT id FROM temp.archive_batch_topics"
+
+
+def _copy(cur, table: str, where: str) -> int:
+    """main.<table> の where に合う行を退避先へ写し、写した行数を返す。
+
+    同じキー（articles は id と url）の行が退避先にあれば置き換える（途中で落ちて本体と退避先の両方に
+    残った行を、次回の実行で揃える）。
+    """
+    cols = table_columns(cur, table)
+    if not cols:
+        return 0
+    col_list = ", ".join(f'"{name}"' for name, _type in cols)
+    cur.execute(
+        f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table}({col_list}) "
+        f"SELECT {col_list} FROM main.{table} WHERE {where}"
+    )
+    return cur.rowcount
+
+
+def _delete(cur, table: str, where: str) -> None:
+    if table_columns(cur, table):
+        cur.execute(f"DELETE FROM main.{table} WHERE {where}")
+
+
+def archive_batch(cur, cutoff: str, limit: int = BATCH_SIZE) -> Counter:
+    """event_ts が cutoff より前の記事を古い順に最大 limit 件、紐付けと冷えたトピックごと退避先へ移す。
+
+    退避先への書き込みと本体からの削除は呼び出し側のトランザクションで行う。移した行数を表ごとに返す。
+    """
+    counts: Counter = Counter()
+    cur.execute("DELETE FROM temp.archive_batch_articles")
+    cur.execute("DELETE FROM temp.archive_batch_topics")
+    cur.execute(
+        "INSERT INTO temp.archive_batch_articles(id) "
+        "SELECT id FROM main.articles WHERE event_ts < ? ORDER BY event_ts LIMIT ?",
+        (cutoff, int(limit)),
+    )
+    if not cur.rowcount:
+        return counts
+    # この記事を外すと本体に記事が残らないトピック（トピックの行と insight も移す）
+    cur.execute(
+        f"""
+        INSERT INTO temp.archive_batch_topics(id)
+        SELECT DISTINCT ta.topic_id FROM main.topic_articles ta
+        WHERE ta.article_id IN ({_BATCH_ARTICLES})
+          AND NOT EXISTS (
+            SELECT 1 FROM main.topic_articles o
+            WHERE o.topic_id = ta.topic_id AND o.article_id NOT IN ({_BATCH_ARTICLES})
+          )
+        """
+    )
+
+    # 同じ URL の記事が別の id で退避済みなら、退避先の古い行と紐付けを消してから置き換える
+    delete_archived_articles(
+        cur,
+        f"SELECT a.id FROM {ARCHIVE_SCHEMA}.articles a JOIN main.articles m ON m.url = a.url "
+        f"WHERE m.id IN ({_BATCH_ARTICLES}) AND a.id != m.id",
+    )
+    counts["articles"] = _copy(cur, "articles", f"id IN ({_BATCH_ARTICLES})")
+    counts["topic_articles"] = _copy(cur, "topic_articles", f"article_id IN ({_BATCH_ARTICLES})")
+    counts["article_entities"] = _copy(cur, "article_entities", f"article_id IN ({_BATCH_ARTICLES})")
+    counts["topics"] = _copy(cur, "topics", f"id IN ({_BATCH_TOPICS})")
+    counts["topic_insights"] = _copy(cur, "topic_insights", f"topic_id IN ({_BATCH_TOPICS})")
+    counts["edges"] = _copy(cur, "edges", f"topic_id IN ({_BATCH_TOPICS})")
+
+    # 本体からは参照する側から消す（記事・トピックの削除トリガが FTS・topic_stats 等の派生データを追従させる）
+    _delete(cur, "edges", f"topic_id IN ({_BATCH_TOPICS})")
+    _delete(cur, "topic_insights", f"topic_id IN ({_BATCH_TOPICS})")
+    _delete(cur, "article_entities", f"article_id IN ({_BATCH_ARTICLES})")
+    _delete(cur, "topic_articles", f"article_id IN ({_BATCH_ARTICLES})")
+    _delete(cur, "articles", f"id IN ({_BATCH_ARTICLES})")
+    _delete(cur, "topics", f"id IN ({_BATCH_TOPICS})")
+    return counts
+
+
+def _size_mb(cur, schema: str) -> tuple[float, float]:
+    """(ファイル上の大きさ, 空きページを除いた大きさ) を MB で返す。"""
+    page_size = cur.execute(f"PRAGMA {schema}.page_size").fetchone()[0]
+    pages = cur.execute(f"PRAGMA {schema}.page_count").fetchone()[0]
+    free = cur.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+    return pages * page_size / 2**20, (pages - free) * page_size / 2**20
+
+
+def main(days: int | None = None, *, vacuum: bool = False) -> Counter:
+    """event_ts が days 日（既定 ARCHIVE_AFTER_DAYS）より前の記事を退避し、表ごとの移した行数を返す。
+
+    BATCH_SIZE 件ずつコミットする。境界より前の記事を移し終えたら境界を記録する
+    （読み手はこれ以降の範囲なら本体だけを読む）。vacuum=True なら最後に本体を VACUUM する。
+    """
+    t0 = time.perf_counter()
+    logger.info("step=archive start")
+    days = ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff_dt = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = cutoff_dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    init_db()
+    conn = connect()
+    attach_archive(conn, create=True)
+    cur = conn.cursor()
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch_articles (id INTEGER PRIMARY KEY)")
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch_topics (id INTEGER PRIMARY KEY)")
+    main_before, _ = _size_mb(cur, "main")
+
+    totals: Counter = Counter()
+    while True:
+        counts = archive_batch(cur, cutoff)
+        # 記事が減ったトピックの集計も同じトランザクションで反映する
+        refresh_topic_stats(cur)
+        conn.commit()
+        totals.update(counts)
+        if counts["articles"] < BATCH_SIZE:
+            break
+    # 境界は戻さない（days を延ばしても、退避済みの記事は本体に戻らない）
+    if int(cutoff_dt.timestamp()) > get_watermark(cur, ARCHIVE_WATERMARK):
+        set_watermark(cur, ARCHIVE_WATERMARK, int(cutoff_dt.timestamp()))
+    conn.commit()
+    logger.info(
+        "step=archive moved cutoff=%s %s", cutoff,
+        " ".join(f"{table}={totals[table]}" for table in
+                 ("articles", "topic_articles", "article_entities", "topics", "topic_insights", "edges")),
+    )
+
+    if vacuum and totals["articles"]:
+        t1 = time.perf_counter()
+        if cur.execute("SELECT 1 FROM main.sqlite_master WHERE name='articles_fts'").fetchone():
+            # 削除で増えた FTS のセグメントをまとめてから詰める
+            cur.execute("INSERT INTO articles_fts(articles_fts) VALUES('optimize')")
+            conn.commit()
+        cur.execute("VACUUM main")
+        logger.info("step=archive vacuum sec=%.1f", time.perf_counter() - t1)
+
+    (main_file, main_used), (arch_file, _) = _size_mb(cur, "main"), _size_mb(cur, ARCHIVE_SCHEMA)
+    logger.info(
+        "step=archive size main=%.1fMB->%.1fMB (used %.1fMB) archive=%.1fMB (%s)",
+        main_before, main_file, main_used, arch_file, archive_path(),
+    )
+    conn.close()
+    logger.info("step=archive end sec=%.1f", time.perf_counter() - t0)
+    return totals
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    ap = argparse.ArgumentParser(description="古い記事を退避 DB へ移し、state.sqlite に直近の記事だけを残す")
+    ap.add_argument("--days", type=int, default=None,
+                    help=f"この日数より前の記事を退避する（既定 ARCHIVE_AFTER_DAYS={ARCHIVE_AFTER_DAYS}）")
+    ap.add_argument("--vacuum", action="store_true", help="最後に state.sqlite を VACUUM してファイルを縮める")
+    args = ap.parse_args()
+    main(args.days, vacuum=args.vacuum)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import sqlite3
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 
+from db import connect
+
 DB_PATH = "data/state.sqlite"
 
 
@@ -39,7 +40,7 @@ def norm(s: str) -> str:
 
 
 def main():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     cur = conn.cursor()
 
     rows = cur.execute(
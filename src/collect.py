@@ -6,25 +6,28 @@ from email.utils import parsedate_to_datetime
 from collections import defaultdict
 from pathlib import Path
 
-from db import init_db, connect
+from db import ARCHIVE_SCHEMA, archive_attached, attach_archive, init_db, connect, refresh_topic_stats
+from feed_fastparse import parse_feed_limited
+import http_client
+import http_replay
 
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import logging
+import math
 import re
 import time
 from functools import lru_cache
 import json
 
 # ★本文フェッチ用
-import urllib.request
 import urllib.error
 import html as _html
 import socket
 
 logger = logging.getLogger(__name__)
 import ssl
+import sqlite3
 
-import certifi
 import requests
 
 FAILURE_THRESHOLD = 3
@@ -85,20 +88,56 @@ def should_fetch_fulltext(source: str, content: str, fetch_count: int, fetch_lim
     return len((content or "").strip()) < MIN_CONTENT_CHARS
 
 
-def fetch_fulltext(url: str, source: str = "") -> str:
-    """記事ページを取得して本文っぽいテキストを抽出（簡易）。失敗時は空文字。"""
+# 本文フェッチ結果キャッシュ（fulltext_cache）の有効期間。
+# 成功・恒久的な失敗（content_too_short 等）は長め、一時的な失敗（timeout 等）は短めに保持する。
+FULLTEXT_CACHE_TTL_HOURS = int(os.environ.get("FULLTEXT_CACHE_TTL_HOURS", "168"))
+FULLTEXT_CACHE_NEG_TTL_HOURS = int(os.environ.get("FULLTEXT_CACHE_NEG_TTL_HOURS", "24"))
+# 取得し直しても結果が変わらない失敗種別（TTL は成功と同じ長さ）
+FULLTEXT_PERMANENT_FAILURES = {
+    "skip_domain",
+    "content_type_mismatch",
+    "content_too_short",
+    "response_too_large",
+}
+
+
+def _fulltext_failure_status(exc: Exception) -> str:
+    # requests の InvalidURL 等は ValueError も継承するため先に分類する
+    if isinstance(exc, ValueError) and not isinstance(exc, requests.RequestException):
+        return str(exc).split(":", 1)[0] or "parse_error"
+    return classify_error(exc)
+
+
+def download_fulltext(url: str) -> tuple[bytes, str, str, int]:
+    """記事ページの HTML を取得し (data, charset, status, size) を返す（I/O のみ）。
+
+    status は取得成功時 "ok"、失敗時は timeout_error / content_type_mismatch 等。
+    """
     host = urlsplit(url).netloc.lower()
     if host in SKIP_FETCH_DOMAINS:
-        return ""
+        return b"", "", "skip_domain", 0
 
+    size = 0
     try:
-        req = urllib.request.Request(url, headers=HEADERS, method="GET")
-        with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT_SEC) as resp:
+        with http_client.get(
+            http_replay.target_url(url), headers=HEADERS, timeout=FETCH_TIMEOUT_SEC, stream=True
+        ) as resp:
+            status = resp.status_code
             ctype = (resp.headers.get("Content-Type") or "").lower()
-            if "text/html" not in ctype:
+            if status >= 400 or "text/html" not in ctype:
+                http_replay.record_response(url, kind="article", status=status, headers=resp.headers, body=b"")
+                resp.raise_for_status()
                 raise ValueError(f"content_type_mismatch:{ctype}")
 
-            data = resp.read(MAX_FETCH_BYTES + 1)
+            # 上限 +1 バイトまで読めば超過を判定できる（残りは読まずに接続ごと捨てる）
+            chunks = []
+            for chunk in resp.iter_content(64 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_FETCH_BYTES:
+                    break
+            data = b"".join(chunks)
+            http_replay.record_response(url, kind="article", status=status, headers=resp.headers, body=data)
             if len(data) > MAX_FETCH_BYTES:
                 # 大きすぎるページは無視（事故防止）
                 raise ValueError("response_too_large")
@@ -108,18 +147,92 @@ def fetch_fulltext(url: str, source: str = "") -> str:
             m = re.search(r"charset=([a-zA-Z0-9_\-]+)", ctype)
             if m:
                 charset = m.group(1).strip()
+            return data, charset, "ok", size
+    except (requests.RequestException, TimeoutError, socket.timeout, ValueError) as e:
+        logger.warning("fetch_fulltext failed url=%s err=%s: %s", url[:120], type(e).__name__, e)
+        return b"", "", _fulltext_failure_status(e), size
 
-            html_text = data.decode(charset, errors="ignore")
-            text = _strip_html_soft(html_text)
 
-            # 短すぎる場合は失敗扱い
-            if len(text) < MIN_CONTENT_CHARS:
-                raise ValueError("content_too_short")
+def extract_fulltext(data: bytes, charset: str) -> tuple[str, str]:
+    """取得済み HTML から本文テキストを抽出し (text, status) を返す（CPU のみ）。
+
+    プロセスプールからも呼ばれるため、モジュールトップレベルの純関数に保つ。
+    """
+    try:
+        html_text = data.decode(charset or "utf-8", errors="ignore")
+    except LookupError:
+        html_text = data.decode("utf-8", errors="ignore")
+    text = _strip_html_soft(html_text)
+
+    # 短すぎる場合は失敗扱い
+    if len(text) < MIN_CONTENT_CHARS:
+        return "", "content_too_short"
+    return text, "ok"
+
+
+def fetch_fulltext_result(url: str) -> tuple[str, str, int]:
+    """記事ページを取得して本文を抽出し、(text, status, size) を返す。
+
+    status は成功時 "ok"、失敗時は timeout_error / content_too_short /
+    content_type_mismatch 等の種別。失敗時の text は空文字。
+    """
+    data, charset, status, size = download_fulltext(url)
+    if status != "ok":
+        return "", status, size
+    text, status = extract_fulltext(data, charset)
+    if status != "ok":
+        logger.warning("fetch_fulltext failed url=%s err=ValueError: %s", url[:120], status)
+    return text, status, size
+
+
+def fetch_fulltext(url: str, source: str = "") -> str:
+    """記事ページを取得して本文っぽいテキストを抽出（簡易）。失敗時は空文字。"""
+    text, _status, _size = fetch_fulltext_result(url)
+    return text
+
+
+def get_fulltext_cache(cur, url: str, *, now_iso: str) -> dict | None:
+    """有効期限内のキャッシュがあれば {"status", "text", "size"} を返す。"""
+    cur.execute(
+        "SELECT status, text, size FROM fulltext_cache WHERE url=? AND expires_at > ?",
+        (normalize_url(url), now_iso),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return {"status": row[0] or "", "text": row[1] or "", "size": row[2] or 0}
 
-            return text
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, socket.timeout, ValueError) as e:
-        logger.warning("fetch_fulltext failed url=%s err=%s: %s", url[:120], type(e).__name__, e)
-        return ""
+
+def put_fulltext_cache(cur, url: str, *, status: str, text: str, size: int, now_iso: str):
+    ttl_hours = FULLTEXT_CACHE_TTL_HOURS
+    if status != "ok" and status not in FULLTEXT_PERMANENT_FAILURES:
+        ttl_hours = FULLTEXT_CACHE_NEG_TTL_HOURS
+    expires_at = (
+        datetime.fromisoformat(now_iso) + timedelta(hours=ttl_hours)
+    ).isoformat(timespec="seconds")
+    cur.execute(
+        """
+        INSERT INTO fulltext_cache(url, status, size, text, fetched_at, expires_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            status=excluded.status,
+            size=excluded.size,
+            text=excluded.text,
+            fetched_at=excluded.fetched_at,
+            expires_at=excluded.expires_at
+        """,
+        (normalize_url(url), status, int(size or 0), text or "", now_iso, expires_at),
+    )
+
+
+def purge_fulltext_cache(cur, *, now_iso: str) -> int:
+    """期限切れのキャッシュ行を削除し、削除件数を返す。"""
+    try:
+        cur.execute("DELETE FROM fulltext_cache WHERE expires_at <= ?", (now_iso,))
+    except sqlite3.OperationalError:
+        # fulltext_cache 作成前の DB（簡易スキーマ）では何もしない
+        return 0
+    return cur.rowcount or 0
 
 
 def classify_error(exc: Exception | None = None, *, hint: str = "") -> str:
@@ -146,6 +259,8 @@ def classify_error(exc: Exception | None = None, *, hint: str = "") -> str:
             return "timeout_error"
     if isinstance(exc, requests.exceptions.SSLError):
         return "ssl_error"
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return "http_error"
     if isinstance(exc, requests.exceptions.Timeout):
         return "timeout_error"
     if isinstance(exc, requests.exceptions.ConnectionError):
@@ -168,6 +283,14 @@ def init_failure_stats() -> dict:
         "seen_url_error": set(),
         "detailed_logs": 0,
         "suppressed_logs": 0,
+        # フィード単位の結果件数（fetched / not_modified / failed / suspended / not_due）
+        "feed_outcomes": defaultdict(int),
+        # 本文補完件数（cache_hit / negative_hit / cache_miss / fetched / fetch_failed / budget_skipped / breaker_skipped）
+        "fulltext": defaultdict(int),
+        # 記事の書き込み件数（new / changed / unchanged / low_priority / archived）
+        "articles": defaultdict(int),
+        # 段階別の所要秒（fetch / parse / write / fulltext / total）。parse はフィードごとの合計
+        "timings": defaultdict(float),
     }
 
 
@@ -199,6 +322,11 @@ def append_collect_health_log(*, stats: dict, started_at: datetime, ended_at: da
         "top_sources": sorted(stats["by_source"].items(), key=lambda x: x[1], reverse=True)[:5],
         "top_error_types": sorted(stats["by_error_type"].items(), key=lambda x: x[1], reverse=True)[:5],
         "suppressed_logs": stats["suppressed_logs"],
+        "feed_outcomes": dict(stats.get("feed_outcomes", {})),
+        "fulltext": dict(stats.get("fulltext", {})),
+        "articles": dict(stats.get("articles", {})),
+        "timings": {k: round(v, 2) for k, v in stats.get("timings", {}).items()},
+        "http": dict(stats.get("http", {})),
     }
     with log_path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(payload, ensure_ascii=False) + "\n")
@@ -223,6 +351,32 @@ def print_collect_summary(stats: dict):
     logger.info("collect failure summary total=%d suppressed_logs=%d", stats['total'], stats['suppressed_logs'])
     logger.info("collect failure top_sources=%s", top_sources)
     logger.info("collect failure top_error_types=%s", top_error_types)
+    outcomes = stats.get("feed_outcomes", {})
+    logger.info(
+        "collect feed summary fetched=%d not_modified=%d failed=%d suspended=%d not_due=%d",
+        outcomes.get("fetched", 0), outcomes.get("not_modified", 0),
+        outcomes.get("failed", 0), outcomes.get("suspended", 0), outcomes.get("not_due", 0),
+    )
+    articles = stats.get("articles", {})
+    logger.info(
+        "collect articles new=%d changed=%d unchanged=%d low_priority=%d archived=%d",
+        articles.get("new", 0), articles.get("changed", 0),
+        articles.get("unchanged", 0), articles.get("low_priority", 0), articles.get("archived", 0),
+    )
+    fulltext = stats.get("fulltext", {})
+    logger.info(
+        "collect fulltext cache hit=%d negative_hit=%d miss=%d fetched=%d fetch_failed=%d "
+        "budget_skipped=%d breaker_skipped=%d",
+        fulltext.get("cache_hit", 0), fulltext.get("negative_hit", 0), fulltext.get("cache_miss", 0),
+        fulltext.get("fetched", 0), fulltext.get("fetch_failed", 0), fulltext.get("budget_skipped", 0),
+        fulltext.get("breaker_skipped", 0),
+    )
+    timings = stats.get("timings", {})
+    logger.info(
+        "collect timings fetch_sec=%.1f parse_sec=%.1f write_sec=%.1f fulltext_sec=%.1f total_sec=%.1f",
+        timings.get("fetch_sec", 0.0), timings.get("parse_sec", 0.0), timings.get("write_sec", 0.0),
+        timings.get("fulltext_sec", 0.0), timings.get("total_sec", 0.0),
+    )
 
 
 DROP_QS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "ref", "fbclid", "gclid"}
@@ -485,6 +639,135 @@ def upsert_feed_health(cur, feed_url: str, health: dict):
     )
 
 
+def load_feed_validators(cur) -> dict:
+    """feed_health から条件付き GET 用のバリデータを一括取得する。
+
+    戻り値は feed_url -> {"etag": str, "modified": str}。どちらも空のフィードは含めない。
+    """
+    try:
+        cur.execute("SELECT feed_url, etag, last_modified FROM feed_health")
+    except sqlite3.OperationalError:
+        # etag 列追加前の DB（init_db 未実行）でも収集は継続する
+        return {}
+    out = {}
+    for feed_url, etag, last_modified in cur.fetchall():
+        if etag or last_modified:
+            out[feed_url] = {"etag": etag or "", "modified": last_modified or ""}
+    return out
+
+
+def save_feed_validators(cur, feed_url: str, *, etag: str, modified: str):
+    """取得成功したフィードのバリデータを保存する（記事 0 件のフィードでは feed_health 行もここで作る）。"""
+    cur.execute(
+        """
+        INSERT INTO feed_health(feed_url, etag, last_modified) VALUES (?, ?, ?)
+        ON CONFLICT(feed_url) DO UPDATE SET etag=excluded.etag, last_modified=excluded.last_modified
+        """,
+        (feed_url, etag or "", modified or ""),
+    )
+
+
+# --- 適応ポーリング -----------------------------------------------------------
+# 新着記事の到着間隔（指数移動平均）からフィードごとの次回取得予定を決め、
+# 予定前のフィードは取得自体を省略する。月1更新のベンダーブログを毎回取りに行かないため。
+FEED_ADAPTIVE_POLL = os.environ.get("FEED_ADAPTIVE_POLL", "1") != "0"
+# 平均到着間隔に掛ける係数（0.5 = 平均間隔の半分ごとに確認）
+FEED_POLL_INTERVAL_FACTOR = float(os.environ.get("FEED_POLL_INTERVAL_FACTOR", "0.5"))
+# どんなに更新が少ないフィードでもこの時間以内には必ず確認する
+FEED_POLL_MAX_INTERVAL_HOURS = float(os.environ.get("FEED_POLL_MAX_INTERVAL_HOURS", "24"))
+FEED_INTERVAL_EWMA_ALPHA = 0.3
+# 同時刻の一括公開などで間隔 0 になるのを防ぐ下限
+MIN_ARRIVAL_INTERVAL_SEC = 60
+
+
+def load_feed_schedule(cur) -> dict:
+    """feed_health から適応ポーリング用の統計を一括取得する（feed_url -> dict）。"""
+    try:
+        cur.execute(
+            "SELECT feed_url, avg_interval_sec, arrivals, last_new_at, next_due_at FROM feed_health"
+        )
+    except sqlite3.OperationalError:
+        # 列追加前の DB では全フィードを毎回取得する
+        return {}
+    return {
+        row[0]: {
+            "avg_interval_sec": row[1],
+            "arrivals": row[2] or 0,
+            "last_new_at": row[3] or "",
+            "next_due_at": row[4] or "",
+        }
+        for row in cur.fetchall()
+    }
+
+
+def is_feed_due(schedule: dict | None, now: datetime) -> bool:
+    """次回取得予定を過ぎていれば True。統計が無いフィードは常に取得する。"""
+    if not schedule:
+        return True
+    next_due = _parse_iso8601(schedule.get("next_due_at"))
+    if next_due is None:
+        return True
+    if next_due.tzinfo is None:
+        next_due = next_due.replace(tzinfo=timezone.utc)
+    return next_due <= now
+
+
+def update_interval_stats(
+    avg_interval_sec: float | None,
+    arrivals: int,
+    last_new_at: str,
+    new_times: list[str],
+) -> tuple[float | None, int, str]:
+    """新着記事の時刻列で到着間隔の指数移動平均を更新し (avg, arrivals, last_new_at) を返す。"""
+    points = []
+    for t in [last_new_at, *new_times]:
+        dt = _parse_iso8601(t)
+        if dt is None:
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        points.append(dt)
+    points.sort()
+    for prev, cur_dt in zip(points, points[1:]):
+        gap = max(MIN_ARRIVAL_INTERVAL_SEC, (cur_dt - prev).total_seconds())
+        if avg_interval_sec is None:
+            avg_interval_sec = gap
+        else:
+            avg_interval_sec = (
+                FEED_INTERVAL_EWMA_ALPHA * gap + (1 - FEED_INTERVAL_EWMA_ALPHA) * avg_interval_sec
+            )
+    if points:
+        last_new_at = points[-1].astimezone(timezone.utc).isoformat(timespec="seconds")
+    return avg_interval_sec, arrivals + len(new_times), last_new_at
+
+
+def compute_next_due(avg_interval_sec: float | None, now: datetime) -> str:
+    """平均到着間隔から次回取得予定時刻を決める（統計が無ければ now = 次回も取得）。"""
+    if not avg_interval_sec:
+        return now.isoformat(timespec="seconds")
+    wait_sec = min(avg_interval_sec * FEED_POLL_INTERVAL_FACTOR, FEED_POLL_MAX_INTERVAL_HOURS * 3600)
+    return (now + timedelta(seconds=wait_sec)).isoformat(timespec="seconds")
+
+
+def update_feed_schedule(cur, feed_url: str, *, new_times: list[str], now_iso: str):
+    """取得成功後に到着間隔統計と次回取得予定を更新する。"""
+    try:
+        cur.execute(
+            "SELECT avg_interval_sec, arrivals, last_new_at FROM feed_health WHERE feed_url=?",
+            (feed_url,),
+        )
+    except sqlite3.OperationalError:
+        return
+    row = cur.fetchone() or (None, 0, "")
+    avg, arrivals, last_new_at = update_interval_stats(row[0], row[1] or 0, row[2] or "", new_times)
+    next_due_at = compute_next_due(avg, datetime.fromisoformat(now_iso))
+    cur.execute(
+        "UPDATE feed_health SET avg_interval_sec=?, arrivals=?, last_new_at=?, next_due_at=? "
+        "WHERE feed_url=?",
+        (avg, arrivals, last_new_at, next_due_at, feed_url),
+    )
+
+
 def log_feed_health(*, source: str, url: str, error_type: str, failure_count: int, suspended: bool):
     logger.info(
         "feed_health source=%s url=%s error_type=%s failure_count=%d suspended=%d",
@@ -539,19 +822,68 @@ def mark_feed_success(cur, *, feed: dict, now_iso: str):
     )
 
 
-def _parse_feed_with_requests(url: str, *, tls_mode: str, user_agent: str | None = None):
-    verify = certifi.where()
-    if tls_mode == "relaxed":
-        verify = False
-
+def _conditional_headers(validators: dict | None) -> dict:
+    """保存済みバリデータから If-None-Match / If-Modified-Since ヘッダを組み立てる。"""
+    headers = {}
+    if not FEED_CONDITIONAL_GET or not validators:
+        return headers
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("modified"):
+        headers["If-Modified-Since"] = validators["modified"]
+    return headers
+
+
+def is_not_modified(d) -> bool:
+    """パース結果が 304 Not Modified を示すか（feedparser の d.status 規約に合わせる）。"""
+    return getattr(d, "status", None) == 304
+
+
+def _parse_feed_with_requests(
+    url: str,
+    *,
+    tls_mode: str,
+    user_agent: str | None = None,
+    validators: dict | None = None,
+    limit: int | None = None,
+):
+    """共有 HTTP セッション（http_client）で取得して feedparser でパースする。
+
+    戻り値には feedparser.parse(url) と同じく status / etag / modified を載せる。
+    304 の場合は本文をパースせず、entries 空の結果を返す。
+    limit 指定時は先頭 limit 件だけを逐次パースする高速経路
+    （feed_fastparse）を先に試し、扱えない形式なら feedparser で全体をパースする。
+    """
     headers = dict(HEADERS)
     if user_agent:
         headers["User-Agent"] = user_agent
         headers.update(BROWSER_EXTRA_HEADERS)
+    headers.update(_conditional_headers(validators))
 
-    response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT_SEC, verify=verify)
+    response = http_client.get(
+        http_replay.target_url(url), headers=headers, timeout=FETCH_TIMEOUT_SEC, tls_mode=tls_mode
+    )
+    http_replay.record_response(
+        url, kind="feed", status=response.status_code, headers=response.headers, body=response.content
+    )
+    if response.status_code == 304:
+        return feedparser.FeedParserDict(
+            status=304,
+            entries=[],
+            bozo=0,
+            etag=response.headers.get("ETag") or (validators or {}).get("etag", ""),
+            modified=response.headers.get("Last-Modified") or (validators or {}).get("modified", ""),
+        )
     response.raise_for_status()
-    return feedparser.parse(response.content)
+    t_parse = _now_sec()
+    d = parse_feed_limited(response.content, limit) if limit else None
+    if d is None:
+        d = feedparser.parse(response.content)
+    d["parse_sec"] = _now_sec() - t_parse
+    d["status"] = response.status_code
+    d["etag"] = response.headers.get("ETag", "")
+    d["modified"] = response.headers.get("Last-Modified", "")
+    return d
 
 
 # --- フィード並列プリフェッチ --------------------------------------------
@@ -559,41 +891,61 @@ def _parse_feed_with_requests(url: str, *, tls_mode: str, user_agent: str | None
 FEED_FETCH_WORKERS = int(os.environ.get("FEED_FETCH_WORKERS", "5"))
 # 個別 timeout をすり抜けた場合の保険: プリフェッチ全体の総時間制限（秒）。
 FEED_FETCH_TOTAL_TIMEOUT = int(os.environ.get("FEED_FETCH_TOTAL_TIMEOUT", "600"))
+# ETag / Last-Modified による条件付き GET（"0" で無効化し毎回フル取得する）。
+FEED_CONDITIONAL_GET = os.environ.get("FEED_CONDITIONAL_GET", "1") != "0"
+# limit 件で打ち切る逐次パース（"0" で無効化し常に feedparser で全体をパースする）。
+FEED_FAST_PARSE = os.environ.get("FEED_FAST_PARSE", "1") != "0"
+
 
+def _fetch_kwargs(feed: dict, validators: dict | None) -> dict:
+    """_parse_feed_with_requests へ渡す任意引数（条件付き GET・件数上限）。"""
+    kwargs = {}
+    if validators:
+        kwargs["validators"] = validators
+    if FEED_FAST_PARSE and feed.get("limit"):
+        kwargs["limit"] = int(feed["limit"])
+    return kwargs
 
-def _fetch_single_feed(feed: dict):
+
+def _fetch_single_feed(feed: dict, validators: dict | None = None):
     """requests 経由で 1 フィードを取得し feedparser でパースする。
 
     feedparser.parse(url) を直接呼ぶと内部 urllib に timeout が効かず、
     応答遅延のあるサーバで無限ハングするため、必ず timeout 付き requests を経由する。
+    validators があれば条件付き GET を行う（304 時は is_not_modified(parsed) が True）。
 
     戻り値は (feed_url, parsed, err) のタプル。err が非 None なら例外発生を示す。
     """
     tls_mode = (feed.get("tls_mode") or "strict").lower()
     try:
+        kwargs = _fetch_kwargs(feed, validators)
         d = _parse_feed_with_requests(
-            feed["url"], tls_mode=tls_mode, user_agent=feed.get("user_agent")
+            feed["url"], tls_mode=tls_mode, user_agent=feed.get("user_agent"), **kwargs
         )
         return (feed["url"], d, None)
     except Exception as e:
         return (feed["url"], None, e)
 
 
-def _prefetch_feeds(feed_list: list[dict]) -> dict:
+def _prefetch_feeds(feed_list: list[dict], validators: dict | None = None) -> dict:
     """複数フィードを並列取得し、url -> parsed のマップを返す。
 
     取得に失敗したフィードはマップに含めない（逐次ループ側で従来通り取り直す）。
     個別 timeout（socket.setdefaulttimeout / requests.get timeout）をすり抜けた
     異常系に備え、全体で FEED_FETCH_TOTAL_TIMEOUT 秒経過したら打ち切る。
+    validators（feed_url -> etag/modified）を渡すと条件付き GET になる。
     """
     from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 
+    validators = validators or {}
     workers = max(1, min(FEED_FETCH_WORKERS, len(feed_list) or 1))
     results: dict[str, object] = {}
     timed_out = 0
     ex = ThreadPoolExecutor(max_workers=workers)
     try:
-        futures = [ex.submit(_fetch_single_feed, f) for f in feed_list]
+        futures = [
+            ex.submit(_fetch_single_feed, f, validators.get(f["url"])) for f in feed_list
+        ]
         try:
             for fut in as_completed(futures, timeout=FEED_FETCH_TOTAL_TIMEOUT):
                 try:
@@ -614,286 +966,1049 @@ def _prefetch_feeds(feed_list: list[dict]) -> dict:
         # 実行中スレッドは cancel できない（socket timeout が効く前提）が、
         # 待機中の future は cancel し、__exit__ の wait=True ブロックを避ける。
         ex.shutdown(wait=False, cancel_futures=True)
+    not_modified = sum(1 for d in results.values() if is_not_modified(d))
     logger.info(
-        "prefetch done total=%d success=%d workers=%d timed_out=%d",
-        len(feed_list), len(results), workers, timed_out,
+        "prefetch done total=%d success=%d not_modified=%d workers=%d timed_out=%d",
+        len(feed_list), len(results), not_modified, workers, timed_out,
     )
     return results
 
 
-def main():
-    started_at = datetime.now(timezone.utc)
-    t0 = _now_sec()
-    logger.info("step=collect start")
-    init_db()
-    logger.info("step=collect init_db done")
+# --- ストリーミング（producer/consumer）モード ------------------------------
+# 逐次モードは全フィードのプリフェッチ完了を待ってから DB 処理を始めるため、
+# 遅いフィード 1 本が全体の書き込みを遅らせる。パイプラインモードでは取得できた
+# フィードから順に有界キュー経由で書き込みスレッドへ渡す（COLLECT_PIPELINE=1）。
+COLLECT_PIPELINE = os.environ.get("COLLECT_PIPELINE", "0") == "1"
+COLLECT_QUEUE_SIZE = int(os.environ.get("COLLECT_QUEUE_SIZE", "16"))
+
+
+def _run_feed_pipeline(
+    cur,
+    feed_list: list[dict],
+    validators: dict,
+    feed_kwargs: dict,
+    *,
+    queue_size: int | None = None,
+) -> dict:
+    """フェッチワーカー → 有界キュー → 書き込みスレッド（呼び出し元）の順に処理する。
+
+    process_feed は呼び出し元スレッドだけで実行するため sqlite3 接続は共有しない。
+    キューが満杯の間ワーカーは取得結果を保持したまま待つ（書き込みが追いつくまで抑制）。
+    FEED_FETCH_TOTAL_TIMEOUT を過ぎたら、キューに届いている取得結果を処理してから、
+    まだ届いていないフィードだけを逐次モードと同様に process_feed のフォールバック経路で
+    取り直す。戻り値はステージ別メトリクス。
+    """
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
 
-    with open("src/sources.yaml", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f) or {}
+    queue_size = COLLECT_QUEUE_SIZE if queue_size is None else queue_size
+    q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
 
-    feed_list = load_feed_list(cfg)
+    pending: dict[str, list[dict]] = {}
+    for feed in feed_list:
+        pending.setdefault(feed["url"], []).append(feed)
+
+    def produce(feed: dict):
+        if stop.is_set():
+            return
+        item = _fetch_single_feed(feed, validators.get(feed["url"]))
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    workers = max(1, min(FEED_FETCH_WORKERS, len(pending) or 1))
+    t_start = _now_sec()
+    deadline = t_start + FEED_FETCH_TOTAL_TIMEOUT
+    last_received = t_start
+    write_sec = 0.0
+    depths: list[int] = []
+    def consume(item) -> None:
+        nonlocal last_received, write_sec
+        url, parsed, err = item
+        last_received = _now_sec()
+        depths.append(q.qsize())
+        t_write = _now_sec()
+        for feed in pending.pop(url, []):
+            process_feed(cur, feed, parsed if err is None else None, **feed_kwargs)
+        write_sec += _now_sec() - t_write
+
+    ex = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [ex.submit(produce, feeds[0]) for feeds in pending.values()]
+        while pending:
+            remaining = deadline - _now_sec()
+            if remaining <= 0:
+                break
+            try:
+                item = q.get(timeout=min(remaining, 1.0))
+            except queue.Empty:
+                if all(f.done() for f in futures) and q.empty():
+                    break
+                continue
+            consume(item)
+    finally:
+        stop.set()
+        ex.shutdown(wait=False, cancel_futures=True)
+
+    # 締め切り時点でキューに届いている結果は取り直さずに使う（フォールバックは 1 本ずつの逐次取得になるため）
+    while pending:
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            break
+        consume(item)
+
+    fetch_sec = last_received - t_start
+    timed_out = sum(len(feeds) for feeds in pending.values())
+    if timed_out:
+        logger.warning(
+            "pipeline total timeout exceeded sec=%d pending=%d; "
+            "残りのフィードは逐次ループで再取得する",
+            FEED_FETCH_TOTAL_TIMEOUT, timed_out,
+        )
+        t_write = _now_sec()
+        for feeds in pending.values():
+            for feed in feeds:
+                process_feed(cur, feed, None, **feed_kwargs)
+        write_sec += _now_sec() - t_write
+
+    metrics = {
+        "feeds": len(feed_list),
+        "workers": workers,
+        "fetch_sec": round(fetch_sec, 2),
+        "write_sec": round(write_sec, 2),
+        "total_sec": round(_now_sec() - t_start, 2),
+        "queue_max": max(depths, default=0),
+        "queue_avg": round(sum(depths) / len(depths), 2) if depths else 0.0,
+        "timed_out": timed_out,
+    }
     logger.info(
-        "feeds loaded total=%d workers=%d fetch_timeout=%ds total_timeout=%ds",
-        len(feed_list), FEED_FETCH_WORKERS,
-        FETCH_TIMEOUT_SEC, FEED_FETCH_TOTAL_TIMEOUT,
+        "pipeline done feeds=%d workers=%d fetch_sec=%.1f write_sec=%.1f total_sec=%.1f "
+        "queue_max=%d queue_avg=%.1f timed_out=%d",
+        metrics["feeds"], metrics["workers"], metrics["fetch_sec"], metrics["write_sec"],
+        metrics["total_sec"], metrics["queue_max"], metrics["queue_avg"], metrics["timed_out"],
     )
+    return metrics
 
-    conn = connect()
-    cur = conn.cursor()
-    source_week_new_count = defaultdict(int)
-    failure_stats = init_failure_stats()
 
-    # ネットワーク I/O 部のみ並列化し、結果を url -> parsed のマップに格納する。
-    # DB 書き込みは既存ループで逐次実行するため、ここではフェッチのみを並列化する。
-    prefetched = _prefetch_feeds(feed_list)
+# --- 本文フェッチの並列ステージ ------------------------------------------
+# フィード処理ループでは補完対象をジョブとして積むだけにし、全フィード処理後に
+# ホスト単位の同時接続上限つきで並列取得してから本文を一括で書き戻す。
+# 1 ホストの応答遅延（FETCH_TIMEOUT_SEC）が収集全体を止めないようにするため。
+FULLTEXT_WORKERS = int(os.environ.get("FULLTEXT_WORKERS", "8"))
+FULLTEXT_PER_HOST = int(os.environ.get("FULLTEXT_PER_HOST", "2"))
+FULLTEXT_TOTAL_BUDGET_SEC = int(os.environ.get("FULLTEXT_TOTAL_BUDGET_SEC", "120"))
+# HTML→テキスト抽出用のプロセス数（0 ならダウンロードスレッド内で抽出する）
+FULLTEXT_PARSE_WORKERS = int(os.environ.get("FULLTEXT_PARSE_WORKERS", "2"))
 
-    for feed in feed_list:
-        loop_now = datetime.now(timezone.utc)
-        now_iso = loop_now.isoformat(timespec="seconds")
-        health = get_feed_health(cur, feed["url"])
-        suspend_until = _parse_iso8601(health.get("suspend_until"))
-        if suspend_until and suspend_until > loop_now:
-            logger.info(
-                "feed suspended source=%s url=%s suspend_until=%s",
-                feed.get('source', ''), feed['url'], health.get('suspend_until', ''),
+
+def _make_parse_executor(parse_workers: int):
+    from concurrent.futures import ProcessPoolExecutor
+
+    if parse_workers <= 0:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=parse_workers)
+    except (OSError, NotImplementedError, ValueError) as e:
+        logger.warning("fulltext parse pool unavailable; extracting inline err=%s", e)
+        return None
+
+
+def _timed_download(url: str):
+    t0 = _now_sec()
+    result = download_fulltext(url)
+    return result, _now_sec() - t0
+
+
+def fetch_fulltext_batch(
+    urls: list[str],
+    *,
+    workers: int | None = None,
+    per_host: int | None = None,
+    budget_sec: float | None = None,
+    parse_workers: int | None = None,
+    latencies: dict[str, float] | None = None,
+) -> dict[str, tuple[str, str, int]]:
+    """複数 URL の本文を並列取得し、url -> (text, status, size) を返す。
+
+    - 同時ダウンロード数は workers、同一ホストへの同時接続は per_host まで
+    - HTML→テキスト抽出は別プロセスプール（parse_workers）で行い I/O スレッドを塞がない
+    - 全体で budget_sec 秒を超えたら打ち切る。未完了の URL は戻り値に含めない
+    - latencies を渡すと url -> ダウンロード所要秒を書き込む（ドメイン別統計用）
+    """
+    from collections import deque
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    workers = max(1, FULLTEXT_WORKERS if workers is None else workers)
+    per_host = max(1, FULLTEXT_PER_HOST if per_host is None else per_host)
+    budget_sec = FULLTEXT_TOTAL_BUDGET_SEC if budget_sec is None else budget_sec
+    parse_workers = FULLTEXT_PARSE_WORKERS if parse_workers is None else parse_workers
+
+    unique = list(dict.fromkeys(u for u in urls if u))
+    if not unique:
+        return {}
+
+    queues: dict[str, deque] = {}
+    for u in unique:
+        queues.setdefault(urlsplit(u).netloc.lower(), deque()).append(u)
+    inflight_by_host: dict[str, int] = defaultdict(int)
+
+    results: dict[str, tuple[str, str, int]] = {}
+    downloads: dict = {}  # future -> (url, host)
+    extracts: dict = {}   # future -> (url, size, data, charset)
+    deadline = _now_sec() + budget_sec
+    io_ex = ThreadPoolExecutor(max_workers=min(workers, len(unique)))
+    parse_ex = None
+    parse_pool_started = False
+    try:
+        while True:
+            # 空きのあるホストからラウンドロビンで投入する
+            progressed = True
+            while progressed and len(downloads) < workers:
+                progressed = False
+                for host in list(queues):
+                    if len(downloads) >= workers:
+                        break
+                    if inflight_by_host[host] >= per_host:
+                        continue
+                    url = queues[host].popleft()
+                    if not queues[host]:
+                        del queues[host]
+                    downloads[io_ex.submit(_timed_download, url)] = (url, host)
+                    inflight_by_host[host] += 1
+                    progressed = True
+
+            pending = list(downloads) + list(extracts)
+            remaining = deadline - _now_sec()
+            if not pending or remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in downloads:
+                    url, host = downloads.pop(fut)
+                    inflight_by_host[host] -= 1
+                    try:
+                        (data, charset, status, size), elapsed = fut.result()
+                    except Exception as e:
+                        logger.warning("fulltext download worker crashed url=%s err=%s", url[:120], e)
+                        results[url] = ("", classify_error(e), 0)
+                        continue
+                    if latencies is not None:
+                        latencies[url] = elapsed
+                    if status != "ok":
+                        results[url] = ("", status, size)
+                        continue
+                    if not parse_pool_started:
+                        parse_ex = _make_parse_executor(parse_workers)
+                        parse_pool_started = True
+                    if parse_ex is None:
+                        text, status = extract_fulltext(data, charset)
+                        results[url] = (text, status, size)
+                    else:
+                        extracts[parse_ex.submit(extract_fulltext, data, charset)] = (url, size, data, charset)
+                else:
+                    url, size, data, charset = extracts.pop(fut)
+                    try:
+                        text, status = fut.result()
+                    except Exception as e:
+                        # プロセスプール破損時もその場で抽出して結果は失わない
+                        logger.warning("fulltext parse worker failed url=%s err=%s", url[:120], e)
+                        text, status = extract_fulltext(data, charset)
+                    results[url] = (text, status, size)
+    finally:
+        io_ex.shutdown(wait=False, cancel_futures=True)
+        if parse_ex is not None:
+            parse_ex.shutdown(wait=False, cancel_futures=True)
+
+    skipped = len(unique) - len(results)
+    if skipped:
+        logger.warning(
+            "fulltext budget exceeded sec=%s skipped=%d; 未取得分は RSS 本文のまま保存する",
+            budget_sec, skipped,
+        )
+    return results
+
+
+# --- 本文取得のドメイン別統計とサーキットブレーカー -----------------------------
+# 応答しなくなったドメインは毎回 FETCH_TIMEOUT_SEC を浪費するため、直近の取得結果から
+# 失敗率・p95 レイテンシが閾値を超えたドメインを open にして本文取得を止める。
+# cooldown 経過後は 1 件だけ試験取得し、成功すれば closed に戻す（失敗なら cooldown 倍増）。
+FULLTEXT_BREAKER = os.environ.get("FULLTEXT_BREAKER", "1") != "0"
+DOMAIN_STATS_WINDOW = int(os.environ.get("DOMAIN_STATS_WINDOW", "50"))
+BREAKER_MIN_SAMPLES = int(os.environ.get("BREAKER_MIN_SAMPLES", "5"))
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_P95_LATENCY_SEC = float(os.environ.get("BREAKER_P95_LATENCY_SEC", "10"))
+BREAKER_COOLDOWN_HOURS = float(os.environ.get("BREAKER_COOLDOWN_HOURS", "6"))
+BREAKER_MAX_COOLDOWN_HOURS = float(os.environ.get("BREAKER_MAX_COOLDOWN_HOURS", "48"))
+
+
+def fulltext_domain(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def is_domain_fetch_ok(status: str) -> bool:
+    """ドメインが応答したか（本文が短い・HTML でない等の内容起因の失敗は成功扱い）。"""
+    return status == "ok" or status in FULLTEXT_PERMANENT_FAILURES
+
+
+def load_domain_breakers(cur) -> dict[str, dict]:
+    """fulltext_domain_stats を domain -> 行の dict で返す（テーブル未作成なら空）。"""
+    try:
+        cur.execute(
+            """
+            SELECT domain, attempts, successes, bytes, recent, breaker_state, open_until, trips
+            FROM fulltext_domain_stats
+            """
+        )
+    except sqlite3.OperationalError:
+        return {}
+    out = {}
+    for domain, attempts, successes, nbytes, recent, state, open_until, trips in cur.fetchall():
+        try:
+            recent_list = json.loads(recent or "[]")
+        except json.JSONDecodeError:
+            recent_list = []
+        out[domain] = {
+            "attempts": attempts or 0,
+            "successes": successes or 0,
+            "bytes": nbytes or 0,
+            "recent": recent_list,
+            "breaker_state": state or "closed",
+            "open_until": open_until or "",
+            "trips": trips or 0,
+        }
+    return out
+
+
+def plan_breaker_fetches(
+    urls: list[str], breakers: dict[str, dict], now: datetime
+) -> tuple[list[str], list[str], set[str]]:
+    """(取得する URL, ブレーカーで見送る URL, 試験取得する open ドメイン) を返す。"""
+    allowed: list[str] = []
+    blocked: list[str] = []
+    probing: set[str] = set()
+    for url in urls:
+        domain = fulltext_domain(url)
+        breaker = breakers.get(domain)
+        if not breaker or breaker["breaker_state"] != "open":
+            allowed.append(url)
+            continue
+        open_until = _parse_iso8601(breaker["open_until"])
+        if (open_until and open_until > now) or domain in probing:
+            blocked.append(url)
+            continue
+        probing.add(domain)
+        allowed.append(url)
+    return allowed, blocked, probing
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """最近傍順位法のパーセンタイル。"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _breaker_cooldown(trips: int) -> timedelta:
+    hours = BREAKER_COOLDOWN_HOURS * (2 ** max(0, trips - 1))
+    return timedelta(hours=min(hours, BREAKER_MAX_COOLDOWN_HOURS))
+
+
+def update_domain_stats(
+    cur,
+    samples: list[tuple[str, str, float, int]],
+    *,
+    breakers: dict[str, dict],
+    probing: set[str],
+    now_iso: str,
+) -> dict[str, str]:
+    """取得結果 (url, status, latency_sec, size) をドメイン別に集計して保存する。
+
+    戻り値は状態が変わったドメイン -> 新しい breaker_state。
+    """
+    by_domain: dict[str, list[tuple[str, float, int]]] = defaultdict(list)
+    for url, status, latency_sec, size in samples:
+        by_domain[fulltext_domain(url)].append((status, latency_sec, size))
+
+    now = datetime.fromisoformat(now_iso)
+    changed: dict[str, str] = {}
+    rows = []
+    for domain, results in by_domain.items():
+        prev = breakers.get(domain) or {
+            "attempts": 0, "successes": 0, "bytes": 0, "recent": [],
+            "breaker_state": "closed", "open_until": "", "trips": 0,
+        }
+        state, open_until, trips = prev["breaker_state"], prev["open_until"], prev["trips"]
+        recent = list(prev["recent"])
+        oks = [is_domain_fetch_ok(status) for status, _lat, _size in results]
+        if domain in probing and FULLTEXT_BREAKER:
+            if any(oks):
+                # 試験取得に成功: 過去の失敗履歴は捨てて closed からやり直す
+                state, open_until, trips, recent = "closed", "", 0, []
+            else:
+                trips += 1
+                open_until = (now + _breaker_cooldown(trips)).isoformat(timespec="seconds")
+                logger.warning(
+                    "fulltext breaker probe failed domain=%s status=%s open_until=%s",
+                    domain, results[-1][0], open_until,
+                )
+        recent.extend([int(ok), round(lat * 1000)] for ok, (_s, lat, _z) in zip(oks, results))
+        recent = recent[-DOMAIN_STATS_WINDOW:]
+
+        success_rate = sum(ok for ok, _ms in recent) / len(recent)
+        latencies_ms = [ms for _ok, ms in recent]
+        p50 = _percentile(latencies_ms, 0.5)
+        p95 = _percentile(latencies_ms, 0.95)
+        if (
+            FULLTEXT_BREAKER
+            and state == "closed"
+            and len(recent) >= BREAKER_MIN_SAMPLES
+            and (1 - success_rate >= BREAKER_FAILURE_RATE or p95 >= BREAKER_P95_LATENCY_SEC * 1000)
+        ):
+            state = "open"
+            trips += 1
+            open_until = (now + _breaker_cooldown(trips)).isoformat(timespec="seconds")
+        if state != prev["breaker_state"]:
+            changed[domain] = state
+            logger.warning(
+                "fulltext breaker %s domain=%s success_rate=%.2f p95_ms=%s open_until=%s",
+                state, domain, success_rate, p95, open_until or "-",
             )
-            log_feed_health(
-                source=feed.get("source", ""),
-                url=feed["url"],
-                error_type="suspended",
-                failure_count=int(health.get("failure_count", 0)),
-                suspended=True,
+        rows.append((
+            domain,
+            len(results),
+            sum(oks),
+            sum(size for _s, _lat, size in results),
+            json.dumps(recent),
+            round(success_rate, 4),
+            p50,
+            p95,
+            state,
+            open_until,
+            trips,
+            results[-1][0],
+            now_iso,
+        ))
+
+    try:
+        cur.executemany(
+            """
+            INSERT INTO fulltext_domain_stats(
+              domain, attempts, successes, bytes, recent, success_rate, p50_ms, p95_ms,
+              breaker_state, open_until, trips, last_status, updated_at
             )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET
+              attempts = attempts + excluded.attempts,
+              successes = successes + excluded.successes,
+              bytes = bytes + excluded.bytes,
+              recent = excluded.recent,
+              success_rate = excluded.success_rate,
+              p50_ms = excluded.p50_ms,
+              p95_ms = excluded.p95_ms,
+              breaker_state = excluded.breaker_state,
+              open_until = excluded.open_until,
+              trips = excluded.trips,
+              last_status = excluded.last_status,
+              updated_at = excluded.updated_at
+            """,
+            rows,
+        )
+    except sqlite3.OperationalError as e:
+        # テーブル未作成の簡易スキーマ（テスト等）では統計を残さない
+        logger.debug("fulltext_domain_stats unavailable: %s", e)
+    return changed
+
+
+def run_fulltext_stage(cur, jobs: list[dict], *, stats: dict, now_iso: str) -> int:
+    """本文補完ジョブ（{"url", "table"}）を解決し、取得できた本文を一括で書き戻す。
+
+    fulltext_cache を先に引き、未キャッシュ分のみ fetch_fulltext_batch で並列取得して
+    結果（失敗含む）をキャッシュする。戻り値は本文を置き換えた行数。
+    """
+    counters = stats["fulltext"]
+    bodies: dict[str, str] = {}
+    misses: list[str] = []
+    seen: set[str] = set()
+    for job in jobs:
+        url = job["url"]
+        if url in seen:
+            continue
+        seen.add(url)
+        cached = get_fulltext_cache(cur, url, now_iso=now_iso)
+        if cached is None:
+            counters["cache_miss"] += 1
+            misses.append(url)
+        elif cached["status"] == "ok":
+            counters["cache_hit"] += 1
+            bodies[url] = cached["text"]
+        else:
+            counters["negative_hit"] += 1
+
+    breakers: dict[str, dict] = {}
+    probing: set[str] = set()
+    if FULLTEXT_BREAKER and misses:
+        breakers = load_domain_breakers(cur)
+        misses, blocked, probing = plan_breaker_fetches(misses, breakers, datetime.fromisoformat(now_iso))
+        # 見送った URL はキャッシュしない（ブレーカーが閉じたら取得し直す）
+        counters["breaker_skipped"] += len(blocked)
+
+    latencies: dict[str, float] = {}
+    fetched = fetch_fulltext_batch(misses, latencies=latencies) if misses else {}
+    samples = [
+        (url, fetched[url][1], latencies.get(url, 0.0), fetched[url][2])
+        for url in misses
+        if url in fetched and fetched[url][1] != "skip_domain"
+    ]
+    if samples:
+        update_domain_stats(cur, samples, breakers=breakers, probing=probing, now_iso=now_iso)
+    for url in misses:
+        if url not in fetched:
+            counters["budget_skipped"] += 1
+            continue
+        text, status, size = fetched[url]
+        put_fulltext_cache(cur, url, status=status, text=text, size=size, now_iso=now_iso)
+        if text:
+            counters["fetched"] += 1
+            bodies[url] = text
+        else:
+            counters["fetch_failed"] += 1
+
+    updated = 0
+    for table in ("articles", "low_priority_articles"):
+        rows = [(bodies[j["url"]], j["url"]) for j in jobs if j["table"] == table and j["url"] in bodies]
+        if rows:
+            cur.executemany(f"UPDATE {table} SET content=? WHERE url=?", rows)
+            updated += len(rows)
+    return updated
+
+
+# --- 記事の一括 upsert -------------------------------------------------------
+# articles へ書く列。fetched_at 以外が既存行と一致する記事は書き込まない。
+ARTICLE_UPSERT_COLUMNS = (
+    "url", "title", "content", "source", "category", "source_tier",
+    "published_at", "fetched_at", "kind", "region",
+)
+_ARTICLE_COMPARE_COLUMNS = (
+    "title", "content", "source", "category", "source_tier", "published_at", "kind", "region",
+)
+_ARTICLE_UPSERT_SQL = """
+    INSERT INTO articles
+    (url, title, content, source, category, source_tier, published_at, fetched_at, kind, region)
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(url) DO UPDATE SET
+        title=excluded.title,
+        content=excluded.content,
+        source=excluded.source,
+        category=excluded.category,
+        source_tier=excluded.source_tier,
+        published_at=excluded.published_at,
+        fetched_at=excluded.fetched_at,
+        kind=excluded.kind,
+        region=excluded.region
+"""
+_LOW_PRIORITY_UPSERT_SQL = """
+    INSERT INTO low_priority_articles
+    (url, title, content, source, vendor, category, source_tier,
+     published_at, fetched_at, kind, region, reason, queued_at)
+    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(url) DO UPDATE SET
+        title=excluded.title,
+        content=excluded.content,
+        source=excluded.source,
+        vendor=excluded.vendor,
+        category=excluded.category,
+        source_tier=excluded.source_tier,
+        published_at=excluded.published_at,
+        fetched_at=excluded.fetched_at,
+        kind=excluded.kind,
+        region=excluded.region,
+        reason=excluded.reason,
+        queued_at=excluded.queued_at
+"""
+# 空値で書かない列の既定値。書き込み時に補完し、比較時も補完後の値として扱う
+# （init_db の空値補完は旧 DB へのマイグレーション時の 1 回だけなので、以後の行はここで揃える）。
+_ARTICLE_COLUMN_DEFAULTS = {"kind": "tech", "region": "global", "source_tier": "secondary"}
+# SQLite のバインド変数上限（古いビルドは 999）を超えないよう IN 句を分割する
+_KNOWN_URL_CHUNK = 500
+
+
+def load_known_articles(cur, urls: list[str]) -> dict[str, tuple]:
+    """articles に既存の URL を一括で引き、url -> 比較キー（_ARTICLE_COMPARE_COLUMNS 順）を返す。"""
+    out: dict[str, tuple] = {}
+    unique = list(dict.fromkeys(urls))
+    cols = ", ".join(_ARTICLE_COMPARE_COLUMNS)
+    for i in range(0, len(unique), _KNOWN_URL_CHUNK):
+        chunk = unique[i:i + _KNOWN_URL_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        cur.execute(f"SELECT url, {cols} FROM articles WHERE url IN ({placeholders})", chunk)
+        for row in cur.fetchall():
+            out[row[0]] = _article_compare_key(dict(zip(_ARTICLE_COMPARE_COLUMNS, row[1:])))
+    return out
+
+
+def load_archived_urls(cur, urls: list[str]) -> set[str]:
+    """退避 DB（ATTACH 済みの接続のとき）に移した記事の URL を返す。
+
+    退避済みの記事は本体の articles に無いので、これで除かないと古い記事を載せ続けるフィードから
+    新しい id で入れ直してしまう。
+    """
+    if not archive_attached(cur):
+        return set()
+    out: set[str] = set()
+    unique = list(dict.fromkeys(urls))
+    for i in range(0, len(unique), _KNOWN_URL_CHUNK):
+        chunk = unique[i:i + _KNOWN_URL_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        cur.execute(f"SELECT url FROM {ARCHIVE_SCHEMA}.articles WHERE url IN ({placeholders})", chunk)
+        out.update(row[0] for row in cur.fetchall())
+    return out
+
+
+def _article_compare_key(values: dict) -> tuple:
+    key = []
+    for col in _ARTICLE_COMPARE_COLUMNS:
+        v = values.get(col)
+        if col in _ARTICLE_COLUMN_DEFAULTS and not v:
+            v = _ARTICLE_COLUMN_DEFAULTS[col]
+        key.append(v)
+    return tuple(key)
+
+
+def upsert_articles_bulk(cur, rows: list[dict], *, known: dict[str, tuple] | None = None) -> dict:
+    """記事行を new / changed / unchanged に分類し、new と changed だけを executemany で書く。
+
+    title / content などが既存行とバイト単位で一致する記事は UPDATE しないため、
+    FTS5 同期トリガ（articles_fts_au）の delete+insert も発生しない。
+    同一 URL が複数あれば最後の行を採用する（逐次 upsert と同じ結果）。
+    known を省略した場合はここで load_known_articles を呼ぶ。
+    """
+    latest: dict[str, dict] = {}
+    for r in rows:
+        latest[r["url"]] = r
+    if known is None:
+        known = load_known_articles(cur, list(latest))
+
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    to_write = []
+    for url, r in latest.items():
+        prev = known.get(url)
+        if prev is None:
+            counts["new"] += 1
+        elif prev == _article_compare_key(r):
+            counts["unchanged"] += 1
             continue
+        else:
+            counts["changed"] += 1
+        to_write.append(tuple(
+            (r[c] or _ARTICLE_COLUMN_DEFAULTS[c]) if c in _ARTICLE_COLUMN_DEFAULTS else r[c]
+            for c in ARTICLE_UPSERT_COLUMNS
+        ))
+    if to_write:
+        cur.executemany(_ARTICLE_UPSERT_SQL, to_write)
+    return counts
+
+
+def process_feed(
+    cur,
+    feed: dict,
+    prefetched_d,
+    *,
+    failure_stats: dict,
+    validators: dict,
+    source_week_new_count: dict,
+    fulltext_jobs: list[dict],
+):
+    """1 フィード分の health 判定・（必要なら）再取得・記事 upsert を行う。
+
+    prefetched_d は並列取得済みのパース結果（失敗・未取得なら None）。
+    逐次モード / パイプラインモードの両方から単一の書き込みスレッドで呼ばれる。
+    """
+    loop_now = datetime.now(timezone.utc)
+    now_iso = loop_now.isoformat(timespec="seconds")
+    health = get_feed_health(cur, feed["url"])
+    suspend_until = _parse_iso8601(health.get("suspend_until"))
+    if suspend_until and suspend_until > loop_now:
+        logger.info(
+            "feed suspended source=%s url=%s suspend_until=%s",
+            feed.get('source', ''), feed['url'], health.get('suspend_until', ''),
+        )
+        log_feed_health(
+            source=feed.get("source", ""),
+            url=feed["url"],
+            error_type="suspended",
+            failure_count=int(health.get("failure_count", 0)),
+            suspended=True,
+        )
+        failure_stats["feed_outcomes"]["suspended"] += 1
+        return
 
-        fetch_count = 0
-        fetch_limit = 30  # Forest Watchは30件全部補完してもよい
-        tls_mode = (feed.get("tls_mode") or "strict").lower()
-        # 並列プリフェッチ結果がある場合はそれを使う。
-        # 失敗時のみ従来のリトライ/フォールバック経路に入る。
-        prefetched_d = prefetched.get(feed["url"])
+    fetch_count = 0
+    fetch_limit = 30  # Forest Watchは30件全部補完してもよい
+    tls_mode = (feed.get("tls_mode") or "strict").lower()
+    # 並列プリフェッチ結果がある場合はそれを使う。
+    # 失敗時のみ従来のリトライ/フォールバック経路に入る。
+    feed_validators = validators.get(feed["url"]) or {}
+    try:
+        if prefetched_d is not None:
+            d = prefetched_d
+        else:
+            _headers = dict(HEADERS)
+            if feed.get("user_agent"):
+                _headers["User-Agent"] = feed["user_agent"]
+                _headers.update(BROWSER_EXTRA_HEADERS)
+            d = feedparser.parse(
+                http_replay.target_url(feed["url"]),
+                request_headers=_headers,
+                etag=feed_validators.get("etag") or None,
+                modified=feed_validators.get("modified") or None,
+            )
+    except ssl.SSLError as e:
+        error_type = classify_error(e)
+        should_log, suppressed = record_failure(
+            failure_stats,
+            source=feed.get("source", ""),
+            url=feed["url"],
+            error_type=error_type,
+        )
+        if should_log:
+            logger.warning(
+                "feed fetch failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
+                feed.get('source', ''), feed['url'], tls_mode, error_type, e,
+            )
+        elif suppressed == 1:
+            logger.info("collect failure detailed logs are now rate-limited")
         try:
-            if prefetched_d is not None:
-                d = prefetched_d
-            else:
-                _headers = dict(HEADERS)
-                if feed.get("user_agent"):
-                    _headers["User-Agent"] = feed["user_agent"]
-                    _headers.update(BROWSER_EXTRA_HEADERS)
-                d = feedparser.parse(feed["url"], request_headers=_headers)
-        except ssl.SSLError as e:
-            error_type = classify_error(e)
+            d = _parse_feed_with_requests(
+                feed["url"], tls_mode=tls_mode, **_fetch_kwargs(feed, feed_validators)
+            )
+        except requests.exceptions.SSLError as retry_e:
+            retry_error_type = classify_error(retry_e)
             should_log, suppressed = record_failure(
                 failure_stats,
                 source=feed.get("source", ""),
                 url=feed["url"],
-                error_type=error_type,
+                error_type=retry_error_type,
             )
             if should_log:
                 logger.warning(
-                    "feed fetch failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
-                    feed.get('source', ''), feed['url'], tls_mode, error_type, e,
+                    "feed fetch retry failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
+                    feed.get('source', ''), feed['url'], tls_mode, retry_error_type, retry_e,
                 )
             elif suppressed == 1:
                 logger.info("collect failure detailed logs are now rate-limited")
-            try:
-                d = _parse_feed_with_requests(feed["url"], tls_mode=tls_mode)
-            except requests.exceptions.SSLError as retry_e:
-                retry_error_type = classify_error(retry_e)
-                should_log, suppressed = record_failure(
-                    failure_stats,
-                    source=feed.get("source", ""),
-                    url=feed["url"],
-                    error_type=retry_error_type,
-                )
-                if should_log:
-                    logger.warning(
-                        "feed fetch retry failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
-                        feed.get('source', ''), feed['url'], tls_mode, retry_error_type, retry_e,
-                    )
-                elif suppressed == 1:
-                    logger.info("collect failure detailed logs are now rate-limited")
-                mark_feed_failure(cur, feed=feed, error_type=retry_error_type, now_iso=now_iso)
-                continue
-            except (requests.RequestException, ValueError, OSError) as retry_e:
-                retry_error_type = classify_error(retry_e)
-                should_log, suppressed = record_failure(
-                    failure_stats,
-                    source=feed.get("source", ""),
-                    url=feed["url"],
-                    error_type=retry_error_type,
-                )
-                if should_log:
-                    logger.warning(
-                        "feed fetch retry failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
-                        feed.get('source', ''), feed['url'], tls_mode, retry_error_type, retry_e,
-                    )
-                elif suppressed == 1:
-                    logger.info("collect failure detailed logs are now rate-limited")
-                mark_feed_failure(cur, feed=feed, error_type=retry_error_type, now_iso=now_iso)
-                continue
-        except (urllib.error.URLError, ValueError, OSError) as e:
-            error_type = classify_error(e)
+            mark_feed_failure(cur, feed=feed, error_type=retry_error_type, now_iso=now_iso)
+            failure_stats["feed_outcomes"]["failed"] += 1
+            return
+        except (requests.RequestException, ValueError, OSError) as retry_e:
+            retry_error_type = classify_error(retry_e)
             should_log, suppressed = record_failure(
                 failure_stats,
                 source=feed.get("source", ""),
                 url=feed["url"],
-                error_type=error_type,
+                error_type=retry_error_type,
             )
             if should_log:
                 logger.warning(
-                    "feed fetch failed source=%s url=%s error_type=%s err=%s",
-                    feed.get('source', ''), feed['url'], error_type, e,
+                    "feed fetch retry failed source=%s url=%s tls_mode=%s error_type=%s err=%s",
+                    feed.get('source', ''), feed['url'], tls_mode, retry_error_type, retry_e,
                 )
             elif suppressed == 1:
                 logger.info("collect failure detailed logs are now rate-limited")
-            mark_feed_failure(cur, feed=feed, error_type=error_type, now_iso=now_iso)
+            mark_feed_failure(cur, feed=feed, error_type=retry_error_type, now_iso=now_iso)
+            failure_stats["feed_outcomes"]["failed"] += 1
+            return
+    except (urllib.error.URLError, ValueError, OSError) as e:
+        error_type = classify_error(e)
+        should_log, suppressed = record_failure(
+            failure_stats,
+            source=feed.get("source", ""),
+            url=feed["url"],
+            error_type=error_type,
+        )
+        if should_log:
+            logger.warning(
+                "feed fetch failed source=%s url=%s error_type=%s err=%s",
+                feed.get('source', ''), feed['url'], error_type, e,
+            )
+        elif suppressed == 1:
+            logger.info("collect failure detailed logs are now rate-limited")
+        mark_feed_failure(cur, feed=feed, error_type=error_type, now_iso=now_iso)
+        failure_stats["feed_outcomes"]["failed"] += 1
+        return
+
+    if is_not_modified(d):
+        # 304: 前回から変化なし。パースも DB ループも不要
+        mark_feed_success(cur, feed=feed, now_iso=now_iso)
+        update_feed_schedule(cur, feed["url"], new_times=[], now_iso=now_iso)
+        failure_stats["feed_outcomes"]["not_modified"] += 1
+        return
+
+    entries = getattr(d, "entries", [])
+    failure_stats["timings"]["parse_sec"] += getattr(d, "parse_sec", 0.0) or 0.0
+    bozo = getattr(d, "bozo", 0)
+    if bozo:
+        # 壊れたXMLでも entries が取れることがあるので続行はする
+        logger.warning("malformed feed source=%s url=%s err=%s", feed.get('source', ''), feed['url'], getattr(d, 'bozo_exception', ''))
+
+    if bozo and not entries:
+        mark_feed_failure(cur, feed=feed, error_type="bozo_empty", now_iso=now_iso)
+        failure_stats["feed_outcomes"]["failed"] += 1
+        return
+
+    if entries:
+        mark_feed_success(cur, feed=feed, now_iso=now_iso)
+    # 壊れていない取得結果のみバリデータを保存する（次回 304 で取りこぼさないため）。
+    # 記事 0 件の正常なフィードも保存しないと、毎回全文を取り直すことになる
+    if FEED_CONDITIONAL_GET and not bozo:
+        save_feed_validators(
+            cur, feed["url"],
+            etag=getattr(d, "etag", "") or "",
+            modified=getattr(d, "modified", "") or "",
+        )
+    failure_stats["feed_outcomes"]["fetched"] += 1
+
+    limit = feed.get("limit", 30)
+    candidates: list[dict] = []
+    for e in entries[:limit]:
+        raw_link = getattr(e, "link", None)
+        if not raw_link:
+            logger.warning("skip entry without link source=%s feed_url=%s", feed.get('source', ''), feed['url'])
             continue
-
-        entries = getattr(d, "entries", [])
-        bozo = getattr(d, "bozo", 0)
-        if bozo:
-            # 壊れたXMLでも entries が取れることがあるので続行はする
-            logger.warning("malformed feed source=%s url=%s err=%s", feed.get('source', ''), feed['url'], getattr(d, 'bozo_exception', ''))
-
-        if bozo and not entries:
-            mark_feed_failure(cur, feed=feed, error_type="bozo_empty", now_iso=now_iso)
+        link = normalize_url(raw_link)
+        title = getattr(e, "title", None)
+        if not link or not title:
+            logger.warning("skip invalid entry source=%s feed_url=%s url=%s", feed.get('source', ''), feed['url'], raw_link)
             continue
+        content = ""
 
-        if entries:
-            mark_feed_success(cur, feed=feed, now_iso=now_iso)
-
-        limit = feed.get("limit", 30)
-        for e in entries[:limit]:
-            raw_link = getattr(e, "link", None)
-            if not raw_link:
-                logger.warning("skip entry without link source=%s feed_url=%s", feed.get('source', ''), feed['url'])
-                continue
-            link = normalize_url(raw_link)
-            title = getattr(e, "title", None)
-            if not link or not title:
-                logger.warning("skip invalid entry source=%s feed_url=%s url=%s", feed.get('source', ''), feed['url'], raw_link)
-                continue
-            content = ""
-
-            if getattr(e, "content", None):
-                if isinstance(e.content, list) and e.content:
-                    content = e.content[0].get("value", "")
-            elif getattr(e, "summary", None):
-                content = e.summary
+        if getattr(e, "content", None):
+            if isinstance(e.content, list) and e.content:
+                content = e.content[0].get("value", "")
+        elif getattr(e, "summary", None):
+            content = e.summary
 
-            content = strip_html(content)
-
-            if is_arxiv_feed(feed) and not matches_manufacturing_keywords(title, content):
-                logger.info(
-                    "skip arxiv entry by manufacturing filter source=%s title=%s",
-                    feed.get('source', ''), title[:80],
-                )
-                continue
+        content = strip_html(content)
 
-            # ★本文が薄い/空なら、記事本文の補完を試みる（成功時のみ置き換え）
-            src = feed.get("source", "")
-            if should_fetch_fulltext(src, content, fetch_count, fetch_limit):
-                full = fetch_fulltext(link, source=src)
-                if full:
-                    content = full
-                    fetch_count += 1
-                    # print(f"[INFO] fetched fulltext source={src} url={link}")
-
-            published_at = normalize_published_at(e)
-            fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-            cur.execute("SELECT 1 FROM articles WHERE url=?", (link,))
-            is_new_article = cur.fetchone() is None
-
-            week_key = resolve_week_key(published_at, fetched_at)
-            source_unit = (feed.get("vendor") or feed.get("source") or "").strip() or "unknown"
-            source_count_key = (source_unit, week_key)
-            weekly_limit = feed.get("weekly_new_limit")
-            if weekly_limit is None and feed.get("kind") == "news":
-                weekly_limit = 12
-
-            if should_route_to_low_priority(
-                is_new=is_new_article,
-                current_new_count=source_week_new_count[source_count_key],
-                weekly_limit=weekly_limit,
-            ):
-                cur.execute(
-                    """
-                    INSERT INTO low_priority_articles
-                    (url, title, content, source, vendor, category, source_tier,
-                     published_at, fetched_at, kind, region, reason, queued_at)
-                    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-                    ON CONFLICT(url) DO UPDATE SET
-                        title=excluded.title,
-                        content=excluded.content,
-                        source=excluded.source,
-                        vendor=excluded.vendor,
-                        category=excluded.category,
-                        source_tier=excluded.source_tier,
-                        published_at=excluded.published_at,
-                        fetched_at=excluded.fetched_at,
-                        kind=excluded.kind,
-                        region=excluded.region,
-                        reason=excluded.reason,
-                        queued_at=excluded.queued_at
-                    """,
-                    (
-                        link,
-                        title,
-                        content,
-                        feed.get("source", ""),
-                        feed.get("vendor", ""),
-                        feed.get("category", "") or "",
-                        feed.get("source_tier", "secondary"),
-                        published_at,
-                        fetched_at,
-                        feed.get("kind", "tech"),
-                        feed.get("region", "") or "",
-                        f"weekly_new_limit_exceeded:{source_unit}:{week_key}:{weekly_limit}",
-                        fetched_at,
-                    ),
-                )
-                continue
+        if is_arxiv_feed(feed) and not matches_manufacturing_keywords(title, content):
+            logger.info(
+                "skip arxiv entry by manufacturing filter source=%s title=%s",
+                feed.get('source', ''), title[:80],
+            )
+            continue
 
-            cur.execute(
-                """
-                INSERT INTO articles
-                (url, title, content, source, category, source_tier, published_at, fetched_at, kind, region)
-                VALUES (?,?,?,?,?,?,?,?,?,?)
-                ON CONFLICT(url) DO UPDATE SET
-                    title=excluded.title,
-                    content=excluded.content,
-                    source=excluded.source,
-                    category=excluded.category,
-                    source_tier=excluded.source_tier,
-                    published_at=excluded.published_at,
-                    fetched_at=excluded.fetched_at,
-                    kind=excluded.kind,
-                    region=excluded.region
-                """,
+        candidates.append({
+            "url": link,
+            "title": title,
+            "content": content,
+            "published_at": normalize_published_at(e),
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+
+    # 退避済みの記事（1 年以上前の記事まで載せているブログ等）は既知として書き込まない
+    archived = load_archived_urls(cur, [c["url"] for c in candidates])
+    if archived:
+        candidates = [c for c in candidates if c["url"] not in archived]
+        failure_stats["articles"]["archived"] += len(archived)
+
+    # 既存記事の判定はフィード単位で 1 クエリにまとめる（エントリ毎の SELECT を避ける）
+    known = load_known_articles(cur, [c["url"] for c in candidates])
+    inserted_urls: set[str] = set()
+    source_unit = (feed.get("vendor") or feed.get("source") or "").strip() or "unknown"
+    weekly_limit = feed.get("weekly_new_limit")
+    if weekly_limit is None and feed.get("kind") == "news":
+        weekly_limit = 12
+    src = feed.get("source", "")
+    article_rows: list[dict] = []
+    low_priority_rows: list[tuple] = []
+    new_times: list[str] = []
+
+    for c in candidates:
+        link = c["url"]
+        content = c["content"]
+        published_at = c["published_at"]
+        fetched_at = c["fetched_at"]
+        prev = known.get(link)
+        is_new_article = prev is None and link not in inserted_urls
+        if is_new_article:
+            new_times.append(published_at or fetched_at)
+
+        # ★本文が薄い/空なら、記事本文の補完を試みる（成功時のみ置き換え）。
+        # 取得はループ後の並列ステージで行うため、ここでは対象数（試行数）のみ数える。
+        # 既に補完済みの既存記事は保存済み本文を使い、再取得も本文の書き換えもしない。
+        needs_fulltext = should_fetch_fulltext(src, content, fetch_count, fetch_limit)
+        if needs_fulltext and prev is not None and len(prev[1] or "") >= MIN_CONTENT_CHARS:
+            content = prev[1]
+            needs_fulltext = False
+        if needs_fulltext:
+            fetch_count += 1
+
+        week_key = resolve_week_key(published_at, fetched_at)
+        source_count_key = (source_unit, week_key)
+
+        if should_route_to_low_priority(
+            is_new=is_new_article,
+            current_new_count=source_week_new_count[source_count_key],
+            weekly_limit=weekly_limit,
+        ):
+            low_priority_rows.append(
                 (
                     link,
-                    title,
+                    c["title"],
                     content,
                     feed.get("source", ""),
+                    feed.get("vendor", ""),
                     feed.get("category", "") or "",
                     feed.get("source_tier", "secondary"),
                     published_at,
                     fetched_at,
                     feed.get("kind", "tech"),
                     feed.get("region", "") or "",
-                ),
+                    f"weekly_new_limit_exceeded:{source_unit}:{week_key}:{weekly_limit}",
+                    fetched_at,
+                )
             )
+            if needs_fulltext:
+                fulltext_jobs.append({"url": link, "table": "low_priority_articles"})
+            continue
+
+        article_rows.append({
+            "url": link,
+            "title": c["title"],
+            "content": content,
+            "source": feed.get("source", ""),
+            "category": feed.get("category", "") or "",
+            "source_tier": feed.get("source_tier", "secondary"),
+            "published_at": published_at,
+            "fetched_at": fetched_at,
+            "kind": feed.get("kind", "tech"),
+            "region": feed.get("region", "") or "",
+        })
+
+        if needs_fulltext:
+            fulltext_jobs.append({"url": link, "table": "articles"})
+        if is_new_article:
+            inserted_urls.add(link)
+            source_week_new_count[source_count_key] += 1
+
+    if low_priority_rows:
+        cur.executemany(_LOW_PRIORITY_UPSERT_SQL, low_priority_rows)
+        failure_stats["articles"]["low_priority"] += len(low_priority_rows)
+    for key, n in upsert_articles_bulk(cur, article_rows, known=known).items():
+        failure_stats["articles"][key] += n
+    if entries:
+        update_feed_schedule(cur, feed["url"], new_times=new_times, now_iso=now_iso)
+
+
+def main(pipeline: bool | None = None):
+    """RSS を収集して articles / low_priority_articles に保存する。
+
+    pipeline=True（既定は COLLECT_PIPELINE 環境変数）でストリーミングモードになる。
+    戻り値は実行統計（init_failure_stats の形式。timings に段階別の所要秒）。
+    """
+    if pipeline is None:
+        pipeline = COLLECT_PIPELINE
+    started_at = datetime.now(timezone.utc)
+    t0 = _now_sec()
+    logger.info("step=collect start")
+    init_db()
+    logger.info("step=collect init_db done")
 
-            if is_new_article:
-                source_week_new_count[source_count_key] += 1
+    with open("src/sources.yaml", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f) or {}
+
+    feed_list = load_feed_list(cfg)
+    logger.info(
+        "feeds loaded total=%d workers=%d fetch_timeout=%ds total_timeout=%ds mode=%s",
+        len(feed_list), FEED_FETCH_WORKERS,
+        FETCH_TIMEOUT_SEC, FEED_FETCH_TOTAL_TIMEOUT,
+        "pipeline" if pipeline else "batch",
+    )
+
+    # フィード取得・本文取得の並列数ぶんホストごとの接続を保持する
+    http_client.configure(pool_maxsize=max(FEED_FETCH_WORKERS, FULLTEXT_WORKERS))
+    http_client.reset_stats()
+
+    conn = connect()
+    # 退避 DB があれば ATTACH し、退避済みの URL も既知の記事として扱う
+    attach_archive(conn)
+    cur = conn.cursor()
+    source_week_new_count = defaultdict(int)
+    failure_stats = init_failure_stats()
+    fulltext_jobs: list[dict] = []
+
+    # 前回取得時の ETag / Last-Modified を条件付き GET に使う
+    validators = load_feed_validators(cur) if FEED_CONDITIONAL_GET else {}
+
+    # 更新頻度から見て次回取得予定前のフィードは取得しない
+    if FEED_ADAPTIVE_POLL:
+        schedule = load_feed_schedule(cur)
+        run_now = datetime.now(timezone.utc)
+        due = [f for f in feed_list if is_feed_due(schedule.get(f["url"]), run_now)]
+        not_due = len(feed_list) - len(due)
+        failure_stats["feed_outcomes"]["not_due"] += not_due
+        logger.info("adaptive poll due=%d not_due=%d", len(due), not_due)
+        feed_list = due
+
+    feed_kwargs = {
+        "failure_stats": failure_stats,
+        "validators": validators,
+        "source_week_new_count": source_week_new_count,
+        "fulltext_jobs": fulltext_jobs,
+    }
+    timings = failure_stats["timings"]
+    if pipeline:
+        metrics = _run_feed_pipeline(cur, feed_list, validators, feed_kwargs)
+        timings["fetch_sec"] = metrics["fetch_sec"]
+        timings["write_sec"] = metrics["write_sec"]
+    else:
+        # ネットワーク I/O 部のみ並列化し、結果を url -> parsed のマップに格納する。
+        # DB 書き込みは既存ループで逐次実行するため、ここではフェッチのみを並列化する。
+        t_fetch = _now_sec()
+        prefetched = _prefetch_feeds(feed_list, validators)
+        t_write = _now_sec()
+        for feed in feed_list:
+            process_feed(cur, feed, prefetched.get(feed["url"]), **feed_kwargs)
+        timings["fetch_sec"] = t_write - t_fetch
+        timings["write_sec"] = _now_sec() - t_write
+        logger.info(
+            "batch done feeds=%d fetch_sec=%.1f write_sec=%.1f",
+            len(feed_list), timings["fetch_sec"], timings["write_sec"],
+        )
+
+    if fulltext_jobs:
+        t_fulltext = _now_sec()
+        replaced = run_fulltext_stage(
+            cur, fulltext_jobs,
+            stats=failure_stats,
+            now_iso=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        timings["fulltext_sec"] = _now_sec() - t_fulltext
+        logger.info(
+            "fulltext stage done jobs=%d replaced=%d sec=%.1f",
+            len(fulltext_jobs), replaced, timings["fulltext_sec"],
+        )
+
+    purged = purge_fulltext_cache(cur, now_iso=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    if purged:
+        logger.info("fulltext_cache purged expired=%d", purged)
 
     cur.execute(
         "UPDATE articles SET category='news' "
         "WHERE kind='news' AND (category IS NULL OR TRIM(category)='')"
     )
 
+    # 既存記事の更新（本文の差し替え・公開日時の訂正など）で変わったトピックの集計を反映する
+    stats_refreshed = refresh_topic_stats(cur)
+    if stats_refreshed:
+        logger.info("topic_stats refreshed topics=%d", stats_refreshed)
+
     cur.execute(
         """
         SELECT feed_url, failure_count, suspend_until
@@ -913,11 +2028,13 @@ def main():
     conn.close()
 
     ended_at = datetime.now(timezone.utc)
+    timings["total_sec"] = _now_sec() - t0
+    failure_stats["http"] = http_client.log_pool_stats("collect http")
     print_collect_summary(failure_stats)
     append_collect_health_log(stats=failure_stats, started_at=started_at, ended_at=ended_at)
 
-    sec = _now_sec() - t0
-    logger.info("step=collect end sec=%.1f", sec)
+    logger.info("step=collect end sec=%.1f", timings["total_sec"])
+    return failure_stats
 
 
 if __name__ == "__main__":
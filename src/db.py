@@ -1,20 +1,63 @@
 # src/db.py
+import os
 import sqlite3
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 
 DB_PATH = Path("data/state.sqlite")
 
+# 全ステップ共通の接続設定（環境変数で調整可）
+# WAL にすると描画・集計の読み取りが収集・判定の書き込みを待たず、NORMAL 同期でもコミット単位の
+# 耐久性は WAL が担保する（電源断で直近のコミットを失う可能性はあるが DB は壊れない）
+JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+CACHE_SIZE_MB = int(os.environ.get("SQLITE_CACHE_SIZE_MB", "64"))
+MMAP_SIZE_MB = int(os.environ.get("SQLITE_MMAP_SIZE_MB", "256"))
+TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "30000"))
 
-def connect():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(DB_PATH)
+# 退避 DB（古い記事の移し先。src/archive.py が書く）。未設定なら DB_PATH と同じディレクトリの archive.sqlite
+ARCHIVE_PATH = Path(os.environ["ARCHIVE_DB_PATH"]) if os.environ.get("ARCHIVE_DB_PATH") else None
 
 
-def init_db():
-    conn = connect()
-    cur = conn.cursor()
+def connect(path=None, *, readonly: bool = False, archive: bool = False):
+    """DB 接続を返す（各ステップはここを通して接続する）。
+
+    path を省略すると DB_PATH。readonly=True は描画・集計用で、書き込みを
+    query_only で禁止する（journal_mode / synchronous は書き込み側の設定に従う）。
+    archive=True なら退避 DB を ATTACH し、退避済みの行も all_<表> の TEMP VIEW で読めるようにする
+    （attach_archive。退避 DB が無ければ何もしない）。
+    """
+    path = Path(path) if path is not None else DB_PATH
+    if not readonly:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    configure_connection(conn, readonly=readonly)
+    # temp_store の設定で TEMP スキーマが作り直されるので、TEMP VIEW は設定の後に作る
+    if archive:
+        attach_archive(conn)
+    return conn
+
 
+def configure_connection(conn, *, readonly: bool = False):
+    """接続に共通の PRAGMA を設定する。"""
+    for name, value in (("journal_mode", JOURNAL_MODE), ("synchronous", SYNCHRONOUS), ("temp_store", TEMP_STORE)):
+        if not _VALID_IDENTIFIER.match(value):
+            raise ValueError(f"Invalid {name}: {value!r}")
+    if not readonly:
+        conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+        conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+    # cache_size は負値で KiB 指定
+    conn.execute(f"PRAGMA cache_size={-CACHE_SIZE_MB * 1024}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_MB * 1024 * 1024}")
+    conn.execute(f"PRAGMA temp_store={TEMP_STORE}")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+
+
+def _migrate_core_tables(cur):
+    """記事・トピック系の基本テーブル。旧 DB の列追加・空値補完・topic_key 重複整理を含む。"""
     # ---- articles ----
     cur.execute("""
     CREATE TABLE IF NOT EXISTS articles (
@@ -39,6 +82,13 @@ def init_db():
     ON articles(url)
     """)
 
+    # ---- articles: 後方互換（既存DBに列が無い場合の追加。列を使うインデックスより先に行う）----
+    ensure_column(cur, "articles", "kind", "TEXT")
+    ensure_column(cur, "articles", "region", "TEXT")
+    ensure_column(cur, "articles", "title_ja", "TEXT")
+    ensure_column(cur, "articles", "source_tier", "TEXT")
+    ensure_column(cur, "articles", "url_norm", "TEXT")
+
     # クエリ性能向上用インデックス
     cur.execute("""
     CREATE INDEX IF NOT EXISTS idx_articles_category_published
@@ -57,12 +107,6 @@ def init_db():
     ON articles(published_at DESC)
     """)
 
-    # ---- articles: 後方互換（既存DBに列が無い場合の追加）----
-    ensure_column(cur, "articles", "kind", "TEXT")
-    ensure_column(cur, "articles", "region", "TEXT")
-    ensure_column(cur, "articles", "title_ja", "TEXT")
-    ensure_column(cur, "articles", "source_tier", "TEXT")
-
     # 既存データの最低限のデフォルト補完（NULL/空のみ対象）
     cur.execute("UPDATE articles SET kind='tech' WHERE kind IS NULL OR kind=''")
     cur.execute("UPDATE articles SET region='global' WHERE region IS NULL OR region=''")
@@ -171,6 +215,9 @@ def init_db():
     ensure_column(cur, "topic_insights", "src_hash", "TEXT")
     ensure_column(cur, "topic_insights", "perspective_digest", "TEXT")
 
+
+def _migrate_feed_tables(cur):
+    """収集（フィード取得・本文取得）の状態テーブル。"""
     # ---- low_priority_articles (source上限超過分の退避キュー) ----
     cur.execute("""
     CREATE TABLE IF NOT EXISTS low_priority_articles (
@@ -211,8 +258,57 @@ def init_db():
     ensure_column(cur, "feed_health", "last_success_at", "TEXT")
     ensure_column(cur, "feed_health", "last_failure_reason", "TEXT")
     ensure_column(cur, "feed_health", "suspend_until", "TEXT")
+    # 条件付き GET 用のバリデータ（If-None-Match / If-Modified-Since）
+    ensure_column(cur, "feed_health", "etag", "TEXT")
+    ensure_column(cur, "feed_health", "last_modified", "TEXT")
+    # 適応ポーリング用の更新間隔統計（新着記事の到着間隔の指数移動平均）と次回取得予定
+    ensure_column(cur, "feed_health", "avg_interval_sec", "REAL")
+    ensure_column(cur, "feed_health", "arrivals", "INTEGER DEFAULT 0")
+    ensure_column(cur, "feed_health", "last_new_at", "TEXT")
+    ensure_column(cur, "feed_health", "next_due_at", "TEXT")
+
+    # ---- fulltext_cache (記事本文フェッチ結果のキャッシュ) ----
+    # status='ok' 以外（timeout_error / content_too_short 等）も保存し、
+    # expires_at まで同一 URL へのネットワーク取得を省略する。
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS fulltext_cache (
+      url TEXT PRIMARY KEY,     -- collect.normalize_url 済み
+      status TEXT,
+      size INTEGER DEFAULT 0,   -- 取得バイト数
+      text TEXT,
+      fetched_at TEXT,
+      expires_at TEXT
+    )
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_fulltext_cache_expires
+    ON fulltext_cache(expires_at)
+    """)
 
+    # ---- fulltext_domain_stats (本文取得のドメイン別統計・サーキットブレーカー) ----
+    # recent は直近の取得結果 [[ok(0/1), latency_ms], ...] の JSON（古い順）。
+    # breaker_state='open' かつ open_until 経過後は 1 件だけ試験取得（half-open）する。
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS fulltext_domain_stats (
+      domain TEXT PRIMARY KEY,
+      attempts INTEGER DEFAULT 0,   -- 累計取得回数
+      successes INTEGER DEFAULT 0,  -- 累計成功回数
+      bytes INTEGER DEFAULT 0,      -- 累計取得バイト数
+      recent TEXT,
+      success_rate REAL,            -- recent 内の成功率
+      p50_ms REAL,
+      p95_ms REAL,
+      breaker_state TEXT DEFAULT 'closed',
+      open_until TEXT,
+      trips INTEGER DEFAULT 0,      -- 連続で open になった回数（cooldown 倍増に使う）
+      last_status TEXT,
+      updated_at TEXT
+    )
+    """)
 
+
+def _migrate_forecast_tables(cur):
+    """未来予測レポートと検証結果。"""
     # ---- forecast_reports (未来予測レポート) ----
     cur.execute("""
     CREATE TABLE IF NOT EXISTS forecast_reports (
@@ -256,6 +352,9 @@ def init_db():
     ON forecast_verifications(report_date, horizon, verification_round)
     """)
 
+
+def _migrate_entity_and_history_tables(cur):
+    """エンティティ・トピックの日次スナップショット・カテゴリ別推移。"""
     # ---- entities / article_entities (企業・製品・技術エンティティ) ----
     cur.execute("""
     CREATE TABLE IF NOT EXISTS entities (
@@ -317,9 +416,18 @@ def init_db():
     ON category_trends(category, report_date DESC)
     """)
 
+
+def _migrate_pipeline_watermarks(cur):
+    # ---- pipeline_watermarks (各ステップが処理済みの位置。thread の記事 id 等) ----
+    ensure_watermarks_table(cur)
+
+
+def _migrate_articles_fts(cur):
     # ---- FTS5 全文検索（articles の title / title_ja / content） ----
     # SQLite の FTS5 拡張が有効ならトリガ同期付きで作成する。
     # 拡張不在の古い SQLite でも起動できるよう例外は握りつぶす（検索機能はオプション扱い）。
+    # FTS5 が無くてもこの版は適用済みとして記録される。後から FTS5 を有効にした場合は
+    # この関数を直接呼んで作成する（空の articles_fts は rebuild で既存記事を取り込む）。
     try:
         cur.execute("""
         CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
@@ -359,8 +467,490 @@ def init_db():
         # FTS5 拡張が無い環境では検索機能を諦める（他機能は継続）。
         pass
 
+
+
+# ---- articles.event_ts（記事の時刻の正規化列） ----
+# published_at（空なら fetched_at）を UTC の 'YYYY-MM-DD HH:MM:SS' にした値。datetime(?) で作った
+# 境界値とそのまま比較・ソートでき、(kind, category, event_ts) のインデックスで範囲走査できる。
+# 挿入時・published_at / fetched_at の更新時にトリガで算出する。
+def event_ts_sql(prefix: str = "") -> str:
+    """event_ts の算出式。prefix は列の修飾（'new.' / 'a.' など）。
+
+    datetime() で解釈できない値は、従来のクエリと同じく 'T' を空白にした先頭 19 文字で読み直す。
+    """
+    p = prefix
+    return (
+        f"COALESCE(datetime(NULLIF({p}published_at,'')),"
+        f" datetime(substr(replace(NULLIF({p}published_at,''),'T',' '),1,19)),"
+        f" datetime({p}fetched_at),"
+        f" datetime(substr(replace({p}fetched_at,'T',' '),1,19)))"
+    )
+
+
+def event_ts_expr(cur, prefix: str = "") -> str:
+    """クエリで記事の時刻として使う式。
+
+    event_ts 列があれば列そのもの（インデックスが効く）。列の無い DB（マイグレーション前や
+    テスト用の簡易スキーマ）では同じ値を算出式で求める。
+    """
+    cur.execute("PRAGMA table_info(articles)")
+    cols = {row[1] for row in cur.fetchall()}
+    if "event_ts" in cols:
+        return f"{prefix}event_ts"
+    if "published_at" not in cols:
+        return f"datetime({prefix}fetched_at)"
+    return event_ts_sql(prefix)
+
+
+def _migrate_articles_event_ts(cur):
+    ensure_column(cur, "articles", "event_ts", "TEXT")
+
+    # FTS 同期トリガを本文系の列の更新だけに絞る（event_ts 等の更新で索引を作り直さない）
+    if cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='articles_fts_au'"
+    ).fetchone():
+        cur.execute("DROP TRIGGER articles_fts_au")
+        cur.execute("""
+        CREATE TRIGGER articles_fts_au AFTER UPDATE OF title, title_ja, content ON articles BEGIN
+          INSERT INTO articles_fts(articles_fts, rowid, title, title_ja, content)
+          VALUES ('delete', old.id, COALESCE(old.title,''), COALESCE(old.title_ja,''), COALESCE(old.content,''));
+          INSERT INTO articles_fts(rowid, title, title_ja, content)
+          VALUES (new.id, COALESCE(new.title,''), COALESCE(new.title_ja,''), COALESCE(new.content,''));
+        END
+        """)
+
+    # 既存行のバックフィル（インデックス作成前に行う方が速い）
+    cur.execute(f"UPDATE articles SET event_ts = {event_ts_sql()} WHERE event_ts IS NULL")
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_articles_event_ts
+    ON articles(event_ts)
+    """)
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_articles_kind_category_event_ts
+    ON articles(kind, category, event_ts)
+    """)
+
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS articles_event_ts_ai AFTER INSERT ON articles BEGIN
+      UPDATE articles SET event_ts = {event_ts_sql("new.")} WHERE id = new.id;
+    END
+    """)
+    cur.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS articles_event_ts_au
+    AFTER UPDATE OF published_at, fetched_at ON articles
+    WHEN new.event_ts IS NOT {event_ts_sql("new.")}
+    BEGIN
+      UPDATE articles SET event_ts = {event_ts_sql("new.")} WHERE id = new.id;
+    END
+    """)
+
+
+# ---- topic_stats（トピック単位の集計の実体化） ----
+# 描画（技術ページ・カテゴリ横断 TOP・JP 優先・タイムライン・運用ページ）と LLM の対象選びが
+# 毎回 topic_articles × articles から求めていた集計を、トピックごとに 1 行で持つ。
+# 記事の紐付け・削除、時刻・種別・地域・URL・本文の有無の変更はトリガで topic_stats_dirty に
+# 記録し、refresh_topic_stats() がそのトピックだけ数え直す（thread / dedupe / collect の最後に呼ぶ）。
+# 48h・7 日の件数は窓の基準時刻（pipeline_watermarks の TOPIC_STATS_WINDOW。UNIX 秒）時点の値で、
+# decay_topic_stats() が基準時刻を進めるときに、窓から外れた記事のトピックだけを数え直させる。
+TOPIC_STATS_WINDOW = "topic_stats_window"
+TOPIC_STATS_WINDOW_HOURS = (48, 7 * 24)
+
+
+def _migrate_topic_stats(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS topic_stats (
+      topic_id INTEGER PRIMARY KEY,
+      article_count INTEGER NOT NULL DEFAULT 0,
+      news_count INTEGER NOT NULL DEFAULT 0,     -- kind='news' の記事数
+      jp_count INTEGER NOT NULL DEFAULT 0,       -- region='jp' の記事数
+      recent_48h INTEGER NOT NULL DEFAULT 0,
+      recent_7d INTEGER NOT NULL DEFAULT 0,
+      jp_recent_48h INTEGER NOT NULL DEFAULT 0,
+      max_article_id INTEGER,                    -- 最後に紐付いた（id が最大の）記事
+      latest_article_id INTEGER,                 -- event_ts が最新の記事
+      latest_ts TEXT,
+      rep_article_id INTEGER,                    -- 代表記事（本文あり→fetched_at→event_ts の新しい順→url）
+      updated_at TEXT
+    )
+    """)
+    cur.execute("CREATE TABLE IF NOT EXISTS topic_stats_dirty (topic_id INTEGER PRIMARY KEY)")
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS topic_stats_topic_articles_ai AFTER INSERT ON topic_articles BEGIN
+      INSERT OR IGNORE INTO topic_stats_dirty(topic_id) VALUES (new.topic_id);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS topic_stats_topic_articles_ad AFTER DELETE ON topic_articles BEGIN
+      INSERT OR IGNORE INTO topic_stats_dirty(topic_id) VALUES (old.topic_id);
+    END
+    """)
+    # event_ts は published_at / fetched_at の更新に articles_event_ts_au が追従させる。
+    # 本文は代表記事の判定に空かどうかだけを使うので、空⇔非空が変わったときだけ拾う。
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS topic_stats_articles_au
+    AFTER UPDATE OF event_ts, fetched_at, kind, region, url, content ON articles
+    WHEN old.event_ts IS NOT new.event_ts
+      OR old.fetched_at IS NOT new.fetched_at
+      OR old.kind IS NOT new.kind
+      OR old.region IS NOT new.region
+      OR old.url IS NOT new.url
+      OR (COALESCE(old.content,'') = '') <> (COALESCE(new.content,'') = '')
+    BEGIN
+      INSERT OR IGNORE INTO topic_stats_dirty(topic_id)
+      SELECT topic_id FROM topic_articles WHERE article_id = new.id;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS topic_stats_articles_ad AFTER DELETE ON articles BEGIN
+      INSERT OR IGNORE INTO topic_stats_dirty(topic_id)
+      SELECT topic_id FROM topic_articles WHERE article_id = old.id;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS topic_stats_topics_ad AFTER DELETE ON topics BEGIN
+      DELETE FROM topic_stats WHERE topic_id = old.id;
+      DELETE FROM topic_stats_dirty WHERE topic_id = old.id;
+    END
+    """)
+
+    # 既存トピックの初回集計（基準時刻が未記録なので decay が全トピックを対象にする）
+    ensure_watermarks_table(cur)
+    decay_topic_stats(cur)
+    refresh_topic_stats(cur)
+
+
+def _window_cutoff(anchor: int, hours: int) -> str:
+    """基準時刻 anchor（UNIX 秒）から hours 時間前を event_ts と同じ書式で返す。"""
+    return datetime.fromtimestamp(anchor - hours * 3600, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def decay_topic_stats(cur, now_dt: datetime | None = None) -> int:
+    """48h / 7 日窓の基準時刻を now_dt（既定は現在）に進め、窓から外れた記事のトピックを数え直し対象にする。
+
+    前回の基準時刻から今回までの間に窓の下端を越えた記事を event_ts の範囲走査で拾うので、
+    対象は実際に件数が変わるトピックだけになる（新しく窓に入る記事は紐付け時にトリガで拾われる）。
+    基準時刻が未記録なら全トピックが対象。対象に加えたトピック数を返す（反映は refresh_topic_stats）。
+    """
+    if not table_exists(cur, "topic_stats"):
+        return 0
+    anchor = int((now_dt or datetime.now(timezone.utc)).timestamp())
+    prev = get_watermark(cur, TOPIC_STATS_WINDOW)
+    if prev and anchor <= prev:
+        return 0
+    marked = 0
+    if not prev:
+        cur.execute("INSERT OR IGNORE INTO topic_stats_dirty(topic_id) SELECT id FROM topics")
+        marked += cur.rowcount
+    else:
+        for hours in TOPIC_STATS_WINDOW_HOURS:
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO topic_stats_dirty(topic_id)
+                SELECT ta.topic_id
+                FROM articles a
+                CROSS JOIN topic_articles ta ON ta.article_id = a.id
+                WHERE a.event_ts >= ? AND a.event_ts < ?
+                """,
+                (_window_cutoff(prev, hours), _window_cutoff(anchor, hours)),
+            )
+            marked += cur.rowcount
+    set_watermark(cur, TOPIC_STATS_WINDOW, anchor)
+    return marked
+
+
+def refresh_topic_stats(cur) -> int:
+    """topic_stats_dirty のトピックだけ topic_stats を数え直し、数え直したトピック数を返す。
+
+    48h / 7 日の件数は窓の基準時刻での値。記事が 0 件になったトピックは行を消す
+    （読む側は LEFT JOIN で 0 件として扱う）。topic_stats の無い DB では何もしない。
+    """
+    if not table_exists(cur, "topic_stats"):
+        return 0
+    dirty = cur.execute("SELECT COUNT(*) FROM topic_stats_dirty").fetchone()[0]
+    if not dirty:
+        return 0
+    anchor = get_watermark(cur, TOPIC_STATS_WINDOW) or int(datetime.now(timezone.utc).timestamp())
+    cutoff_48h, cutoff_7d = (_window_cutoff(anchor, hours) for hours in TOPIC_STATS_WINDOW_HOURS)
+
+    cur.execute("DELETE FROM topic_stats WHERE topic_id IN (SELECT topic_id FROM topic_stats_dirty)")
+    cur.execute(
+        """
+        INSERT INTO topic_stats(
+          topic_id, article_count, news_count, jp_count, recent_48h, recent_7d, jp_recent_48h,
+          max_article_id, latest_article_id, latest_ts, rep_article_id, updated_at
+        )
+        SELECT
+          topic_id,
+          COUNT(*),
+          SUM(is_news),
+          SUM(is_jp),
+          SUM(CASE WHEN event_ts >= ? THEN 1 ELSE 0 END),
+          SUM(CASE WHEN event_ts >= ? THEN 1 ELSE 0 END),
+          SUM(CASE WHEN is_jp AND event_ts >= ? THEN 1 ELSE 0 END),
+          MAX(article_id),
+          MAX(CASE WHEN latest_rn = 1 THEN article_id END),
+          MAX(CASE WHEN latest_rn = 1 THEN event_ts END),
+          MAX(CASE WHEN rep_rn = 1 THEN article_id END),
+          ?
+        FROM (
+          SELECT
+            ta.topic_id,
+            a.id AS article_id,
+            a.event_ts,
+            CASE WHEN COALESCE(a.kind,'') = 'news' THEN 1 ELSE 0 END AS is_news,
+            CASE WHEN COALESCE(NULLIF(a.region,''), 'global') = 'jp' THEN 1 ELSE 0 END AS is_jp,
+            ROW_NUMBER() OVER (
+              PARTITION BY ta.topic_id
+              ORDER BY a.event_ts DESC, a.id DESC
+            ) AS latest_rn,
+            ROW_NUMBER() OVER (
+              PARTITION BY ta.topic_id
+              ORDER BY
+                CASE WHEN COALESCE(a.content,'') != '' THEN 0 ELSE 1 END,
+                datetime(a.fetched_at) DESC,
+                a.event_ts DESC,
+                a.url ASC
+            ) AS rep_rn
+          FROM topic_stats_dirty d
+          CROSS JOIN topic_articles ta ON ta.topic_id = d.topic_id
+          JOIN articles a ON a.id = ta.article_id
+        )
+        GROUP BY topic_id
+        """,
+        (cutoff_48h, cutoff_7d, cutoff_48h, now()),
+    )
+    cur.execute("DELETE FROM topic_stats_dirty")
+    return dirty
+
+
+def update_topic_stats(cur, now_dt: datetime | None = None) -> int:
+    """窓の基準時刻を進めて（decay）、変更のあったトピックの集計を反映する。反映したトピック数を返す。
+
+    48h / 7 日の件数を現在時刻に合わせる必要がある読み手（描画）の直前に呼ぶ。
+    """
+    decay_topic_stats(cur, now_dt)
+    return refresh_topic_stats(cur)
+
+
+# ---- 退避 DB（hot/archive 分割） ----
+# 古い記事とその紐付け、記事が残らなくなったトピックは src/archive.py が退避 DB へ移し、本体には
+# 直近の記事だけを残す。移した行の id は変えないので、本体と退避先を UNION ALL した
+# TEMP VIEW all_<表> を読めば移す前と同じ結果になる（退避 DB を ATTACH した接続でだけ作る）。
+# 境界は pipeline_watermarks の ARCHIVE_WATERMARK（UNIX 秒）で、本体には event_ts がこれ以降の記事が全部ある。
+ARCHIVE_SCHEMA = "archive"
+ARCHIVE_TABLES = ("articles", "topic_articles", "article_entities", "edges", "topics", "topic_insights")
+ARCHIVE_WATERMARK = "archive_cutoff"
+# 退避先の索引。URL は本体と同じく一意（collect は退避済みの URL を既知として扱い、入れ直さない）。
+# topic_key の一意索引は写さない（トピックを退避した後に、同じ topic_key のトピックを thread が作りうる）
+ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS {s}.idx_articles_event_ts ON articles(event_ts)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_articles_published ON articles(published_at DESC)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS {s}.idx_articles_url ON articles(url)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_topic_articles_article ON topic_articles(article_id)",
+    "CREATE INDEX IF NOT EXISTS {s}.idx_article_entities_entity ON article_entities(entity_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS {s}.idx_edges_topic_parent_child"
+    " ON edges(topic_id, parent_article_id, child_article_id)",
+)
+
+
+def archive_path() -> Path:
+    """退避 DB のパス（ARCHIVE_DB_PATH。未設定なら DB_PATH と同じディレクトリの archive.sqlite）。"""
+    return ARCHIVE_PATH or DB_PATH.with_name("archive.sqlite")
+
+
+def attach_archive(conn, path=None, *, create: bool = False) -> bool:
+    """退避 DB を archive スキーマとして ATTACH し、TEMP VIEW all_<表> を作る。
+
+    退避 DB が無ければ ATTACH せず False を返す。create=True（退避ジョブ）はファイルと退避先の表を作る。
+    """
+    path = Path(path) if path is not None else archive_path()
+    if not create and not path.exists():
+        return False
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(path),))
+    cur = conn.cursor()
+    if create:
+        if not _VALID_IDENTIFIER.match(JOURNAL_MODE):
+            raise ValueError(f"Invalid journal_mode: {JOURNAL_MODE!r}")
+        cur.execute(f"PRAGMA {ARCHIVE_SCHEMA}.journal_mode={JOURNAL_MODE}")
+        ensure_archive_tables(cur)
+    # 読み取り専用の接続（query_only）でも TEMP VIEW は作れるよう、作る間だけ外す
+    query_only = cur.execute("PRAGMA query_only").fetchone()[0]
+    if query_only:
+        cur.execute("PRAGMA query_only=OFF")
+    try:
+        create_archive_views(cur)
+    finally:
+        if query_only:
+            cur.execute("PRAGMA query_only=ON")
+    return True
+
+
+def ensure_archive_tables(cur):
+    """退避先に ARCHIVE_TABLES を本体と同じ定義で作り、本体に後から足された列を追加する。"""
+    for table in ARCHIVE_TABLES:
+        row = cur.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone()
+        if row is None:
+            continue
+        archived = {name for name, _type in table_columns(cur, table, ARCHIVE_SCHEMA)}
+        if not archived:
+            cur.execute(_re.sub(
+                rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {ARCHIVE_SCHEMA}.{table}", row[0], count=1
+            ))
+            continue
+        for name, coltype in table_columns(cur, table):
+            if name not in archived:
+                cur.execute(f'ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN "{name}" {coltype}')
+    # url 索引が一意でなかった頃の退避先に残った同じ URL の記事は、最後に退避した行だけを残す
+    url_index = {row[1]: row[2] for row in cur.execute(f"PRAGMA {ARCHIVE_SCHEMA}.index_list(articles)").fetchall()}
+    if url_index.get("idx_articles_url") == 0:
+        delete_archived_articles(
+            cur,
+            f"SELECT a.id FROM {ARCHIVE_SCHEMA}.articles a WHERE EXISTS ("
+            f"SELECT 1 FROM {ARCHIVE_SCHEMA}.articles b WHERE b.url = a.url AND b.id > a.id)",
+        )
+        cur.execute(f"DROP INDEX {ARCHIVE_SCHEMA}.idx_articles_url")
+    for sql in ARCHIVE_INDEXES:
+        table = sql.split(" ON ")[1].split("(")[0]
+        if table_columns(cur, table, ARCHIVE_SCHEMA):
+            cur.execute(sql.format(s=ARCHIVE_SCHEMA))
+
+
+def delete_archived_articles(cur, ids_sql: str, params=()):
+    """退避先から ids_sql（記事 id を返す SELECT）の記事と、その topic_articles / article_entities を消す。"""
+    for table, col in (("topic_articles", "article_id"), ("article_entities", "article_id"), ("articles", "id")):
+        if table_columns(cur, table, ARCHIVE_SCHEMA):
+            cur.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.{table} WHERE {col} IN ({ids_sql})", params)
+
+
+def archive_attached(cur) -> bool:
+    """この接続に退避 DB が ATTACH されているか。"""
+    return any(row[1] == ARCHIVE_SCHEMA for row in cur.execute("PRAGMA database_list").fetchall())
+
+
+def create_archive_views(cur):
+    """本体と退避先を UNION ALL した TEMP VIEW all_<表> を作る。
+
+    列は本体に合わせ、退避先に無い列は NULL。退避先に表が無ければ本体だけを読む。
+    """
+    for table in ARCHIVE_TABLES:
+        cols = [name for name, _type in table_columns(cur, table)]
+        if not cols:
+            continue
+        archived = {name for name, _type in table_columns(cur, table, ARCHIVE_SCHEMA)}
+        select = "SELECT " + ", ".join(f'"{c}"' for c in cols) + f" FROM main.{table}"
+        if archived:
+            arch_cols = ", ".join(f'"{c}"' if c in archived else f'NULL AS "{c}"' for c in cols)
+            select += f" UNION ALL SELECT {arch_cols} FROM {ARCHIVE_SCHEMA}.{table}"
+        cur.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+        cur.execute(f"CREATE TEMP VIEW all_{table} AS {select}")
+
+
+def archive_boundary(cur) -> str | None:
+    """退避の境界（event_ts と同じ書式）。まだ退避していなければ None。"""
+    if not table_exists(cur, "pipeline_watermarks"):
+        return None
+    value = get_watermark(cur, ARCHIVE_WATERMARK)
+    return _window_cutoff(value, 0) if value else None
+
+
+def archive_source(cur, table: str, since: str | None = None) -> str:
+    """table を読むクエリの FROM に置く名前。
+
+    退避 DB を ATTACH した接続（connect(archive=True)）では退避済みの行も含む all_<table>。
+    since（event_ts と同じ書式の下限）が退避の境界以降なら本体だけで足りるので table のまま。
+    """
+    cur.execute("SELECT 1 FROM sqlite_temp_master WHERE type='view' AND name=?", (f"all_{table}",))
+    if cur.fetchone() is None:
+        return table
+    if since is not None:
+        boundary = archive_boundary(cur)
+        if boundary is not None and since >= boundary:
+            return table
+    return f"all_{table}"
+
+# ---- スキーマのマイグレーション ----
+# (版, 名前, 適用関数)。版は 1 からの連番で、追加は末尾にだけ行う（適用済みの版は書き換えない）。
+# schema_version 導入前の DB には全版が順に適用されるため、各関数は既存のテーブル・列が
+# あっても安全なよう冪等に書く（CREATE ... IF NOT EXISTS / ensure_column）。
+MIGRATIONS = [
+    (1, "core_tables", _migrate_core_tables),
+    (2, "feed_tables", _migrate_feed_tables),
+    (3, "forecast_tables", _migrate_forecast_tables),
+    (4, "entity_and_history_tables", _migrate_entity_and_history_tables),
+    (5, "pipeline_watermarks", _migrate_pipeline_watermarks),
+    (6, "articles_fts", _migrate_articles_fts),
+    (7, "articles_event_ts", _migrate_articles_event_ts),
+    (8, "topic_stats", _migrate_topic_stats),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def init_db():
+    """DB のスキーマを最新版にする（各ステップの起動時に呼ぶ）。
+
+    schema_version に記録された版が最新なら 1 クエリで戻る。未適用の版があるときだけ
+    migrate() で順に適用する（全表 UPDATE や topic_key の重複整理は該当版の初回適用時のみ）。
+    """
+    conn = connect()
+    try:
+        if get_schema_version(conn.cursor()) >= SCHEMA_VERSION:
+            return
+        migrate(conn)
+    finally:
+        conn.close()
+
+
+def migrate(conn) -> list[int]:
+    """未適用のマイグレーションを版の順に適用し、適用した版の一覧を返す。
+
+    版ごとに BEGIN IMMEDIATE で書き込みロックを取り、適用と schema_version への記録を
+    同じトランザクションでコミットする。同時に起動した別プロセスが先に適用した版は飛ばす。
+    """
+    cur = conn.cursor()
+    ensure_schema_version_table(cur)
     conn.commit()
-    conn.close()
+    applied = []
+    for version, name, migration in MIGRATIONS:
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(cur) >= version:
+                conn.rollback()
+                continue
+            migration(cur)
+            cur.execute(
+                "INSERT INTO schema_version(version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, now()),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def ensure_schema_version_table(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+      version INTEGER PRIMARY KEY,
+      name TEXT,
+      applied_at TEXT
+    )
+    """)
+
+
+def get_schema_version(cur) -> int:
+    """適用済みのスキーマ版（schema_version が無い DB は 0）。"""
+    try:
+        cur.execute("SELECT MAX(version) FROM schema_version")
+    except sqlite3.OperationalError:
+        return 0
+    row = cur.fetchone()
+    return int(row[0] or 0)
 
 import re as _re
 _VALID_IDENTIFIER = _re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
@@ -376,6 +966,14 @@ def ensure_column(cur, table: str, col: str, coltype: str):
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
 
 
+def table_columns(cur, table: str, schema: str = "main") -> list[tuple[str, str]]:
+    """schema.table の (列名, 型) の一覧（表が無ければ空）。"""
+    if not _VALID_IDENTIFIER.match(table) or not _VALID_IDENTIFIER.match(schema):
+        raise ValueError(f"Invalid table name: {schema}.{table}")
+    cur.execute(f"PRAGMA {schema}.table_info({table})")
+    return [(row[1], row[2]) for row in cur.fetchall()]
+
+
 def dedupe_topics_by_key(cur):
     """
     旧DBで topic_key の重複があると UNIQUE INDEX 作成で失敗するため、
@@ -437,6 +1035,33 @@ def dedupe_topics_by_key(cur):
             cur.execute("DELETE FROM topics WHERE id=?", (dup_id,))
 
 
+def ensure_watermarks_table(cur):
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS pipeline_watermarks (
+      name TEXT PRIMARY KEY,
+      value INTEGER NOT NULL DEFAULT 0,
+      updated_at TEXT
+    )
+    """)
+
+
+def get_watermark(cur, name: str) -> int:
+    """ステップ name の処理済み位置（未記録なら 0）。"""
+    cur.execute("SELECT value FROM pipeline_watermarks WHERE name=?", (name,))
+    row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def set_watermark(cur, name: str, value: int):
+    cur.execute(
+        """
+        INSERT INTO pipeline_watermarks(name, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at
+        """,
+        (name, int(value), now()),
+    )
+
+
 def table_exists(cur, table: str) -> bool:
     cur.execute(
         "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1",
@@ -446,18 +1071,15 @@ def table_exists(cur, table: str) -> bool:
 
 
 def recompute_score_48h():
+    """topics.score_48h を topic_stats の 48h 件数に揃える（値が変わるトピックだけ書き換える）。"""
     conn = connect()
     cur = conn.cursor()
 
+    update_topic_stats(cur)
     cur.execute("""
     UPDATE topics
-    SET score_48h = (
-      SELECT COUNT(*)
-      FROM topic_articles ta
-      JOIN articles a ON a.id = ta.article_id
-      WHERE ta.topic_id = topics.id
-        AND datetime(a.published_at) >= datetime('now', '-48 hours')
-    )
+    SET score_48h = COALESCE((SELECT recent_48h FROM topic_stats s WHERE s.topic_id = topics.id), 0)
+    WHERE score_48h IS NOT COALESCE((SELECT recent_48h FROM topic_stats s WHERE s.topic_id = topics.id), 0)
     """)
 
     conn.commit()
@@ -1,4 +1,5 @@
 import logging
+import os
 import re
 import time
 import unicodedata
@@ -11,7 +12,10 @@ logger = logging.getLogger(__name__)
 
 from difflib import SequenceMatcher
 
-from db import connect, ensure_column
+from rapidfuzz import fuzz, process
+
+from db import connect, ensure_column, refresh_topic_stats
+from dedupe_lsh import PARAMS_KEY, LSHIndex, minhash_bands, pack_bands, unpack_bands
 
 # カテゴリ別に重複判定しきい値を調整
 # 値が低いほど「重複」と判定されやすい。
@@ -49,6 +53,17 @@ CANDIDATE_WINDOW_PER_BLOCK = {
     "ai": 100,
 }
 
+# 候補抽出方式: "lsh"（MinHash/LSH、既定）/ "blocking"（タイトル先頭語ブロッキング＋直近ウィンドウ）
+DEDUPE_CANDIDATES = os.environ.get("DEDUPE_CANDIDATES", "lsh").strip().lower()
+
+# 候補の採点方式: "rapidfuzz"（候補ブロックを一括採点して足切りしてから厳密スコア、既定）/
+# "difflib"（候補ごとに厳密スコアのみ）。どちらも判定と dedupe_judgments の記録は同一
+DEDUPE_SCORER = os.environ.get("DEDUPE_SCORER", "rapidfuzz").strip().lower()
+# カテゴリ別判定の並列プロセス数（1 なら直列。URL 完全一致は全体で先に解決する）
+DEDUPE_WORKERS = int(os.environ.get("DEDUPE_WORKERS", "1"))
+# 浮動小数の丸め差で境界上の候補を落とさないための余裕
+_BOUND_EPS = 1e-6
+
 # 類似度計算前の軽量フィルタ（大きく離れた候補を除外）
 MAX_TOKEN_COUNT_DIFF = 8
 MAX_TITLE_LENGTH_DIFF = 48
@@ -95,6 +110,50 @@ def _ratio(a: str, b: str) -> float:
     return SequenceMatcher(None, a or "", b or "").ratio() * 100
 
 
+def _upper_bound_scores(query: str, choices: list[str], score_cutoff: float) -> dict[int, float]:
+    """choices を rapidfuzz でまとめて採点し、score_cutoff 以上の {添字: スコア} を返す。
+
+    fuzz.ratio は最長共通部分列に基づく Indel 類似度で、SequenceMatcher の一致ブロックの
+    合計は最長共通部分列を超えないため、この値は常に _ratio 以上（上界）になる。
+    """
+    return {
+        idx: score
+        for _, score, idx in process.extract(
+            query, choices, scorer=fuzz.ratio, limit=None, score_cutoff=score_cutoff
+        )
+    }
+
+
+def _prune_candidates(
+    token_str: str,
+    norm_url: str,
+    threshold: float,
+    candidates: list[dict],
+) -> list[dict]:
+    """厳密スコアでも重複になり得ない候補を、候補ブロック一括の上界スコアで除く。
+
+    残った候補は元の順序のまま返すので、呼び出し側の厳密判定（最初に一致した候補で
+    削除）は全候補を厳密に採点した場合と同じ結果になる。
+    """
+    if not candidates:
+        return candidates
+    title_ub = _upper_bound_scores(
+        token_str, [k["token_str"] for k in candidates], threshold - 5 - _BOUND_EPS
+    )
+    if not title_ub:
+        return []
+    order = sorted(title_ub)
+    url_ub = _upper_bound_scores(norm_url, [candidates[j]["norm_url"] for j in order], 0)
+    survivors = []
+    for pos, j in enumerate(order):
+        kept = candidates[j]
+        if norm_url and norm_url == kept["norm_url"]:
+            survivors.append(kept)
+        elif _composite_score(title_ub[j], url_ub.get(pos, 0.0)) >= threshold - _BOUND_EPS:
+            survivors.append(kept)
+    return survivors
+
+
 
 
 def _title_tokens(title: str) -> list[str]:
@@ -175,6 +234,155 @@ def ensure_dedupe_log_table(cur):
     )
 
 
+def ensure_features_table(cur):
+    """記事ごとの正規化済み特徴量（dedupe_features）とその無効化トリガを用意する。
+
+    正規化タイトル・URL とトークン数は初回の dedupe で一度だけ計算して保存し、
+    以後は新規記事の分だけ計算する。タイトル・URL・カテゴリが更新された記事と
+    削除された記事の行はトリガで消えるので、次回の実行で計算し直される。
+    LSH の帯キー（bands）は比較対象になった記事についてだけ遅延計算して保存する。
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dedupe_features (
+          article_id INTEGER PRIMARY KEY,
+          cat_key TEXT NOT NULL,
+          norm_title TEXT NOT NULL,
+          norm_url TEXT NOT NULL,
+          params TEXT,
+          bands BLOB
+        )
+        """
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_dedupe_features_cat_article "
+        "ON dedupe_features(cat_key, article_id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_dedupe_features_norm_url ON dedupe_features(norm_url)"
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS dedupe_features_au
+        AFTER UPDATE OF title, url, url_norm, category ON articles
+        WHEN old.title IS NOT new.title OR old.url IS NOT new.url
+          OR old.url_norm IS NOT new.url_norm OR old.category IS NOT new.category
+        BEGIN
+          DELETE FROM dedupe_features WHERE article_id = old.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS dedupe_features_ad AFTER DELETE ON articles BEGIN
+          DELETE FROM dedupe_features WHERE article_id = old.id;
+        END
+        """
+    )
+    # 未判定記事の探索用（dedupe_checked=1 が大半なので部分インデックスで十分小さい）。
+    # normalize.py は毎回全件の url_norm を同じ値で書き直すため、上のトリガは値が
+    # 変わったときだけ発火させる
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_articles_dedupe_unchecked "
+        "ON articles(id) WHERE dedupe_checked = 0"
+    )
+
+
+def _category_key(category: str | None) -> str:
+    return (category or "").strip().lower() or "default"
+
+
+def refresh_features(cur) -> int:
+    """特徴量が未保存の記事（新規・更新後）の分だけ正規化して保存し、件数を返す。"""
+    cur.execute(
+        """
+        SELECT a.id, a.category, a.title, a.url, a.url_norm
+        FROM articles a
+        WHERE NOT EXISTS (SELECT 1 FROM dedupe_features f WHERE f.article_id = a.id)
+        """
+    )
+    rows = [
+        (i, _category_key(category), normalize_title(title), normalize_url(url_norm or url))
+        for i, category, title, url, url_norm in cur.fetchall()
+    ]
+    if rows:
+        cur.executemany(
+            "INSERT INTO dedupe_features(article_id, cat_key, norm_title, norm_url) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
+
+
+def load_dedupe_rows(cur) -> tuple[list[tuple], dict[str, int]]:
+    """判定に関係する記事だけを id 降順で読み込む。
+
+    記事は id 降順に処理され、未判定の記事はそれより新しい「残す」記事とだけ比較される。
+    したがってカテゴリ内で最も古い未判定記事より古い記事は比較候補にならない
+    （カテゴリ別の窓）。窓の外の記事に起こり得るのは URL 完全一致による削除だけなので、
+    正規化 URL が他の記事と重複しているものに限って追加で読み込む。
+
+    戻り値は (行のリスト, カテゴリ -> 窓の下限 id)。
+    """
+    cur.execute(
+        """
+        SELECT f.cat_key, MIN(a.id)
+        FROM articles a JOIN dedupe_features f ON f.article_id = a.id
+        WHERE a.dedupe_checked = 0
+        GROUP BY f.cat_key
+        """
+    )
+    window_start = dict(cur.fetchall())
+    if not window_start:
+        return [], window_start
+
+    in_window = " OR ".join("(f.cat_key = ? AND a.id >= ?)" for _ in window_start)
+    params = [x for item in window_start.items() for x in item]
+    cur.execute(
+        f"""
+        SELECT a.id, a.source, a.category, a.dedupe_checked,
+               f.cat_key, f.norm_title, f.norm_url, f.params, f.bands
+        FROM articles a JOIN dedupe_features f ON f.article_id = a.id
+        WHERE {in_window}
+           OR f.norm_url IN (
+             SELECT norm_url FROM dedupe_features
+             WHERE norm_url != '' GROUP BY norm_url HAVING COUNT(*) > 1
+           )
+        ORDER BY a.id DESC
+        """,
+        params,
+    )
+    return cur.fetchall(), window_start
+
+
+_JUDGMENT_COLUMNS = (
+    "article_id", "kept_article_id", "article_source", "kept_source", "article_category",
+    "title_score", "url_score", "composite_score", "threshold",
+    "title_match", "url_exact_match", "decision", "reason",
+)
+
+
+def log_decisions(cur, decisions: list[dict]):
+    """判定結果（log_decision のキーワード引数と同じ dict）をまとめて dedupe_judgments に記録する。"""
+    created_at = datetime.utcnow().isoformat(timespec="seconds")
+    rows = []
+    for d in decisions:
+        values = [d[c] for c in _JUDGMENT_COLUMNS]
+        values[9] = 1 if d["title_match"] else 0
+        values[10] = 1 if d["url_exact_match"] else 0
+        rows.append((*values, created_at))
+    cur.executemany(
+        """
+        INSERT INTO dedupe_judgments(
+          article_id, kept_article_id, article_source, kept_source, article_category,
+          title_score, url_score, composite_score, threshold,
+          title_match, url_exact_match, decision, reason, created_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
 def log_decision(
     cur,
     *,
@@ -192,83 +400,72 @@ def log_decision(
     decision: str,
     reason: str,
 ):
-    cur.execute(
-        """
-        INSERT INTO dedupe_judgments(
-          article_id, kept_article_id, article_source, kept_source, article_category,
-          title_score, url_score, composite_score, threshold,
-          title_match, url_exact_match, decision, reason, created_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            article_id,
-            kept_article_id,
-            article_source,
-            kept_source,
-            article_category,
-            title_score,
-            url_score,
-            composite_score,
-            threshold,
-            1 if title_match else 0,
-            1 if url_exact_match else 0,
-            decision,
-            reason,
-            datetime.utcnow().isoformat(timespec="seconds"),
-        ),
-    )
-
-
-def main():
+    log_decisions(cur, [{
+        "article_id": article_id,
+        "kept_article_id": kept_article_id,
+        "article_source": article_source,
+        "kept_source": kept_source,
+        "article_category": article_category,
+        "title_score": title_score,
+        "url_score": url_score,
+        "composite_score": composite_score,
+        "threshold": threshold,
+        "title_match": title_match,
+        "url_exact_match": url_exact_match,
+        "decision": decision,
+        "reason": reason,
+    }])
+
+
+def _url_exact_decision(row: tuple, kept_id: int, kept_source: str) -> dict:
+    i, source, category = row[0], row[1], row[2]
+    return {
+        "article_id": i,
+        "kept_article_id": kept_id,
+        "article_source": source,
+        "kept_source": kept_source,
+        "article_category": category,
+        "title_score": 0.0,
+        "url_score": 100.0,
+        "composite_score": 100.0,
+        "threshold": category_threshold(category),
+        "title_match": False,
+        "url_exact_match": True,
+        "decision": "delete",
+        "reason": "url_exact",
+    }
+
+
+def _judge_rows(
+    rows: list[tuple],
+    *,
+    use_lsh: bool,
+    use_rapidfuzz: bool,
+    window_start: dict[str, int],
+) -> dict:
+    """id 降順の行を順に判定する（DB には書かない）。
+
+    戻り値は削除判定（log_decisions の引数と同じ dict）のリスト、今回「残す」と判定した
+    未判定記事の id、新たに計算した帯キー、厳密スコアを計算した候補数。
+    """
     t0 = _now_sec()
-    logger.info("step=dedupe start")
-
-    conn = connect()
-    cur = conn.cursor()
-    ensure_dedupe_log_table(cur)
-    # 判定済みフラグ。既に「残す」と判定された記事を毎回再判定しないための増分化用
-    ensure_column(cur, "articles", "dedupe_checked", "INTEGER DEFAULT 0")
-
-    cur.execute(
-        "SELECT id, source, category, title, url, url_norm, COALESCE(dedupe_checked,0) "
-        "FROM articles ORDER BY id DESC"
-    )
-    rows = cur.fetchall()
+    new_bands: list[tuple] = []
+    lsh_index = LSHIndex()
 
     seen_by_category: Dict[str, list[dict]] = {}
     seen_by_category_block: Dict[str, dict[str, list[dict]]] = defaultdict(dict)
     seen_by_norm_url: Dict[str, dict] = {}
-    deleted = 0
+    decisions: list[dict] = []
     candidate_checked = 0
     judged_ids: list[int] = []
 
-    for idx, (i, source, category, title, url, url_norm, already_checked) in enumerate(rows, start=1):
-        cat_key = (category or "").strip().lower() or "default"
-        norm_title = normalize_title(title)
-        norm_url = normalize_url(url_norm or url)
+    for idx, row in enumerate(rows, start=1):
+        i, source, category, already_checked, cat_key, norm_title, norm_url, params, stored_bands = row
         threshold = category_threshold(category)
 
         exact_url_kept = seen_by_norm_url.get(norm_url) if norm_url else None
         if exact_url_kept is not None:
-            cur.execute("DELETE FROM articles WHERE id=?", (i,))
-            log_decision(
-                cur,
-                article_id=i,
-                kept_article_id=exact_url_kept["id"],
-                article_source=source,
-                kept_source=exact_url_kept["source"],
-                article_category=category,
-                title_score=0.0,
-                url_score=100.0,
-                composite_score=100.0,
-                threshold=threshold,
-                title_match=False,
-                url_exact_match=True,
-                decision="delete",
-                reason="url_exact",
-            )
-            deleted += 1
+            decisions.append(_url_exact_decision(row, exact_url_kept["id"], exact_url_kept["source"]))
             continue
 
         category_seen = seen_by_category.get(cat_key, [])
@@ -276,10 +473,21 @@ def main():
         category_window = _window_for_category(CANDIDATE_WINDOW_PER_CATEGORY, cat_key)
         block_window = _window_for_category(CANDIDATE_WINDOW_PER_BLOCK, cat_key)
         title_tokens = _title_tokens(norm_title)
-        title_token_set = set(title_tokens)
+        # token set ratio の比較対象（整列済みトークン集合の連結）
+        title_token_str = " ".join(sorted(set(title_tokens)))
         title_token_count = len(title_tokens)
 
-        blocking_keys = _blocking_keys(norm_title)
+        if use_lsh:
+            # 窓の外の記事（URL 重複のためだけに読んだもの）は比較候補にならないので帯キー不要
+            bands: tuple[int, ...] = ()
+            if i >= window_start.get(cat_key, i + 1):
+                if params == PARAMS_KEY:
+                    bands = unpack_bands(stored_bands)
+                else:
+                    bands = minhash_bands(norm_title)
+                    new_bands.append((PARAMS_KEY, pack_bands(bands), i))
+        else:
+            blocking_keys = _blocking_keys(norm_title)
 
         if already_checked:
             # 前回までの実行で「残す」と判定済みの記事は再判定しない。
@@ -287,6 +495,9 @@ def main():
             # 後続の新規記事が従来と同一の候補集合と比較できる状態を保つ。
             # 候補を空にすることで下の for/else が必ず else（＝残す）へ抜ける。
             candidate_slice: list[dict] = []
+        elif use_lsh:
+            # LSH のバケットが一致した記事だけを厳密スコアの対象にする
+            candidate_slice = lsh_index.candidates(cat_key, bands)
         else:
             blocked_candidates: list[dict] = []
             seen_ids: set[int] = set()
@@ -303,6 +514,9 @@ def main():
             else:
                 candidate_slice = list(reversed(category_seen[-category_window:]))
 
+        if use_rapidfuzz:
+            candidate_slice = _prune_candidates(title_token_str, norm_url, threshold, candidate_slice)
+
         for kept in candidate_slice:
             candidate_checked += 1
             if not _is_viable_candidate(norm_title, title_token_count, kept):
@@ -311,7 +525,7 @@ def main():
             kept_title = kept["norm_title"]
             kept_url = kept["norm_url"]
 
-            title_score = _token_set_ratio_from_sets(title_token_set, kept["token_set"])
+            title_score = _ratio(title_token_str, kept["token_str"])
             title_match = title_score >= (threshold - 5)
             if not title_match:
                 continue
@@ -323,24 +537,21 @@ def main():
             is_duplicate = url_exact_match or composite >= threshold
             if is_duplicate:
                 reason = "url_exact" if url_exact_match else "composite_threshold"
-                cur.execute("DELETE FROM articles WHERE id=?", (i,))
-                log_decision(
-                    cur,
-                    article_id=i,
-                    kept_article_id=kept["id"],
-                    article_source=source,
-                    kept_source=kept["source"],
-                    article_category=category,
-                    title_score=title_score,
-                    url_score=url_score,
-                    composite_score=composite,
-                    threshold=threshold,
-                    title_match=title_match,
-                    url_exact_match=url_exact_match,
-                    decision="delete",
-                    reason=reason,
-                )
-                deleted += 1
+                decisions.append({
+                    "article_id": i,
+                    "kept_article_id": kept["id"],
+                    "article_source": source,
+                    "kept_source": kept["source"],
+                    "article_category": category,
+                    "title_score": title_score,
+                    "url_score": url_score,
+                    "composite_score": composite,
+                    "threshold": threshold,
+                    "title_match": title_match,
+                    "url_exact_match": url_exact_match,
+                    "decision": "delete",
+                    "reason": reason,
+                })
                 break
         else:
             kept_entry = {
@@ -348,18 +559,21 @@ def main():
                 "norm_title": norm_title,
                 "norm_url": norm_url,
                 "source": source,
-                "token_set": set(title_tokens),
+                "token_str": title_token_str,
                 "token_count": title_token_count,
                 "title_length": len(norm_title),
             }
-            category_seen.append(kept_entry)
-            seen_by_category[cat_key] = category_seen
+            if use_lsh:
+                lsh_index.add(cat_key, bands, kept_entry)
+            else:
+                category_seen.append(kept_entry)
+                seen_by_category[cat_key] = category_seen
 
-            for bk in blocking_keys:
-                key_items = category_block.setdefault(bk, [])
-                key_items.append(kept_entry)
-                if len(key_items) > block_window * 2:
-                    del key_items[:-block_window]
+                for bk in blocking_keys:
+                    key_items = category_block.setdefault(bk, [])
+                    key_items.append(kept_entry)
+                    if len(key_items) > block_window * 2:
+                        del key_items[:-block_window]
 
             if norm_url:
                 seen_by_norm_url[norm_url] = kept_entry
@@ -370,9 +584,175 @@ def main():
         if idx % 500 == 0:
             logger.info(
                 "dedupe progress processed=%d/%d deleted=%d candidate_checked=%d sec=%.1f",
-                idx, len(rows), deleted, candidate_checked, _now_sec() - t0,
+                idx, len(rows), len(decisions), candidate_checked, _now_sec() - t0,
             )
 
+    return {
+        "decisions": decisions,
+        "judged": judged_ids,
+        "new_bands": new_bands,
+        "candidate_checked": candidate_checked,
+    }
+
+
+
+def _judge_category(args: tuple) -> dict:
+    rows, use_lsh, use_rapidfuzz, window_start = args
+    return _judge_rows(rows, use_lsh=use_lsh, use_rapidfuzz=use_rapidfuzz, window_start=window_start)
+
+
+def _url_exact_plan(rows: list[tuple], composite_deleted: set[int]) -> dict[int, tuple]:
+    """カテゴリをまたぐ URL 完全一致の削除を先に決める（記事 id -> 残す記事の行）。
+
+    直列処理では、同じ正規化 URL を持つ記事のうち最も新しい「残す」記事より古いものが
+    url_exact で削除される。composite_deleted はカテゴリ別の判定で類似削除された
+    記事の id で、該当する記事はその URL の代表にならない。
+    """
+    groups: dict[str, list[tuple]] = defaultdict(list)
+    for row in rows:
+        if row[6]:
+            groups[row[6]].append(row)
+    plan: dict[int, tuple] = {}
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        leader = None
+        for row in members:
+            if leader is not None:
+                plan[row[0]] = leader
+            elif row[0] not in composite_deleted:
+                leader = row
+    return plan
+
+
+def _judge_parallel(
+    rows: list[tuple],
+    *,
+    use_lsh: bool,
+    use_rapidfuzz: bool,
+    window_start: dict[str, int],
+    workers: int,
+) -> dict | None:
+    """URL 完全一致を全体で先に解決し、カテゴリごとの判定をプロセスプールで並列に行う。
+
+    URL の代表が類似削除されると代表が入れ替わり、そのカテゴリの入力も変わるため、
+    類似削除された URL 重複記事の集合が変わらなくなるまでカテゴリ単位で判定し直す
+    （直列処理の結果と一致する）。プールが使えない・収束しない場合は None。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    by_category: dict[str, list[tuple]] = defaultdict(list)
+    for row in rows:
+        by_category[row[4]].append(row)
+    url_counts: dict[str, int] = defaultdict(int)
+    for row in rows:
+        if row[6]:
+            url_counts[row[6]] += 1
+    url_members = {row[0] for row in rows if row[6] and url_counts[row[6]] > 1}
+    category_of = {row[0]: row[4] for row in rows}
+
+    results: dict[str, dict] = {}
+    excluded_prev: dict[str, frozenset[int]] = {}
+    composite_deleted: set[int] = set()
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, NotImplementedError, ValueError) as e:
+        logger.warning("dedupe process pool unavailable; judging serially err=%s", e)
+        return None
+    with executor:
+        for attempt in range(len(url_members) + 1):
+            plan = _url_exact_plan(rows, composite_deleted)
+            excluded_sets: dict[str, set[int]] = defaultdict(set)
+            for article_id in plan:
+                excluded_sets[category_of[article_id]].add(article_id)
+            excluded = {cat: frozenset(ids) for cat, ids in excluded_sets.items()}
+            dirty = [
+                cat for cat in by_category
+                if cat not in results or excluded.get(cat) != excluded_prev.get(cat)
+            ]
+            inputs = [
+                (
+                    [r for r in by_category[cat] if r[0] not in plan],
+                    use_lsh,
+                    use_rapidfuzz,
+                    window_start,
+                )
+                for cat in dirty
+            ]
+            for cat, result in zip(dirty, executor.map(_judge_category, inputs)):
+                results[cat] = result
+            excluded_prev = excluded
+
+            found = {
+                d["article_id"]
+                for result in results.values()
+                for d in result["decisions"]
+                if d["reason"] == "composite_threshold" and d["article_id"] in url_members
+            }
+            if found == composite_deleted:
+                logger.info("dedupe parallel categories=%d rounds=%d", len(by_category), attempt + 1)
+                break
+            composite_deleted = found
+        else:
+            logger.warning("dedupe parallel did not converge; judging serially")
+            return None
+
+    decisions = [_url_exact_decision(row, leader[0], leader[1]) for row in rows if (leader := plan.get(row[0]))]
+    for result in results.values():
+        decisions.extend(result["decisions"])
+    # 直列処理と同じ id 降順で記録する
+    decisions.sort(key=lambda d: d["article_id"], reverse=True)
+    return {
+        "decisions": decisions,
+        "judged": [i for result in results.values() for i in result["judged"]],
+        "new_bands": [b for result in results.values() for b in result["new_bands"]],
+        "candidate_checked": sum(result["candidate_checked"] for result in results.values()),
+    }
+
+
+def main(candidate_mode: str | None = None, scorer: str | None = None, workers: int | None = None):
+    """記事の重複を判定して削除する。
+
+    candidate_mode は候補抽出方式（既定は DEDUPE_CANDIDATES 環境変数）、
+    scorer は候補の採点方式（既定は DEDUPE_SCORER 環境変数）、
+    workers はカテゴリ別判定の並列プロセス数（既定は DEDUPE_WORKERS 環境変数）。
+    """
+    use_lsh = (candidate_mode or DEDUPE_CANDIDATES) != "blocking"
+    use_rapidfuzz = (scorer or DEDUPE_SCORER) != "difflib"
+    workers = DEDUPE_WORKERS if workers is None else workers
+    t0 = _now_sec()
+    logger.info(
+        "step=dedupe start candidates=%s scorer=%s workers=%d",
+        "lsh" if use_lsh else "blocking", "rapidfuzz" if use_rapidfuzz else "difflib", workers,
+    )
+
+    conn = connect()
+    cur = conn.cursor()
+    ensure_dedupe_log_table(cur)
+    # 判定済みフラグ。既に「残す」と判定された記事を毎回再判定しないための増分化用
+    ensure_column(cur, "articles", "dedupe_checked", "INTEGER DEFAULT 0")
+    ensure_features_table(cur)
+    features_computed = refresh_features(cur)
+    rows, window_start = load_dedupe_rows(cur)
+    if workers > 1 and len({row[4] for row in rows}) > 1:
+        result = _judge_parallel(
+            rows, use_lsh=use_lsh, use_rapidfuzz=use_rapidfuzz, window_start=window_start, workers=workers
+        )
+    else:
+        result = None
+    if result is None:
+        result = _judge_rows(rows, use_lsh=use_lsh, use_rapidfuzz=use_rapidfuzz, window_start=window_start)
+    decisions = result["decisions"]
+    judged_ids = result["judged"]
+    new_bands = result["new_bands"]
+    candidate_checked = result["candidate_checked"]
+    deleted = len(decisions)
+
+    # 削除と判定記録は 1 トランザクションでまとめて書く
+    if decisions:
+        cur.executemany("DELETE FROM articles WHERE id=?", [(d["article_id"],) for d in decisions])
+        log_decisions(cur, decisions)
+
     # 今回判定して残した記事に判定済みフラグを立て、次回以降の再判定対象から外す
     if judged_ids:
         cur.executemany(
@@ -380,6 +760,10 @@ def main():
             [(x,) for x in judged_ids],
         )
 
+    if new_bands:
+        # 削除済みの記事の分はトリガで特徴量ごと消えているので UPDATE は空振りする
+        cur.executemany("UPDATE dedupe_features SET params=?, bands=? WHERE article_id=?", new_bands)
+
     # 削除した記事に紐づく topic_articles の孤児行を掃除する
     # （残すとトピックが「記事0件のゾンビ」としてページに現れ、タイムラインが空になる）
     # テスト用の最小DBには topic_articles が無いため存在チェックを挟む
@@ -393,12 +777,27 @@ def main():
         if orphans_removed:
             logger.info("dedupe cleaned orphan topic_articles rows=%d", orphans_removed)
 
+    # 記事を削除したトピックの集計（topic_stats）を削除と同じトランザクションで数え直す
+    stats_refreshed = refresh_topic_stats(cur)
+    if stats_refreshed:
+        logger.info("dedupe refreshed topic_stats topics=%d", stats_refreshed)
+
     conn.commit()
     conn.close()
     logger.info(
-        "step=dedupe end sec=%.1f deleted=%d total=%d judged=%d candidate_checked=%d",
+        "step=dedupe end sec=%.1f deleted=%d loaded=%d judged=%d candidate_checked=%d "
+        "features_computed=%d minhash_computed=%d",
         _now_sec() - t0, deleted, len(rows), len(judged_ids), candidate_checked,
+        features_computed, len(new_bands),
     )
+    return {
+        "deleted": deleted,
+        "loaded": len(rows),
+        "features_computed": features_computed,
+        "judged": len(judged_ids),
+        "candidate_checked": candidate_checked,
+        "minhash_computed": len(new_bands),
+    }
 
 
 if __name__ == "__main__":
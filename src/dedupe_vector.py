@@ -1,18 +1,26 @@
 """ベクトル類似度を用いた記事・トピック dedupe（オプション機能）。
 
 環境変数 USE_VECTOR_DEDUPE=1 のとき有効。sentence-transformers が未インストールなら
-自動でフォールバック（既存の文字列類似のみ使用）する。
+自動でフォールバック（既存の文字列類似のみ使用）する。VECTOR_DEDUPE_MODEL=hashing なら
+sentence-transformers を使わず、組み込みのハッシュ TF-IDF（embedding_hashing、numpy のみ）で
+埋め込む。
 
 使い方:
     # 単体実行（既存 dedupe の後に重複を再判定）
     USE_VECTOR_DEDUPE=1 python src/dedupe_vector.py
     python src/dedupe_vector.py --threshold 0.80
+    VECTOR_DEDUPE_MODEL=hashing python src/dedupe_vector.py --threshold 0.5
 
 設計:
 - 既存の dedupe.py は変更しない（互換維持）
 - 埋め込みはタイトル単位。本文は重すぎるため使わない
 - 類似度 >= threshold かつ同日・同カテゴリの記事ペアを merge 候補として出す
+  （--across-categories でカテゴリをまたいだ比較も可能）
+- 類似度は n×n 行列を作らず、TILE_SIZE 四方のタイルごとに NumPy で計算して
+  上三角のしきい値超えだけを取り出す（メモリは 1 タイル分）
 - モデルは paraphrase-multilingual-MiniLM-L12-v2（CPU でも数千件処理可）
+- 埋め込みは embedding_store に (モデル名, タイトル) 単位でキャッシュし、
+  未計算のタイトルだけをバッチで encode する（全件キャッシュ済みならモデルも読み込まない）
 """
 from __future__ import annotations
 
@@ -28,19 +36,31 @@ DEFAULT_MODEL = os.environ.get(
     "VECTOR_DEDUPE_MODEL", "paraphrase-multilingual-MiniLM-L12-v2"
 )
 DEFAULT_THRESHOLD = float(os.environ.get("VECTOR_DEDUPE_THRESHOLD", "0.82"))
+# 類似度行列を計算するタイルの一辺（1 タイル = TILE_SIZE^2 個の float32。2048 で 16MB）
+TILE_SIZE = int(os.environ.get("VECTOR_DEDUPE_TILE", "2048"))
 
 
 def _is_enabled() -> bool:
     return os.environ.get("USE_VECTOR_DEDUPE", "").strip() in ("1", "true", "True", "yes")
 
 
+def _is_hashing(model_name: str) -> bool:
+    return model_name.strip().lower() == "hashing"
+
+
 def _load_model(model_name: str = DEFAULT_MODEL):
-    """sentence-transformers をオプショナルに読み込む。失敗時は None。"""
+    """埋め込みモデルを読み込む（hashing は組み込み、それ以外は sentence-transformers）。失敗時は None。"""
     try:
+        if _is_hashing(model_name):
+            from embedding_hashing import HashingTfidfModel
+            return HashingTfidfModel()
         from sentence_transformers import SentenceTransformer
         return SentenceTransformer(model_name)
     except Exception as e:
-        print(f"[dedupe_vector] sentence-transformers 未利用: {type(e).__name__}: {e}")
+        print(
+            f"[dedupe_vector] 埋め込みモデル {model_name} 未利用: {type(e).__name__}: {e}"
+            "（VECTOR_DEDUPE_MODEL=hashing なら numpy だけで動作）"
+        )
         return None
 
 
@@ -50,25 +70,26 @@ def find_duplicate_candidates(
     threshold: float = DEFAULT_THRESHOLD,
     model_name: str = DEFAULT_MODEL,
     conn=None,
+    cache_dir=None,
+    across_categories: bool = False,
+    tile_size: int = TILE_SIZE,
 ) -> list[dict]:
     """直近 N 日の記事を対象に、ベクトル類似度で重複候補ペアを検出する。
 
     戻り値の各要素: {
       "a_id", "a_title", "b_id", "b_title", "score", "category"
     }
-    a_id < b_id で重複除去済み。同一カテゴリ内でのみ比較。
+    a_id < b_id で重複除去済み。既定では同一カテゴリ内でのみ比較し、
+    across_categories=True なら全記事をまとめて比較する（カテゴリが異なるペアの
+    category は "a のカテゴリ|b のカテゴリ"）。
     """
     if not _is_enabled():
         print("[dedupe_vector] USE_VECTOR_DEDUPE 未設定のため無効（既存 dedupe のみ）")
         return []
 
-    model = _load_model(model_name)
-    if model is None:
-        return []
-
     owns_conn = False
     if conn is None:
-        conn = connect()
+        conn = connect(readonly=True)
         owns_conn = True
     cur = conn.cursor()
 
@@ -92,42 +113,126 @@ def find_duplicate_candidates(
         return []
 
     # カテゴリ別にグルーピングして比較件数を抑える
-    by_cat: dict[str, list[tuple[int, str]]] = {}
+    by_cat: dict[str, list[tuple[int, str, str]]] = {}
     for aid, title, cat in rows:
-        by_cat.setdefault(cat, []).append((int(aid), title))
+        by_cat.setdefault("*" if across_categories else cat, []).append((int(aid), title, cat))
+
+    if _is_hashing(model_name):
+        return _find_with_hashing(by_cat, threshold, tile_size)
+
+    try:
+        from embedding_store import EmbeddingStore  # numpy は sentence-transformers と一緒に入る
+    except ImportError as e:
+        print(f"[dedupe_vector] numpy 未利用: {e}")
+        return []
+
+    store = EmbeddingStore(model_name, cache_dir)
+    model = None
+
+    def encode(batch: list[str]):
+        # キャッシュに無いタイトルが出たときだけモデルを読み込む
+        nonlocal model
+        if model is None:
+            model = _load_model(model_name)
+            if model is None:
+                return None
+        return model.encode(batch, show_progress_bar=False, normalize_embeddings=True)
+
+    candidates: list[dict] = []
+    try:
+        for items in by_cat.values():
+            if len(items) < 2:
+                continue
+            titles = [t for _, t, _ in items]
+            embeddings = store.embed(titles, encode)
+            if embeddings is None:
+                return []
+            candidates.extend(_candidates_for_group(items, embeddings, threshold, tile_size))
+        evicted = store.evict()
+        print(
+            f"[dedupe_vector] embeddings cached={store.hits} encoded={store.encoded} "
+            f"evicted={evicted} store_rows={store.rows}"
+        )
+    finally:
+        store.close()
+
+    candidates.sort(key=lambda x: -x["score"])
+    return candidates
+
 
+def _candidates_for_group(items: list[tuple[int, str, str]], embeddings, threshold: float, tile_size: int) -> list[dict]:
     candidates: list[dict] = []
-    for cat, items in by_cat.items():
+    for i, j, score in zip(*similar_pairs(embeddings, threshold, tile_size=tile_size)):
+        a_id, a_title, a_cat = items[i]
+        b_id, b_title, b_cat = items[j]
+        candidates.append({
+            "a_id": a_id, "a_title": a_title,
+            "b_id": b_id, "b_title": b_title,
+            "score": round(float(score), 3),
+            "category": a_cat if a_cat == b_cat else f"{a_cat}|{b_cat}",
+        })
+    return candidates
+
+
+def _find_with_hashing(by_cat: dict[str, list[tuple[int, str, str]]], threshold: float, tile_size: int) -> list[dict]:
+    """組み込みのハッシュ TF-IDF で埋め込む（IDF はグループごとに求めるためキャッシュしない）。"""
+    model = _load_model("hashing")
+    if model is None:
+        return []
+    candidates: list[dict] = []
+    for items in by_cat.values():
         if len(items) < 2:
             continue
-        titles = [t for _, t in items]
-        ids = [i for i, _ in items]
-        embeddings = model.encode(titles, show_progress_bar=False, normalize_embeddings=True)
-        # cosine 類似度 (正規化済みなので内積 = cosine)
-        import numpy as np  # sentence-transformers と一緒に入る
-
-        mat = embeddings @ embeddings.T
-        n = len(items)
-        for i in range(n):
-            for j in range(i + 1, n):
-                score = float(mat[i][j])
-                if score >= threshold:
-                    candidates.append({
-                        "a_id": ids[i], "a_title": titles[i],
-                        "b_id": ids[j], "b_title": titles[j],
-                        "score": round(score, 3), "category": cat,
-                    })
-
+        embeddings = model.encode([t for _, t, _ in items], normalize_embeddings=True)
+        candidates.extend(_candidates_for_group(items, embeddings, threshold, tile_size))
     candidates.sort(key=lambda x: -x["score"])
     return candidates
 
 
+def similar_pairs(embeddings, threshold: float, *, tile_size: int = TILE_SIZE):
+    """正規化済み埋め込みの上三角（i < j）で内積が threshold 以上のペアを返す。
+
+    n×n の類似度行列は作らず、tile_size 行 × tile_size 列のタイルごとに内積を取り、
+    しきい値を超えた位置だけを取り出す。戻り値は (i, j, score) の 3 配列で、
+    (i, j) の辞書順（従来の二重ループと同じ順）に並ぶ。
+    """
+    import numpy as np  # sentence-transformers と一緒に入る
+
+    emb = np.asarray(embeddings, dtype=np.float32)
+    n = len(emb)
+    tile_size = max(1, int(tile_size))
+    found_i, found_j, found_s = [], [], []
+    for r0 in range(0, n, tile_size):
+        rows = emb[r0:r0 + tile_size]
+        for c0 in range(r0, n, tile_size):
+            # cosine 類似度 (正規化済みなので内積 = cosine)
+            block = rows @ emb[c0:c0 + tile_size].T
+            ii, jj = np.nonzero(block >= threshold)
+            if c0 == r0:
+                upper = jj > ii
+                ii, jj = ii[upper], jj[upper]
+            if len(ii):
+                found_i.append(ii + r0)
+                found_j.append(jj + c0)
+                found_s.append(block[ii, jj])
+    if not found_i:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float32)
+    i = np.concatenate(found_i)
+    j = np.concatenate(found_j)
+    scores = np.concatenate(found_s)
+    order = np.lexsort((j, i))
+    return i[order], j[order], scores[order]
+
+
 def main() -> int:
     p = argparse.ArgumentParser(description=__doc__)
     p.add_argument("--days", type=int, default=7)
     p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
     p.add_argument("--model", default=DEFAULT_MODEL)
     p.add_argument("--limit", type=int, default=50, help="表示する候補数の上限")
+    p.add_argument("--across-categories", action="store_true", help="カテゴリをまたいで比較する")
+    p.add_argument("--tile-size", type=int, default=TILE_SIZE, help="類似度計算のタイルの一辺")
     args = p.parse_args()
 
     if not _is_enabled():
@@ -135,7 +240,8 @@ def main() -> int:
         os.environ["USE_VECTOR_DEDUPE"] = "1"
 
     results = find_duplicate_candidates(
-        days=args.days, threshold=args.threshold, model_name=args.model
+        days=args.days, threshold=args.threshold, model_name=args.model,
+        across_categories=args.across_categories, tile_size=args.tile_size,
     )
     print(f"候補 {len(results)} ペア (threshold={args.threshold}, days={args.days})")
     for c in results[: args.limit]:
@@ -85,7 +85,7 @@ def compute_diff(conn=None, *, gap_threshold: int = 10) -> dict:
     """
     owns_conn = False
     if conn is None:
-        conn = connect()
+        conn = connect(readonly=True)
         owns_conn = True
     cur = conn.cursor()
 
@@ -0,0 +1,93 @@
+"""依存ライブラリなしの簡易埋め込み: ハッシュ化した文字 n-gram の TF-IDF。
+
+VECTOR_DEDUPE_MODEL=hashing のとき dedupe_vector が sentence-transformers の代わりに使う。
+意味的な言い換えは拾えないが、表記ゆれ・語順違い・日英混在の見出しの近さは
+十分に表せ、CPU でも数万件を数秒で埋め込める（モデルの読み込みも不要）。
+
+特徴量（NFKC 正規化・小文字化した見出しから）:
+- 文字 2-gram / 3-gram（前後に空白を補う。日本語は語の区切りが無いため文字単位が基本）
+- 空白区切りの語（英語の語単位の一致を強める）
+
+各特徴量を CRC32 で HASHING_DIM 次元に割り当て（符号付きハッシュで衝突の偏りを打ち消す）、
+TF は 1 + log(tf)、IDF は encode() に渡した見出し集合から求める。したがって
+ベクトルは同じ呼び出しの中でだけ比較可能で、埋め込みキャッシュには保存しない。
+"""
+from __future__ import annotations
+
+import math
+import os
+import re
+import unicodedata
+import zlib
+from collections import Counter
+
+import numpy as np
+
+HASHING_MODEL_NAME = "hashing"
+HASHING_DIM = int(os.environ.get("VECTOR_HASHING_DIM", "1024"))
+NGRAM_SIZES = (2, 3)
+
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def _normalize(title: str) -> str:
+    s = unicodedata.normalize("NFKC", title or "").lower()
+    s = _PUNCT_RE.sub(" ", s)
+    return _SPACE_RE.sub(" ", s).strip()
+
+
+def title_features(title: str) -> Counter:
+    """見出しの特徴量（文字 n-gram と語）の出現回数。"""
+    s = _normalize(title)
+    feats: Counter = Counter()
+    if not s:
+        return feats
+    padded = f" {s} "
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            gram = padded[i:i + n]
+            if gram.strip():
+                feats["c:" + gram] += 1
+    for word in s.split(" "):
+        feats["w:" + word] += 1
+    return feats
+
+
+class HashingTfidfModel:
+    """SentenceTransformer と同じ encode() 呼び出しで使えるハッシュ TF-IDF 埋め込み。"""
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self._buckets: dict[str, tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        hit = self._buckets.get(feature)
+        if hit is None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            hit = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+            self._buckets[feature] = hit
+        return hit
+
+    def encode(self, titles: list[str], *, normalize_embeddings: bool = True, **_kwargs) -> np.ndarray:
+        """titles を (len(titles), dim) の float32 行列にする。IDF は titles から求める。"""
+        n = len(titles)
+        flat: list[int] = []
+        vals: list[float] = []
+        for r, title in enumerate(titles):
+            base = r * self.dim
+            for feature, tf in title_features(title).items():
+                col, sign = self._bucket(feature)
+                flat.append(base + col)
+                vals.append(sign * (1.0 + math.log(tf)))
+        # 同じ行・列への衝突は bincount で足し合わせる（np.add.at より大幅に速い）
+        mat = np.bincount(
+            np.asarray(flat, dtype=np.int64), weights=np.asarray(vals, dtype=np.float64), minlength=n * self.dim
+        ).astype(np.float32).reshape(n, self.dim)
+        df = np.count_nonzero(mat, axis=0)
+        idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        mat *= idf
+        if normalize_embeddings:
+            norms = np.linalg.norm(mat, axis=1, keepdims=True)
+            np.divide(mat, norms, out=mat, where=norms > 0)
+        return mat
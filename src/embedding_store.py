@@ -0,0 +1,190 @@
+"""タイトル埋め込みの永続キャッシュ（dedupe_vector 用）。
+
+収集済み記事のタイトルは変わらないため、埋め込みは (モデル名, タイトルのハッシュ) を
+キーに一度だけ計算して保存し、次回以降は読み出すだけにする。
+
+保存形式（モデルごとのディレクトリ）:
+    <VECTOR_EMBED_CACHE_DIR>/<モデル名>/vectors*.f32  float32 行列（行 = 埋め込み、追記のみ）
+    <VECTOR_EMBED_CACHE_DIR>/<モデル名>/index.sqlite  title_hash -> (行番号, 最終利用日時)
+
+行列は np.memmap で開くので、参照する行だけがメモリに載る。最終利用から
+VECTOR_EMBED_CACHE_MAX_AGE_DAYS 日を超えた行は evict() で索引から外し、
+行列は生きている行だけで書き直す（行番号は詰め直す）。
+
+numpy は sentence-transformers と一緒に入る前提のオプション依存。
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from db import DB_PATH
+
+CACHE_DIR = Path(os.environ.get("VECTOR_EMBED_CACHE_DIR", str(DB_PATH.parent / "embeddings")))
+MAX_AGE_DAYS = int(os.environ.get("VECTOR_EMBED_CACHE_MAX_AGE_DAYS", "30"))
+ENCODE_BATCH_SIZE = int(os.environ.get("VECTOR_EMBED_BATCH_SIZE", "64"))
+
+_DTYPE = np.dtype("<f4")
+
+
+def title_hash(title: str) -> str:
+    return hashlib.blake2b((title or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _model_dirname(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_name).strip("_") or "model"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class EmbeddingStore:
+    """1 モデル分の埋め込みキャッシュ。"""
+
+    def __init__(self, model_name: str, cache_dir: Path | str | None = None):
+        self.model_name = model_name
+        self.dir = Path(cache_dir or CACHE_DIR) / _model_dirname(model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.dir / "index.sqlite")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+              title_hash TEXT PRIMARY KEY,
+              row INTEGER NOT NULL,
+              last_used TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        self.dim = int(meta["dim"]) if "dim" in meta else None
+        self.vectors_path = self.dir / meta.get("file", "vectors.f32")
+        self.rows = self._file_rows()
+        self.encoded = 0
+        self.hits = 0
+
+    def _file_rows(self) -> int:
+        if self.dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * _DTYPE.itemsize)
+
+    def _matrix(self):
+        if not self.rows:
+            return np.zeros((0, self.dim or 0), dtype=_DTYPE)
+        return np.memmap(self.vectors_path, dtype=_DTYPE, mode="r", shape=(self.rows, self.dim))
+
+    def lookup(self, hashes: list[str]) -> dict[str, int]:
+        """保存済みのハッシュ -> 行番号。"""
+        found: dict[str, int] = {}
+        unique = list(dict.fromkeys(hashes))
+        # SQLite の変数上限（既定 999）を超えないよう分割して引く
+        for start in range(0, len(unique), 900):
+            chunk = unique[start:start + 900]
+            marks = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT title_hash, row FROM embeddings WHERE title_hash IN ({marks})", chunk
+            ).fetchall())
+        # 索引だけ残って行列が欠けている行（書き込み途中で落ちた等）は未保存扱い
+        return {h: r for h, r in found.items() if r < self.rows}
+
+    def add(self, hashes: list[str], vectors) -> None:
+        """埋め込みを行列の末尾に追記し、索引に登録する。"""
+        vectors = np.asarray(vectors, dtype=_DTYPE)
+        if not len(hashes):
+            return
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('dim', ?)", (str(self.dim),))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"embedding dim mismatch: {vectors.shape[1]} != {self.dim}")
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors).tobytes())
+        now = _now_iso()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings(title_hash, row, last_used) VALUES (?, ?, ?)",
+            [(h, self.rows + k, now) for k, h in enumerate(hashes)],
+        )
+        self.conn.commit()
+        self.rows += len(hashes)
+
+    def embed(self, titles: list[str], encode, batch_size: int = ENCODE_BATCH_SIZE):
+        """titles の埋め込み行列（len(titles) × dim）を返す。
+
+        キャッシュに無いタイトルだけを batch_size 件ずつ encode(list[str]) で計算して保存する。
+        encode が None を返したら（モデルが使えない等）None を返す。
+        """
+        hashes = [title_hash(t) for t in titles]
+        known = self.lookup(hashes)
+        missing: dict[str, str] = {}
+        for h, t in zip(hashes, titles):
+            if h not in known and h not in missing:
+                missing[h] = t
+        self.hits += len(titles) - sum(1 for h in hashes if h in missing)
+
+        items = list(missing.items())
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            vectors = encode([t for _, t in batch])
+            if vectors is None:
+                return None
+            self.add([h for h, _ in batch], vectors)
+            self.encoded += len(batch)
+        if items:
+            known = self.lookup(hashes)
+
+        self.conn.executemany(
+            "UPDATE embeddings SET last_used=? WHERE title_hash=?",
+            [(_now_iso(), h) for h in dict.fromkeys(hashes)],
+        )
+        self.conn.commit()
+        if not titles:
+            return np.zeros((0, self.dim or 0), dtype=_DTYPE)
+        return np.asarray(self._matrix()[[known[h] for h in hashes]])
+
+    def evict(self, max_age_days: int = MAX_AGE_DAYS) -> int:
+        """最終利用が max_age_days 日より前の行を捨てて行列を詰め直し、捨てた件数を返す。"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        stale = self.conn.execute("SELECT COUNT(*) FROM embeddings WHERE last_used < ?", (cutoff,)).fetchone()[0]
+        if not stale:
+            return 0
+        live = self.conn.execute(
+            "SELECT title_hash, row FROM embeddings WHERE last_used >= ? AND row < ? ORDER BY row",
+            (cutoff, self.rows),
+        ).fetchall()
+        # 詰め直した行列は別名で書き、索引と参照先ファイル名を 1 トランザクションで切り替える
+        # （途中で落ちても旧ファイルと旧索引の組が残る）
+        generation = int(self.conn.execute(
+            "SELECT COALESCE((SELECT value FROM meta WHERE key='generation'), 0)"
+        ).fetchone()[0]) + 1
+        new_path = self.dir / f"vectors.{generation}.f32"
+        matrix = self._matrix()
+        with open(new_path, "wb") as f:
+            for start in range(0, len(live), 4096):
+                rows = [r for _, r in live[start:start + 4096]]
+                f.write(np.ascontiguousarray(matrix[rows]).tobytes())
+        del matrix
+        self.conn.execute("DELETE FROM embeddings WHERE last_used < ? OR row >= ?", (cutoff, self.rows))
+        self.conn.executemany(
+            "UPDATE embeddings SET row=? WHERE title_hash=?",
+            [(new_row, h) for new_row, (h, _) in enumerate(live)],
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+            [("file", new_path.name), ("generation", str(generation))],
+        )
+        self.conn.commit()
+        old_path, self.vectors_path = self.vectors_path, new_path
+        old_path.unlink(missing_ok=True)
+        self.rows = len(live)
+        return stale
+
+    def close(self) -> None:
+        self.conn.close()
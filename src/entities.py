@@ -164,7 +164,7 @@ def render_entity_pages(out_dir: Path | str, *, conn=None, top_n: int = 30) -> i
 
     owns_conn = False
     if conn is None:
-        conn = connect()
+        conn = connect(readonly=True)
         owns_conn = True
     cur = conn.cursor()
 
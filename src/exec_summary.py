@@ -222,7 +222,7 @@ def _render_index(categories_with_output: list[tuple[str, str]]) -> str:
 
 def generate(categories: list[str], *, no_llm: bool = False) -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    conn = connect()
+    conn = connect(readonly=True)
     cur = conn.cursor()
 
     generated: list[tuple[str, str]] = []
@@ -0,0 +1,175 @@
+"""フィードの逐次パース（件数上限で打ち切る高速経路）。
+
+feedparser.parse() は文書全体をパースしてから entries[:limit] を切り出すため、
+arXiv の大量リストや全エントリに本文 HTML を持つ Atom など大きなフィードでは、
+捨てるエントリのために CPU とメモリを使ってしまう。本モジュールは lxml の
+iterparse で item / entry を文書順に読み、limit 件に達した時点で打ち切る。
+
+対応形式: RSS 2.0 / RSS 1.0 (RDF) / Atom 1.0。以下の場合は None を返し、
+呼び出し側は feedparser にフォールバックする:
+  - XML として壊れている（feedparser は bozo として読めることがある）
+  - item / entry が 1 件も無い、未知の形式（Atom 0.3 など）
+  - 相対リンク、xhtml 本文、子要素を含む description、解釈できない日付など
+    feedparser の正規化に任せるべきエントリを含む
+
+戻り値は feedparser.FeedParserDict で、collect.process_feed が参照する
+entries[*].title / link / summary / content[0].value / published(_parsed) /
+updated(_parsed) と bozo を feedparser と同じ形で持つ。
+feedparser のような HTML サニタイズは行わず script/style の除去のみ行う
+（エンティティの再エスケープ有無など本文テキストに軽微な差が出ることがある）。
+"""
+from __future__ import annotations
+
+import io
+import logging
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import feedparser
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS10_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+_RSS20_ITEM = "item"
+_RSS10_ITEM = f"{{{RSS10_NS}}}item"
+_ATOM_ENTRY = f"{{{ATOM_NS}}}entry"
+_ITEM_TAGS = (_RSS20_ITEM, _RSS10_ITEM, _ATOM_ENTRY)
+
+_SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style)\b.*?>.*?</\1\s*>")
+
+
+class _Unsupported(Exception):
+    """高速経路では扱わず feedparser に任せるべき入力。"""
+
+
+def _text(el) -> str:
+    if len(el):
+        # 子要素を持つ（xhtml 本文や非エスケープ HTML）ものは feedparser に任せる
+        raise _Unsupported(f"nested markup in {el.tag}")
+    return (el.text or "").strip()
+
+
+def _html(el) -> str:
+    return _SCRIPT_STYLE_RE.sub("", _text(el))
+
+
+def _parse_date(value: str):
+    """RFC 822 / ISO 8601 を UTC の struct_time に変換する（feedparser の *_parsed 相当）。"""
+    if not value:
+        return None
+    dt = None
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise _Unsupported(f"unparsable date {value!r}") from None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).timetuple()
+
+
+def _set_date(entry: feedparser.FeedParserDict, key: str, value: str):
+    if not value or key in entry:
+        return
+    entry[key] = value
+    entry[f"{key}_parsed"] = _parse_date(value)
+
+
+def _check_link(link: str) -> str:
+    if not link.startswith(("http://", "https://")):
+        raise _Unsupported(f"relative or missing link {link!r}")
+    return link
+
+
+def _rss_entry(el, ns: str) -> feedparser.FeedParserDict:
+    entry = feedparser.FeedParserDict()
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == f"{ns}title":
+            entry["title"] = _text(child)
+        elif tag == f"{ns}link":
+            entry["link"] = _text(child)
+        elif tag == f"{ns}description":
+            entry["summary"] = _html(child)
+        elif tag == f"{{{CONTENT_NS}}}encoded":
+            entry["content"] = [{"value": _html(child)}]
+        elif tag == f"{ns}pubDate":
+            _set_date(entry, "published", _text(child))
+        elif tag == f"{{{DC_NS}}}date":
+            _set_date(entry, "updated", _text(child))
+    entry["link"] = _check_link(entry.get("link", ""))
+    return entry
+
+
+def _atom_entry(el) -> feedparser.FeedParserDict:
+    entry = feedparser.FeedParserDict()
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == f"{{{ATOM_NS}}}title":
+            entry["title"] = _text(child)
+        elif tag == f"{{{ATOM_NS}}}link":
+            if child.get("rel", "alternate") == "alternate" and "link" not in entry:
+                entry["link"] = (child.get("href") or "").strip()
+        elif tag == f"{{{ATOM_NS}}}summary":
+            entry["summary"] = _html(child)
+        elif tag == f"{{{ATOM_NS}}}content":
+            if child.get("type") == "xhtml" or child.get("src"):
+                raise _Unsupported("xhtml or out-of-line atom content")
+            entry["content"] = [{"value": _html(child)}]
+        elif tag == f"{{{ATOM_NS}}}published":
+            _set_date(entry, "published", _text(child))
+        elif tag == f"{{{ATOM_NS}}}updated":
+            _set_date(entry, "updated", _text(child))
+    entry["link"] = _check_link(entry.get("link", ""))
+    return entry
+
+
+def parse_feed_limited(content: bytes, limit: int):
+    """先頭から limit 件のエントリだけをパースする。扱えない入力なら None。"""
+    if not content or limit <= 0:
+        return None
+    entries = []
+    version = ""
+    try:
+        context = etree.iterparse(
+            io.BytesIO(content),
+            events=("end",),
+            tag=_ITEM_TAGS,
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+        )
+        for _event, el in context:
+            if el.tag == _ATOM_ENTRY:
+                version = version or "atom10"
+                entries.append(_atom_entry(el))
+            elif el.tag == _RSS10_ITEM:
+                version = version or "rss10"
+                entries.append(_rss_entry(el, f"{{{RSS10_NS}}}"))
+            else:
+                version = version or "rss20"
+                entries.append(_rss_entry(el, ""))
+            # 処理済みの要素は解放し、巨大フィードでもメモリを一定に保つ
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+            if len(entries) >= limit:
+                break
+    except (etree.XMLSyntaxError, _Unsupported) as e:
+        logger.debug("fastparse fallback to feedparser: %s", e)
+        return None
+    if not entries:
+        return None
+    return feedparser.FeedParserDict(entries=entries, bozo=0, version=version, fastparse=True)
@@ -20,6 +20,7 @@ from concurrent.futures import ThreadPoolExecutor
 import feedparser
 import requests
 
+import http_client
 from db import connect
 
 if os.name == "nt":
@@ -27,13 +28,14 @@ if os.name == "nt":
 
 UA = {"User-Agent": "DailyTechTrend/1.0 (+feed health recheck)"}
 TIMEOUT = 15
+WORKERS = 8
 
 
 def check_feed(url: str) -> dict:
     """フィードを取得して状態を分類する。"""
     result = {"url": url, "status": "dead", "detail": "", "final_url": url}
     try:
-        r = requests.get(url, headers=UA, timeout=TIMEOUT, allow_redirects=True)
+        r = http_client.get(url, headers=UA, timeout=TIMEOUT, allow_redirects=True)
         result["final_url"] = r.url
         result["detail"] = f"http={r.status_code}"
         if r.status_code != 200:
@@ -68,8 +70,14 @@ def main() -> int:
     targets = cur.fetchall()
     print(f"[feed_recheck] 対象 {len(targets)} 件 (failure_count >= {args.min_failures})")
 
-    with ThreadPoolExecutor(max_workers=8) as ex:
+    http_client.configure(pool_maxsize=WORKERS)
+    with ThreadPoolExecutor(max_workers=WORKERS) as ex:
         results = list(ex.map(lambda t: check_feed(t[0]), targets))
+    http_stats = http_client.pool_stats()
+    print(
+        f"[feed_recheck] http requests={http_stats['requests']} new_connections={http_stats['new_connections']} "
+        f"reuse_rate={http_stats['reuse_rate']:.0%} dns_hits={http_stats['dns_hits']}"
+    )
 
     alive = [r for r in results if r["status"] == "alive"]
     moved = [r for r in results if r["status"] == "moved"]
@@ -1,10 +1,11 @@
-import sqlite3
 from pathlib import Path
 
+from db import connect
+
 def main():
     base = Path(__file__).resolve().parent.parent
     db = base / "data" / "state.sqlite"
-    con = sqlite3.connect(db)
+    con = connect(db)
     cur = con.cursor()
     cur.execute("""
     UPDATE articles
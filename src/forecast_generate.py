@@ -11,7 +11,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
-from db import connect, init_db
+from db import archive_source, connect, event_ts_expr, init_db
 from llm_insights_api import (
     post_ollama,
     _get_lm_content,
@@ -73,18 +73,20 @@ def build_news_digest(cur, hours: int = 48, per_cat: int = 5) -> str:
     """直近の記事からカテゴリ別にサンプリングし、ダイジェストテキストを構築
 
     重要度が MIN_IMPORTANCE 未満の記事は除外する（insight未生成の新着記事はデフォルト50扱いで含める）。
+    期間が退避の境界より前にかかり、cur が退避 DB を ATTACH した接続なら退避済みの記事も読む。
     """
     cutoff = (datetime.now(timezone.utc) - timedelta(hours=hours)).strftime(
         "%Y-%m-%d %H:%M:%S"
     )
-    cur.execute("""
+    cur.execute(f"""
         SELECT a.title, a.category,
                COALESCE(ti.summary, '') as summary,
                COALESCE(ti.importance, 50) as importance
-        FROM articles a
-        LEFT JOIN topic_articles ta ON ta.article_id = a.id AND ta.is_representative = 1
-        LEFT JOIN topic_insights ti ON ti.topic_id = ta.topic_id
-        WHERE datetime(a.fetched_at) >= datetime(?)
+        FROM {archive_source(cur, "articles", cutoff)} a
+        LEFT JOIN {archive_source(cur, "topic_articles", cutoff)} ta
+          ON ta.article_id = a.id AND ta.is_representative = 1
+        LEFT JOIN {archive_source(cur, "topic_insights", cutoff)} ti ON ti.topic_id = ta.topic_id
+        WHERE {event_ts_expr(cur, "a.")} >= datetime(?)
           AND COALESCE(ti.importance, 50) >= ?
         ORDER BY ti.importance DESC NULLS LAST
     """, (cutoff, MIN_IMPORTANCE))
@@ -769,7 +771,7 @@ def _aggregate_topic_perspectives(cur, hours: int = 48,
             FROM topic_insights ti
             JOIN topic_articles ta ON ta.topic_id = ti.topic_id AND ta.is_representative = 1
             JOIN articles a ON a.id = ta.article_id
-            WHERE datetime(a.fetched_at) >= datetime(?)
+            WHERE {event_ts_expr(cur, "a.")} >= datetime(?)
               AND ti.perspectives IS NOT NULL
               AND COALESCE(ti.importance, 0) >= 50
               AND a.category IN ({placeholders})
@@ -377,7 +377,8 @@ def main():
     print("[forecast_verify] 開始")
 
     init_db()
-    conn = connect()
+    # ダイジェストの期間が退避の境界より前にかかるときは退避済みの記事も読む
+    conn = connect(archive=True)
     cur = conn.cursor()
 
     today = datetime.now(timezone.utc)
@@ -0,0 +1,234 @@
+"""collect / 本文取得 / feed_recheck 共通の HTTP クライアント層。
+
+従来は取得のたびに requests.get / urllib.request.urlopen を呼んでおり、同一ホストの
+フィード・記事でも毎回 TCP + TLS ハンドシェイクからやり直していた。ここでは
+  - tls_mode（strict / relaxed）ごとに 1 つの requests.Session を共有し、
+    ホスト単位のコネクションプール（keep-alive）を使い回す
+  - プールサイズは呼び出し側のワーカー数に合わせる（configure(pool_maxsize=...)）
+  - 名前解決結果を TTL 付きでキャッシュする（socket.getaddrinfo をプロセス全体で差し替え、
+    close_sessions() で元に戻す）
+  - リクエスト数と新規接続数を数え、接続再利用率をログに出す
+を行う。Session / urllib3 のプールはスレッド間で共有してよい。
+
+User-Agent 等のヘッダはリクエストごとに渡す（フィード単位の user_agent 指定に対応）。
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# 1 ホストあたりの保持接続数（並列ワーカー数以上にしないと接続が捨てられる）
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "8"))
+# プールを保持するホスト数。requests 既定の 10 では 100 超のフィードで LRU 追い出しが起きる
+HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", "256"))
+# 名前解決キャッシュの有効秒数（0 で無効）
+HTTP_DNS_CACHE_TTL_SEC = int(os.environ.get("HTTP_DNS_CACHE_TTL_SEC", "300"))
+# 名前解決キャッシュの最大件数（記事ホストの数だけ増えないよう、超えたら期限切れ→古い順に捨てる）
+HTTP_DNS_CACHE_MAX_ENTRIES = int(os.environ.get("HTTP_DNS_CACHE_MAX_ENTRIES", "1024"))
+
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+_stats: dict[str, int] = defaultdict(int)
+_hosts: dict[str, int] = defaultdict(int)
+
+
+def _count(key: str, n: int = 1):
+    with _lock:
+        _stats[key] += n
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count("new_connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count("new_connections")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    """新規接続数を数えるプールを使う HTTPAdapter。"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).netloc.lower()
+        with _lock:
+            _stats["requests"] += 1
+            _hosts[host] += 1
+        return super().send(request, **kwargs)
+
+
+# --- 名前解決キャッシュ -----------------------------------------------------
+# socket.getaddrinfo の差し替えはプロセス全体に効く（共有 Session 以外のライブラリの名前解決も
+# キャッシュを通る）。install_dns_cache() は get_session() から呼ばれ、close_sessions() で元に戻す。
+_orig_getaddrinfo = socket.getaddrinfo
+_replaced_getaddrinfo = None  # install_dns_cache() が差し替える前の socket.getaddrinfo
+_dns_cache: dict[tuple, tuple[float, list]] = {}
+
+
+def _store_dns(key: tuple, expires: float, result: list, now: float):
+    """キャッシュに入れる。上限を超えるなら期限切れを消し、それでも多ければ古く入れた順に捨てる（_lock 内で呼ぶ）。"""
+    _dns_cache.pop(key, None)
+    if len(_dns_cache) >= HTTP_DNS_CACHE_MAX_ENTRIES:
+        for stale in [k for k, (exp, _r) in _dns_cache.items() if exp <= now]:
+            del _dns_cache[stale]
+        while _dns_cache and len(_dns_cache) >= HTTP_DNS_CACHE_MAX_ENTRIES:
+            del _dns_cache[next(iter(_dns_cache))]
+    _dns_cache[key] = (expires, result)
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):  # noqa: A002 - socket のシグネチャ
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    with _lock:
+        hit = _dns_cache.get(key)
+    if hit is not None and hit[0] > now:
+        _count("dns_hits")
+        return list(hit[1])
+    result = _orig_getaddrinfo(host, port, family, type, proto, flags)
+    _count("dns_misses")
+    with _lock:
+        _store_dns(key, now + HTTP_DNS_CACHE_TTL_SEC, result, now)
+    return list(result)
+
+
+def install_dns_cache():
+    """socket.getaddrinfo をキャッシュ付きに差し替える（プロセス全体。冪等。失敗は都度引き直す）。"""
+    global _replaced_getaddrinfo
+    if HTTP_DNS_CACHE_TTL_SEC > 0 and socket.getaddrinfo is not _cached_getaddrinfo:
+        _replaced_getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = _cached_getaddrinfo
+
+
+def uninstall_dns_cache():
+    """install_dns_cache() の差し替えを戻し、キャッシュを捨てる（他で差し替えられていれば触らない）。"""
+    global _replaced_getaddrinfo
+    if socket.getaddrinfo is _cached_getaddrinfo and _replaced_getaddrinfo is not None:
+        socket.getaddrinfo = _replaced_getaddrinfo
+    _replaced_getaddrinfo = None
+    clear_dns_cache()
+
+
+def clear_dns_cache():
+    with _lock:
+        _dns_cache.clear()
+
+
+# --- セッション -------------------------------------------------------------
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = _PooledAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(tls_mode: str = "strict") -> requests.Session:
+    """tls_mode ごとの共有 Session を返す（初回呼び出し時に作成）。"""
+    tls_mode = (tls_mode or "strict").lower()
+    with _lock:
+        session = _sessions.get(tls_mode)
+        if session is None:
+            session = _sessions[tls_mode] = _new_session()
+    install_dns_cache()
+    return session
+
+
+def configure(*, pool_maxsize: int):
+    """ホストあたりのプールサイズを変更する。既存の Session は閉じて作り直す。"""
+    global HTTP_POOL_MAXSIZE
+    pool_maxsize = max(1, int(pool_maxsize))
+    if pool_maxsize == HTTP_POOL_MAXSIZE:
+        return
+    HTTP_POOL_MAXSIZE = pool_maxsize
+    close_sessions()
+
+
+def close_sessions():
+    """共有 Session を閉じ、socket.getaddrinfo の差し替えも戻す（次の get_session() で作り直す）。"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+    uninstall_dns_cache()
+
+
+def get(
+    url: str,
+    *,
+    headers: dict | None = None,
+    timeout: float,
+    tls_mode: str = "strict",
+    stream: bool = False,
+    allow_redirects: bool = True,
+) -> requests.Response:
+    """共有 Session で GET する。tls_mode="relaxed" のときだけ証明書検証を行わない。"""
+    tls_mode = (tls_mode or "strict").lower()
+    verify = False if tls_mode == "relaxed" else certifi.where()
+    return get_session(tls_mode).get(
+        url,
+        headers=headers,
+        timeout=timeout,
+        verify=verify,
+        stream=stream,
+        allow_redirects=allow_redirects,
+    )
+
+
+# --- 統計 -------------------------------------------------------------------
+def pool_stats() -> dict:
+    """リクエスト数・新規接続数・接続再利用率・DNS キャッシュ命中数を返す。"""
+    with _lock:
+        stats = dict(_stats)
+        hosts = len(_hosts)
+    requests_total = stats.get("requests", 0)
+    new_conns = stats.get("new_connections", 0)
+    reused = max(0, requests_total - new_conns)
+    return {
+        "requests": requests_total,
+        "hosts": hosts,
+        "new_connections": new_conns,
+        "reused": reused,
+        "reuse_rate": round(reused / requests_total, 3) if requests_total else 0.0,
+        "dns_hits": stats.get("dns_hits", 0),
+        "dns_misses": stats.get("dns_misses", 0),
+    }
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+        _hosts.clear()
+
+
+def log_pool_stats(prefix: str = "http"):
+    s = pool_stats()
+    logger.info(
+        "%s pool requests=%d hosts=%d new_connections=%d reused=%d reuse_rate=%.1f%% "
+        "dns_hits=%d dns_misses=%d",
+        prefix, s["requests"], s["hosts"], s["new_connections"], s["reused"],
+        s["reuse_rate"] * 100, s["dns_hits"], s["dns_misses"],
+    )
+    return s
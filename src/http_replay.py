@@ -0,0 +1,255 @@
+"""collect のフィード／記事レスポンスの記録と再生（オフラインベンチ用）。
+
+収集性能の比較を 100 以上のライブホストに依存させないため、
+  - 記録: COLLECT_RECORD_DIR を設定して collect を実行すると、フィード取得
+    （_parse_feed_with_requests）と本文取得（download_fulltext）の生レスポンス
+    （ステータス・主要ヘッダ・本文）をコーパスへ保存する。
+  - 再生: ReplayServer がコーパスをローカル HTTP で返す。COLLECT_REPLAY_BASE
+    （またはモジュール変数 REPLAY_BASE）を設定すると collect の取得先 URL が
+    {base}/replay?url=<元URL> に書き換わる。DB に入る URL は元のまま。
+
+コーパスの構成（本文は sha256 によるコンテンツアドレス。同一本文は 1 ファイル）:
+    <dir>/index.jsonl        1 行 1 レスポンス（同一 URL は後勝ち）
+    <dir>/blobs/ab/abcdef…   本文
+
+scripts/bench_collect.py がこのモジュールを使って collect.main() を計測する。
+feedparser.parse(url) による逐次フォールバック取得は記録対象外（再生はされる）。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+RECORD_DIR = os.environ.get("COLLECT_RECORD_DIR", "")
+REPLAY_BASE = os.environ.get("COLLECT_REPLAY_BASE", "")
+
+# 再生時に意味を持つヘッダのみ保存する。本文は展開済みで保存するため
+# Content-Encoding / Content-Length 等は保存しない。
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_record_lock = threading.Lock()
+
+
+def target_url(url: str) -> str:
+    """再生モードなら取得先をローカル再生サーバに書き換える。"""
+    if not REPLAY_BASE:
+        return url
+    return f"{REPLAY_BASE.rstrip('/')}/replay?url={quote(url, safe='')}"
+
+
+def _blob_path(corpus_dir: Path, digest: str) -> Path:
+    return corpus_dir / "blobs" / digest[:2] / digest
+
+
+def record_response(
+    url: str,
+    *,
+    kind: str,
+    status: int,
+    headers,
+    body: bytes,
+    corpus_dir: str | Path | None = None,
+):
+    """1 レスポンスをコーパスへ追記する。記録モードでなければ何もしない。
+
+    kind は "feed" / "article"。headers は Mapping（requests / urllib どちらの形式も可）。
+    """
+    corpus_dir = corpus_dir or RECORD_DIR
+    if not corpus_dir:
+        return
+    corpus_dir = Path(corpus_dir)
+    body = body or b""
+    digest = hashlib.sha256(body).hexdigest()
+    kept = {}
+    for name in RECORDED_HEADERS:
+        value = headers.get(name) if headers is not None else None
+        if value:
+            kept[name] = value
+    entry = {
+        "url": url,
+        "kind": kind,
+        "status": int(status),
+        "headers": kept,
+        "body": digest,
+        "size": len(body),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    try:
+        blob = _blob_path(corpus_dir, digest)
+        with _record_lock:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_suffix(".tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, blob)
+            with (corpus_dir / "index.jsonl").open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning("replay record failed url=%s err=%s", url[:120], e)
+
+
+def load_corpus(corpus_dir: str | Path) -> dict[str, dict]:
+    """index.jsonl を読み url -> エントリのマップを返す（同一 URL は後勝ち）。"""
+    index_path = Path(corpus_dir) / "index.jsonl"
+    entries: dict[str, dict] = {}
+    if not index_path.exists():
+        return entries
+    with index_path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["url"]] = entry
+    return entries
+
+
+def read_body(corpus_dir: str | Path, entry: dict) -> bytes:
+    return _blob_path(Path(corpus_dir), entry["body"]).read_bytes()
+
+
+def _roll(seed: int, url: str, salt: str) -> float:
+    """URL ごとに決定的な [0, 1) の値（同じ seed なら毎回同じ URL で障害が起きる）。"""
+    h = hashlib.sha256(f"{seed}:{salt}:{url}".encode()).digest()
+    return int.from_bytes(h[:8], "big") / 2**64
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """コーパスを返すローカル HTTP サーバ。
+
+    latency_ms / jitter_ms: 応答前の待ち時間（jitter は URL ごとに決定的）
+    error_rate: 503 を返す割合
+    timeout_rate: hang_sec 待ってから応答せずに切断する割合
+    not_modified_rate: 条件付きヘッダの有無に関わらず 304 を返す割合（フィードのみ）
+    記録済み ETag / Last-Modified と一致する条件付き GET には常に 304 を返す。
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        corpus_dir: str | Path,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        hang_sec: float = 20.0,
+        not_modified_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.corpus_dir = Path(corpus_dir)
+        self.entries = load_corpus(self.corpus_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_sec = hang_sec
+        self.not_modified_rate = not_modified_rate
+        self.seed = seed
+        self.counts: dict[str, int] = {}
+        self.bytes_sent = 0
+        self._counts_lock = threading.Lock()
+        super().__init__((host, port), _ReplayHandler)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str, nbytes: int = 0):
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.bytes_sent += nbytes
+
+    def start(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="replay-server", daemon=True)
+        t.start()
+        return t
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler のシグネチャ
+        logger.debug("replay %s", format % args)
+
+    def _send(self, status: int, headers: dict, body: bytes = b""):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        server: ReplayServer = self.server
+        url = (parse_qs(urlsplit(self.path).query).get("url") or [""])[0]
+        entry = server.entries.get(url)
+        if entry is None:
+            server.count("missing")
+            self._send(404, {"Content-Type": "text/plain"}, b"not recorded")
+            return
+
+        delay = server.latency_ms
+        if server.jitter_ms:
+            delay += random.Random(f"{server.seed}:{url}").uniform(0, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if _roll(server.seed, url, "timeout") < server.timeout_rate:
+            server.count("timeout")
+            time.sleep(server.hang_sec)
+            self.close_connection = True
+            return
+        if _roll(server.seed, url, "error") < server.error_rate:
+            server.count("error")
+            self._send(503, {"Content-Type": "text/plain"}, b"injected error")
+            return
+
+        headers = dict(entry.get("headers") or {})
+        validators = {k: headers[k] for k in ("ETag", "Last-Modified") if k in headers}
+        etag = headers.get("ETag")
+        modified = headers.get("Last-Modified")
+        conditional_hit = (
+            (etag and self.headers.get("If-None-Match") == etag)
+            or (modified and self.headers.get("If-Modified-Since") == modified)
+        )
+        forced = (
+            entry.get("kind") == "feed"
+            and int(entry.get("status", 200)) == 200
+            and _roll(server.seed, url, "304") < server.not_modified_rate
+        )
+        if conditional_hit or forced:
+            server.count("not_modified")
+            self._send(304, validators)
+            return
+
+        body = read_body(server.corpus_dir, entry)
+        server.count(str(entry.get("status", 200)), len(body))
+        self._send(int(entry.get("status", 200)), headers, body)
@@ -4,10 +4,12 @@ import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 
+from db import connect as connect_db, event_ts_expr, table_exists
+
 
 def connect():
     base = Path(__file__).resolve().parent.parent
-    return sqlite3.connect(base / "data" / "state.sqlite")
+    return connect_db(base / "data" / "state.sqlite")
 
 
 def _now():
@@ -48,6 +50,18 @@ def pick_topic_inputs(conn, limit=300, rescue=False, skip_kinds=()):
 
     # articles.region が無いテスト DB 互換のために式を切替える
     region_expr = "COALESCE(a.region, '')" if _articles_has_region(conn) else "''"
+    ts = event_ts_expr(cur, "a.")
+    if table_exists(cur, "topic_stats"):
+        # 各トピックの最新記事（event_ts→id の新しい順の先頭）は topic_stats が持つ。
+        # CROSS JOIN で topic_stats を外側に固定する（kind の索引から全記事を走査させない）
+        latest_rank = "1"
+        latest_from = """topic_stats s
+      CROSS JOIN topic_articles ta ON ta.topic_id = s.topic_id AND ta.article_id = s.latest_article_id
+      CROSS JOIN articles a ON a.id = ta.article_id"""
+    else:
+        latest_rank = f"ROW_NUMBER() OVER (PARTITION BY ta.topic_id ORDER BY {ts} DESC, a.id DESC)"
+        latest_from = """topic_articles ta
+      JOIN articles a ON a.id = ta.article_id"""
 
     skip = tuple(
         k.strip().lower() for k in (skip_kinds or ()) if str(k or "").strip()
@@ -77,7 +91,7 @@ def pick_topic_inputs(conn, limit=300, rescue=False, skip_kinds=()):
         a.content,
         a.category AS article_category,
         a.published_at,
-        a.fetched_at,
+        {ts} AS event_ts,
         {region_expr} AS region,
         CASE
           WHEN a.kind = 'news' AND {region_expr} = 'global' THEN 'global_news'
@@ -87,12 +101,8 @@ def pick_topic_inputs(conn, limit=300, rescue=False, skip_kinds=()):
           WHEN a.kind = 'tech'                              THEN 'jp_tech'
           ELSE 'other'
         END AS bucket,
-        ROW_NUMBER() OVER (
-          PARTITION BY ta.topic_id
-          ORDER BY COALESCE(a.published_at, a.fetched_at) DESC, a.id DESC
-        ) AS rn
-      FROM topic_articles ta
-      JOIN articles a ON a.id = ta.article_id
+        {latest_rank} AS rn
+      FROM {latest_from}
       WHERE a.kind IN ('tech','news')
     ),
     pending AS (
@@ -111,7 +121,7 @@ def pick_topic_inputs(conn, limit=300, rescue=False, skip_kinds=()):
         l.source AS source,
         l.url AS url,
         l.published_at AS published_at,
-        l.fetched_at AS fetched_at,
+        l.event_ts AS event_ts,
         l.bucket AS bucket,
         t.score_48h AS importance_hint,
         COALESCE(NULLIF(l.content,''), NULLIF(l.title_ja,''), NULLIF(l.title,''), '') AS body,
@@ -145,12 +155,12 @@ def pick_topic_inputs(conn, limit=300, rescue=False, skip_kinds=()):
         pending.*,
         ROW_NUMBER() OVER (
           PARTITION BY bucket
-          ORDER BY datetime(COALESCE(NULLIF(published_at,''), fetched_at)) DESC, topic_id DESC
+          ORDER BY event_ts DESC, topic_id DESC
         ) AS bucket_rn
       FROM pending
     )
     -- bucket_rn ASC でバケット横断のラウンドロビン、同順位内は新しい順
-    ORDER BY bucket_rn ASC, datetime(COALESCE(NULLIF(published_at,''), fetched_at)) DESC, topic_id DESC
+    ORDER BY bucket_rn ASC, event_ts DESC, topic_id DESC
     LIMIT ?
     """
     cur.execute(sql, (1 if rescue else 0, *skip, limit))
@@ -145,7 +145,7 @@ def notify(
 
     戻り値: {"count": N, "channels": {"slack": status, "discord": status}, "items": [...]}
     """
-    conn = connect()
+    conn = connect(readonly=True)
     items = collect_notifiable_topics(conn.cursor(), min_importance=min_importance, limit=max_items)
     conn.close()
 
@@ -30,13 +30,13 @@ def _parse_collect_health(log_dir: Path) -> dict:
 
 def _count_db_stats(db_path: Path) -> dict:
     """SQLite から主要テーブルの件数を取得する。"""
-    import sqlite3
+    from db import connect
 
     stats = {}
     if not db_path.exists():
         return stats
 
-    conn = sqlite3.connect(str(db_path))
+    conn = connect(db_path, readonly=True)
     cur = conn.cursor()
 
     for table in ("articles", "topics", "topic_articles", "topic_insights"):
@@ -114,16 +114,17 @@ def record_category_trends(db_path: Path | None = None) -> int:
 
     戻り値は書き込んだ行数（カテゴリ数）。
     """
-    import sqlite3
     from datetime import datetime, timezone
 
+    from db import connect
+
     if db_path is None:
         db_path = Path("data/state.sqlite")
     if not db_path.exists():
         return 0
 
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    conn = sqlite3.connect(str(db_path))
+    conn = connect(db_path)
     cur = conn.cursor()
 
     # 当日受信の articles をカテゴリ別に集計
@@ -17,6 +17,8 @@ from pathlib import Path
 
 from jinja2 import Template
 
+from db import archive_source
+
 
 # 独立したロガー。render_main 側のロガーと干渉しないよう別名。
 _logger = logging.getLogger("render_feeds")
@@ -418,13 +420,16 @@ def render_search_page(
 ) -> None:
     """検索用JSON + search.html を出力する。
 
-    JSON は軽量化のため短いキー (u,t,tj,s,c,d,src) で保存。
+    JSON は軽量化のため短いキー (u,t,tj,s,c,d,src) で保存。本体の記事が limit 件に満たなければ、
+    退避 DB を ATTACH した接続（db.connect(archive=True)）では退避済みの記事で埋める。
     """
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    # 並べ替えの列をそのまま返す内側の問い合わせで limit 件を選ぶ。all_articles でも本体と退避先の
+    # published_at 索引を新しい順にマージして読み、limit 件で止まる（式の列だけだと全件を並べ替える）
     cur.execute(
-        """
+        f"""
         SELECT
           COALESCE(title,'') AS title,
           COALESCE(title_ja,'') AS title_ja,
@@ -433,10 +438,14 @@ def render_search_page(
           COALESCE(substr(published_at,1,16),'') AS dt,
           COALESCE(source,'') AS source,
           COALESCE(url,'') AS url
-        FROM articles
-        WHERE url IS NOT NULL AND url != ''
+        FROM (
+          SELECT title, title_ja, content, category, published_at, source, url
+          FROM {archive_source(cur, "articles")}
+          WHERE url IS NOT NULL AND url != ''
+          ORDER BY published_at DESC
+          LIMIT ?
+        )
         ORDER BY published_at DESC
-        LIMIT ?
         """,
         (int(limit),),
     )
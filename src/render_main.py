@@ -12,7 +12,7 @@ import yaml
 from jinja2 import Template, Environment, FileSystemLoader
 from datetime import datetime, timedelta, timezone
 
-from db import connect
+from db import connect, event_ts_expr, init_db, update_topic_stats
 from text_clean import clean_for_html, clean_json_like
 
 from typing import Any, List
@@ -858,9 +858,10 @@ def render_news_region_page(cur, region, limit_each=30, cutoff_dt=None, min_per_
 
 
 def fetch_news_articles(cur, region: str, limit: int = 60):
+    ts = event_ts_expr(cur)
     if region:
         cur.execute(
-            """
+            f"""
             SELECT
               articles.id AS article_id,
               COALESCE(NULLIF(title_ja,''), NULLIF(title,''), url) AS title,
@@ -898,12 +899,7 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
             WHERE kind='news' AND region=?
             ORDER BY
               COALESCE(importance, 0) DESC,
-              datetime(
-                substr(
-                  replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),
-                  1, 19
-                )
-              ) DESC,
+              {ts} DESC,
               id DESC
             LIMIT ?
             """,
@@ -911,7 +907,7 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
         )
     else:
         cur.execute(
-            """
+            f"""
             SELECT
               COALESCE(NULLIF(title_ja,''), NULLIF(title,''), url) AS title,
               url,
@@ -921,14 +917,7 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
               COALESCE(NULLIF(published_at,''), fetched_at) AS dt
             FROM articles
             WHERE kind='news'
-            ORDER BY
-              datetime(
-                substr(
-                  replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),
-                  1, 19
-                )
-              ) DESC,
-              id DESC
+            ORDER BY {ts} DESC, id DESC
             LIMIT ?
             """,
             (limit,),
@@ -936,9 +925,19 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
 
     return cur.fetchall()
 
+def _news_category_cond(category: str, prefix: str = "") -> Tuple[str, tuple]:
+    """COALESCE(NULLIF(category,''), 'other') = ? と同じ条件を、category の索引が効く形で返す。"""
+    if category == "other":
+        return f"({prefix}category = 'other' OR {prefix}category IS NULL OR {prefix}category = '')", ()
+    return f"{prefix}category = ?", (category,)
+
+
 def fetch_news_articles_by_category(cur, region: str, category: str, limit: int = 40):
+    # (kind, category, event_ts) の索引を新しい順に辿り、limit 件で打ち切る
+    ts = event_ts_expr(cur, "a.")
+    cat_cond, cat_params = _news_category_cond(category, "a.")
     cur.execute(
-        """
+        f"""
         SELECT
           a.id AS article_id,
           COALESCE(NULLIF(a.title_ja,''), NULLIF(a.title,''), a.url) AS title,
@@ -1027,38 +1026,28 @@ def fetch_news_articles_by_category(cur, region: str, category: str, limit: int
         FROM articles a
         WHERE a.kind='news'
           AND a.region=?
-          AND COALESCE(NULLIF(a.category,''), 'other')=?
-        ORDER BY
-          datetime(
-            substr(
-              replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),
-              1, 19
-            )
-          ) DESC,
-          a.id DESC
+          AND {cat_cond}
+        ORDER BY {ts} DESC, a.id DESC
         LIMIT ?
 
         """,
-        (region, category, limit),
+        (region, *cat_params, limit),
     )
     return cur.fetchall()
 
 def count_news_recent_48h(cur, region: str, category: str, cutoff_dt: str) -> int:
+    ts = event_ts_expr(cur)
+    cat_cond, cat_params = _news_category_cond(category)
     cur.execute(
-        """
+        f"""
         SELECT COUNT(*)
         FROM articles
         WHERE kind='news'
           AND region=?
-          AND COALESCE(NULLIF(category,''), 'other')=?
-          AND datetime(
-                substr(
-                  replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),
-                  1, 19
-                )
-              ) >= datetime(?)
+          AND {cat_cond}
+          AND {ts} >= datetime(?)
         """,
-        (region, category, cutoff_dt),
+        (region, *cat_params, cutoff_dt),
     )
     return int(cur.fetchone()[0] or 0)
 
@@ -1607,20 +1596,14 @@ def render_search_page(out_dir: Path, generated_at: str, cur, limit: int = 3000)
 def _build_ops_page_data(cur, cutoff_48h: str, cat_name: Dict[str, str]) -> Dict[str, Any]:
     """ops.html 用の統計データを取得・集計する（main() から分離）。"""
     cutoff_7d = (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    ts = event_ts_expr(cur)
 
-    # 記事統計
-    cur.execute("""
-        SELECT COUNT(*) as total,
-          SUM(CASE WHEN datetime(fetched_at) >= datetime(?) THEN 1 ELSE 0 END) as week,
-          SUM(CASE WHEN datetime(fetched_at) >= datetime(?) THEN 1 ELSE 0 END) as h48
-        FROM articles
-    """, (cutoff_7d, cutoff_48h))
-    row = cur.fetchone()
-    ops_stats = {
-        "article_total": int(row[0] or 0),
-        "article_week": int(row[1] or 0),
-        "article_48h": int(row[2] or 0),
-    }
+    # 記事統計（期間内の件数は event_ts の範囲走査で数える）
+    cur.execute("SELECT COUNT(*) FROM articles")
+    ops_stats = {"article_total": int(cur.fetchone()[0] or 0)}
+    for key, cutoff in (("article_week", cutoff_7d), ("article_48h", cutoff_48h)):
+        cur.execute(f"SELECT COUNT(*) FROM articles WHERE {ts} >= datetime(?)", (cutoff,))
+        ops_stats[key] = int(cur.fetchone()[0] or 0)
 
     # トピック・インサイト統計
     cur.execute("SELECT COUNT(*) FROM topics")
@@ -1647,9 +1630,9 @@ def _build_ops_page_data(cur, cutoff_48h: str, cat_name: Dict[str, str]) -> Dict
         daily_trend.append({"d": d, "cnt": cnt, "px": px, "label": label})
 
     # カテゴリ別（全期間+7日）
-    cur.execute("""
+    cur.execute(f"""
         SELECT COALESCE(NULLIF(category,''), 'other') as cat, COUNT(*) as total,
-          SUM(CASE WHEN datetime(fetched_at) >= datetime(?) THEN 1 ELSE 0 END) as week
+          SUM(CASE WHEN {ts} >= datetime(?) THEN 1 ELSE 0 END) as week
         FROM articles
         GROUP BY cat
         ORDER BY total DESC
@@ -1667,12 +1650,12 @@ def _build_ops_page_data(cur, cutoff_48h: str, cat_name: Dict[str, str]) -> Dict
         })
 
     # ソース別記事数TOP15（7日列追加）
-    cur.execute("""
+    cur.execute(f"""
         SELECT
           COALESCE(NULLIF(source,''), '') AS source,
           COUNT(*) AS total,
-          SUM(CASE WHEN datetime(COALESCE(NULLIF(published_at,''), fetched_at)) >= datetime(?) THEN 1 ELSE 0 END) AS recent7d,
-          SUM(CASE WHEN datetime(COALESCE(NULLIF(published_at,''), fetched_at)) >= datetime(?) THEN 1 ELSE 0 END) AS recent48,
+          SUM(CASE WHEN {ts} >= datetime(?) THEN 1 ELSE 0 END) AS recent7d,
+          SUM(CASE WHEN {ts} >= datetime(?) THEN 1 ELSE 0 END) AS recent48,
           GROUP_CONCAT(DISTINCT COALESCE(NULLIF(category,''), 'other')) AS categories
         FROM articles
         WHERE COALESCE(NULLIF(source,''), '') != ''
@@ -1714,6 +1697,36 @@ def _build_ops_page_data(cur, cutoff_48h: str, cat_name: Dict[str, str]) -> Dict
         # feed_healthテーブルが未作成のDBも許容するため debug レベル
         _log_render_error("ops.feed_health_query", e, level="debug")
 
+    # 本文取得のドメイン別統計（ブレーカー open → 成功率の低い順）
+    fetch_domains = []
+    try:
+        cur.execute("""
+            SELECT domain, attempts, successes, bytes, success_rate, p50_ms, p95_ms,
+                   breaker_state, open_until, last_status, updated_at
+            FROM fulltext_domain_stats
+            ORDER BY CASE WHEN breaker_state = 'open' THEN 0 ELSE 1 END,
+                     success_rate ASC, p95_ms DESC, domain ASC
+            LIMIT 30
+        """)
+        for (domain, attempts, successes, nbytes, success_rate, p50, p95,
+             state, open_until, last_status, updated_at) in cur.fetchall():
+            fetch_domains.append({
+                "domain": domain,
+                "attempts": int(attempts or 0),
+                "successes": int(successes or 0),
+                "mb": round((nbytes or 0) / 1_000_000, 1),
+                "success_pct": round((success_rate or 0) * 100),
+                "p50_ms": int(p50 or 0),
+                "p95_ms": int(p95 or 0),
+                "state": state or "closed",
+                "open_until": (open_until or "")[:16],
+                "last_status": clean_for_html(last_status or ""),
+                "updated_at": (updated_at or "")[:16],
+            })
+    except Exception as e:
+        # fulltext_domain_stats 未作成の DB も許容する
+        _log_render_error("ops.fetch_domain_query", e, level="debug")
+
     # 一次情報比率（kind制限なし）
     primary_ratio_threshold = float(os.environ.get("PRIMARY_RATIO_THRESHOLD", "0.5") or "0.5")
     cur.execute("""
@@ -1783,6 +1796,7 @@ def _build_ops_page_data(cur, cutoff_48h: str, cat_name: Dict[str, str]) -> Dict
         "category_dist": category_dist,
         "source_exposure": source_exposure,
         "feed_issues": feed_issues,
+        "fetch_domains": fetch_domains,
         "primary_ratio_by_category": primary_ratio_by_category,
         "primary_ratio_threshold": primary_ratio_threshold,
         "rss_sources": rss_sources,
@@ -1799,10 +1813,10 @@ def _build_meta_and_jp_priority(cur, cutoff_48h: str, rss_sources: int) -> Dict[
 
     # 新規記事数（48h）
     cur.execute(
-        """
+        f"""
         SELECT COUNT(*)
         FROM articles
-        WHERE datetime(COALESCE(NULLIF(published_at,''), fetched_at)) >= datetime(?)
+        WHERE {event_ts_expr(cur)} >= datetime(?)
         """,
         (cutoff_48h,),
     )
@@ -1816,81 +1830,32 @@ def _build_meta_and_jp_priority(cur, cutoff_48h: str, rss_sources: int) -> Dict[
         "rss_sources": rss_sources,
     }
 
+    # JP の記事を含むトピック。最新記事の URL・代表記事の日付・JP 記事の 48h 件数は topic_stats から引く
     cur.execute(
         """
         SELECT
           t.id,
           COALESCE(t.title_ja, t.title) AS title,
           COALESCE(NULLIF(t.category,''), 'other') AS category,
-          (
-            SELECT a2.url
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY a2.id DESC
-            LIMIT 1
-          ) AS url,
-          (
-            SELECT COALESCE(
-              NULLIF(a2.published_at,''),
-              a2.fetched_at
-            )
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY
-              CASE
-                WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                ELSE 1
-              END,
-              datetime(a2.fetched_at) DESC,
-              datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-              a2.url ASC
-            LIMIT 1
-          ) AS article_date,
-          (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-              AND COALESCE(NULLIF(a3.region, ''), 'global') = 'jp'
-          ) AS recent,
+          na.url AS url,
+          COALESCE(NULLIF(ra.published_at,''), ra.fetched_at) AS article_date,
+          s.jp_recent_48h AS recent,
           i.importance,
           i.summary,
           i.tags,
           i.perspectives,
           i.perspective_digest
-        FROM topics t
+        FROM topic_stats s
+        JOIN topics t ON t.id = s.topic_id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles ra ON ra.id = s.rep_article_id
         LEFT JOIN topic_insights i ON i.topic_id = t.id
-        WHERE COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
-          AND NOT EXISTS (
-            SELECT 1
-            FROM topic_articles ta4
-            JOIN articles a4 ON a4.id = ta4.article_id
-            WHERE ta4.topic_id = t.id
-              AND COALESCE(a4.kind,'') = 'news'
-          )
-          AND EXISTS (
-            SELECT 1
-            FROM topic_articles ta
-            JOIN articles a ON a.id = ta.article_id
-            WHERE ta.topic_id = t.id
-              AND COALESCE(NULLIF(a.region, ''), 'global') = 'jp'
-          )
+        WHERE s.jp_count > 0
+          AND COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
+          AND s.news_count = 0
         ORDER BY COALESCE(i.importance,0) DESC, COALESCE(recent,0) DESC, t.id ASC
         LIMIT 10
-        """,
-        (cutoff_48h,),
+        """
     )
     jp_priority_top = []
     for tid, title, category, url, article_date, recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -1915,85 +1880,25 @@ def _build_meta_and_jp_priority(cur, cutoff_48h: str, rss_sources: int) -> Dict[
           t.id,
           COALESCE(t.title_ja, t.title) AS title,
           COALESCE(NULLIF(t.category,''), 'other') AS category,
-          (
-            SELECT a2.url
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY a2.id DESC
-            LIMIT 1
-          ) AS url,
-          (
-            SELECT COALESCE(
-              NULLIF(a2.published_at,''),
-              a2.fetched_at
-            )
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY
-              CASE
-                WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                ELSE 1
-              END,
-              datetime(a2.fetched_at) DESC,
-              datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-              a2.url ASC
-            LIMIT 1
-          ) AS article_date,
-          (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-              AND COALESCE(NULLIF(a3.region, ''), 'global') = 'jp'
-          ) AS recent,
+          na.url AS url,
+          COALESCE(NULLIF(ra.published_at,''), ra.fetched_at) AS article_date,
+          s.jp_recent_48h AS recent,
           i.importance,
           i.summary,
           i.tags,
           i.perspectives,
           i.perspective_digest
-        FROM topics t
+        FROM topic_stats s
+        JOIN topics t ON t.id = s.topic_id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles ra ON ra.id = s.rep_article_id
         LEFT JOIN topic_insights i ON i.topic_id = t.id
-        WHERE COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
-          AND NOT EXISTS (
-            SELECT 1
-            FROM topic_articles ta4
-            JOIN articles a4 ON a4.id = ta4.article_id
-            WHERE ta4.topic_id = t.id
-              AND COALESCE(a4.kind,'') = 'news'
-          )
-          AND (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-              AND COALESCE(NULLIF(a3.region, ''), 'global') = 'jp'
-          ) > 0
+        WHERE s.jp_recent_48h > 0
+          AND COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
+          AND s.news_count = 0
         ORDER BY COALESCE(recent,0) DESC, COALESCE(i.importance,0) DESC, t.id ASC
         LIMIT 10
-        """,
-        (cutoff_48h, cutoff_48h),
+        """
     )
     jp_priority_trending_top = []
     for tid, title, category, url, article_date, recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -2104,91 +2009,71 @@ def _build_tag_groups(topics_by_cat: Dict[str, List[Dict[str, Any]]], out_dir: P
     return {"tag_list": tag_list, "tag_groups": tag_groups}
 
 
+# カテゴリ一覧（B）の列。代表記事（本文あり→fetched_at→event_ts の新しい順→url）と 48h 件数は
+# topic_stats から引く。記事の無いトピックは topic_stats に行が無いので LEFT JOIN で 0 件として残す。
+_TOPIC_LIST_SQL = """
+SELECT
+  t.id,
+  COALESCE(t.title_ja, t.title) AS title,
+  ra.url AS url,
+  COALESCE(NULLIF(ra.published_at,''), ra.fetched_at) AS article_date,
+  COALESCE(s.recent_48h, 0) AS recent,
+  ra.source AS source,
+  i.importance,
+  i.summary,
+  i.key_points,
+  i.evidence_urls,
+  i.tags,
+  i.perspectives,
+  i.perspective_digest
+FROM topics t
+LEFT JOIN topic_stats s ON s.topic_id = t.id
+LEFT JOIN articles ra ON ra.id = s.rep_article_id
+LEFT JOIN topic_insights i ON i.topic_id = t.id
+WHERE {topic_cond}
+  AND COALESCE(t.category,'') <> 'news'
+  AND COALESCE(s.news_count, 0) = 0
+"""
+
+
 def _build_category_topics(cur, cat_id: str, cutoff_48h: str, LIMIT_PER_CAT: int, HOT_TOP_N: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """1カテゴリ分の注目TOP5(hot_list)と一覧(items)を構築する（main() のループ本体を分離）。"""
 
     # (A) 注目TOP5（48h増分、published_atベース）
+    # 48h 以内の記事を event_ts の範囲走査で拾ってトピック別に数え、該当トピックだけ総数を
+    # topic_stats から引く（news 以外の記事数 = 全記事数 - news の記事数）。
+    # article_date（全記事の最新時刻）は 48h 以内に記事がある以上、その中の最大値と一致する。
+    ts = event_ts_expr(cur, "a.")
     if cat_id == "other":
-        cur.execute(
-            """
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS ttitle,
-              COUNT(ta.article_id) AS total_count,
-              SUM(
-                CASE
-                  WHEN datetime(
-                    substr(
-                      replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),
-                      1, 19
-                    )
-                  ) >= datetime(?) THEN 1
-                  ELSE 0
-                END
-              ) AS recent_count,
-              MAX(
-                datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                )
-              ) AS article_date
-            FROM topics t
-            JOIN topic_articles ta ON ta.topic_id = t.id
-            JOIN articles a ON a.id = ta.article_id
-            WHERE (t.category IS NULL OR t.category = '')
-              AND COALESCE(t.category,'') <> 'news'
-              AND COALESCE(a.kind,'') <> 'news'
-            GROUP BY t.id
-            HAVING recent_count > 0
-            ORDER BY recent_count DESC, total_count DESC, t.id DESC
-            LIMIT ?
-            """,
-            (cutoff_48h, HOT_TOP_N),
-        )
-
-
+        topic_cond, topic_params = "(t.category IS NULL OR t.category = '')", ()
     else:
-        cur.execute(
-            """
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS ttitle,
-              COUNT(ta.article_id) AS total_count,
-              SUM(
-                CASE
-                  WHEN datetime(
-                    substr(
-                      replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),
-                      1, 19
-                    )
-                  ) >= datetime(?) THEN 1
-                  ELSE 0
-                END
-              ) AS recent_count,
-              MAX(
-                datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                )
-              ) AS article_date
-            FROM topics t
-            JOIN topic_articles ta ON ta.topic_id = t.id
-            JOIN articles a ON a.id = ta.article_id
-            WHERE t.category = ?
-              AND COALESCE(t.category,'') <> 'news'
-              AND COALESCE(a.kind,'') <> 'news'
-            GROUP BY t.id
-            HAVING recent_count > 0
-            ORDER BY recent_count DESC, total_count DESC, t.id DESC
-            LIMIT ?
-            """,
-            (cutoff_48h, cat_id, HOT_TOP_N),
+        topic_cond, topic_params = "t.category = ?", (cat_id,)
+    cur.execute(
+        f"""
+        WITH recent AS (
+          SELECT ta.topic_id, COUNT(*) AS recent_count, MAX({ts}) AS article_date
+          FROM articles a
+          CROSS JOIN topic_articles ta ON ta.article_id = a.id  -- CROSS JOIN で articles を外側に固定
+          WHERE {ts} >= datetime(?)
+            AND COALESCE(a.kind,'') <> 'news'
+          GROUP BY ta.topic_id
         )
-
+        SELECT
+          t.id,
+          COALESCE(t.title_ja, t.title) AS ttitle,
+          s.article_count - s.news_count AS total_count,
+          r.recent_count,
+          r.article_date
+        FROM recent r
+        JOIN topics t ON t.id = r.topic_id
+        JOIN topic_stats s ON s.topic_id = t.id
+        WHERE {topic_cond}
+          AND COALESCE(t.category,'') <> 'news'
+        ORDER BY r.recent_count DESC, total_count DESC, t.id DESC
+        LIMIT ?
+        """,
+        (cutoff_48h, *topic_params, HOT_TOP_N),
+    )
 
     rows = cur.fetchall()
     hot_list = [
@@ -2203,194 +2088,18 @@ def _build_category_topics(cur, cat_id: str, cutoff_48h: str, LIMIT_PER_CAT: int
     )
 
     # (B) 一覧（topics + insights + 代表URL + 48h増分）
-    if cat_id == "other":
-        cur.execute(
-            """
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS title,
-              (
-                  SELECT a2.url
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE
-                        WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                        ELSE 1
-                      END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                    LIMIT 1
-
-                ) AS url,
-                (
-                  SELECT COALESCE(
-                    NULLIF(a2.published_at,''),
-                    a2.fetched_at
-                  )
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                    CASE
-                      WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                      ELSE 1
-                    END,
-                    datetime(a2.fetched_at) DESC,
-                    datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                    a2.url ASC
-                  LIMIT 1
-                ) AS article_date,
-              (
-                  SELECT COALESCE(SUM(
-                    CASE
-                      WHEN datetime(
-                        substr(
-                          replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                          1, 19
-                        )
-                      ) >= datetime(?) THEN 1
-                      ELSE 0
-                    END
-                  ), 0)
-                  FROM topic_articles ta3
-                  JOIN articles a3 ON a3.id = ta3.article_id
-                  WHERE ta3.topic_id = t.id
-                ) AS recent,
-              (
-                  SELECT a2.source
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0 ELSE 1 END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                  LIMIT 1
-                ) AS source,
-              i.importance,
-              i.summary,
-              i.key_points,
-              i.evidence_urls,
-              i.tags,
-              i.perspectives,
-              i.perspective_digest
-            FROM topics t
-            LEFT JOIN topic_insights i ON i.topic_id = t.id
-            WHERE (t.category IS NULL OR t.category = '')
-              AND NOT EXISTS (
-                SELECT 1
-                FROM topic_articles ta4
-                JOIN articles a4 ON a4.id = ta4.article_id
-                WHERE ta4.topic_id = t.id
-                  AND COALESCE(a4.kind,'') = 'news'
-              )
-            ORDER BY
-              COALESCE(i.importance, 0) DESC,
-              COALESCE(recent, 0) DESC,
-              t.id DESC
-            LIMIT ?
-            """,
-            (cutoff_48h, LIMIT_PER_CAT),
-        )
-    else:
-        cur.execute(
-            """
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS title,
-              (
-                  SELECT a2.url
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE
-                        WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                        ELSE 1
-                      END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                    LIMIT 1
-                ) AS url,
-                (
-                  SELECT COALESCE(
-                    NULLIF(a2.published_at,''),
-                    a2.fetched_at
-                  )
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                    CASE
-                      WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                      ELSE 1
-                    END,
-                    datetime(a2.fetched_at) DESC,
-                    datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                    a2.url ASC
-                  LIMIT 1
-                ) AS article_date,
-              (
-                  SELECT COALESCE(SUM(
-                    CASE
-                      WHEN datetime(
-                        substr(
-                          replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                          1, 19
-                        )
-                      ) >= datetime(?) THEN 1
-                      ELSE 0
-                    END
-                  ), 0)
-                  FROM topic_articles ta3
-                  JOIN articles a3 ON a3.id = ta3.article_id
-                  WHERE ta3.topic_id = t.id
-                ) AS recent,
-              (
-                  SELECT a2.source
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0 ELSE 1 END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                  LIMIT 1
-                ) AS source,
-
-              i.importance,
-              i.summary,
-              i.key_points,
-              i.evidence_urls,
-              i.tags,
-              i.perspectives,
-              i.perspective_digest
-            FROM topics t
-            LEFT JOIN topic_insights i ON i.topic_id = t.id
-            WHERE t.category = ?
-              AND COALESCE(t.category,'') <> 'news'
-              AND NOT EXISTS (
-                SELECT 1
-                FROM topic_articles ta4
-                JOIN articles a4 ON a4.id = ta4.article_id
-                WHERE ta4.topic_id = t.id
-                  AND COALESCE(a4.kind,'') = 'news'
-              )
-            ORDER BY
-              COALESCE(i.importance, 0) DESC,
-              COALESCE(recent, 0) DESC,
-              t.id DESC
-            LIMIT ?
-            """,
-            (cutoff_48h, cat_id, LIMIT_PER_CAT),
-        )
-
+    # 代表記事と 48h 件数は topic_stats（変更のあったトピックだけ数え直す集計）から引く
+    cur.execute(
+        _TOPIC_LIST_SQL.format(topic_cond=topic_cond)
+        + """
+        ORDER BY
+          COALESCE(i.importance, 0) DESC,
+          COALESCE(recent, 0) DESC,
+          t.id DESC
+        LIMIT ?
+        """,
+        (*topic_params, LIMIT_PER_CAT),
+    )
 
     rows = cur.fetchall()
     items: List[Dict[str, Any]] = []
@@ -2434,180 +2143,8 @@ def _build_category_topics(cur, cat_id: str, cutoff_48h: str, LIMIT_PER_CAT: int
         # IN句プレースホルダを生成
         placeholders = ",".join(["?"] * len(missing_ids))
 
-        if cat_id == "other":
-            sql_missing = f"""
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS title,
-              (
-                  SELECT a2.url
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE
-                        WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                        ELSE 1
-                      END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                    LIMIT 1
-                ) AS url,
-                (
-                  SELECT COALESCE(
-                    NULLIF(a2.published_at,''),
-                    a2.fetched_at
-                  )
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                    CASE
-                      WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                      ELSE 1
-                    END,
-                    datetime(a2.fetched_at) DESC,
-                    datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                    a2.url ASC
-                  LIMIT 1
-                ) AS article_date,
-              (
-                  SELECT COALESCE(SUM(
-                    CASE
-                      WHEN datetime(
-                        substr(
-                          replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                          1, 19
-                        )
-                      ) >= datetime(?) THEN 1
-                      ELSE 0
-                    END
-                  ), 0)
-                  FROM topic_articles ta3
-                  JOIN articles a3 ON a3.id = ta3.article_id
-                  WHERE ta3.topic_id = t.id
-                ) AS recent,
-              (
-                  SELECT a2.source
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0 ELSE 1 END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                  LIMIT 1
-                ) AS source,
-              i.importance,
-              i.summary,
-              i.key_points,
-              i.evidence_urls,
-              i.tags,
-              i.perspectives,
-              i.perspective_digest
-            FROM topics t
-            LEFT JOIN topic_insights i ON i.topic_id = t.id
-            WHERE (t.category IS NULL OR t.category = '')
-              AND COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
-              AND NOT EXISTS (
-                SELECT 1
-                FROM topic_articles ta4
-                JOIN articles a4 ON a4.id = ta4.article_id
-                WHERE ta4.topic_id = t.id
-                  AND COALESCE(a4.kind,'') = 'news'
-              )
-              AND t.id IN ({placeholders})
-            """
-            params = [cutoff_48h, *missing_ids]
-        else:
-            sql_missing = f"""
-            SELECT
-              t.id,
-              COALESCE(t.title_ja, t.title) AS title,
-              (
-                  SELECT a2.url
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE
-                        WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                        ELSE 1
-                      END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                    LIMIT 1
-                ) AS url,
-                (
-                  SELECT COALESCE(
-                    NULLIF(a2.published_at,''),
-                    a2.fetched_at
-                  )
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                    CASE
-                      WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                      ELSE 1
-                    END,
-                    datetime(a2.fetched_at) DESC,
-                    datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                    a2.url ASC
-                  LIMIT 1
-                ) AS article_date,
-              (
-                  SELECT COALESCE(SUM(
-                    CASE
-                      WHEN datetime(
-                        substr(
-                          replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                          1, 19
-                        )
-                      ) >= datetime(?) THEN 1
-                      ELSE 0
-                    END
-                  ), 0)
-                  FROM topic_articles ta3
-                  JOIN articles a3 ON a3.id = ta3.article_id
-                  WHERE ta3.topic_id = t.id
-                ) AS recent,
-              (
-                  SELECT a2.source
-                  FROM topic_articles ta2
-                  JOIN articles a2 ON a2.id = ta2.article_id
-                  WHERE ta2.topic_id = t.id
-                  ORDER BY
-                      CASE WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0 ELSE 1 END,
-                      datetime(a2.fetched_at) DESC,
-                      datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-                      a2.url ASC
-                  LIMIT 1
-                ) AS source,
-              i.importance,
-              i.summary,
-              i.key_points,
-              i.evidence_urls,
-              i.tags,
-              i.perspectives,
-              i.perspective_digest
-            FROM topics t
-            LEFT JOIN topic_insights i ON i.topic_id = t.id
-            WHERE t.category = ?
-              AND COALESCE(NULLIF(t.category,''), 'other') <> 'news'
-              AND NOT EXISTS (
-                SELECT 1
-                FROM topic_articles ta4
-                JOIN articles a4 ON a4.id = ta4.article_id
-                WHERE ta4.topic_id = t.id
-                  AND COALESCE(a4.kind,'') = 'news'
-              )
-              AND t.id IN ({placeholders})
-            """
-            params = [cutoff_48h, cat_id, *missing_ids]
+        sql_missing = _TOPIC_LIST_SQL.format(topic_cond=topic_cond) + f"AND t.id IN ({placeholders})"
+        params = [*topic_params, *missing_ids]
 
         cur.execute(sql_missing, params)
         for r in cur.fetchall():
@@ -2672,81 +2209,40 @@ def _build_cross_category_top(
         tech_cat_ids = [c["id"] for c in tech_categories if c.get("id") and c.get("id") != "other"]
 
     ph = ",".join(["?"] * len(tech_cat_ids))
+    # 最新記事の URL・代表記事の日付・48h 件数は topic_stats から引く（トピックごとの相関サブクエリを使わない）
     cur.execute(
-    f"""
-    SELECT
-      t.id,
-      COALESCE(t.title_ja, t.title) AS title,
-      COALESCE(NULLIF(t.category,''), 'other') AS category,
-      (
-        SELECT a2.url
-        FROM topic_articles ta2
-        JOIN articles a2 ON a2.id = ta2.article_id
-        WHERE ta2.topic_id = t.id
-        ORDER BY a2.id DESC
-        LIMIT 1
-      ) AS url,
-      (
-        SELECT COALESCE(
-          NULLIF(a2.published_at,''),
-          a2.fetched_at
-        )
-        FROM topic_articles ta2
-        JOIN articles a2 ON a2.id = ta2.article_id
-        WHERE ta2.topic_id = t.id
+        f"""
+        SELECT
+          t.id,
+          COALESCE(t.title_ja, t.title) AS title,
+          COALESCE(NULLIF(t.category,''), 'other') AS category,
+          na.url AS url,
+          COALESCE(NULLIF(ra.published_at,''), ra.fetched_at) AS article_date,
+          COALESCE(s.recent_48h, 0) AS recent,
+          i.importance,
+          i.summary,
+          i.tags,
+          i.perspectives,
+          i.perspective_digest
+        FROM topics t
+        LEFT JOIN topic_stats s ON s.topic_id = t.id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles ra ON ra.id = s.rep_article_id
+        LEFT JOIN topic_insights i ON i.topic_id = t.id
+        WHERE COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
+          AND COALESCE(s.news_count, 0) = 0
         ORDER BY
           CASE
-            WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-            ELSE 1
-          END,
-          datetime(a2.fetched_at) DESC,
-          datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-          a2.url ASC
-        LIMIT 1
-      ) AS article_date,
-      (
-        SELECT COALESCE(SUM(
-          CASE
-            WHEN datetime(
-              substr(
-                replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                1, 19
-              )
-            ) >= datetime(?) THEN 1
+            WHEN COALESCE(NULLIF(t.category,''), 'other') IN ({ph}) THEN 1
             ELSE 0
-          END
-        ), 0)
-        FROM topic_articles ta3
-        JOIN articles a3 ON a3.id = ta3.article_id
-        WHERE ta3.topic_id = t.id
-      ) AS recent,
-      i.importance,
-      i.summary,
-      i.tags,
-      i.perspectives,
-      i.perspective_digest
-    FROM topics t
-    LEFT JOIN topic_insights i ON i.topic_id = t.id
-    WHERE COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
-      AND NOT EXISTS (
-        SELECT 1
-        FROM topic_articles ta4
-        JOIN articles a4 ON a4.id = ta4.article_id
-        WHERE ta4.topic_id = t.id
-          AND COALESCE(a4.kind,'') = 'news'
-      )
-    ORDER BY
-      CASE
-        WHEN COALESCE(NULLIF(t.category,''), 'other') IN ({ph}) THEN 1
-        ELSE 0
-      END DESC,
-      COALESCE(i.importance,0) DESC,
-      COALESCE(recent,0) DESC,
-      t.id ASC
-    LIMIT 10
-    """,
-    (cutoff_48h, *tech_cat_ids),
-)
+          END DESC,
+          COALESCE(i.importance,0) DESC,
+          COALESCE(recent,0) DESC,
+          t.id ASC
+        LIMIT 10
+        """,
+        tuple(tech_cat_ids),
+    )
 
     global_top = []
     for tid, title, category, url, article_date,recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -2772,82 +2268,25 @@ def _build_cross_category_top(
           t.id,
           COALESCE(t.title_ja, t.title) AS title,
           COALESCE(NULLIF(t.category,''), 'other') AS category,
-          (
-            SELECT a2.url
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY a2.id DESC
-            LIMIT 1
-          ) AS url,
-          (
-            SELECT COALESCE(
-              NULLIF(a2.published_at,''),
-              a2.fetched_at
-            )
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY
-              CASE
-                WHEN COALESCE(NULLIF(a2.content,''), '') != '' THEN 0
-                ELSE 1
-              END,
-              datetime(a2.fetched_at) DESC,
-              datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC,
-              a2.url ASC
-            LIMIT 1
-          ) AS article_date,
-          (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-          ) AS recent,
+          na.url AS url,
+          COALESCE(NULLIF(ra.published_at,''), ra.fetched_at) AS article_date,
+          COALESCE(s.recent_48h, 0) AS recent,
           i.importance,
           i.summary,
           i.tags,
           i.perspectives,
           i.perspective_digest
-        FROM topics t
+        FROM topic_stats s
+        JOIN topics t ON t.id = s.topic_id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles ra ON ra.id = s.rep_article_id
         LEFT JOIN topic_insights i ON i.topic_id = t.id
-        WHERE (
-          SELECT COALESCE(SUM(
-            CASE
-              WHEN datetime(
-                substr(
-                  replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                  1, 19
-                )
-              ) >= datetime(?) THEN 1
-              ELSE 0
-            END
-          ), 0)
-          FROM topic_articles ta3
-          JOIN articles a3 ON a3.id = ta3.article_id
-          WHERE ta3.topic_id = t.id
-        ) > 0
+        WHERE s.recent_48h > 0
           AND COALESCE(NULLIF(t.category,''), 'other') NOT IN ('news', 'market')
-          AND NOT EXISTS (
-            SELECT 1
-            FROM topic_articles ta4
-            JOIN articles a4 ON a4.id = ta4.article_id
-            WHERE ta4.topic_id = t.id
-              AND COALESCE(a4.kind,'') = 'news'
-          )
+          AND s.news_count = 0
         ORDER BY COALESCE(recent,0) DESC, COALESCE(i.importance,0) DESC, t.id ASC
         LIMIT 10
-        """,
-        (cutoff_48h, cutoff_48h),
+        """
     )
     trending_top = []
     for tid, title, category, url, article_date, recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -2866,56 +2305,30 @@ def _build_cross_category_top(
             "date": article_date or "",
         })
 
+    # market の日付は event_ts が最新の記事
     cur.execute(
         """
         SELECT
           t.id,
           COALESCE(t.title_ja, t.title) AS title,
           COALESCE(NULLIF(t.category,''), 'other') AS category,
-          (
-            SELECT a2.url
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY a2.id DESC
-            LIMIT 1
-          ) AS url,
-          (
-            SELECT COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC
-            LIMIT 1
-          ) AS article_date,
-          (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-          ) AS recent,
+          na.url AS url,
+          COALESCE(NULLIF(la.published_at,''), la.fetched_at) AS article_date,
+          COALESCE(s.recent_48h, 0) AS recent,
           i.importance,
           i.summary,
           i.tags,
           i.perspectives,
           i.perspective_digest
         FROM topics t
+        LEFT JOIN topic_stats s ON s.topic_id = t.id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles la ON la.id = s.latest_article_id
         LEFT JOIN topic_insights i ON i.topic_id = t.id
         WHERE COALESCE(NULLIF(t.category,''), 'other') = 'market'
         ORDER BY COALESCE(i.importance,0) DESC, COALESCE(recent,0) DESC, t.id ASC
         LIMIT 10
-        """,
-        (cutoff_48h,),
+        """
     )
     market_top = []
     for tid, title, category, url, article_date, recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -2940,66 +2353,24 @@ def _build_cross_category_top(
           t.id,
           COALESCE(t.title_ja, t.title) AS title,
           COALESCE(NULLIF(t.category,''), 'other') AS category,
-          (
-            SELECT a2.url
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY a2.id DESC
-            LIMIT 1
-          ) AS url,
-          (
-            SELECT COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)
-            FROM topic_articles ta2
-            JOIN articles a2 ON a2.id = ta2.article_id
-            WHERE ta2.topic_id = t.id
-            ORDER BY datetime(COALESCE(NULLIF(a2.published_at,''), a2.fetched_at)) DESC
-            LIMIT 1
-          ) AS article_date,
-          (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-          ) AS recent,
+          na.url AS url,
+          COALESCE(NULLIF(la.published_at,''), la.fetched_at) AS article_date,
+          COALESCE(s.recent_48h, 0) AS recent,
           i.importance,
           i.summary,
           i.tags,
           i.perspectives,
           i.perspective_digest
-        FROM topics t
+        FROM topic_stats s
+        JOIN topics t ON t.id = s.topic_id
+        LEFT JOIN articles na ON na.id = s.max_article_id
+        LEFT JOIN articles la ON la.id = s.latest_article_id
         LEFT JOIN topic_insights i ON i.topic_id = t.id
-        WHERE COALESCE(NULLIF(t.category,''), 'other') = 'market'
-          AND (
-            SELECT COALESCE(SUM(
-              CASE
-                WHEN datetime(
-                  substr(
-                    replace(replace(COALESCE(NULLIF(a3.published_at,''), a3.fetched_at),'T',' '),'+00:00',''),
-                    1, 19
-                  )
-                ) >= datetime(?) THEN 1
-                ELSE 0
-              END
-            ), 0)
-            FROM topic_articles ta3
-            JOIN articles a3 ON a3.id = ta3.article_id
-            WHERE ta3.topic_id = t.id
-          ) > 0
+        WHERE s.recent_48h > 0
+          AND COALESCE(NULLIF(t.category,''), 'other') = 'market'
         ORDER BY COALESCE(recent,0) DESC, COALESCE(i.importance,0) DESC, t.id ASC
         LIMIT 10
-        """,
-        (cutoff_48h, cutoff_48h),
+        """
     )
     market_trending_top = []
     for tid, title, category, url, article_date, recent, importance, summary, tags, perspectives, perspective_digest in cur.fetchall():
@@ -3021,6 +2392,18 @@ def _build_cross_category_top(
     return global_top, trending_top, market_top, market_trending_top
 
 
+def _advance_topic_stats(now_dt: datetime) -> None:
+    """topic_stats の窓の基準時刻を now_dt に進め、未反映の変更と合わせて数え直す（書き込み用の短い接続）。"""
+    init_db()
+    wconn = connect()
+    try:
+        refreshed = update_topic_stats(wconn.cursor(), now_dt)
+        wconn.commit()
+    finally:
+        wconn.close()
+    print(f"[TIME] step=render topic_stats refreshed={refreshed}")
+
+
 def main():
     t0 = _now_sec()
     print("[TIME] step=render start")
@@ -3028,7 +2411,14 @@ def main():
     out_dir = Path("docs")
     out_dir.mkdir(exist_ok=True)
 
-    conn = connect()
+    # topic_stats の 48h / 7 日窓を描画時刻まで進めてから読む（窓から外れた記事のトピックだけ数え直す）
+    render_now = datetime.now(timezone.utc)
+    _advance_topic_stats(render_now)
+
+    # 描画は読み取り専用の接続で行い、書き込む処理（スナップショット保存・エンティティ抽出）は
+    # それぞれ自前の書き込み用接続を開く。退避 DB があれば ATTACH し、タイムラインと検索インデックスは
+    # 退避済みの記事も読む（各ページの集計は本体の直近の記事だけを読む）
+    conn = connect(readonly=True, archive=True)
     cur = conn.cursor()
     # categories: YAML -> DB -> other
     tech_categories, cat_name = _build_tech_categories(cur)
@@ -3036,7 +2426,7 @@ def main():
     topics_by_cat: Dict[str, List[Dict[str, Any]]] = {}
     hot_by_cat: Dict[str, List[Dict[str, Any]]] = {}
     # 48h cutoff（UTCでSQLite互換の "YYYY-MM-DD HH:MM:SS"）
-    cutoff_48h = (datetime.now(timezone.utc) - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
+    cutoff_48h = (render_now - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
 
     LIMIT_PER_CAT = 15
     HOT_TOP_N = 5
@@ -3057,6 +2447,7 @@ def main():
     category_dist = _ops_data["category_dist"]
     source_exposure = _ops_data["source_exposure"]
     feed_issues = _ops_data["feed_issues"]
+    fetch_domains = _ops_data["fetch_domains"]
     primary_ratio_by_category = _ops_data["primary_ratio_by_category"]
     primary_ratio_threshold = _ops_data["primary_ratio_threshold"]
     rss_sources = _ops_data["rss_sources"]
@@ -3181,6 +2572,7 @@ def main():
             category_dist=category_dist,
             source_exposure=source_exposure,
             feed_issues=feed_issues,
+            fetch_domains=fetch_domains,
             feed_quality=feed_quality,
             primary_ratio_by_category=primary_ratio_by_category,
             primary_ratio_threshold=primary_ratio_threshold,
@@ -3221,7 +2613,7 @@ def main():
         try:
             # Diff ビュー生成（スナップショット保存→差分描画）
             from diff_view import save_today_snapshot, render_diff_page
-            save_today_snapshot(conn)
+            save_today_snapshot()
             render_diff_page(out_dir, conn)
         except Exception as e:
             _log_render_error("diff.render", e, level="error")
@@ -3251,7 +2643,7 @@ def main():
         try:
             # エンティティ抽出＋企業別ページ（辞書マッチ）
             from entities import extract_entities_by_dict, render_entity_pages
-            extract_entities_by_dict(conn)
+            extract_entities_by_dict()
             render_entity_pages(out_dir, conn=conn, top_n=30)
         except Exception as e:
             _log_render_error("entities.render", e, level="error")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from db import event_ts_expr
 from text_clean import clean_for_html
 
 
@@ -11,9 +12,10 @@ def _clean_rows(rows):
 
 
 def fetch_news_articles(cur, region: str, limit: int = 60):
+    ts = event_ts_expr(cur)
     if region:
         cur.execute(
-            """
+            f"""
             SELECT
               articles.id AS article_id,
               COALESCE(NULLIF(title_ja,''), NULLIF(title,''), url) AS title,
@@ -41,14 +43,14 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
               ) AS summary
             FROM articles
             WHERE kind='news' AND region=?
-            ORDER BY datetime(substr(replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),1, 19)) DESC, id DESC
+            ORDER BY {ts} DESC, id DESC
             LIMIT ?
             """,
             (region, limit),
         )
     else:
         cur.execute(
-            """
+            f"""
             SELECT COALESCE(NULLIF(title_ja,''), NULLIF(title,''), url) AS title, url,
               COALESCE(NULLIF(source,''), '') AS source,
               COALESCE(NULLIF(category,''), '') AS category,
@@ -56,7 +58,7 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
               COALESCE(NULLIF(published_at,''), fetched_at) AS dt
             FROM articles
             WHERE kind='news'
-            ORDER BY datetime(substr(replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),1,19)) DESC, id DESC
+            ORDER BY {ts} DESC, id DESC
             LIMIT ?
             """,
             (limit,),
@@ -65,8 +67,9 @@ def fetch_news_articles(cur, region: str, limit: int = 60):
 
 
 def fetch_news_articles_by_category(cur, region: str, category: str, limit: int = 40):
+    ts = event_ts_expr(cur, "a.")
     cur.execute(
-        """
+        f"""
         SELECT
           a.id AS article_id,
           COALESCE(NULLIF(a.title_ja,''), NULLIF(a.title,''), a.url) AS title,
@@ -125,7 +128,7 @@ def fetch_news_articles_by_category(cur, region: str, category: str, limit: int
           ) AS is_representative
         FROM articles a
         WHERE a.kind='news' AND COALESCE(a.region,'')=? AND COALESCE(a.category,'')=?
-        ORDER BY datetime(substr(replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),1,19)) DESC, a.id DESC
+        ORDER BY {ts} DESC, a.id DESC
         LIMIT ?
         """,
         (region, category, limit),
@@ -134,10 +137,11 @@ def fetch_news_articles_by_category(cur, region: str, category: str, limit: int
 
 
 def count_news_recent_48h(cur, region: str, category: str, cutoff_dt: str) -> int:
+    ts = event_ts_expr(cur)
     cur.execute(
-        """
+        f"""
         SELECT COALESCE(SUM(
-          CASE WHEN datetime(substr(replace(replace(COALESCE(NULLIF(published_at,''), fetched_at),'T',' '),'+00:00',''),1,19)) >= datetime(?) THEN 1 ELSE 0 END
+          CASE WHEN {ts} >= datetime(?) THEN 1 ELSE 0 END
         ),0)
         FROM articles
         WHERE kind='news' AND COALESCE(region,'')=? AND COALESCE(category,'')=?
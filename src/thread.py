@@ -1,8 +1,17 @@
 import logging
+import os
 import re
+from collections import Counter
 from datetime import datetime, timezone
-from rapidfuzz import fuzz
-from db import connect
+from rapidfuzz import fuzz, process
+from db import (
+    connect,
+    ensure_watermarks_table,
+    event_ts_expr,
+    get_watermark,
+    refresh_topic_stats,
+    set_watermark,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -10,8 +19,22 @@ logger = logging.getLogger(__name__)
 TOPIC_SIM = 88
 NEWS_TOPIC_SIM = 94
 
-# 比較対象を増やしすぎないため、各カテゴリで直近の topic をこの件数だけ比較
-CANDIDATE_TOPICS_PER_CAT = 400
+# 全トピックを照合対象にするが、採点（token_set_ratio）するのは索引キーを多く共有する
+# 上位この件数まで（頻出語だけを共有する大量のトピックを採点しない）
+MAX_TOPIC_CANDIDATES = 100
+# これより多くのトピックに現れる索引キー（頻出語）は、より珍しいキーがあれば候補集めに使わない
+FREQUENT_KEY_TOPICS = 1000
+
+# 未紐付けの記事を id 順にこの件数ずつ読み、バッチごとに確定（コミット）する
+BATCH_SIZE = int(os.environ.get("THREAD_BATCH_SIZE", "2000"))
+# pipeline_watermarks 上の thread の処理済み記事 id
+WATERMARK_NAME = "thread"
+
+# 1 なら edges と代表記事を全トピック分作り直す（修復用。既定は変更のあったトピックだけ）
+FULL_REBUILD = os.environ.get("THREAD_FULL_REBUILD", "0") == "1"
+
+# 転置索引のキー: 英数字は語単位、かな漢字は語の区切りが無いため文字 2-gram 単位
+_INDEX_TOKEN_RE = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u4e00-\u9fff]+")
 
 NOISE_PATTERNS = [
     r"\bupdate\b", r"\breleased?\b", r"\bannounce[sd]?\b", r"\bintroducing\b",
@@ -20,52 +43,153 @@ NOISE_PATTERNS = [
     r"\bcve-\d{4}-\d+\b",  # CVEはテーマに寄与するが、同テーマがバラける原因にもなるので一旦ノイズ扱い（後で改善可）
 ]
 
+_BRACKET_RE = re.compile(r"\[[^\]]+\]|\([^)]+\)")
+_NOISE_RES = [re.compile(p, re.IGNORECASE) for p in NOISE_PATTERNS]
+_NON_TITLE_CHAR_RE = re.compile(r"[^a-z0-9\u3040-\u30ff\u4e00-\u9fff\s\-_/]")
+_SPACE_RE = re.compile(r"\s+")
+
 def normalize_title(title: str) -> str:
     t = (title or "").lower()
-    t = re.sub(r"\[[^\]]+\]|\([^)]+\)", " ", t)  # []や()の補足を落とす
-    for p in NOISE_PATTERNS:
-        t = re.sub(p, " ", t, flags=re.IGNORECASE)
-    t = re.sub(r"[^a-z0-9\u3040-\u30ff\u4e00-\u9fff\s\-_/]", " ", t)  # 日本語も残す
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _BRACKET_RE.sub(" ", t)  # []や()の補足を落とす
+    for p in _NOISE_RES:
+        t = p.sub(" ", t)
+    t = _NON_TITLE_CHAR_RE.sub(" ", t)  # 日本語も残す
+    t = _SPACE_RE.sub(" ", t).strip()
     return t
 
 def make_topic_key(norm_title: str) -> str:
     # 先頭だけキーにして、表記揺れに強くする
     return norm_title[:120]
 
-def load_topic_candidates(cur):
-    """
-    各カテゴリの直近トピック候補を読み込む
-    {cat: [(topic_id, topic_title_norm, topic_title_raw), ...]}
-    """
+def index_tokens(norm_title: str) -> set[str]:
+    """正規化タイトルの転置索引キー（英数字かかな漢字を含む語が共通なら、キーも必ず共通になる）。"""
+    keys = set()
+    for m in _INDEX_TOKEN_RE.findall(norm_title or ""):
+        if m[0].isascii() or len(m) == 1:
+            keys.add(m)
+        else:
+            keys.update(m[i:i + 2] for i in range(len(m) - 1))
+    return keys
+
+
+class TopicIndex:
+    """(kind, region, category) ごとのトピック転置索引（後から追加したものほど優先）。"""
+
+    def __init__(self):
+        self._topics: dict[tuple, list[tuple[int, str]]] = {}
+        self._postings: dict[tuple, dict[str, list[int]]] = {}
+
+    @classmethod
+    def from_candidates(cls, candidates_by_cat):
+        """旧形式 {key: [(topic_id, topic_title_norm, topic_title_raw), ...]}（新しい順）から作る。"""
+        index = cls()
+        for key, items in candidates_by_cat.items():
+            for item in reversed(items):
+                index.add(key, item[0], item[1])
+        return index
+
+    def add(self, key: tuple, topic_id: int, norm_title: str):
+        topics = self._topics.setdefault(key, [])
+        postings = self._postings.setdefault(key, {})
+        pos = len(topics)
+        topics.append((topic_id, norm_title))
+        for tok in index_tokens(norm_title):
+            postings.setdefault(tok, []).append(pos)
+
+    def candidates(self, key: tuple, norm_title: str, limit: int = MAX_TOPIC_CANDIDATES) -> list[tuple[int, str]]:
+        """索引キーを共有するトピックを、共有キー数の多い順に最大 limit 件選んで新しい順に返す。
+
+        FREQUENT_KEY_TOPICS を超える頻出キーは、最も珍しいキーでない限り数えない。
+        """
+        postings = self._postings.get(key)
+        if not postings:
+            return []
+        lists = sorted((postings[tok] for tok in index_tokens(norm_title) if tok in postings), key=len)
+        if not lists:
+            return []
+        shared = Counter()
+        for i, plist in enumerate(lists):
+            if i and len(plist) > FREQUENT_KEY_TOPICS:
+                break
+            shared.update(plist)
+        picked = list(shared)
+        if len(picked) > limit:
+            # 共有キー数の多い順に limit 件。境界の共有キー数では新しいトピックを残す
+            room, cut = limit, 0
+            for count, n in sorted(Counter(shared.values()).items(), reverse=True):
+                if n > room:
+                    cut = count
+                    break
+                room -= n
+            picked = [pos for pos, count in shared.items() if count > cut]
+            picked += sorted((pos for pos, count in shared.items() if count == cut), reverse=True)[:room]
+        topics = self._topics[key]
+        return [topics[pos] for pos in sorted(picked, reverse=True)]
+
+    def __len__(self):
+        return sum(len(v) for v in self._topics.values())
+
+
+def load_topic_candidates(cur) -> TopicIndex:
+    """既存の全トピックを (kind, region, category) ごとの転置索引に読み込む。"""
     cur.execute("""
         SELECT id, title, kind, region, category
         FROM topics
-        ORDER BY id DESC
+        ORDER BY id
     """)
-    by_cat = {}
+    index = TopicIndex()
     for tid, ttitle, kind, region, cat in cur.fetchall():
         if cat is None or not kind:
             continue
-        key = (kind, region or "", cat)
-        if len(by_cat.get(key, [])) >= CANDIDATE_TOPICS_PER_CAT:
-            continue
-        by_cat.setdefault(key, []).append((tid, normalize_title(ttitle or ""), ttitle or ""))
-    return by_cat
+        index.add((kind, region or "", cat), tid, normalize_title(ttitle or ""))
+    return index
+
+def fetch_unthreaded_articles(cur, after_id: int = 0, limit: int = BATCH_SIZE, *, upto_id=None, kinds=None):
+    """id が after_id より大きく（upto_id 以下で）どのトピックにも紐付いていない記事を id 順に最大 limit 件返す。
+
+    [(id, title, title_ja, kind, region, category), ...]。thread（処理済み位置の続きから）と
+    topic_backfill（thread が処理済みなのに紐付かなかった記事だけ、kinds で絞る）が共用する。
+    """
+    filters = ""
+    params = [after_id]
+    if upto_id is not None:
+        filters += " AND a.id <= ?"
+        params.append(upto_id)
+    if kinds:
+        filters += f" AND a.kind IN ({','.join('?' * len(kinds))})"
+        params.extend(kinds)
+    params.append(limit)
+    cur.execute(f"""
+        SELECT a.id, a.title, a.title_ja, a.kind, a.region, a.category
+        FROM articles a
+        WHERE a.id > ?{filters}
+          AND NOT EXISTS (SELECT 1 FROM topic_articles ta WHERE ta.article_id = a.id)
+        ORDER BY a.id
+        LIMIT ?
+    """, params)
+    return cur.fetchall()
 
 def find_best_topic(norm_title: str, kind: str, region: str, cat: str, candidates_by_cat):
-    best_tid = None
-    best_score = -1
+    """閾値以上で最も近いトピック (topic_id, score)。無ければ (None, -1)。
+
+    candidates_by_cat は TopicIndex（旧形式の dict も受け付ける）。索引キーを共有する
+    トピック（最大 MAX_TOPIC_CANDIDATES 件）だけを token_set_ratio で採点し、
+    同点なら新しいトピックを選ぶ。
+    """
+    if not isinstance(candidates_by_cat, TopicIndex):
+        candidates_by_cat = TopicIndex.from_candidates(candidates_by_cat)
     sim_threshold = NEWS_TOPIC_SIM if kind == "news" else TOPIC_SIM
-    key = (kind, region or "", cat)
-    for tid, tnorm, _traw in candidates_by_cat.get(key, []):
-        score = fuzz.token_set_ratio(norm_title, tnorm)
-        if score > best_score:
-            best_score = score
-            best_tid = tid
-    if best_score >= sim_threshold:
-        return best_tid, best_score
-    return None, best_score
+    candidates = candidates_by_cat.candidates((kind, region or "", cat), norm_title)
+    if not candidates:
+        return None, -1
+    best = process.extractOne(
+        norm_title, [tnorm for _tid, tnorm in candidates],
+        scorer=fuzz.token_set_ratio, score_cutoff=sim_threshold,
+    )
+    if best is None:
+        return None, -1
+    _choice, score, pos = best
+    return candidates[pos][0], score
 
 
 def ensure_topic_articles_columns(cur):
@@ -75,7 +199,97 @@ def ensure_topic_articles_columns(cur):
         cur.execute("ALTER TABLE topic_articles ADD COLUMN is_representative INTEGER DEFAULT 0")
 
 
-def mark_news_representative_articles(cur):
+def ensure_dirty_topics_table(cur) -> bool:
+    """edges・代表記事の作り直しが必要なトピックを記録する表とトリガを用意する。
+
+    topic_articles の追加・削除（thread / topic_backfill の紐付け、dedupe の孤児掃除、
+    topic_key 重複の統合）と、並び順・代表の判定に使う記事列やトピック種別の変更を
+    トリガで拾うので、どのステップが書き換えても次回の thread で反映される。
+    表を新規に作った場合は True（それ以前の変更は記録されていないので全件作り直す）。
+    """
+    created = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='thread_dirty_topics'"
+    ).fetchone() is None
+    cur.execute("CREATE TABLE IF NOT EXISTS thread_dirty_topics (topic_id INTEGER PRIMARY KEY)")
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS thread_dirty_topic_articles_ai AFTER INSERT ON topic_articles BEGIN
+          INSERT OR IGNORE INTO thread_dirty_topics(topic_id) VALUES (new.topic_id);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS thread_dirty_topic_articles_ad AFTER DELETE ON topic_articles BEGIN
+          INSERT OR IGNORE INTO thread_dirty_topics(topic_id) VALUES (old.topic_id);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS thread_dirty_articles_au
+        AFTER UPDATE OF published_at, fetched_at, source_tier ON articles
+        WHEN old.published_at IS NOT new.published_at
+          OR old.fetched_at IS NOT new.fetched_at
+          OR old.source_tier IS NOT new.source_tier
+        BEGIN
+          INSERT OR IGNORE INTO thread_dirty_topics(topic_id)
+          SELECT topic_id FROM topic_articles WHERE article_id = new.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS thread_dirty_articles_ad AFTER DELETE ON articles BEGIN
+          INSERT OR IGNORE INTO thread_dirty_topics(topic_id)
+          SELECT topic_id FROM topic_articles WHERE article_id = old.id;
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS thread_dirty_topics_au AFTER UPDATE OF kind ON topics
+        WHEN old.kind IS NOT new.kind
+        BEGIN
+          INSERT OR IGNORE INTO thread_dirty_topics(topic_id) VALUES (new.id);
+        END
+        """
+    )
+    return created
+
+
+def rebuild_edges(cur, dirty_only: bool = True) -> int:
+    """トピック内の記事を published_at→id で並べ、前→後を親子とする edges を作り直す。
+
+    dirty_only なら thread_dirty_topics のトピックだけ。作り直した edges の本数を返す。
+    """
+    if dirty_only:
+        cur.execute("DELETE FROM edges WHERE topic_id IN (SELECT topic_id FROM thread_dirty_topics)")
+        topic_filter = "WHERE ta.topic_id IN (SELECT topic_id FROM thread_dirty_topics)"
+    else:
+        cur.execute("DELETE FROM edges")
+        topic_filter = ""
+    cur.execute(f"""
+        SELECT ta.topic_id, a.id
+        FROM topic_articles ta
+        JOIN articles a ON a.id=ta.article_id
+        {topic_filter}
+        ORDER BY ta.topic_id, COALESCE(a.published_at,''), a.id
+    """)
+    edges = []
+    prev_tid = prev_aid = None
+    for tid, aid in cur.fetchall():
+        if tid == prev_tid:
+            edges.append((tid, prev_aid, aid))
+        prev_tid, prev_aid = tid, aid
+    cur.executemany("""
+        INSERT OR IGNORE INTO edges(topic_id, parent_article_id, child_article_id)
+        VALUES(?,?,?)
+    """, edges)
+    return len(edges)
+
+
+def mark_news_representative_articles(cur, dirty_only: bool = False):
     """news トピックごとの代表記事に is_representative=1 を立てる。
 
     以前は CTE `ranked` を相関サブクエリ `EXISTS(...)` の中から参照していたが、
@@ -83,10 +297,15 @@ def mark_news_representative_articles(cur):
     再計算するため、実測で約490秒かかっていた。
     代表記事を一時テーブルへ一度だけ確定させ、UPDATE 2本に分けることで解消する。
     判定結果（どの行に1が立つか）は従来と同一。
+    dirty_only なら thread_dirty_topics のトピックだけを判定し直す。
     """
+    news_topics = "SELECT id FROM topics WHERE COALESCE(kind,'')='news'"
+    ts = event_ts_expr(cur, "a.")
+    if dirty_only:
+        news_topics += " AND id IN (SELECT topic_id FROM thread_dirty_topics)"
     cur.execute("DROP TABLE IF EXISTS temp._news_rep")
     cur.execute(
-        """
+        f"""
         CREATE TEMP TABLE _news_rep AS
         SELECT topic_id, article_id FROM (
           SELECT
@@ -96,13 +315,12 @@ def mark_news_representative_articles(cur):
               PARTITION BY ta.topic_id
               ORDER BY
                 CASE COALESCE(NULLIF(a.source_tier,''), 'secondary') WHEN 'primary' THEN 1 ELSE 0 END DESC,
-                datetime(substr(replace(replace(COALESCE(NULLIF(a.published_at,''), a.fetched_at),'T',' '),'+00:00',''),1,19)) DESC,
+                {ts} DESC,
                 a.id DESC
             ) AS rn
           FROM topic_articles ta
-          JOIN topics t ON t.id = ta.topic_id
           JOIN articles a ON a.id = ta.article_id
-          WHERE COALESCE(t.kind,'')='news'
+          WHERE ta.topic_id IN ({news_topics})
         )
         WHERE rn = 1
         """
@@ -113,17 +331,17 @@ def mark_news_representative_articles(cur):
 
     # まず news トピック配下を一旦 0 に落としてから、代表行だけ 1 を立てる
     cur.execute(
-        """
+        f"""
         UPDATE topic_articles
         SET is_representative = 0
-        WHERE topic_id IN (SELECT id FROM topics WHERE COALESCE(kind,'')='news')
+        WHERE topic_id IN ({news_topics})
         """
     )
     cur.execute(
-        """
+        f"""
         UPDATE topic_articles
         SET is_representative = 1
-        WHERE topic_id IN (SELECT id FROM topics WHERE COALESCE(kind,'')='news')
+        WHERE topic_id IN ({news_topics})
           AND EXISTS (
             SELECT 1 FROM _news_rep r
             WHERE r.topic_id = topic_articles.topic_id
@@ -133,7 +351,11 @@ def mark_news_representative_articles(cur):
     )
     cur.execute("DROP TABLE temp._news_rep")
 
-def main():
+def main(full_rebuild: bool | None = None):
+    """未紐付けの記事をトピックに寄せ、変更のあったトピックの edges と代表記事を作り直す。
+
+    full_rebuild（既定は THREAD_FULL_REBUILD 環境変数）なら全トピック分を作り直す。
+    """
     import time as _time
     t0 = _time.perf_counter()
     logger.info("step=thread start")
@@ -142,86 +364,87 @@ def main():
     now = datetime.now(timezone.utc).isoformat()
 
     ensure_topic_articles_columns(cur)
+    if ensure_dirty_topics_table(cur):
+        full_rebuild = True
+    if full_rebuild is None:
+        full_rebuild = FULL_REBUILD
 
-    # まず既存 topics を候補として読む
+    # まず既存 topics を候補として読む（全件を転置索引に載せる）
     candidates_by_cat = load_topic_candidates(cur)
+    logger.info("step=thread topics_indexed=%d", len(candidates_by_cat))
 
-    # 直近の articles を処理（必要なら件数増やしてOK）
-    cur.execute("""
-        SELECT id, title, kind, region, category
-        FROM articles
-        ORDER BY id DESC
-        LIMIT 2000
-    """)
-    articles = cur.fetchall()
+    # 前回までに見た記事 id（処理済み位置）より後ろの未紐付け記事を id 順に処理する
+    ensure_watermarks_table(cur)
+    watermark = get_watermark(cur, WATERMARK_NAME)
+    processed = linked = 0
+    while True:
+        articles = fetch_unthreaded_articles(cur, after_id=watermark, limit=BATCH_SIZE)
+        if not articles:
+            break
+        for aid, title, _title_ja, kind, region, cat in articles:
+            if not title or not cat or not kind:
+                continue
 
-    for aid, title, kind, region, cat in articles:
-        if not title or not cat or not kind:
-            continue
+            norm = normalize_title(title)
+            if not norm:
+                continue
 
-        # すでに topic に紐付いてたらスキップ
-        cur.execute("SELECT 1 FROM topic_articles WHERE article_id=? LIMIT 1", (aid,))
-        if cur.fetchone():
-            continue
+            tid, score = find_best_topic(norm, kind, region, cat, candidates_by_cat)
 
-        norm = normalize_title(title)
-        if not norm:
-            continue
+            if tid is None:
+                # 新規 topic
+                key = make_topic_key(norm)
+                # topic_key が衝突しても title は更新せず、既存を使う
+                cur.execute("""
+                    INSERT OR IGNORE INTO topics(topic_key, title, category, kind, region, created_at)
+                    VALUES(?,?,?,?,?,?)
+                """, (key, title[:200], cat, kind, region, now))
 
-        tid, score = find_best_topic(norm, kind, region, cat, candidates_by_cat)
-
-        if tid is None:
-            # 新規 topic
-            key = make_topic_key(norm)
-            # topic_key が衝突しても title は更新せず、既存を使う
-            cur.execute("""
-                INSERT OR IGNORE INTO topics(topic_key, title, category, kind, region, created_at)
-                VALUES(?,?,?,?,?,?)
-            """, (key, title[:200], cat, kind, region, now))
-
-            cur.execute("SELECT id, title FROM topics WHERE topic_key=?", (key,))
-            row = cur.fetchone()
-            if row:
-                tid = row[0]
-                # 候補にも追加して、以降の記事が同topicに寄るようにする
-                ckey = (kind, region or "", cat)
-                candidates_by_cat.setdefault(ckey, []).insert(0, (tid, normalize_title(row[1] or ""), row[1] or ""))
-
-        # 紐付け
-        cur.execute("INSERT OR IGNORE INTO topic_articles(topic_id, article_id) VALUES(?,?)", (tid, aid))
-
-    # ツリー（topic内をpublished_at→idで並べ、前→後を親子）
-    cur.execute("""
-        SELECT ta.topic_id, a.id, COALESCE(a.published_at,''), a.title
-        FROM topic_articles ta
-        JOIN articles a ON a.id=ta.article_id
-        ORDER BY ta.topic_id, COALESCE(a.published_at,''), a.id
-    """)
-    rows = cur.fetchall()
+                cur.execute("SELECT id, title FROM topics WHERE topic_key=?", (key,))
+                row = cur.fetchone()
+                if row:
+                    tid = row[0]
+                    # 候補にも追加して、以降の記事が同topicに寄るようにする
+                    candidates_by_cat.add((kind, region or "", cat), tid, normalize_title(row[1] or ""))
 
-    by_topic = {}
-    for tid, aid, pub, t in rows:
-        by_topic.setdefault(tid, []).append((pub, aid))
+            # 紐付け
+            cur.execute("INSERT OR IGNORE INTO topic_articles(topic_id, article_id) VALUES(?,?)", (tid, aid))
+            linked += 1
 
-    for tid, items in by_topic.items():
-        cur.execute("DELETE FROM edges WHERE topic_id=?", (tid,))
-        for i in range(1, len(items)):
-            parent = items[i-1][1]
-            child = items[i][1]
-            cur.execute("""
-                INSERT OR IGNORE INTO edges(topic_id, parent_article_id, child_article_id)
-                VALUES(?,?,?)
-            """, (tid, parent, child))
+        # 紐付けと処理済み位置を同じトランザクションで確定する（途中で落ちても次回はその続きから）
+        processed += len(articles)
+        watermark = articles[-1][0]
+        set_watermark(cur, WATERMARK_NAME, watermark)
+        conn.commit()
+        if len(articles) < BATCH_SIZE:
+            break
+    logger.info("step=thread intake processed=%d linked=%d watermark=%d", processed, linked, watermark)
 
-    mark_news_representative_articles(cur)
+    # ツリーと代表記事は、今回を含め前回の thread 以降に記事の増減があったトピックだけ作り直す
+    dirty = cur.execute("SELECT COUNT(*) FROM thread_dirty_topics").fetchone()[0]
+    edges = rebuild_edges(cur, dirty_only=not full_rebuild)
+    mark_news_representative_articles(cur, dirty_only=not full_rebuild)
+    cur.execute("DELETE FROM thread_dirty_topics")
+    logger.info(
+        "step=thread rebuilt %s dirty_topics=%d edges=%d",
+        "all" if full_rebuild else "dirty", dirty, edges,
+    )
+    # 紐付けが増えたトピックの集計（topic_stats）も同じトランザクションで反映する
+    logger.info("step=thread topic_stats refreshed=%d", refresh_topic_stats(cur))
 
     conn.commit()
     conn.close()
     logger.info("step=thread end sec=%.1f", _time.perf_counter() - t0)
 
 if __name__ == "__main__":
+    import argparse
+
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
-    main()
+    ap = argparse.ArgumentParser(description="記事をトピックに紐付け、edges と代表記事を更新する")
+    ap.add_argument("--full-rebuild", action="store_true",
+                    help="edges と代表記事を全トピック分作り直す（修復用）")
+    args = ap.parse_args()
+    main(full_rebuild=True if args.full_rebuild else None)
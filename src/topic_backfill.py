@@ -1,34 +1,30 @@
 # src/topic_backfill.py
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timezone
 
+from db import connect as connect_db, ensure_watermarks_table, get_watermark
+from thread import WATERMARK_NAME, fetch_unthreaded_articles
+
 def connect():
     base = Path(__file__).resolve().parent.parent
-    return sqlite3.connect(base / "data" / "state.sqlite")
+    return connect_db(base / "data" / "state.sqlite")
 
 def main(limit: int = 500):
     con = connect()
     cur = con.cursor()
 
-    # 未トピック化の news/tech を拾う
-    sql = """
-    SELECT a.id, a.kind, a.category, a.title, a.title_ja
-    FROM articles a
-    LEFT JOIN topic_articles ta ON ta.article_id = a.id
-    WHERE ta.article_id IS NULL
-      AND a.kind IN ('news','tech')
-    ORDER BY COALESCE(a.published_at, a.fetched_at) DESC
-    LIMIT ?
-    """
-    cur.execute(sql, (limit,))
-    rows = cur.fetchall()
+    # 未トピック化の news/tech を拾う。thread と同じ取り込みクエリで、thread が処理済みなのに
+    # 紐付けなかった記事（カテゴリ・タイトル欠け等）だけを対象にする（未処理分は thread に任せる）
+    ensure_watermarks_table(cur)
+    rows = fetch_unthreaded_articles(
+        cur, after_id=0, limit=limit, upto_id=get_watermark(cur, WATERMARK_NAME), kinds=("news", "tech")
+    )
 
     now = datetime.now(timezone.utc).isoformat()
     created_topics = 0
     linked = 0
 
-    for article_id, kind, category, title, title_ja in rows:
+    for article_id, title, title_ja, kind, _region, category in rows:
         # category 空は kind を採用（news/tech を落とさない）
         cat = (category.strip() if category else "") or kind
 
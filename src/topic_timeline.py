@@ -9,7 +9,7 @@ from datetime import datetime, timedelta, timezone
 from html import escape
 from pathlib import Path
 
-from db import connect
+from db import archive_source, connect, table_exists
 from page_common import PAGE_BASE_CSS, PAGE_DARK_CSS
 
 
@@ -41,7 +41,7 @@ def render_topic_timelines(
 
     owns_conn = False
     if conn is None:
-        conn = connect()
+        conn = connect(readonly=True, archive=True)
         owns_conn = True
     cur = conn.cursor()
 
@@ -57,15 +57,19 @@ def render_topic_timelines(
         (int(top_n),),
     )
     target_ids |= {r[0] for r in cur.fetchall()}
-    cutoff_48h = (datetime.now(timezone.utc) - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
-    cur.execute(
-        """
-        SELECT DISTINCT ta.topic_id FROM topic_articles ta
-        JOIN articles a ON a.id = ta.article_id
-        WHERE COALESCE(a.published_at, a.fetched_at) >= ?
-        """,
-        (cutoff_48h,),
-    )
+    if table_exists(cur, "topic_stats"):
+        # 48h 件数は topic_stats が持つ（全記事を走査しない）
+        cur.execute("SELECT topic_id FROM topic_stats WHERE recent_48h > 0")
+    else:
+        cutoff_48h = (datetime.now(timezone.utc) - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
+        cur.execute(
+            """
+            SELECT DISTINCT ta.topic_id FROM topic_articles ta
+            JOIN articles a ON a.id = ta.article_id
+            WHERE COALESCE(a.published_at, a.fetched_at) >= ?
+            """,
+            (cutoff_48h,),
+        )
     target_ids |= {r[0] for r in cur.fetchall()}
 
     # 詳細をチャンク取得（SQLite の IN 句上限対策）
@@ -94,10 +98,13 @@ def render_topic_timelines(
         topics.extend(cur.fetchall())
     topics.sort(key=lambda r: ((r[3] or 0), str(r[5] or "")), reverse=True)
 
+    # 記事の一覧は退避済みの古い記事も含める（退避 DB を ATTACH した接続なら all_<表> を読む）。
+    # 対象のトピックは本体から選ぶ（記事がすべて退避されたトピックは更新が無く、既存のページがそのまま使える）
+    ta_src, a_src = archive_source(cur, "topic_articles"), archive_source(cur, "articles")
     generated = 0
     for topic_id, title, category, importance, summary, updated_at in topics:
         cur.execute(
-            """
+            f"""
             SELECT
               a.id,
               COALESCE(a.title_ja, a.title) AS title,
@@ -105,8 +112,8 @@ def render_topic_timelines(
               COALESCE(a.url, ''),
               COALESCE(a.published_at, a.fetched_at) AS dt,
               COALESCE(a.content, '')
-            FROM topic_articles ta
-            JOIN articles a ON a.id = ta.article_id
+            FROM {ta_src} ta
+            JOIN {a_src} a ON a.id = ta.article_id
             WHERE ta.topic_id = ?
             ORDER BY COALESCE(a.published_at, a.fetched_at) ASC
             """,
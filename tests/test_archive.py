@@ -0,0 +1,222 @@
+"""古い記事の退避（archive.py）と、退避済みの行を all_<表> の TEMP VIEW で読む view 層のテスト。"""
+import collections
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import archive
+import db
+import forecast_generate
+import render_feeds
+import topic_timeline
+
+NOW = datetime.now(timezone.utc)
+
+
+def _ts(days_ago: float) -> str:
+    return (NOW - timedelta(days=days_ago)).isoformat(timespec="seconds")
+
+
+def _setup(tmp_path, monkeypatch):
+    """トピック 1 は古い記事と新しい記事、2 は古い記事だけ、3 は新しい記事だけを持つ。"""
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    conn = sqlite3.connect(db.DB_PATH)
+    for i, (days, title) in enumerate(
+        [(400, "old release notes"), (300, "legacy outage"), (250, "legacy outage follow up"),
+         (1, "new release notes"), (2, "fresh launch")],
+        start=1,
+    ):
+        conn.execute(
+            "INSERT INTO articles(id, url, title, content, category, kind, published_at, fetched_at) "
+            "VALUES (?, ?, ?, ?, 'ai', 'tech', ?, ?)",
+            (i, f"https://example.com/{i}", title, f"body {title}", _ts(days), _ts(days)),
+        )
+    conn.executemany(
+        "INSERT INTO topics(id, topic_key, title, category, kind) VALUES (?, ?, ?, 'ai', 'tech')",
+        [(1, "k1", "release notes"), (2, "k2", "legacy outage"), (3, "k3", "fresh launch")],
+    )
+    conn.executemany(
+        "INSERT INTO topic_articles(topic_id, article_id, is_representative) VALUES (?, ?, ?)",
+        [(1, 1, 1), (1, 4, 0), (2, 2, 1), (2, 3, 0), (3, 5, 1)],
+    )
+    conn.executemany(
+        "INSERT INTO topic_insights(topic_id, importance, summary) VALUES (?, ?, ?)",
+        [(1, 90, "summary 1"), (2, 80, "summary 2"), (3, 70, "summary 3")],
+    )
+    conn.executemany("INSERT INTO edges VALUES (?, ?, ?)", [(1, 1, 4), (2, 2, 3)])
+    conn.execute("INSERT INTO entities(id, name, slug) VALUES (1, 'Example', 'example')")
+    conn.executemany("INSERT INTO article_entities(article_id, entity_id) VALUES (?, 1)", [(1,), (4,)])
+    db.refresh_topic_stats(conn.cursor())
+    conn.commit()
+    conn.close()
+
+
+def _ids(conn, sql):
+    return [row[0] for row in conn.execute(sql)]
+
+
+def test_archive_moves_old_articles_and_cold_topics(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    monkeypatch.setattr(archive, "BATCH_SIZE", 1)  # バッチごとのコミットを跨いでも同じ結果になる
+
+    moved = archive.main(days=30)
+    assert dict(moved) == {"articles": 3, "topic_articles": 3, "article_entities": 1,
+                           "topics": 1, "topic_insights": 1, "edges": 1}
+
+    conn = sqlite3.connect(db.DB_PATH)
+    assert _ids(conn, "SELECT id FROM articles ORDER BY id") == [4, 5]
+    assert _ids(conn, "SELECT id FROM topics ORDER BY id") == [1, 3]
+    assert _ids(conn, "SELECT topic_id FROM topic_insights ORDER BY topic_id") == [1, 3]
+    assert _ids(conn, "SELECT article_id FROM article_entities") == [4]
+    # 記事が減ったトピックの集計は同じトランザクションで数え直され、冷えたトピックの行は消える
+    assert conn.execute("SELECT topic_id, article_count FROM topic_stats ORDER BY topic_id").fetchall() == [
+        (1, 1), (3, 1)
+    ]
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='articles_fts'").fetchone():
+        assert _ids(conn, "SELECT rowid FROM articles_fts WHERE articles_fts MATCH 'legacy'") == []
+    assert db.get_watermark(conn.cursor(), db.ARCHIVE_WATERMARK) > 0
+    conn.close()
+
+    conn = sqlite3.connect(db.archive_path())
+    assert _ids(conn, "SELECT id FROM articles ORDER BY id") == [1, 2, 3]
+    assert _ids(conn, "SELECT id FROM topics") == [2]
+    assert conn.execute("SELECT * FROM edges").fetchall() == [(2, 2, 3)]
+    conn.close()
+
+    assert sum(archive.main(days=30).values()) == 0
+
+
+def _render_readers(out_dir, cur):
+    topic_timeline.render_topic_timelines(out_dir, top_n=0, include_ids=[1], conn=cur.connection)
+    render_feeds.render_search_page(out_dir, "now", cur)
+    return {
+        "timeline": (out_dir / "topic" / "1" / "index.html").read_text(encoding="utf-8"),
+        "search": (out_dir / "search-index.json").read_text(encoding="utf-8"),
+        # 重要度が同じ記事の並びは SQL 上も未定義なので行の集合で比べる
+        "digest_all": sorted(forecast_generate.build_news_digest(cur, hours=24 * 500, per_cat=10).splitlines()),
+        "digest_48h": sorted(forecast_generate.build_news_digest(cur, hours=48, per_cat=10).splitlines()),
+    }
+
+
+def test_readers_see_archived_rows_through_views(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    conn = db.connect(readonly=True, archive=True)
+    before = _render_readers(tmp_path / "before", conn.cursor())
+    conn.close()
+    assert "old release notes" in before["timeline"]
+    assert "- [重要度80] legacy outage — summary 2" in before["digest_all"]
+
+    archive.main(days=30)
+    conn = db.connect(readonly=True, archive=True)
+    assert _render_readers(tmp_path / "after", conn.cursor()) == before
+    conn.close()
+
+
+def test_archive_source_reads_archive_only_past_the_boundary(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    conn = db.connect(readonly=True, archive=True)
+    assert db.archive_source(conn.cursor(), "articles") == "articles"  # 退避 DB がまだ無い
+    conn.close()
+
+    archive.main(days=30)
+    recent = (NOW - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    old = (NOW - timedelta(days=60)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = db.connect(readonly=True, archive=True)
+    cur = conn.cursor()
+    assert db.archive_source(cur, "articles") == "all_articles"
+    assert db.archive_source(cur, "articles", since=recent) == "articles"
+    assert db.archive_source(cur, "topic_insights", since=old) == "all_topic_insights"
+    conn.close()
+
+    conn = db.connect(readonly=True)
+    assert db.archive_source(conn.cursor(), "articles") == "articles"  # ATTACH しない接続は本体だけ
+    conn.close()
+
+
+def test_views_and_archive_follow_columns_added_to_main(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    archive.main(days=30)
+    conn = sqlite3.connect(db.DB_PATH)
+    db.ensure_column(conn.cursor(), "articles", "summary_ja", "TEXT")
+    conn.execute("UPDATE articles SET summary_ja='要約' WHERE id=4")
+    conn.commit()
+    conn.close()
+
+    conn = db.connect(readonly=True, archive=True)
+    assert conn.execute("SELECT id, summary_ja FROM all_articles ORDER BY id").fetchall() == [
+        (1, None), (2, None), (3, None), (4, "要約"), (5, None)
+    ]
+    conn.close()
+
+    archive.main(days=0)  # 退避先にも列が足されてから移す
+    conn = sqlite3.connect(db.archive_path())
+    assert conn.execute("SELECT summary_ja FROM articles WHERE id=4").fetchone() == ("要約",)
+    conn.close()
+
+
+def _collect_old_feed(monkeypatch, url):
+    """400 日前の記事を載せ続けるフィードを collect の書き込み経路（process_feed）で 1 回処理する。"""
+    import collect
+    from email.utils import format_datetime
+
+    monkeypatch.setattr(collect, "log_feed_health", lambda **_kw: None)
+    pub = format_datetime(NOW - timedelta(days=400))
+    d = collect.feedparser.parse(
+        f"<rss><channel><item><title>old post</title><link>{url}</link>"
+        f"<pubDate>{pub}</pubDate><description>body</description></item></channel></rss>".encode()
+    )
+    feed = {"url": "https://blog.example/rss", "source": "blog", "category": "ai", "kind": "tech",
+            "region": "global", "limit": 10, "source_tier": "secondary", "tls_mode": "strict"}
+    conn = db.connect()
+    db.attach_archive(conn)
+    stats = collect.init_failure_stats()
+    collect.process_feed(conn.cursor(), feed, d, failure_stats=stats, validators={},
+                         source_week_new_count=collections.defaultdict(int), fulltext_jobs=[])
+    conn.commit()
+    conn.close()
+    return dict(stats["articles"])
+
+
+def test_collect_does_not_reinsert_archived_articles(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    url = "https://blog.example/old-post"
+
+    assert _collect_old_feed(monkeypatch, url) == {"new": 1, "changed": 0, "unchanged": 0}
+    archive.main(days=180)
+    for _ in range(2):
+        # 退避済みの URL は既知として扱い、本体にも退避先にも増やさない
+        assert _collect_old_feed(monkeypatch, url) == {"archived": 1, "new": 0, "changed": 0, "unchanged": 0}
+        archive.main(days=180)
+
+    conn = sqlite3.connect(db.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM articles WHERE url=?", (url,)).fetchone() == (0,)
+    conn.close()
+    conn = sqlite3.connect(db.archive_path())
+    assert conn.execute("SELECT COUNT(*) FROM articles WHERE url=?", (url,)).fetchone() == (1,)
+    conn.close()
+
+
+def test_archive_replaces_archived_article_with_same_url(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    archive.main(days=30)
+    # 退避済みの URL の記事が別の id で本体に入っていた場合（退避 DB を ATTACH しない書き込み等）
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.execute(
+        "INSERT INTO articles(id, url, title, content, category, kind, published_at, fetched_at) "
+        "VALUES (9, 'https://example.com/1', 'old release notes', 'body', 'ai', 'tech', ?, ?)",
+        (_ts(400), _ts(400)),
+    )
+    conn.commit()
+    conn.close()
+
+    archive.main(days=30)
+    conn = sqlite3.connect(db.archive_path())
+    assert conn.execute("SELECT id FROM articles WHERE url='https://example.com/1'").fetchall() == [(9,)]
+    # 置き換えた古い行（id=1）の紐付けも残さない
+    assert conn.execute("SELECT COUNT(*) FROM topic_articles WHERE article_id=1").fetchone() == (0,)
+    assert conn.execute("SELECT COUNT(*) FROM article_entities WHERE article_id=1").fetchone() == (0,)
+    conn.close()
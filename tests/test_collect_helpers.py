@@ -1,6 +1,7 @@
 """collect.py の純関数ヘルパーに対する単体テスト。"""
 import sys
 from pathlib import Path
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -37,8 +38,8 @@ def test_fetch_fulltext_returns_empty_for_skipped_domain():
 
 
 def test_fetch_fulltext_returns_empty_on_network_error():
-    """urlopen が例外を投げても fetch_fulltext は空文字を返す。"""
-    with patch("collect.urllib.request.urlopen", side_effect=TimeoutError("fake")):
+    """HTTP 取得が例外を投げても fetch_fulltext は空文字を返す。"""
+    with patch("collect.http_client.get", side_effect=TimeoutError("fake")):
         assert collect.fetch_fulltext("https://example.com/article") == ""
 
 
@@ -50,10 +51,11 @@ def test_fetch_fulltext_extracts_text_from_html():
 
     class FakeResp:
         # HTTP ヘッダは dict.get でアクセスされるため、"Content-Type" キーで返す
+        status_code = 200
         headers = {"Content-Type": "text/html; charset=utf-8"}
 
-        def read(self, n=None):
-            return fake_html
+        def iter_content(self, chunk_size=None):
+            yield fake_html
 
         def __enter__(self):
             return self
@@ -61,7 +63,7 @@ def test_fetch_fulltext_extracts_text_from_html():
         def __exit__(self, exc_type, exc, tb):
             return False
 
-    with patch("collect.urllib.request.urlopen", return_value=FakeResp()):
+    with patch("collect.http_client.get", return_value=FakeResp()):
         out = collect.fetch_fulltext("https://example.com/article")
 
     assert "本文テスト" in out
@@ -103,3 +105,629 @@ def test_classify_error_unknown():
 
 def test_classify_error_hint_overrides():
     assert collect.classify_error(ValueError("x"), hint="my_hint") == "my_hint"
+
+
+# --- 条件付き GET (ETag / Last-Modified) -----------------------------------
+class _FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise collect.requests.HTTPError(f"http={self.status_code}")
+
+
+def test_parse_feed_with_requests_sends_validators_and_skips_parse_on_304(monkeypatch):
+    sent = {}
+
+    def fake_get(url, headers=None, **kwargs):
+        sent.update(headers or {})
+        return _FakeResponse(304)
+
+    monkeypatch.setattr(collect.http_client, "get", fake_get)
+    monkeypatch.setattr(collect.feedparser, "parse", MagicMock(side_effect=AssertionError("parsed")))
+
+    d = collect._parse_feed_with_requests(
+        "https://example.com/rss",
+        tls_mode="strict",
+        validators={"etag": '"abc"', "modified": "Wed, 01 Jan 2026 00:00:00 GMT"},
+    )
+    assert sent["If-None-Match"] == '"abc"'
+    assert sent["If-Modified-Since"] == "Wed, 01 Jan 2026 00:00:00 GMT"
+    assert collect.is_not_modified(d)
+    assert d.entries == []
+    assert d.etag == '"abc"'
+
+
+def test_parse_feed_with_requests_records_validators_from_200(monkeypatch):
+    rss = b"<rss><channel><item><title>t</title><link>https://e.com/a</link></item></channel></rss>"
+    monkeypatch.setattr(
+        collect.http_client,
+        "get",
+        lambda url, **kw: _FakeResponse(200, rss, {"ETag": "W/\"v2\"", "Last-Modified": "Thu"}),
+    )
+    d = collect._parse_feed_with_requests("https://example.com/rss", tls_mode="strict")
+    assert not collect.is_not_modified(d)
+    assert len(d.entries) == 1
+    assert d.etag == 'W/"v2"'
+    assert d.modified == "Thu"
+
+
+def test_feed_validators_roundtrip():
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE feed_health (feed_url TEXT PRIMARY KEY, failure_count INTEGER DEFAULT 0, "
+        "last_success_at TEXT, last_failure_reason TEXT, suspend_until TEXT, etag TEXT, last_modified TEXT)"
+    )
+    feed = {"url": "https://example.com/rss", "source": "ex"}
+    collect.mark_feed_success(cur, feed=feed, now_iso="2026-01-01T00:00:00+00:00")
+    collect.save_feed_validators(cur, feed["url"], etag='"x"', modified="")
+    # バリデータが無いフィードは返さない
+    collect.mark_feed_success(cur, feed={"url": "https://other/rss"}, now_iso="2026-01-01T00:00:00+00:00")
+
+    assert collect.load_feed_validators(cur) == {feed["url"]: {"etag": '"x"', "modified": ""}}
+
+
+def test_empty_feed_stores_validators_and_gets_304_next_time(tmp_path, monkeypatch):
+    import sqlite3
+
+    import db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    monkeypatch.setattr(collect, "log_feed_health", lambda **_kw: None)
+
+    def fake_get(url, headers=None, **kwargs):
+        if (headers or {}).get("If-None-Match") == '"e1"':
+            return _FakeResponse(304)
+        return _FakeResponse(200, b"<rss><channel><title>empty</title></channel></rss>", {"ETag": '"e1"'})
+
+    monkeypatch.setattr(collect.http_client, "get", fake_get)
+    feed = {"url": "https://example.com/rss", "source": "ex", "category": "ai", "kind": "tech",
+            "region": "global", "limit": 10, "source_tier": "secondary", "tls_mode": "strict"}
+    conn = sqlite3.connect(db.DB_PATH)
+    cur = conn.cursor()
+
+    def run(validators):
+        stats = collect.init_failure_stats()
+        d = collect._parse_feed_with_requests(feed["url"], tls_mode="strict", validators=validators.get(feed["url"]))
+        collect.process_feed(cur, feed, d, failure_stats=stats, validators=validators,
+                             source_week_new_count={}, fulltext_jobs=[])
+        return stats["feed_outcomes"]
+
+    # 200 だが記事 0 件（bozo なし）でもバリデータを保存し、次回は 304 になる
+    assert run({})["fetched"] == 1
+    validators = collect.load_feed_validators(cur)
+    assert validators == {feed["url"]: {"etag": '"e1"', "modified": ""}}
+    assert run(validators)["not_modified"] == 1
+    conn.close()
+
+
+def test_prefetch_feeds_passes_validators_per_feed(monkeypatch):
+    seen = {}
+
+    def fake_parse_with_requests(url, *, tls_mode, user_agent=None, validators=None):
+        seen[url] = validators
+        return collect.feedparser.FeedParserDict(status=304, entries=[])
+
+    monkeypatch.setattr(collect, "_parse_feed_with_requests", fake_parse_with_requests)
+    result = collect._prefetch_feeds(
+        [{"url": "https://a/rss"}, {"url": "https://b/rss"}],
+        {"https://a/rss": {"etag": "1", "modified": ""}},
+    )
+    assert seen == {"https://a/rss": {"etag": "1", "modified": ""}, "https://b/rss": None}
+    assert all(collect.is_not_modified(d) for d in result.values())
+
+
+# --- fulltext_cache --------------------------------------------------------
+def _fulltext_cache_cursor():
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE fulltext_cache (url TEXT PRIMARY KEY, status TEXT, size INTEGER DEFAULT 0, "
+        "text TEXT, fetched_at TEXT, expires_at TEXT)"
+    )
+    return cur
+
+
+def _fulltext_stage_cursor():
+    cur = _fulltext_cache_cursor()
+    for table in ("articles", "low_priority_articles"):
+        cur.execute(f"CREATE TABLE {table} (url TEXT PRIMARY KEY, content TEXT)")
+    return cur
+
+
+def test_run_fulltext_stage_hits_cache_on_second_run(monkeypatch):
+    cur = _fulltext_stage_cursor()
+    cur.execute("INSERT INTO articles VALUES ('https://example.com/a', 'thin')")
+    stats = collect.init_failure_stats()
+    calls = []
+
+    def fake_batch(urls, **kwargs):
+        calls.append(list(urls))
+        return {u: ("本文" * 200, "ok", 1234) for u in urls}
+
+    monkeypatch.setattr(collect, "fetch_fulltext_batch", fake_batch)
+    now_iso = "2026-01-01T00:00:00+00:00"
+    jobs = [{"url": "https://example.com/a", "table": "articles"}]
+    assert collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=now_iso) == 1
+    cur.execute("UPDATE articles SET content='thin'")
+    assert collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=now_iso) == 1
+
+    assert calls == [["https://example.com/a"]]  # 2 回目はネットワークに出ない
+    assert cur.execute("SELECT content FROM articles").fetchone()[0] == "本文" * 200
+    assert stats["fulltext"]["cache_miss"] == 1
+    assert stats["fulltext"]["cache_hit"] == 1
+    assert stats["fulltext"]["fetched"] == 1
+
+
+def test_run_fulltext_stage_caches_negative_results_until_expiry(monkeypatch):
+    cur = _fulltext_stage_cursor()
+    cur.execute("INSERT INTO low_priority_articles VALUES ('https://slow.example/a', 'thin')")
+    stats = collect.init_failure_stats()
+    calls = []
+
+    def fake_batch(urls, **kwargs):
+        calls.append(list(urls))
+        return {u: ("", "timeout_error", 0) for u in urls}
+
+    monkeypatch.setattr(collect, "fetch_fulltext_batch", fake_batch)
+    jobs = [{"url": "https://slow.example/a", "table": "low_priority_articles"}]
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=t0.isoformat()) == 0
+    assert collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=t0.isoformat()) == 0
+    assert len(calls) == 1
+    assert stats["fulltext"]["negative_hit"] == 1
+    assert cur.execute("SELECT content FROM low_priority_articles").fetchone()[0] == "thin"
+
+    # 一時的失敗は短い TTL で期限切れになり再取得される
+    later = t0 + timedelta(hours=collect.FULLTEXT_CACHE_NEG_TTL_HOURS + 1)
+    collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=later.isoformat())
+    assert len(calls) == 2
+
+
+def test_run_fulltext_stage_does_not_cache_budget_skipped_urls(monkeypatch):
+    cur = _fulltext_stage_cursor()
+    stats = collect.init_failure_stats()
+    monkeypatch.setattr(collect, "fetch_fulltext_batch", lambda urls, **kwargs: {})
+    jobs = [{"url": "https://e.com/a", "table": "articles"}]
+    collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso="2026-01-01T00:00:00+00:00")
+    assert stats["fulltext"]["budget_skipped"] == 1
+    assert cur.execute("SELECT COUNT(*) FROM fulltext_cache").fetchone()[0] == 0
+
+
+def test_put_fulltext_cache_keeps_permanent_failures_for_full_ttl():
+    cur = _fulltext_cache_cursor()
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    collect.put_fulltext_cache(cur, "https://e.com/x", status="content_too_short", text="", size=10, now_iso=t0.isoformat())
+    later = t0 + timedelta(hours=collect.FULLTEXT_CACHE_NEG_TTL_HOURS + 1)
+    assert collect.get_fulltext_cache(cur, "https://e.com/x", now_iso=later.isoformat())["status"] == "content_too_short"
+
+    expired = t0 + timedelta(hours=collect.FULLTEXT_CACHE_TTL_HOURS + 1)
+    assert collect.purge_fulltext_cache(cur, now_iso=expired.isoformat()) == 1
+
+
+def test_fetch_fulltext_result_reports_failure_status():
+    assert collect.fetch_fulltext_result("https://www3.nhk.or.jp/news/a") == ("", "skip_domain", 0)
+    with patch("collect.http_client.get", side_effect=TimeoutError("fake")):
+        assert collect.fetch_fulltext_result("https://example.com/a") == ("", "timeout_error", 0)
+
+
+# --- fetch_fulltext_batch --------------------------------------------------
+def test_fetch_fulltext_batch_caps_concurrency_per_host(monkeypatch):
+    import threading
+    import time
+
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def fake_download(url):
+        host = url.split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return b"<p>" + ("x" * collect.MIN_CONTENT_CHARS).encode() + b"</p>", "utf-8", "ok", 10
+
+    monkeypatch.setattr(collect, "download_fulltext", fake_download)
+    urls = [f"https://a.example/{i}" for i in range(6)] + [f"https://b.example/{i}" for i in range(3)]
+    out = collect.fetch_fulltext_batch(urls, workers=6, per_host=2, budget_sec=10, parse_workers=0)
+
+    assert set(out) == set(urls)
+    assert all(status == "ok" for _text, status, _size in out.values())
+    assert peak["a.example"] <= 2
+    assert peak["b.example"] <= 2
+
+
+def test_fetch_fulltext_batch_stops_at_budget(monkeypatch):
+    import time
+
+    def fake_download(url):
+        if "slow" in url:
+            time.sleep(1.0)
+        return b"", "", "timeout_error", 0
+
+    monkeypatch.setattr(collect, "download_fulltext", fake_download)
+    started = time.perf_counter()
+    out = collect.fetch_fulltext_batch(
+        ["https://fast.example/a", "https://slow.example/a"],
+        workers=2, per_host=1, budget_sec=0.3, parse_workers=0,
+    )
+    assert time.perf_counter() - started < 0.9
+    assert out == {"https://fast.example/a": ("", "timeout_error", 0)}
+
+
+def test_fetch_fulltext_batch_extracts_in_process_pool(monkeypatch):
+    body = "本文テスト。" * 50
+    monkeypatch.setattr(
+        collect,
+        "download_fulltext",
+        lambda url: (f"<html><body><p>{body}</p></body></html>".encode("utf-8"), "utf-8", "ok", 99),
+    )
+    out = collect.fetch_fulltext_batch(["https://e.com/a"], workers=1, per_host=1, budget_sec=30, parse_workers=1)
+    text, status, size = out["https://e.com/a"]
+    assert status == "ok" and size == 99
+    assert "本文テスト" in text and "<p>" not in text
+
+
+# --- ドメイン別統計・サーキットブレーカー ------------------------------------
+def _breaker_stage_cursor(tmp_path, monkeypatch):
+    import sqlite3
+
+    import db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    return sqlite3.connect(db.DB_PATH).cursor()
+
+
+def test_breaker_opens_on_failures_and_closes_after_successful_probe(tmp_path, monkeypatch):
+    cur = _breaker_stage_cursor(tmp_path, monkeypatch)
+    stats = collect.init_failure_stats()
+    outcome = {"status": "timeout_error"}
+    calls = []
+
+    def fake_batch(urls, latencies=None, **kwargs):
+        calls.append(list(urls))
+        for u in urls:
+            latencies[u] = 15.0
+        return {u: ("", outcome["status"], 0) if outcome["status"] != "ok" else ("本文" * 200, "ok", 500) for u in urls}
+
+    monkeypatch.setattr(collect, "fetch_fulltext_batch", fake_batch)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    jobs = [{"url": f"https://slow.example/{i}", "table": "articles"} for i in range(collect.BREAKER_MIN_SAMPLES)]
+    collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=t0.isoformat())
+    row = cur.execute(
+        "SELECT breaker_state, trips, success_rate, p95_ms FROM fulltext_domain_stats WHERE domain='slow.example'"
+    ).fetchone()
+    assert row == ("open", 1, 0.0, 15000)
+
+    # open 中は新しい URL も取得しない（キャッシュもしない）
+    more = [{"url": "https://slow.example/new", "table": "articles"}, {"url": "https://ok.example/a", "table": "articles"}]
+    outcome["status"] = "ok"
+    collect.run_fulltext_stage(cur, more, stats=stats, now_iso=(t0 + timedelta(hours=1)).isoformat())
+    assert calls[-1] == ["https://ok.example/a"]
+    assert stats["fulltext"]["breaker_skipped"] == 1
+
+    # cooldown 経過後は 1 件だけ試験取得し、成功すれば closed に戻る
+    probe = [{"url": f"https://slow.example/p{i}", "table": "articles"} for i in range(3)]
+    later = t0 + timedelta(hours=collect.BREAKER_COOLDOWN_HOURS + 1)
+    collect.run_fulltext_stage(cur, probe, stats=stats, now_iso=later.isoformat())
+    assert calls[-1] == ["https://slow.example/p0"]
+    state, trips, recent = cur.execute(
+        "SELECT breaker_state, trips, recent FROM fulltext_domain_stats WHERE domain='slow.example'"
+    ).fetchone()
+    assert (state, trips) == ("closed", 0)
+    assert recent == "[[1, 15000]]"
+
+
+def test_breaker_probe_failure_doubles_cooldown(tmp_path, monkeypatch):
+    cur = _breaker_stage_cursor(tmp_path, monkeypatch)
+    stats = collect.init_failure_stats()
+    monkeypatch.setattr(
+        collect, "fetch_fulltext_batch", lambda urls, latencies=None, **kw: {u: ("", "connection_error", 0) for u in urls}
+    )
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    jobs = [{"url": f"https://down.example/{i}", "table": "articles"} for i in range(collect.BREAKER_MIN_SAMPLES)]
+    collect.run_fulltext_stage(cur, jobs, stats=stats, now_iso=t0.isoformat())
+
+    probe_at = t0 + timedelta(hours=collect.BREAKER_COOLDOWN_HOURS + 1)
+    collect.run_fulltext_stage(
+        cur, [{"url": "https://down.example/p", "table": "articles"}], stats=stats, now_iso=probe_at.isoformat()
+    )
+    state, trips, open_until = cur.execute(
+        "SELECT breaker_state, trips, open_until FROM fulltext_domain_stats"
+    ).fetchone()
+    assert (state, trips) == ("open", 2)
+    assert datetime.fromisoformat(open_until) == probe_at + timedelta(hours=collect.BREAKER_COOLDOWN_HOURS * 2)
+
+
+def test_content_failures_do_not_trip_breaker_and_stats_accumulate(tmp_path, monkeypatch):
+    cur = _breaker_stage_cursor(tmp_path, monkeypatch)
+    samples = [(f"https://thin.example/{i}", "content_too_short", 0.1 * (i + 1), 1000) for i in range(10)]
+    changed = collect.update_domain_stats(
+        cur, samples, breakers={}, probing=set(), now_iso="2026-01-01T00:00:00+00:00"
+    )
+    assert changed == {}
+    row = cur.execute(
+        "SELECT attempts, successes, bytes, success_rate, p50_ms, p95_ms, breaker_state FROM fulltext_domain_stats"
+    ).fetchone()
+    assert row == (10, 10, 10000, 1.0, 500, 1000, "closed")
+
+
+# --- パイプラインモード ----------------------------------------------------
+_REAL_FEEDPARSER_PARSE = collect.feedparser.parse
+
+
+def _run_collect_main(monkeypatch, tmp_path, *, pipeline: bool):
+    import sqlite3
+    import time
+
+    import db
+
+    db_path = tmp_path / f"state_{int(pipeline)}.sqlite"
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    monkeypatch.setattr(collect, "init_db", db.init_db)
+    monkeypatch.setattr(collect, "connect", lambda: sqlite3.connect(db_path))
+    monkeypatch.setattr(collect, "append_collect_health_log", lambda **_kw: None)
+
+    def rss(prefix, n):
+        items = "".join(
+            f"<item><title>{prefix} {i}</title><link>https://{prefix}.example/{i}</link>"
+            f"<description>body {i}</description></item>"
+            for i in range(n)
+        )
+        return _REAL_FEEDPARSER_PARSE(f"<rss><channel>{items}</channel></rss>".encode())
+
+    parsed = {"https://slow.example/rss": rss("slow", 3), "https://fast.example/rss": rss("fast", 4)}
+
+    def fake_parse_with_requests(url, *, tls_mode, user_agent=None, validators=None, limit=None):
+        if url == "https://slow.example/rss":
+            time.sleep(0.2)
+        if url not in parsed:
+            raise ValueError("broken feed")
+        return parsed[url]
+
+    monkeypatch.setattr(collect, "_parse_feed_with_requests", fake_parse_with_requests)
+    # フォールバック経路（feedparser.parse(url)）はネットワークに出さず失敗させる
+    monkeypatch.setattr(collect.feedparser, "parse", MagicMock(side_effect=ValueError("offline")))
+    base = {"category": "ai", "kind": "tech", "region": "global", "limit": 10,
+            "source_tier": "secondary", "weekly_new_limit": None, "tls_mode": "strict"}
+    monkeypatch.setattr(
+        collect,
+        "load_feed_list",
+        lambda _cfg: [
+            {**base, "url": "https://slow.example/rss", "source": "slow", "vendor": "slow"},
+            {**base, "url": "https://broken.example/rss", "source": "broken", "vendor": "broken"},
+            {**base, "url": "https://fast.example/rss", "source": "fast", "vendor": "fast"},
+        ],
+    )
+
+    collect.main(pipeline=pipeline)
+
+    conn = sqlite3.connect(db_path)
+    articles = conn.execute("SELECT url, title, content, category FROM articles ORDER BY url").fetchall()
+    health = conn.execute(
+        "SELECT feed_url, failure_count, last_failure_reason FROM feed_health ORDER BY feed_url"
+    ).fetchall()
+    conn.close()
+    return articles, health
+
+
+def test_pipeline_mode_matches_batch_mode(monkeypatch, tmp_path):
+    batch = _run_collect_main(monkeypatch, tmp_path, pipeline=False)
+    pipelined = _run_collect_main(monkeypatch, tmp_path, pipeline=True)
+
+    assert len(batch[0]) == 7
+    assert ("https://broken.example/rss", 1, "parse_error") in batch[1]
+    assert pipelined == batch
+
+
+def test_run_feed_pipeline_reports_stage_metrics(monkeypatch):
+    processed = []
+    monkeypatch.setattr(collect, "_fetch_single_feed", lambda feed, validators=None: (feed["url"], {"u": feed["url"]}, None))
+    monkeypatch.setattr(collect, "process_feed", lambda cur, feed, d, **kw: processed.append((feed["url"], d)))
+
+    feeds = [{"url": f"https://e{i}.example/rss"} for i in range(5)] + [{"url": "https://e0.example/rss"}]
+    metrics = collect._run_feed_pipeline(None, feeds, {}, {}, queue_size=2)
+
+    # 同一 URL の重複定義は 1 回の取得結果で両方処理する（逐次モードと同じ件数）
+    assert sorted(u for u, _ in processed) == sorted(f["url"] for f in feeds)
+    assert all(d == {"u": u} for u, d in processed)
+    assert metrics["feeds"] == 6
+    assert metrics["timed_out"] == 0
+    assert metrics["queue_max"] <= 2
+
+
+def test_run_feed_pipeline_uses_queued_results_after_deadline(monkeypatch):
+    import threading
+    import time
+
+    fast = {"https://fast1.example/rss", "https://fast2.example/rss"}
+    fetched, release = threading.Event(), threading.Event()
+    fetch_calls = []
+
+    def fake_fetch(feed, validators=None):
+        fetch_calls.append(feed["url"])
+        if feed["url"] not in fast:
+            release.wait(5)  # 締め切りまで届かないフィード
+        elif fast <= set(fetch_calls):
+            fetched.set()
+        return feed["url"], {"u": feed["url"]}, None
+
+    clock = iter([0.0])
+
+    def fake_now():
+        # 開始時刻の次からは締め切りを過ぎた時刻を返す（速いフィードの結果がキューに入るのを待ってから）
+        try:
+            return next(clock)
+        except StopIteration:
+            fetched.wait(5)
+            time.sleep(0.2)
+            return 1e9
+
+    processed = []
+    monkeypatch.setattr(collect, "FEED_FETCH_WORKERS", 3)
+    monkeypatch.setattr(collect, "_now_sec", fake_now)
+    monkeypatch.setattr(collect, "_fetch_single_feed", fake_fetch)
+    monkeypatch.setattr(collect, "process_feed", lambda cur, feed, d, **kw: processed.append((feed["url"], d)))
+
+    feeds = [{"url": u} for u in sorted(fast)] + [{"url": "https://slow.example/rss"}]
+    try:
+        metrics = collect._run_feed_pipeline(None, feeds, {}, {}, queue_size=4)
+    finally:
+        release.set()
+
+    # キューに届いていた結果はそのまま処理し、届いていないフィードだけをフォールバックで取り直す
+    assert sorted(processed, key=lambda p: p[0]) == [
+        ("https://fast1.example/rss", {"u": "https://fast1.example/rss"}),
+        ("https://fast2.example/rss", {"u": "https://fast2.example/rss"}),
+        ("https://slow.example/rss", None),
+    ]
+    assert metrics["timed_out"] == 1
+
+
+# --- upsert_articles_bulk --------------------------------------------------
+def _article_row(url, *, title="t", content="c", fetched_at="2026-01-01T00:00:00+00:00"):
+    return {
+        "url": url, "title": title, "content": content, "source": "s", "category": "ai",
+        "source_tier": "secondary", "published_at": "2026-01-01T00:00:00+00:00",
+        "fetched_at": fetched_at, "kind": "tech", "region": "global",
+    }
+
+
+def test_upsert_articles_bulk_skips_byte_identical_rows(tmp_path, monkeypatch):
+    import sqlite3
+
+    import db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    conn = sqlite3.connect(db.DB_PATH)
+    cur = conn.cursor()
+
+    first = collect.upsert_articles_bulk(cur, [_article_row("https://e/1"), _article_row("https://e/2")])
+    assert first == {"new": 2, "changed": 0, "unchanged": 0}
+
+    later = "2026-01-02T00:00:00+00:00"
+    second = collect.upsert_articles_bulk(
+        cur,
+        [_article_row("https://e/1", fetched_at=later), _article_row("https://e/2", content="c2", fetched_at=later)],
+    )
+    assert second == {"new": 0, "changed": 1, "unchanged": 1}
+
+    rows = dict(cur.execute("SELECT url, fetched_at FROM articles").fetchall())
+    assert rows["https://e/1"] == "2026-01-01T00:00:00+00:00"  # 未変更行は書き込まれない
+    assert rows["https://e/2"] == later
+    # 変更行は FTS にも反映されている
+    assert cur.execute("SELECT rowid FROM articles_fts WHERE articles_fts MATCH 'c2'").fetchall()
+    conn.close()
+
+
+def test_upsert_articles_bulk_fills_column_defaults(tmp_path, monkeypatch):
+    import sqlite3
+
+    import db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    conn = sqlite3.connect(db.DB_PATH)
+    cur = conn.cursor()
+
+    row = dict(_article_row("https://e/1"), kind="", region="", source_tier=None)
+    assert collect.upsert_articles_bulk(cur, [row]) == {"new": 1, "changed": 0, "unchanged": 0}
+    assert cur.execute("SELECT kind, region, source_tier FROM articles").fetchone() == ("tech", "global", "secondary")
+    # 補完後の値と比較するので、同じ空値の行を再度渡しても書き込まない
+    assert collect.upsert_articles_bulk(cur, [row]) == {"new": 0, "changed": 0, "unchanged": 1}
+    conn.close()
+
+
+def test_load_known_articles_chunks_large_url_lists(monkeypatch):
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE articles (url TEXT PRIMARY KEY, title TEXT, content TEXT, source TEXT, category TEXT, "
+        "source_tier TEXT, published_at TEXT, kind TEXT, region TEXT)"
+    )
+    cur.executemany(
+        "INSERT INTO articles(url, title) VALUES (?, ?)", [(f"https://e/{i}", f"t{i}") for i in range(0, 30, 3)]
+    )
+    monkeypatch.setattr(collect, "_KNOWN_URL_CHUNK", 4)
+    known = collect.load_known_articles(cur, [f"https://e/{i}" for i in range(30)])
+    assert sorted(known) == sorted(f"https://e/{i}" for i in range(0, 30, 3))
+    assert known["https://e/3"][0] == "t3"
+
+
+# --- 適応ポーリング --------------------------------------------------------
+def test_update_interval_stats_tracks_arrival_cadence():
+    avg, arrivals, last_new_at = collect.update_interval_stats(
+        None, 0, "",
+        ["2026-01-01T02:00:00+00:00", "2026-01-01T00:00:00+00:00", "2026-01-01T01:00:00+00:00"],
+    )
+    assert avg == 3600
+    assert arrivals == 3
+    assert last_new_at == "2026-01-01T02:00:00+00:00"
+
+    # 新着が来るたびに前回の最終到着からの間隔で移動平均を更新する
+    avg2, arrivals2, _ = collect.update_interval_stats(avg, arrivals, last_new_at, ["2026-01-01T12:00:00+00:00"])
+    assert 3600 < avg2 < 10 * 3600
+    assert arrivals2 == 4
+
+    # 新着が無ければ統計は変わらない
+    assert collect.update_interval_stats(avg2, 4, last_new_at, []) == (avg2, 4, last_new_at)
+
+
+def test_compute_next_due_is_capped_and_is_feed_due():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monthly = collect.compute_next_due(30 * 86400, now)
+    assert datetime.fromisoformat(monthly) == now + timedelta(hours=collect.FEED_POLL_MAX_INTERVAL_HOURS)
+    hourly = collect.compute_next_due(3600, now)
+    assert datetime.fromisoformat(hourly) == now + timedelta(seconds=3600 * collect.FEED_POLL_INTERVAL_FACTOR)
+
+    assert collect.is_feed_due(None, now)
+    assert collect.is_feed_due({"next_due_at": ""}, now)
+    assert not collect.is_feed_due({"next_due_at": monthly}, now)
+    assert collect.is_feed_due({"next_due_at": monthly}, now + timedelta(days=1))
+
+
+def test_main_skips_feeds_that_are_not_due(monkeypatch, tmp_path):
+    import sqlite3
+
+    import db
+
+    db_path = tmp_path / "state.sqlite"
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    monkeypatch.setattr(collect, "init_db", db.init_db)
+    monkeypatch.setattr(collect, "connect", lambda: sqlite3.connect(db_path))
+    monkeypatch.setattr(collect, "append_collect_health_log", lambda **_kw: None)
+    db.init_db()
+    future = (datetime.now(timezone.utc) + timedelta(hours=6)).isoformat(timespec="seconds")
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO feed_health(feed_url, next_due_at) VALUES ('https://quiet/rss', ?)", (future,))
+    conn.commit()
+    conn.close()
+
+    fetched = []
+
+    def fake_parse_with_requests(url, *, tls_mode, user_agent=None, validators=None, limit=None):
+        fetched.append(url)
+        return collect.feedparser.FeedParserDict(status=304, entries=[])
+
+    monkeypatch.setattr(collect, "_parse_feed_with_requests", fake_parse_with_requests)
+    monkeypatch.setattr(
+        collect, "load_feed_list", lambda _cfg: [{"url": "https://quiet/rss"}, {"url": "https://busy/rss"}]
+    )
+    collect.main()
+    assert fetched == ["https://busy/rss"]
@@ -2,6 +2,8 @@ from pathlib import Path
 import sqlite3
 import sys
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 import db
@@ -50,3 +52,129 @@ def test_init_db_creates_low_priority_queue_index(tmp_path):
     assert "idx_low_priority_articles_url" in indexes
 
     conn.close()
+
+
+def test_connect_applies_production_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "data" / "state.sqlite")
+    conn = db.connect()
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -db.CACHE_SIZE_MB * 1024
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == db.BUSY_TIMEOUT_MS
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_connect_readonly_profile_rejects_writes(tmp_path):
+    path = tmp_path / "state.sqlite"
+    conn = db.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    ro = db.connect(path, readonly=True)
+    try:
+        assert ro.execute("SELECT x FROM t").fetchall() == [(1,)]
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            ro.execute("INSERT INTO t VALUES (2)")
+    finally:
+        ro.close()
+
+
+def test_connect_rejects_invalid_pragma_value(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "JOURNAL_MODE", "WAL; DROP TABLE articles")
+    with pytest.raises(ValueError):
+        db.connect(tmp_path / "state.sqlite")
+
+
+def _schema_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT version, name FROM schema_version ORDER BY version").fetchall()
+    finally:
+        conn.close()
+
+
+def test_init_db_records_migrations_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    expected = [(version, name) for version, name, _fn in db.MIGRATIONS]
+    assert _schema_rows(db.DB_PATH) == expected
+
+    # 最新版の DB では移行処理を一切走らせない
+    def fail(_cur):
+        raise AssertionError("migration re-applied")
+
+    monkeypatch.setattr(db, "MIGRATIONS", [(v, n, fail) for v, n, _fn in db.MIGRATIONS])
+    db.init_db()
+    assert _schema_rows(db.DB_PATH) == expected
+
+
+def test_init_db_applies_only_pending_migrations(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    calls = []
+    migrations = db.MIGRATIONS + [(db.SCHEMA_VERSION + 1, "extra", lambda cur: calls.append(cur))]
+    monkeypatch.setattr(db, "MIGRATIONS", migrations)
+    monkeypatch.setattr(db, "SCHEMA_VERSION", db.SCHEMA_VERSION + 1)
+
+    db.init_db()
+    db.init_db()
+    assert len(calls) == 1
+    assert _schema_rows(db.DB_PATH)[-1] == (db.SCHEMA_VERSION, "extra")
+
+
+def test_failed_migration_is_rolled_back_and_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+
+    def broken(cur):
+        cur.execute("CREATE TABLE half_done (x INTEGER)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS + [(db.SCHEMA_VERSION + 1, "broken", broken)])
+    monkeypatch.setattr(db, "SCHEMA_VERSION", db.SCHEMA_VERSION + 1)
+    with pytest.raises(RuntimeError):
+        db.init_db()
+
+    conn = sqlite3.connect(db.DB_PATH)
+    try:
+        assert not db.table_exists(conn.cursor(), "half_done")
+    finally:
+        conn.close()
+    assert _schema_rows(db.DB_PATH)[-1][0] == db.SCHEMA_VERSION - 1
+
+
+def test_init_db_upgrades_legacy_db_without_schema_version(tmp_path, monkeypatch):
+    # schema_version 導入前の DB（空値の列と topic_key の重複が残っている）
+    path = tmp_path / "state.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT, title TEXT, url TEXT,
+                               content TEXT, category TEXT, published_at TEXT, fetched_at TEXT);
+        INSERT INTO articles(title, url) VALUES ('a', 'https://e/1');
+        CREATE TABLE topics (id INTEGER PRIMARY KEY AUTOINCREMENT, topic_key TEXT, title TEXT, category TEXT,
+                             score_48h INTEGER DEFAULT 0, created_at TEXT);
+        INSERT INTO topics(topic_key, title) VALUES ('k', 'first'), ('k', 'dup');
+        CREATE TABLE topic_articles (topic_id INTEGER, article_id INTEGER, PRIMARY KEY (topic_id, article_id));
+        INSERT INTO topic_articles VALUES (2, 1);
+    """)
+    conn.close()
+    monkeypatch.setattr(db, "DB_PATH", path)
+
+    db.init_db()
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT kind, region, source_tier, title_ja FROM articles").fetchall() == [
+            ("tech", "global", "secondary", None)
+        ]
+        assert conn.execute("SELECT id, kind, region FROM topics").fetchall() == [(1, "tech", "global")]
+        assert conn.execute("SELECT topic_id, article_id FROM topic_articles").fetchall() == [(1, 1)]
+    finally:
+        conn.close()
+    assert [v for v, _n in _schema_rows(path)] == [v for v, _n, _fn in db.MIGRATIONS]
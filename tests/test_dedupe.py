@@ -1,4 +1,5 @@
 from pathlib import Path
+import random
 import sqlite3
 import sys
 
@@ -29,14 +30,14 @@ def test_composite_score_prefers_higher_inputs():
     assert score_similar > score_different
 
 
-def _run_dedupe_for_db(db_path: Path):
+def _run_dedupe_for_db(db_path: Path, candidate_mode: str | None = None):
     def _connect_override():
         return sqlite3.connect(db_path)
 
     original_connect = dedupe.connect
     dedupe.connect = _connect_override
     try:
-        dedupe.main()
+        dedupe.main(candidate_mode=candidate_mode)
     finally:
         dedupe.connect = original_connect
 
@@ -98,3 +99,243 @@ def test_candidate_prefilter_keeps_duplicate_decision_unchanged(tmp_path):
 
     assert remaining_filtered == remaining_unfiltered
     assert judgments_filtered == judgments_unfiltered
+
+
+def _prepare_reordered_headline_db(db_path: Path):
+    _prepare_articles_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM articles")
+    rows = [
+        (20, "srcA", "business", "Apple posts record Q4 earnings in 2025", "https://news.example.com/apple-q4", None),
+        (19, "srcB", "business", "Q4 outlook for chip makers", "https://news.example.com/chips", None),
+        # 語順だけ違う言い換え。先頭語ブロック "q4" には 19 しか居ないため blocking では比較されない
+        (18, "srcC", "business", "Q4 earnings in 2025: Apple posts record", "https://news.example.com/apple-q4-earnings", None),
+    ]
+    conn.executemany("INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_lsh_candidates_catch_reordered_headline_missed_by_blocking(tmp_path):
+    blocking_db = tmp_path / "blocking.sqlite"
+    lsh_db = tmp_path / "lsh.sqlite"
+    _prepare_reordered_headline_db(blocking_db)
+    _prepare_reordered_headline_db(lsh_db)
+
+    remaining_blocking, _ = _run_dedupe_for_db(blocking_db, candidate_mode="blocking")
+    remaining_lsh, judgments_lsh = _run_dedupe_for_db(lsh_db, candidate_mode="lsh")
+
+    assert remaining_blocking == [18, 19, 20]
+    assert remaining_lsh == [19, 20]
+    assert judgments_lsh[-1][:2] == (18, 20)
+
+
+def test_lsh_reuses_stored_bands_and_drops_orphans(tmp_path, monkeypatch):
+    db_path = tmp_path / "lsh.sqlite"
+    _prepare_reordered_headline_db(db_path)
+    _run_dedupe_for_db(db_path, candidate_mode="lsh")
+
+    conn = sqlite3.connect(db_path)
+    stored = {r[0] for r in conn.execute("SELECT article_id FROM dedupe_features WHERE bands IS NOT NULL")}
+    # 削除された 18 の特徴量・帯キーはトリガで消える
+    assert stored == {19, 20}
+    conn.execute(
+        "INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)",
+        (5, "srcD", "business", "Apple posts record Q4 earnings in 2025", "https://news.example.com/apple-q4?ref=x", None),
+    )
+    conn.commit()
+    conn.close()
+
+    computed = []
+    original = dedupe.minhash_bands
+
+    def counting_minhash(norm_title):
+        computed.append(norm_title)
+        return original(norm_title)
+
+    monkeypatch.setattr(dedupe, "minhash_bands", counting_minhash)
+    remaining, _ = _run_dedupe_for_db(db_path, candidate_mode="lsh")
+
+    # 保存済みの 19/20 は再計算せず、新規の 5 だけ計算して 20 の重複として削除する
+    assert computed == ["apple posts record q4 earnings in 2025"]
+    assert remaining == [19, 20]
+
+
+def _run_dedupe_stats(db_path: Path) -> dict:
+    original_connect = dedupe.connect
+    dedupe.connect = lambda: sqlite3.connect(db_path)
+    try:
+        return dedupe.main()
+    finally:
+        dedupe.connect = original_connect
+
+
+def test_features_are_persisted_and_only_category_windows_are_loaded(tmp_path):
+    db_path = tmp_path / "features.sqlite"
+    _prepare_articles_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (100, "srcS", "security", "Kernel privilege escalation fixed", "https://sec.example.com/kernel", None),
+            (101, "srcS", "security", "Browser zero day exploited in the wild", "https://sec.example.com/browser", None),
+            (102, "srcS", "security", "Router botnet grows past one million devices", "https://sec.example.com/router", None),
+            (103, "srcS", "security", "Ransomware group leaks hospital data", "https://sec.example.com/ransom", None),
+            (104, "srcS", "security", "Password manager audit published", "https://sec.example.com/audit", None),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    first = _run_dedupe_stats(db_path)
+    assert first["features_computed"] == 9
+    assert first["deleted"] == 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)",
+        (200, "srcE", "business", "Completely different retail outlook briefing", "https://other.example.org/retail", None),
+    )
+    # normalize.py のように同じ値で書き直しても特徴量は捨てない
+    conn.execute("UPDATE articles SET url_norm=url_norm")
+    conn.commit()
+    conn.close()
+
+    second = _run_dedupe_stats(db_path)
+    # 新規の 1 件だけ正規化し、security カテゴリ（未判定なし）は読み込まない
+    assert second["features_computed"] == 1
+    assert second["loaded"] == 1
+    assert second["deleted"] == 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE articles SET title='Router botnet taken down' WHERE id=102")
+    conn.commit()
+    row = conn.execute("SELECT COUNT(*) FROM dedupe_features WHERE article_id=102").fetchone()
+    conn.close()
+    assert row == (0,)
+    assert _run_dedupe_stats(db_path)["features_computed"] == 1
+
+
+def _prepare_fixture_corpus_db(db_path: Path, seed: int = 7):
+    """言い換え・語の脱落・1 文字違い・URL 違いを混ぜた決定的な合成コーパス。"""
+    rng = random.Random(seed)
+    words = ["openai", "google", "model", "release", "security", "patch", "cloud", "outage", "chip",
+             "export", "rules", "earnings", "record", "agent", "browser", "kernel", "price", "cut",
+             "launch", "api", "preview", "region", "startup", "funding", "生成ai", "半導体", "規制"]
+    rows = []
+    next_id = 1
+    for n in range(120):
+        category = rng.choice(["ai", "security", "business"])
+        host = rng.choice(["a.example.com", "b.example.com", "c.example.org"])
+        title = " ".join(rng.sample(words, rng.randint(4, 8)))
+        url = f"https://{host}/{n}/{title.split()[0]}"
+        rows.append((next_id, f"src{n % 5}", category, title, url, None))
+        next_id += 1
+        for _ in range(rng.randint(0, 3)):
+            tokens = title.split()
+            kind = rng.randrange(5)
+            if kind == 0:
+                rng.shuffle(tokens)
+            elif kind == 1 and len(tokens) > 4:
+                del tokens[rng.randrange(len(tokens))]
+            elif kind == 2:
+                tokens.insert(0, rng.choice(["breaking", "update", "速報"]))
+            elif kind == 3:
+                j = rng.randrange(len(tokens))
+                tokens[j] = tokens[j][:-1] + "x"
+            variant_url = url + rng.choice(["", "-2", "?ref=feed", "/amp", f"-{next_id}"])
+            if rng.random() < 0.3:
+                variant_url = f"https://{rng.choice(['d.example.net', host])}/{next_id}"
+            rows.append((next_id, f"src{next_id % 7}", category, " ".join(tokens), variant_url, None))
+            next_id += 1
+    rng.shuffle(rows)
+    rows = [(i + 1, *r[1:]) for i, r in enumerate(rows)]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE articles (id INTEGER PRIMARY KEY, source TEXT, category TEXT, title TEXT, url TEXT, url_norm TEXT)"
+    )
+    conn.executemany("INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def _run_and_dump(db_path: Path, **kwargs):
+    original_connect = dedupe.connect
+    dedupe.connect = lambda: sqlite3.connect(db_path)
+    try:
+        dedupe.main(**kwargs)
+    finally:
+        dedupe.connect = original_connect
+    conn = sqlite3.connect(db_path)
+    try:
+        remaining = [r[0] for r in conn.execute("SELECT id FROM articles ORDER BY id")]
+        judgments = conn.execute(
+            "SELECT article_id, kept_article_id, article_source, kept_source, article_category, "
+            "title_score, url_score, composite_score, threshold, title_match, url_exact_match, decision, reason "
+            "FROM dedupe_judgments ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    return remaining, judgments
+
+
+def test_rapidfuzz_scorer_matches_difflib_engine_on_fixture_corpus(tmp_path):
+    for candidate_mode in ("lsh", "blocking"):
+        results = {}
+        for scorer in ("difflib", "rapidfuzz"):
+            db_path = tmp_path / f"{candidate_mode}_{scorer}.sqlite"
+            _prepare_fixture_corpus_db(db_path)
+            results[scorer] = _run_and_dump(db_path, candidate_mode=candidate_mode, scorer=scorer)
+
+        remaining, judgments = results["difflib"]
+        assert any(r[-1] == "composite_threshold" for r in judgments)
+        assert results["rapidfuzz"][0] == remaining
+        assert results["rapidfuzz"][1] == judgments
+
+
+def test_upper_bound_scores_never_undercut_difflib_ratio():
+    rng = random.Random(3)
+    alphabet = "abcde fg"
+    for _ in range(300):
+        a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        choices = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(5)]
+        bounds = dedupe._upper_bound_scores(a, choices, 0)
+        for j, c in enumerate(choices):
+            assert bounds[j] >= dedupe._ratio(a, c) - 1e-9
+
+
+def _add_cross_category_url_rows(db_path: Path):
+    """URL の代表（最新の記事）が同カテゴリ内で類似削除され、別カテゴリの記事が代表に繰り下がるケース。"""
+    conn = sqlite3.connect(db_path)
+    base = conn.execute("SELECT MAX(id) FROM articles").fetchone()[0]
+    conn.executemany(
+        "INSERT INTO articles(id, source, category, title, url, url_norm) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (base + 4, "srcX", "ai", "Gemini ultra tops coding benchmark", "https://x.example.com/gemini-ultra-a", None),
+            (base + 3, "srcY", "ai", "Gemini ultra tops coding benchmark", "https://x.example.com/gemini-ultra", None),
+            (base + 2, "srcZ", "security", "Cross posted story", "https://x.example.com/gemini-ultra", None),
+            (base + 1, "srcW", "policy", "Cross posted story again", "https://x.example.com/gemini-ultra", None),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return base
+
+
+def test_parallel_dedupe_matches_serial_output(tmp_path):
+    for candidate_mode in ("lsh", "blocking"):
+        results = {}
+        for workers in (1, 3):
+            db_path = tmp_path / f"{candidate_mode}_{workers}.sqlite"
+            _prepare_fixture_corpus_db(db_path)
+            base = _add_cross_category_url_rows(db_path)
+            results[workers] = _run_and_dump(db_path, candidate_mode=candidate_mode, workers=workers)
+
+        remaining, judgments = results[1]
+        by_article = {j[0]: j for j in judgments}
+        # 代表候補だった記事は類似削除、別カテゴリの記事が代表になり最古の記事だけ URL 一致で削除
+        assert by_article[base + 3][-1] == "composite_threshold"
+        assert base + 2 in remaining
+        assert by_article[base + 1][:2] == (base + 1, base + 2)
+        assert results[3] == results[1]
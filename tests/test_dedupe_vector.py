@@ -0,0 +1,67 @@
+"""dedupe_vector.similar_pairs（タイル分割の類似ペア抽出）のテスト。"""
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import dedupe_vector
+
+
+def _brute_force(emb, threshold):
+    mat = emb @ emb.T
+    return [(i, j, mat[i, j]) for i in range(len(emb)) for j in range(i + 1, len(emb)) if mat[i, j] >= threshold]
+
+
+@pytest.mark.parametrize("tile_size", [1, 3, 7, 16, 1000])
+def test_similar_pairs_matches_double_loop_for_any_tile_size(tile_size):
+    rng = np.random.default_rng(0)
+    emb = rng.normal(size=(37, 8)).astype(np.float32)
+    emb[5] = emb[30] + 0.01  # タイル境界をまたぐ近傍ペア
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+
+    i, j, scores = dedupe_vector.similar_pairs(emb, 0.4, tile_size=tile_size)
+    expected = _brute_force(emb, 0.4)
+    assert list(zip(i.tolist(), j.tolist())) == [(a, b) for a, b, _ in expected]
+    np.testing.assert_allclose(scores, [s for _, _, s in expected], rtol=1e-5)
+
+
+def test_similar_pairs_handles_empty_and_no_match():
+    i, j, scores = dedupe_vector.similar_pairs(np.zeros((0, 4), dtype=np.float32), 0.5)
+    assert len(i) == len(j) == len(scores) == 0
+    emb = np.eye(3, dtype=np.float32)
+    assert len(dedupe_vector.similar_pairs(emb, 0.5)[0]) == 0
+
+
+def test_find_duplicate_candidates_across_categories(tmp_path, monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, title_ja TEXT, category TEXT, "
+        "published_at TEXT, fetched_at TEXT)"
+    )
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO articles(id, title, category, published_at) VALUES (?, ?, ?, ?)",
+        [(1, "chip export rules", "policy", now), (2, "chip export rules!", "business", now),
+         (3, "cloud outage", "cloud", now)],
+    )
+    vectors = {"chip export rules": [1.0, 0.0], "chip export rules!": [0.99, 0.141], "cloud outage": [0.0, 1.0]}
+
+    class FakeModel:
+        def encode(self, batch, **kwargs):
+            return np.array([vectors[t] for t in batch], dtype=np.float32)
+
+    monkeypatch.setenv("USE_VECTOR_DEDUPE", "1")
+    monkeypatch.setattr(dedupe_vector, "_load_model", lambda name: FakeModel())
+
+    per_category = dedupe_vector.find_duplicate_candidates(conn=conn, cache_dir=tmp_path, threshold=0.9)
+    across = dedupe_vector.find_duplicate_candidates(
+        conn=conn, cache_dir=tmp_path, threshold=0.9, across_categories=True, tile_size=2
+    )
+    assert per_category == []
+    assert [(c["a_id"], c["b_id"], c["category"]) for c in across] == [(1, 2, "policy|business")]
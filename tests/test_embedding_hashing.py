@@ -0,0 +1,67 @@
+"""embedding_hashing（ハッシュ TF-IDF 埋め込み）と VECTOR_DEDUPE_MODEL=hashing のテスト。"""
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import dedupe_vector
+from embedding_hashing import HashingTfidfModel, title_features
+
+TITLES = [
+    "OpenAI releases new reasoning model",
+    "New reasoning model released by OpenAI!",
+    "政府、生成AIの規制案を公表",
+    "生成ＡＩの規制案を政府が公表",
+    "Quarterly earnings beat expectations at chip maker",
+    "大雨で首都圏の鉄道に遅れ",
+]
+
+
+def test_title_features_normalizes_width_case_and_punctuation():
+    assert title_features("ＡＩ, Model!") == title_features("ai model")
+    assert title_features("") == {}
+
+
+def test_encode_returns_normalized_deterministic_vectors():
+    emb = HashingTfidfModel(dim=256).encode(TITLES)
+    assert emb.shape == (len(TITLES), 256)
+    assert emb.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(emb, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(emb, HashingTfidfModel(dim=256).encode(TITLES))
+
+
+def test_encode_scores_rewordings_above_unrelated_titles():
+    emb = HashingTfidfModel().encode(TITLES)
+    sim = emb @ emb.T
+    assert sim[0, 1] > 0.5
+    assert sim[2, 3] > 0.5
+    unrelated = [sim[i, j] for i in (0, 2) for j in (4, 5)]
+    assert max(unrelated) < 0.2
+
+
+def test_find_duplicate_candidates_with_hashing_model_skips_cache(tmp_path, monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, title_ja TEXT, category TEXT, "
+        "published_at TEXT, fetched_at TEXT)"
+    )
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO articles(id, title, category, published_at) VALUES (?, ?, 'ai', ?)",
+        [(i + 1, t, now) for i, t in enumerate(TITLES)],
+    )
+    monkeypatch.setenv("USE_VECTOR_DEDUPE", "1")
+    # sentence-transformers が無い環境を再現する
+    monkeypatch.setitem(sys.modules, "sentence_transformers", None)
+
+    found = dedupe_vector.find_duplicate_candidates(
+        conn=conn, cache_dir=tmp_path, threshold=0.5, model_name="hashing"
+    )
+    assert sorted((c["a_id"], c["b_id"]) for c in found) == [(1, 2), (3, 4)]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,97 @@
+"""embedding_store（タイトル埋め込みの永続キャッシュ）と dedupe_vector の連携テスト。"""
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import dedupe_vector
+import embedding_store
+from embedding_store import EmbeddingStore
+
+
+def _fake_encode(calls):
+    def encode(batch):
+        calls.append(list(batch))
+        vecs = np.array([[len(t), t.count("a"), 1.0] for t in batch], dtype=np.float32)
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    return encode
+
+
+def test_embed_encodes_only_missing_titles_in_batches(tmp_path):
+    calls = []
+    store = EmbeddingStore("fake/model v1", tmp_path)
+    first = store.embed(["alpha", "beta", "gamma", "alpha"], _fake_encode(calls), batch_size=2)
+    assert calls == [["alpha", "beta"], ["gamma"]]
+    assert first.shape == (4, 3)
+    np.testing.assert_array_equal(first[0], first[3])
+    store.close()
+
+    calls.clear()
+    store = EmbeddingStore("fake/model v1", tmp_path)
+    second = store.embed(["gamma", "delta", "alpha"], _fake_encode(calls), batch_size=2)
+    assert calls == [["delta"]]
+    np.testing.assert_array_equal(second[0], first[2])
+    np.testing.assert_array_equal(second[2], first[0])
+    assert store.hits == 2 and store.encoded == 1
+    store.close()
+
+
+def test_evict_drops_stale_rows_and_compacts_matrix(tmp_path):
+    store = EmbeddingStore("m", tmp_path)
+    vectors = store.embed(["old", "keep", "older"], _fake_encode([]))
+    old_ts = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat(timespec="seconds")
+    store.conn.executemany(
+        "UPDATE embeddings SET last_used=? WHERE title_hash=?",
+        [(old_ts, embedding_store.title_hash("old")), (old_ts, embedding_store.title_hash("older"))],
+    )
+    store.conn.commit()
+
+    assert store.evict(max_age_days=30) == 2
+    assert store.rows == 1
+    assert store.vectors_path.stat().st_size == 3 * 4
+    store.close()
+
+    calls = []
+    store = EmbeddingStore("m", tmp_path)
+    again = store.embed(["keep", "old"], _fake_encode(calls))
+    np.testing.assert_array_equal(again[0], vectors[1])
+    assert calls == [["old"]]
+    store.close()
+
+
+def test_find_duplicate_candidates_skips_model_when_all_titles_cached(tmp_path, monkeypatch):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, title_ja TEXT, category TEXT, "
+        "published_at TEXT, fetched_at TEXT)"
+    )
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO articles(id, title, category, published_at) VALUES (?, ?, ?, ?)",
+        [(1, "banana", "ai", now), (2, "bananas", "ai", now), (3, "kiwi", "ai", now)],
+    )
+    monkeypatch.setenv("USE_VECTOR_DEDUPE", "1")
+
+    loads = []
+
+    class FakeModel:
+        def encode(self, batch, **kwargs):
+            return _fake_encode([])(batch)
+
+    def fake_load(model_name):
+        loads.append(model_name)
+        return FakeModel()
+
+    monkeypatch.setattr(dedupe_vector, "_load_model", fake_load)
+    first = dedupe_vector.find_duplicate_candidates(threshold=0.99, model_name="fake", conn=conn, cache_dir=tmp_path)
+    second = dedupe_vector.find_duplicate_candidates(threshold=0.99, model_name="fake", conn=conn, cache_dir=tmp_path)
+
+    assert loads == ["fake"]
+    assert first == second
+    assert {(c["a_id"], c["b_id"]) for c in first} == {(1, 2)}
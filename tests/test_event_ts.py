@@ -0,0 +1,133 @@
+"""articles.event_ts（記事時刻の正規化列）のトリガ・バックフィルと、それを使うクエリの実行計画のテスト。"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import render_main
+
+
+def _init(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    return sqlite3.connect(db.DB_PATH)
+
+
+def _insert(conn, url, published_at, fetched_at="2026-01-05T00:00:00+00:00", **cols):
+    values = {"url": url, "title": url, "published_at": published_at, "fetched_at": fetched_at,
+              "kind": "news", "region": "jp", "category": "policy", **cols}
+    conn.execute(
+        f"INSERT INTO articles({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+        tuple(values.values()),
+    )
+    return conn.execute("SELECT event_ts FROM articles WHERE url=?", (url,)).fetchone()[0]
+
+
+def test_event_ts_is_set_on_insert_and_follows_timestamp_updates(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    assert _insert(conn, "u1", "2026-01-02T03:04:05+00:00") == "2026-01-02 03:04:05"
+    assert _insert(conn, "u2", "") == "2026-01-05 00:00:00"  # published_at が空なら fetched_at
+    assert _insert(conn, "u3", "2026-01-02T12:00:00+09:00") == "2026-01-02 03:00:00"  # UTC に揃える
+
+    conn.execute("UPDATE articles SET published_at='2026-02-01T00:00:00+00:00' WHERE url='u1'")
+    conn.execute("UPDATE articles SET fetched_at='2026-03-01T00:00:00+00:00' WHERE url='u2'")
+    rows = dict(conn.execute("SELECT url, event_ts FROM articles WHERE url IN ('u1', 'u2')").fetchall())
+    assert rows == {"u1": "2026-02-01 00:00:00", "u2": "2026-03-01 00:00:00"}
+    conn.close()
+
+
+def test_migration_backfills_event_ts_for_existing_rows(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    _insert(conn, "u1", "2026-01-02T03:04:05+00:00")
+    # event_ts 導入前の状態に戻す
+    conn.execute("UPDATE articles SET event_ts=NULL")
+    conn.execute("DELETE FROM schema_version WHERE version >= 7")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    conn = sqlite3.connect(db.DB_PATH)
+    assert conn.execute("SELECT event_ts FROM articles").fetchall() == [("2026-01-02 03:04:05",)]
+    conn.close()
+
+
+def test_fts_update_trigger_only_follows_text_columns(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name='articles_fts_au'").fetchone()
+    conn.close()
+    if sql is None:
+        pytest.skip("FTS5 の無い SQLite")
+    # event_ts のトリガ更新で FTS の delete + insert が走らない
+    assert "UPDATE OF title, title_ja, content" in sql[0]
+
+
+class _RecordingCursor:
+    """実行した SQL とパラメータを記録する（EXPLAIN QUERY PLAN で同じ文の計画を見る）。"""
+
+    def __init__(self, cur):
+        self._cur = cur
+        self.calls = []
+
+    def execute(self, sql, params=()):
+        self.calls.append((sql, params))
+        return self._cur.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+def _plan(conn, sql, params, *, top_level=False) -> str:
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return "\n".join(row[3] for row in rows if not top_level or row[1] == 0)
+
+
+def _last_plan(conn, fn, *args, top_level=False) -> str:
+    rec = _RecordingCursor(conn.cursor())
+    fn(rec, *args)
+    sql, params = rec.calls[-1]
+    return _plan(conn, sql, params, top_level=top_level)
+
+
+def test_news_queries_range_scan_kind_category_event_ts_index(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    for i in range(20):
+        _insert(conn, f"u{i}", f"2026-01-{i + 1:02d}T00:00:00+00:00")
+
+    plan = _last_plan(conn, render_main.count_news_recent_48h, "jp", "policy", "2026-01-10 00:00:00")
+    assert "idx_articles_kind_category_event_ts (kind=? AND category=? AND event_ts>?)" in plan
+
+    # 索引順に新しい記事から読み、limit 件で止まる（ソート用の一時 B-tree を作らない）
+    plan = _last_plan(conn, render_main.fetch_news_articles_by_category, "jp", "policy", 5, top_level=True)
+    assert "SEARCH a USING INDEX idx_articles_kind_category_event_ts (kind=? AND category=?)" in plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+    rows = render_main.fetch_news_articles_by_category(conn.cursor(), "jp", "policy", 3)
+    assert [r[2] for r in rows] == ["u19", "u18", "u17"]
+    conn.close()
+
+
+def test_hot_topics_query_range_scans_event_ts(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    recent, old = "2026-01-10T00:00:00+00:00", "2025-12-01T00:00:00+00:00"
+    for url, ts in (("a1", recent), ("a2", old), ("a3", old)):
+        _insert(conn, url, ts, kind="tech", category="ai")
+    conn.executemany(
+        "INSERT INTO topics(id, topic_key, title, category, kind) VALUES (?, ?, ?, 'ai', 'tech')",
+        [(1, "k1", "recent topic"), (2, "k2", "old topic")],
+    )
+    conn.executemany("INSERT INTO topic_articles(topic_id, article_id) VALUES (?, ?)", [(1, 1), (1, 2), (2, 3)])
+    db.refresh_topic_stats(conn.cursor())  # thread が紐付けの最後に行う集計の反映
+    conn.commit()
+
+    rec = _RecordingCursor(conn.cursor())
+    hot_list, _items = render_main._build_category_topics(rec, "ai", "2026-01-09 00:00:00", 10, 5)
+    assert [(h["id"], h["articles"], h["recent"], h["date"]) for h in hot_list] == [
+        (1, 2, 1, "2026-01-10 00:00:00")
+    ]
+    sql, params = next(call for call in rec.calls if "WITH recent AS" in call[0])
+    assert "SEARCH a USING INDEX idx_articles_event_ts (event_ts>?)" in _plan(conn, sql, params)
+    conn.close()
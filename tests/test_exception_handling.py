@@ -2,7 +2,6 @@ import sqlite3
 import ssl
 import sys
 from pathlib import Path
-from urllib.error import URLError
 
 import pytest
 import requests
@@ -15,10 +14,10 @@ import translate
 
 
 def test_fetch_fulltext_returns_empty_on_network_error(monkeypatch):
-    def fake_urlopen(*args, **kwargs):
-        raise URLError("network down")
+    def fake_get(*args, **kwargs):
+        raise requests.ConnectionError("network down")
 
-    monkeypatch.setattr(collect.urllib.request, "urlopen", fake_urlopen)
+    monkeypatch.setattr(collect.http_client, "get", fake_get)
 
     out = collect.fetch_fulltext("https://example.com/a", source="example-source")
     assert out == ""
@@ -220,7 +219,7 @@ def test_collect_main_marks_ssl_failure_after_single_retry(monkeypatch, tmp_path
         lambda *_args, **_kwargs: (_ for _ in ()).throw(ssl.SSLError("certificate verify failed")),
     )
     monkeypatch.setattr(
-        collect.requests,
+        collect.http_client,
         "get",
         lambda *_args, **_kwargs: (_ for _ in ()).throw(requests.exceptions.SSLError("certificate verify failed")),
     )
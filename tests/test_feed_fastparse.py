@@ -0,0 +1,96 @@
+"""feed_fastparse（件数上限つき逐次パース）の単体テスト。"""
+import sys
+from pathlib import Path
+
+import feedparser
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from collect import normalize_published_at, strip_html
+from feed_fastparse import parse_feed_limited
+
+RSS20 = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>ch</title>
+{items}
+</channel></rss>"""
+
+RSS20_ITEM = """<item>
+  <title> Item {i} &amp; more </title>
+  <link>https://example.com/{i}</link>
+  <description><![CDATA[<p>desc {i}</p>]]></description>
+  <content:encoded><![CDATA[<div>本文 {i}<script>alert(1)</script></div>]]></content:encoded>
+  <pubDate>Mon, 05 Jan 2026 10:00:00 +0900</pubDate>
+</item>"""
+
+RSS10 = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+ xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel rdf:about="https://export.arxiv.org/rss/cs.AI"><title>arXiv</title></channel>
+<item rdf:about="https://arxiv.org/abs/1"><title>Paper A</title><link>https://arxiv.org/abs/1</link>
+<description>&lt;p&gt;abstract&lt;/p&gt;</description><dc:date>2026-01-02T03:04:05+09:00</dc:date></item>
+</rdf:RDF>"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title type="html">A &amp;lt;b&amp;gt;</title>
+<link rel="enclosure" href="https://z.example/e"/><link rel="alternate" href="https://z.example/1"/>
+<summary>s</summary><content type="html">&lt;p&gt;c&lt;/p&gt;</content>
+<published>2026-01-01T00:00:00Z</published><updated>2026-01-02T00:00:00Z</updated></entry>
+</feed>"""
+
+
+def _content(entry) -> str:
+    if getattr(entry, "content", None):
+        return strip_html(entry.content[0].get("value", ""))
+    return strip_html(getattr(entry, "summary", "") or "")
+
+
+def _assert_same_as_feedparser(raw: bytes, limit: int = 30):
+    fast = parse_feed_limited(raw, limit)
+    slow = feedparser.parse(raw)
+    assert fast is not None
+    assert len(fast.entries) == min(limit, len(slow.entries))
+    for f, s in zip(fast.entries, slow.entries):
+        assert f.title.strip() == s.title.strip()
+        assert f.link == s.link
+        assert normalize_published_at(f) == normalize_published_at(s)
+        assert _content(f).split() == _content(s).split()
+    return fast
+
+
+def test_rss20_matches_feedparser():
+    raw = RSS20.format(items="".join(RSS20_ITEM.format(i=i) for i in range(3))).encode()
+    fast = parse_feed_limited(raw, 30)
+    slow = feedparser.parse(raw)
+    assert [e.link for e in fast.entries] == [e.link for e in slow.entries]
+    assert [normalize_published_at(e) for e in fast.entries] == [normalize_published_at(e) for e in slow.entries]
+    # script の中身は feedparser 同様に落とす
+    assert "alert" not in fast.entries[0].content[0]["value"]
+    assert fast.version == "rss20"
+
+
+def test_rss10_and_atom_match_feedparser():
+    assert _assert_same_as_feedparser(RSS10.encode()).version == "rss10"
+    fast = _assert_same_as_feedparser(ATOM.encode())
+    assert fast.version == "atom10"
+    assert fast.entries[0].link == "https://z.example/1"  # rel=alternate を採用
+
+
+def test_stops_at_limit_without_reading_rest_of_document():
+    items = "".join(RSS20_ITEM.format(i=i) for i in range(5))
+    # limit 以降が壊れていても、打ち切るので読まない
+    raw = RSS20.format(items=items + "<item><title>broken").encode()
+    fast = parse_feed_limited(raw, 5)
+    assert fast is not None
+    assert [e.link for e in fast.entries] == [f"https://example.com/{i}" for i in range(5)]
+
+
+def test_returns_none_for_inputs_left_to_feedparser():
+    relative = RSS20.format(items="<item><title>x</title><link>/a</link></item>").encode()
+    xhtml = ATOM.replace('<content type="html">&lt;p&gt;c&lt;/p&gt;</content>',
+                         '<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">c</div></content>')
+    assert parse_feed_limited(relative, 30) is None
+    assert parse_feed_limited(xhtml.encode(), 30) is None
+    assert parse_feed_limited(b"<html><body>not a feed", 30) is None
+    assert parse_feed_limited(RSS20.format(items="").encode(), 30) is None
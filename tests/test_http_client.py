@@ -0,0 +1,128 @@
+"""http_client（共有セッション・接続再利用・名前解決キャッシュ）の単体テスト。"""
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import http_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):
+        body = f"ua={self.headers.get('User-Agent')}".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_client.close_sessions()
+    http_client.reset_stats()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    http_client.close_sessions()
+
+
+def test_get_reuses_connection_per_host_and_counts_it(local_server):
+    for i in range(5):
+        r = http_client.get(f"{local_server}/feed{i}", headers={"User-Agent": f"ua{i}"}, timeout=5)
+        assert r.text == f"ua=ua{i}"  # ヘッダはリクエストごと
+
+    stats = http_client.pool_stats()
+    assert stats["requests"] == 5
+    assert stats["hosts"] == 1
+    assert stats["new_connections"] == 1
+    assert stats["reuse_rate"] == 0.8
+
+
+def test_sessions_are_shared_per_tls_mode():
+    http_client.close_sessions()
+    assert http_client.get_session("strict") is http_client.get_session("STRICT")
+    assert http_client.get_session("strict") is not http_client.get_session("relaxed")
+    http_client.close_sessions()
+
+
+def test_configure_rebuilds_sessions_with_new_pool_size(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_POOL_MAXSIZE", 8)
+    http_client.close_sessions()
+    before = http_client.get_session()
+    http_client.configure(pool_maxsize=8)
+    assert http_client.get_session() is before
+    http_client.configure(pool_maxsize=16)
+    after = http_client.get_session()
+    assert after is not before
+    assert after.get_adapter("https://example.com")._pool_maxsize == 16
+    http_client.close_sessions()
+
+
+def test_dns_cache_hits_until_ttl(monkeypatch):
+    calls = []
+
+    def fake_getaddrinfo(host, port, *args):
+        calls.append(host)
+        return [("family", "type", 0, "", ("192.0.2.1", port))]
+
+    monkeypatch.setattr(http_client, "_orig_getaddrinfo", fake_getaddrinfo)
+    http_client.clear_dns_cache()
+    http_client.reset_stats()
+
+    first = http_client._cached_getaddrinfo("feeds.example.com", 443)
+    second = http_client._cached_getaddrinfo("feeds.example.com", 443)
+    assert first == second
+    assert calls == ["feeds.example.com"]
+    assert http_client.pool_stats()["dns_hits"] == 1
+
+    monkeypatch.setattr(http_client, "HTTP_DNS_CACHE_TTL_SEC", -1)  # 期限切れ扱い
+    http_client.clear_dns_cache()
+    http_client._cached_getaddrinfo("feeds.example.com", 443)
+    http_client._cached_getaddrinfo("feeds.example.com", 443)
+    assert len(calls) == 3
+    http_client.clear_dns_cache()
+
+
+def test_dns_cache_drops_expired_then_oldest_entries_at_cap(monkeypatch):
+    monkeypatch.setattr(http_client, "_orig_getaddrinfo", lambda host, port, *args: [("a", host)])
+    monkeypatch.setattr(http_client, "HTTP_DNS_CACHE_MAX_ENTRIES", 3)
+    http_client.clear_dns_cache()
+
+    monkeypatch.setattr(http_client, "HTTP_DNS_CACHE_TTL_SEC", -1)  # 期限切れで入る
+    http_client._cached_getaddrinfo("expired.example", 443)
+    monkeypatch.setattr(http_client, "HTTP_DNS_CACHE_TTL_SEC", 300)
+    for host in ("a.example", "b.example", "c.example", "d.example"):
+        http_client._cached_getaddrinfo(host, 443)
+
+    # 上限では期限切れを先に消し、それでも多ければ古く入れた順に捨てる
+    assert [key[0] for key in http_client._dns_cache] == ["b.example", "c.example", "d.example"]
+    http_client.clear_dns_cache()
+
+
+def test_dns_cache_patches_process_wide_until_close_sessions(monkeypatch):
+    import socket
+
+    original = socket.getaddrinfo
+    monkeypatch.setattr(http_client, "HTTP_DNS_CACHE_TTL_SEC", 300)
+    http_client.close_sessions()
+
+    http_client.get_session("strict")
+    # 共有 Session だけでなく、同じプロセスの socket.getaddrinfo 呼び出しすべてがキャッシュを通る
+    assert socket.getaddrinfo is http_client._cached_getaddrinfo
+
+    http_client.close_sessions()
+    assert socket.getaddrinfo is original
+    assert http_client._dns_cache == {}
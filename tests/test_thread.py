@@ -1,10 +1,14 @@
 """thread.py のユニットテスト"""
 from pathlib import Path
+import shutil
+import sqlite3
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from thread import normalize_title, make_topic_key, find_best_topic
+import db
+import thread
+from thread import normalize_title, make_topic_key, find_best_topic, index_tokens, TopicIndex
 
 
 class TestNormalizeTitle:
@@ -66,3 +70,189 @@ class TestFindBestTopic:
     def test_returns_none_for_empty_candidates(self):
         tid, score = find_best_topic("some title", "tech", "", "ai", {})
         assert tid is None
+
+
+class TestIndexTokens:
+    def test_ascii_words_and_japanese_bigrams(self):
+        assert index_tokens("openai gpt-5 新モデル") == {"openai", "gpt", "5", "新モ", "モデ", "デル"}
+
+    def test_single_kanji_is_kept(self):
+        assert index_tokens("株 ai") == {"株", "ai"}
+
+
+class TestTopicIndex:
+    def test_matches_topics_older_than_recent_window(self):
+        index = TopicIndex()
+        key = ("tech", "", "ai")
+        index.add(key, 1, "python machine learning framework")
+        for tid in range(2, 1002):
+            index.add(key, tid, f"unrelated topic number {tid}")
+        tid, score = find_best_topic("python machine learning framework release", "tech", "", "ai", index)
+        assert tid == 1
+        assert score >= 88
+
+    def test_japanese_titles_share_bigram_candidates(self):
+        index = TopicIndex()
+        key = ("news", "jp", "policy")
+        index.add(key, 1, normalize_title("政府が生成AIの規制案を公表"))
+        index.add(key, 2, normalize_title("大雨で首都圏の鉄道に遅れ"))
+        assert [tid for tid, _ in index.candidates(key, normalize_title("政府が生成AIの規制案を公表へ"))] == [1]
+
+    def test_tie_prefers_newest_topic(self):
+        index = TopicIndex()
+        key = ("tech", "", "ai")
+        index.add(key, 1, "rust compiler speedup")
+        index.add(key, 2, "rust compiler speedup")
+        assert find_best_topic("rust compiler speedup", "tech", "", "ai", index)[0] == 2
+
+    def test_candidates_limited_to_most_shared_keys(self, monkeypatch):
+        monkeypatch.setattr(thread, "FREQUENT_KEY_TOPICS", 10_000)
+        index = TopicIndex()
+        key = ("tech", "", "ai")
+        index.add(key, 1, "kubernetes operator security audit")
+        for tid in range(2, 50):
+            index.add(key, tid, f"kubernetes news {tid}")
+        found = index.candidates(key, "kubernetes operator security audit", limit=5)
+        assert len(found) == 5
+        assert found[-1][0] == 1
+        assert [tid for tid, _ in found[:4]] == [49, 48, 47, 46]
+
+    def test_frequent_keys_are_skipped_when_rarer_keys_exist(self, monkeypatch):
+        monkeypatch.setattr(thread, "FREQUENT_KEY_TOPICS", 3)
+        index = TopicIndex()
+        key = ("tech", "", "ai")
+        for tid in range(1, 6):
+            index.add(key, tid, f"openai item{tid}")
+        assert [tid for tid, _ in index.candidates(key, "openai item2")] == [2]
+        assert len(index.candidates(key, "openai")) == 5
+
+
+def _insert_articles(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO articles(kind, region, source, title, url, category, source_tier, published_at) "
+        "VALUES (?, ?, 's', ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _thread_state(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        edges = conn.execute("SELECT * FROM edges ORDER BY 1, 2, 3").fetchall()
+        reps = conn.execute(
+            "SELECT topic_id, article_id, is_representative FROM topic_articles ORDER BY 1, 2"
+        ).fetchall()
+    finally:
+        conn.close()
+    return edges, reps
+
+
+class TestIncrementalRebuild:
+    def test_dirty_topic_rebuild_matches_full_rebuild(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "state.sqlite"
+        monkeypatch.setattr(db, "DB_PATH", db_path)
+        db.init_db()
+        _insert_articles(db_path, [
+            ("news", "jp", "政府が生成AIの規制案を公表", "u1", "policy", "secondary", "2026-10-01T09:00:00"),
+            ("news", "jp", "政府が生成AIの規制案を公表へ", "u2", "policy", "primary", "2026-10-01T10:00:00"),
+            ("news", "jp", "大雨で首都圏の鉄道に遅れ", "u3", "society", "secondary", "2026-10-01T11:00:00"),
+            ("tech", "global", "rust compiler speedup lands", "u4", "devtools", "secondary", "2026-10-01"),
+            ("tech", "global", "rust compiler speedup lands in nightly", "u5", "devtools", "secondary", "2026-10-02"),
+        ])
+        thread.main()  # 追跡表を新規に作るので全件作り直し
+        assert len(_thread_state(db_path)[0]) == 2
+
+        # 後続の実行: 新着、dedupe による削除と孤児掃除、published_at の補正
+        _insert_articles(db_path, [
+            ("news", "jp", "政府が生成AIの規制案を公表 与党も了承", "u6", "policy", "secondary", "2026-10-02T08:00:00"),
+            ("tech", "global", "rust compiler speedup lands today", "u7", "devtools", "secondary", "2026-10-03"),
+        ])
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM articles WHERE url='u2'")
+        conn.execute("DELETE FROM topic_articles WHERE article_id NOT IN (SELECT id FROM articles)")
+        conn.execute("UPDATE articles SET published_at='2026-10-05' WHERE url='u4'")
+        conn.commit()
+        conn.close()
+
+        full_path = tmp_path / "full.sqlite"
+        shutil.copyfile(db_path, full_path)
+        thread.main()
+        incremental = _thread_state(db_path)
+        monkeypatch.setattr(db, "DB_PATH", full_path)
+        thread.main(full_rebuild=True)
+        assert incremental == _thread_state(full_path)
+        edges, reps = incremental
+        assert edges == [(1, 1, 6), (3, 5, 7), (3, 7, 4)]  # published_at を補正した記事は鎖の末尾へ
+        assert (1, 6, 1) in reps  # 代表記事（primary の 2）が dedupe で消えたトピックは代表を選び直す
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM thread_dirty_topics").fetchone()[0] == 0
+        conn.close()
+
+    def test_untouched_topics_are_not_rebuilt(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "state.sqlite"
+        monkeypatch.setattr(db, "DB_PATH", db_path)
+        db.init_db()
+        _insert_articles(db_path, [
+            ("tech", "global", "rust compiler speedup lands", "u1", "devtools", "secondary", "2026-10-01"),
+            ("tech", "global", "rust compiler speedup lands in nightly", "u2", "devtools", "secondary", "2026-10-02"),
+        ])
+        thread.main()
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM edges")  # 未変更のトピックは作り直されないことを確かめる
+        conn.commit()
+        conn.close()
+        thread.main()
+        assert _thread_state(db_path)[0] == []
+        thread.main(full_rebuild=True)
+        assert len(_thread_state(db_path)[0]) == 1
+
+
+class TestIntake:
+    def test_processes_all_unthreaded_articles_in_batches_from_watermark(self, tmp_path, monkeypatch):
+        db_path = tmp_path / "state.sqlite"
+        monkeypatch.setattr(db, "DB_PATH", db_path)
+        monkeypatch.setattr(thread, "BATCH_SIZE", 2)
+        db.init_db()
+        _insert_articles(db_path, [
+            ("tech", "global", f"distinct headline number {word}", f"u{i}", "ai", "secondary", "2026-10-01")
+            for i, word in enumerate(["alpha", "bravo", "charlie", "delta", "echo"])
+        ])
+        thread.main()
+        conn = sqlite3.connect(db_path)
+        cur = conn.cursor()
+        assert cur.execute("SELECT COUNT(*) FROM topic_articles").fetchone()[0] == 5
+        assert db.get_watermark(cur, thread.WATERMARK_NAME) == 5
+        # 処理済み位置より前の記事は（紐付いていなくても）thread では読み直さない
+        cur.execute("DELETE FROM topic_articles WHERE article_id=2")
+        conn.commit()
+        assert thread.fetch_unthreaded_articles(cur, after_id=5) == []
+        assert [r[0] for r in thread.fetch_unthreaded_articles(cur)] == [2]
+        conn.close()
+
+    def test_topic_backfill_only_takes_articles_thread_passed_over(self, tmp_path, monkeypatch):
+        import topic_backfill
+
+        db_path = tmp_path / "state.sqlite"
+        monkeypatch.setattr(db, "DB_PATH", db_path)
+        monkeypatch.setattr(topic_backfill, "connect", lambda: sqlite3.connect(db_path))
+        db.init_db()
+        _insert_articles(db_path, [
+            ("news", "jp", "カテゴリ未設定の記事", "u1", None, "secondary", "2026-10-01"),
+            ("news", "jp", "大雨で首都圏の鉄道に遅れ", "u2", "society", "secondary", "2026-10-01"),
+        ])
+        thread.main()
+        _insert_articles(db_path, [
+            ("news", "jp", "まだ thread が見ていない記事", "u3", None, "secondary", "2026-10-02"),
+        ])
+        topic_backfill.main()
+        conn = sqlite3.connect(db_path)
+        linked = conn.execute(
+            "SELECT ta.article_id, t.topic_key FROM topic_articles ta JOIN topics t ON t.id = ta.topic_id "
+            "ORDER BY ta.article_id"
+        ).fetchall()
+        conn.close()
+        assert linked[0] == (1, "news:1")
+        assert [aid for aid, _ in linked] == [1, 2]
@@ -0,0 +1,201 @@
+"""topic_stats（トピック単位の集計の実体化）の差分反映・窓の decay と、それを読む描画のテスト。"""
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+import render_main
+import thread
+
+ANCHOR = datetime(2026, 10, 10, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _ts(hours_ago: float) -> str:
+    return (ANCHOR - timedelta(hours=hours_ago)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def _init(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "state.sqlite")
+    db.init_db()
+    conn = sqlite3.connect(db.DB_PATH)
+    # init_db が進めた窓の基準時刻をテストの時刻に置き換える
+    db.set_watermark(conn.cursor(), db.TOPIC_STATS_WINDOW, int(ANCHOR.timestamp()))
+    conn.commit()
+    return conn
+
+
+def _insert(conn, url, hours_ago, **cols):
+    values = {"url": url, "title": url, "published_at": _ts(hours_ago), "fetched_at": _ts(hours_ago),
+              "kind": "tech", "region": "global", "category": "ai", "content": "body", **cols}
+    conn.execute(
+        f"INSERT INTO articles({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+        tuple(values.values()),
+    )
+    return conn.execute("SELECT id FROM articles WHERE url=?", (url,)).fetchone()[0]
+
+
+def _link(conn, topic_id, *article_ids, category="ai"):
+    conn.execute(
+        "INSERT OR IGNORE INTO topics(id, topic_key, title, category, kind) VALUES (?, ?, ?, ?, 'tech')",
+        (topic_id, f"k{topic_id}", f"topic {topic_id}", category),
+    )
+    conn.executemany(
+        "INSERT INTO topic_articles(topic_id, article_id) VALUES (?, ?)",
+        [(topic_id, aid) for aid in article_ids],
+    )
+
+
+def _stats(conn):
+    return conn.execute(
+        "SELECT topic_id, article_count, news_count, jp_count, recent_48h, recent_7d, jp_recent_48h,"
+        " max_article_id, latest_article_id, latest_ts, rep_article_id FROM topic_stats ORDER BY topic_id"
+    ).fetchall()
+
+
+def _dirty(conn):
+    return [r[0] for r in conn.execute("SELECT topic_id FROM topic_stats_dirty ORDER BY topic_id")]
+
+
+def test_refresh_counts_windows_and_picks_latest_and_representative(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    a1 = _insert(conn, "u1", 1, content="")                      # 最新だが本文なし
+    a2 = _insert(conn, "u2", 30, region="jp")                    # 本文ありの中で最新 → 代表
+    a3 = _insert(conn, "u3", 24 * 5, kind="news", region="jp")
+    a4 = _insert(conn, "u4", 24 * 30)
+    _link(conn, 1, a1, a2, a3, a4)
+    _link(conn, 2, _insert(conn, "u5", 24 * 30))
+    conn.execute("INSERT INTO topics(id, topic_key, title, category) VALUES (3, 'k3', 'empty', 'ai')")
+    assert _dirty(conn) == [1, 2]
+
+    assert db.refresh_topic_stats(conn.cursor()) == 2
+    assert _stats(conn) == [
+        (1, 4, 1, 2, 2, 3, 1, a4, a1, "2026-10-10 11:00:00", a2),
+        (2, 1, 0, 0, 0, 0, 0, a4 + 1, a4 + 1, "2026-09-10 12:00:00", a4 + 1),
+    ]
+    assert _dirty(conn) == []
+    conn.close()
+
+
+def test_triggers_mark_only_topics_whose_aggregates_can_change(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    a1, a2 = _insert(conn, "u1", 1), _insert(conn, "u2", 2, content="")
+    _link(conn, 1, a1)
+    _link(conn, 2, a2)
+    db.refresh_topic_stats(conn.cursor())
+
+    conn.execute("UPDATE articles SET content='edited', title='edited' WHERE id=?", (a1,))
+    assert _dirty(conn) == []  # 本文の書き換え（空⇔非空が変わらない）は集計に影響しない
+    conn.execute("UPDATE articles SET content='fetched' WHERE id=?", (a2,))
+    assert _dirty(conn) == [2]
+    conn.execute("DELETE FROM topic_stats_dirty")
+
+    conn.execute("UPDATE articles SET published_at=? WHERE id=?", (_ts(100), a1))  # event_ts が追従
+    assert _dirty(conn) == [1]
+    db.refresh_topic_stats(conn.cursor())
+    assert _stats(conn)[0][4:6] == (0, 1)
+
+    conn.execute("DELETE FROM topics WHERE id=2")
+    assert [r[0] for r in _stats(conn)] == [1]
+    conn.close()
+
+
+def test_decay_recounts_only_topics_with_articles_leaving_the_window(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    _link(conn, 1, _insert(conn, "u1", 47))        # 2 時間後に 48h 窓から外れる
+    _link(conn, 2, _insert(conn, "u2", 24 * 3))    # 7 日窓の中に留まる
+    _link(conn, 3, _insert(conn, "u3", 24 * 7 - 1))  # 2 時間後に 7 日窓から外れる
+    cur = conn.cursor()
+    db.refresh_topic_stats(cur)
+    assert [row[4:6] for row in _stats(conn)] == [(1, 1), (0, 1), (0, 1)]
+
+    assert db.decay_topic_stats(cur, ANCHOR - timedelta(hours=1)) == 0  # 基準時刻は戻さない
+    assert db.decay_topic_stats(cur, ANCHOR + timedelta(hours=2)) == 2
+    assert _dirty(conn) == [1, 3]
+    assert db.refresh_topic_stats(cur) == 2
+    assert [row[4:6] for row in _stats(conn)] == [(0, 1), (0, 1), (0, 0)]
+    conn.close()
+
+
+def _insert_titles(conn, rows):
+    conn.executemany(
+        "INSERT INTO articles(kind, region, title, url, category, published_at, fetched_at, content) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(kind, region, title, url, cat, ts, ts, content) for kind, region, title, url, cat, ts, content in rows],
+    )
+    conn.commit()
+
+
+def test_incremental_maintenance_matches_full_rebuild(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    _insert_titles(conn, [
+        ("news", "jp", "政府が生成AIの規制案を公表", "u1", "policy", _ts(50), "body"),
+        ("news", "jp", "政府が生成AIの規制案を公表 与党も了承", "u2", "policy", _ts(40), ""),
+        ("tech", "global", "rust compiler speedup lands", "u3", "devtools", _ts(24 * 8), "body"),
+        ("tech", "global", "rust compiler speedup lands in nightly", "u4", "devtools", _ts(30), "body"),
+    ])
+    conn.close()
+    thread.main()  # 紐付けと同じトランザクションで集計を反映する
+
+    # 後続の変更: 新着の紐付け、dedupe の削除と孤児掃除、本文取得、公開日時の補正
+    conn = sqlite3.connect(db.DB_PATH)
+    _insert_titles(conn, [("tech", "global", "rust compiler speedup lands today", "u5", "devtools", _ts(3), "")])
+    conn.execute("DELETE FROM articles WHERE url='u1'")
+    conn.execute("DELETE FROM topic_articles WHERE article_id NOT IN (SELECT id FROM articles)")
+    conn.execute("UPDATE articles SET content='fetched' WHERE url='u2'")
+    conn.execute("UPDATE articles SET published_at=? WHERE url='u3'", (_ts(10),))
+    conn.commit()
+    conn.close()
+    thread.main()
+
+    conn = sqlite3.connect(db.DB_PATH)
+    incremental = _stats(conn)
+    assert _dirty(conn) == []
+    conn.execute("DELETE FROM topic_stats")
+    conn.execute("INSERT INTO topic_stats_dirty(topic_id) SELECT id FROM topics")
+    db.refresh_topic_stats(conn.cursor())
+    assert incremental == _stats(conn)
+    assert [row[1:5] for row in incremental] == [(1, 1, 1, 1), (3, 0, 0, 3)]
+    conn.close()
+
+
+def test_recompute_score_48h_copies_topic_stats(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    now = datetime.now(timezone.utc)
+    for i, hours in enumerate((1, 2, 24 * 3)):
+        ts = (now - timedelta(hours=hours)).isoformat(timespec="seconds")
+        conn.execute(
+            "INSERT INTO articles(url, title, published_at, fetched_at) VALUES (?, ?, ?, ?)",
+            (f"u{i}", f"u{i}", ts, ts),
+        )
+    _link(conn, 1, 1, 2, 3)
+    conn.commit()
+    conn.close()
+
+    db.recompute_score_48h()  # 窓を現在時刻まで進めてから写す
+    conn = sqlite3.connect(db.DB_PATH)
+    assert conn.execute("SELECT score_48h FROM topics WHERE id=1").fetchone()[0] == 2
+    conn.close()
+
+
+def test_category_list_reads_representative_and_recent_from_topic_stats(tmp_path, monkeypatch):
+    conn = _init(tmp_path, monkeypatch)
+    a1 = _insert(conn, "u1", 1, content="", source="s1")
+    a2 = _insert(conn, "u2", 30, source="s2")
+    _link(conn, 1, a1, a2)
+    _link(conn, 2, _insert(conn, "u3", 2, kind="news"))  # news の記事を含むトピックは技術ページに出さない
+    _link(conn, 3)
+    conn.execute("INSERT INTO topic_insights(topic_id, importance) VALUES (3, 10)")
+    db.refresh_topic_stats(conn.cursor())
+    conn.commit()
+
+    cutoff_48h = (ANCHOR - timedelta(hours=48)).strftime("%Y-%m-%d %H:%M:%S")
+    hot_list, items = render_main._build_category_topics(conn.cursor(), "ai", cutoff_48h, 10, 5)
+    assert [(h["id"], h["articles"], h["recent"]) for h in hot_list] == [(1, 2, 2)]
+    assert [(it["id"], it["url"], it["source"], it["recent"]) for it in items] == [
+        (3, "#", "", 0),  # 記事の無いトピックも insight があれば残る
+        (1, "u2", "s2", 2),
+    ]
+    conn.close()